@@ -9,9 +9,19 @@ Follows the agent pattern from AGENTS.md §3.2.
 Features:
 - Runs on schedule (cron 2h) or manual trigger
 - Supports DRY_RUN mode (compute only, no DB writes)
-- Supports MOCK_MICROSOFT mode (generate synthetic data)
+- Supports MOCK_MICROSOFT (or MOCK_ADS) mode: synthetic data from the
+  backend's seeded generator, at any scale (MOCK_ADS_METRIC_ROWS)
 - Idempotent upserts on unique keys
 - Retry with exponential backoff
+- Streams the report: rows are parsed, normalized and written in
+  fixed-size batches (AD_METRICS_BATCH_SIZE), so memory stays flat
+  whatever the date range
+- Raw payload stored as JSON, compressed, or not at all (--raw)
+- Backfills are split into date chunks (--chunk-days) whose reports are
+  submitted concurrently and polled with adaptive backoff; each finished
+  chunk is streamed into ad_metrics and checkpointed in
+  agent_runs.watermark, so a crashed backfill resumes where it stopped
+  (same --run-id, or --resume)
 
 Usage:
     # Normal run for yesterday
@@ -25,6 +35,12 @@ Usage:
     
     # Mock mode (synthetic data)
     MOCK_MICROSOFT=true python3 ingestor_microsoft_ads.py
+    
+    # Compress the raw payload kept with each row
+    python3 ingestor_microsoft_ads.py --raw compressed
+    
+    # Backfill a year in 14-day chunks, resuming an earlier crashed attempt
+    python3 ingestor_microsoft_ads.py --start 2024-01-01 --end 2024-12-31 --chunk-days 14 --resume
 """
 
 import os
@@ -32,15 +48,52 @@ import sys
 import json
 import uuid
 import argparse
+import importlib
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import time
 import random
 
+AGENT_NAME = 'ingestor-microsoft'
+
+# Days per report when backfilling, and reports in flight at once
+CHUNK_DAYS = int(os.getenv('MICROSOFT_BACKFILL_CHUNK_DAYS', '7'))
+REPORT_CONCURRENCY = int(os.getenv('MICROSOFT_REPORT_CONCURRENCY', '4'))
+
+# Report status polling: start fast, back off to POLL_MAX_SECONDS
+POLL_INITIAL_SECONDS = 1.0
+POLL_MAX_SECONDS = 30.0
+REPORT_TIMEOUT_SECONDS = int(os.getenv('MICROSOFT_REPORT_TIMEOUT_SECONDS', '1800'))
+
+# Shared ad_metrics sink and agent_runs checkpoints from the PPC backend
+PPC_BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'apps', 'ppc-backend')
+
+def _backend_service(name: str):
+    """Import a PPC backend service module (services.<name>), putting the backend on sys.path first."""
+    if PPC_BACKEND_DIR not in sys.path:
+        sys.path.insert(0, PPC_BACKEND_DIR)
+    return importlib.import_module(f'services.{name}')
+
+def date_chunks(start_date: str, end_date: str, chunk_days: int) -> List[Tuple[str, str]]:
+    """Split an inclusive date range into consecutive (start, end) chunks of at most chunk_days days."""
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+    
+    chunks = []
+    while start_dt <= end_dt:
+        chunk_end = min(start_dt + timedelta(days=chunk_days - 1), end_dt)
+        chunks.append((start_dt.strftime('%Y-%m-%d'), chunk_end.strftime('%Y-%m-%d')))
+        start_dt = chunk_end + timedelta(days=1)
+    return chunks
+
 class MicrosoftAdsIngestor:
-    def __init__(self, developer_token: str, client_id: str, client_secret=REDACTED,
+    def __init__(self, developer_token: str, client_id: str, client_secret: str,
                  refresh_token: str, customer_id: str, account_id: str,
-                 dry_run: bool = False, mock_mode: bool = False):
+                 dry_run: bool = False, mock_mode: bool = False, raw_mode: str = 'full',
+                 chunk_days: int = CHUNK_DAYS, concurrency: int = REPORT_CONCURRENCY):
         self.developer_token = developer_token
         self.client_id = client_id
         self.client_secret = client_secret
@@ -49,6 +102,9 @@ class MicrosoftAdsIngestor:
         self.account_id = account_id
         self.dry_run = dry_run
         self.mock_mode = mock_mode
+        self.raw_mode = raw_mode
+        self.chunk_days = chunk_days
+        self.concurrency = concurrency
         
         if not mock_mode:
             self._init_authentication()
@@ -60,7 +116,7 @@ class MicrosoftAdsIngestor:
             
             self.authentication = OAuthWebAuthCodeGrant(
                 client_id=self.client_id,
-                client_secret=REDACTED,
+                client_secret=self.client_secret,
                 redirection_uri="https://login.microsoftonline.com/common/oauth2/nativeclient"
             )
             
@@ -78,31 +134,54 @@ class MicrosoftAdsIngestor:
         except Exception as e:
             raise Exception(f"Authentication failed: {e}")
     
-    def fetch_metrics(self, start_date: str, end_date: str) -> List[Dict]:
-        """Fetch metrics from Microsoft Ads API or generate mock data"""
+    def fetch_metrics(self, start_date: str, end_date: str) -> Iterator[Dict]:
+        """
+        Fetch metrics from Microsoft Ads API or generate mock data, one row at a time.
+        
+        The report is requested and downloaded before this returns (so it can
+        run in a worker thread); the rows are parsed as the iterator is consumed.
+        """
         if self.mock_mode:
             return self._generate_mock_metrics(start_date, end_date)
         else:
             return self._fetch_real_metrics(start_date, end_date)
     
-    def _fetch_real_metrics(self, start_date: str, end_date: str) -> List[Dict]:
-        """Fetch real metrics from Microsoft Ads API"""
-        from bingads.v13.reporting import ReportingServiceManager
+    def _fetch_real_metrics(self, start_date: str, end_date: str) -> Iterator[Dict]:
+        """Download the report for a date range and return its rows as the CSV is read"""
+        download_dir = tempfile.mkdtemp(prefix='msads_report_')
+        try:
+            result_file_path = self._download_report(start_date, end_date, download_dir)
+        except Exception:
+            shutil.rmtree(download_dir, ignore_errors=True)
+            raise
+        
+        if result_file_path is None:
+            # No data for the range: the service returns no file
+            shutil.rmtree(download_dir, ignore_errors=True)
+            return iter(())
+        
+        return self._read_report(result_file_path, download_dir)
+    
+    def _read_report(self, path: str, download_dir: str) -> Iterator[Dict]:
+        try:
+            yield from self.parse_report_csv(path)
+        finally:
+            shutil.rmtree(download_dir, ignore_errors=True)
+    
+    def _build_report_request(self, reporting_service_manager, start_date: str, end_date: str):
+        """CampaignPerformance report request for one date range"""
         from bingads.v13.reporting import CampaignPerformanceReportRequest, \
             ReportFormat, ReportAggregation, CampaignPerformanceReportColumn, \
             AccountThroughCampaignReportScope, ReportTime, Date
         
-        reporting_service_manager = ReportingServiceManager(
-            authorization_data=self.authorization_data,
-            poll_interval_in_milliseconds=5000
-        )
-        
         # Build report request
         report_request = CampaignPerformanceReportRequest(
             Format=ReportFormat.Csv,
-            ReportName='Daily Metrics ETL',
+            ReportName=f'Daily Metrics ETL {start_date} to {end_date}',
             ReturnOnlyCompleteData=False,
-            Aggregation=ReportAggregation.Daily
+            Aggregation=ReportAggregation.Daily,
+            ExcludeReportHeader=True,
+            ExcludeReportFooter=True
         )
         
         # Scope
@@ -148,83 +227,105 @@ class MicrosoftAdsIngestor:
         ])
         report_request.Columns = report_columns
         
-        # Submit and download
-        report_container = reporting_service_manager.submit_download(report_request)
-        result_file_path = reporting_service_manager.download_file(report_container.request_id)
+        return report_request
+    
+    def _download_report(self, start_date: str, end_date: str, download_dir: str) -> Optional[str]:
+        """Submit a report, wait for it and download it; returns the CSV path, or None if empty"""
+        from bingads.v13.reporting import ReportingServiceManager
         
-        # Parse CSV
-        metrics = []
+        # One manager (and SOAP client) per report, so reports can run in parallel threads
+        reporting_service_manager = ReportingServiceManager(
+            authorization_data=self.authorization_data,
+            poll_interval_in_milliseconds=int(POLL_INITIAL_SECONDS * 1000)
+        )
+        report_request = self._build_report_request(reporting_service_manager, start_date, end_date)
+        
+        operation = reporting_service_manager.submit_download(report_request)
+        self._wait_for_report(operation, f"{start_date} to {end_date}")
+        
+        return operation.download_result_file(
+            result_file_directory=download_dir,
+            result_file_name=f"microsoft_{start_date}_{end_date}.csv",
+            decompress=True,
+            overwrite=True
+        )
+    
+    def _wait_for_report(self, operation, label: str):
+        """
+        Poll a submitted report with adaptive backoff.
+        
+        Small reports are usually ready within seconds, so polling starts at
+        POLL_INITIAL_SECONDS and doubles (with jitter, so parallel chunks
+        don't poll in lockstep) up to POLL_MAX_SECONDS.
+        """
+        jitter = random.Random()
+        delay = POLL_INITIAL_SECONDS
+        deadline = time.monotonic() + REPORT_TIMEOUT_SECONDS
+        polls = 0
+        
+        while True:
+            status = operation.get_status()
+            polls += 1
+            
+            if status.status == 'Success':
+                print(f"  Report {label} ready after {polls} polls")
+                return
+            if status.status == 'Error':
+                raise Exception(f"Report {label} failed (request {operation.request_id})")
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Report {label} not ready after {REPORT_TIMEOUT_SECONDS}s")
+            
+            time.sleep(delay * jitter.uniform(0.8, 1.2))
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+    
+    @staticmethod
+    def parse_report_csv(path: str) -> Iterator[Dict]:
+        """Parse a CampaignPerformance CSV report line by line, skipping summary rows"""
         import csv
-        with open(result_file_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
                 if row.get('CampaignId') and row['CampaignId'] != '--':
-                    metrics.append({
+                    yield {
                         'date': row.get('TimePeriod'),
                         'account_id': row.get('AccountId'),
                         'campaign_id': row.get('CampaignId'),
                         'campaign_name': row.get('CampaignName'),
                         'adgroup_id': row.get('AdGroupId'),
                         'adgroup_name': row.get('AdGroupName'),
-                        'impressions': int(row.get('Impressions', 0)),
-                        'clicks': int(row.get('Clicks', 0)),
-                        'spend': float(row.get('Spend', 0)),
-                        'conversions': int(row.get('Conversions', 0)),
-                        'revenue': float(row.get('Revenue', 0)) if row.get('Revenue') else 0
-                    })
-        
-        return metrics
+                        'impressions': int(row.get('Impressions') or 0),
+                        'clicks': int(row.get('Clicks') or 0),
+                        'spend': float(row.get('Spend') or 0),
+                        'conversions': float(row.get('Conversions') or 0),
+                        'revenue': float(row.get('Revenue') or 0)
+                    }
     
-    def _generate_mock_metrics(self, start_date: str, end_date: str) -> List[Dict]:
-        """Generate deterministic synthetic metrics for testing"""
-        metrics = []
-        
-        # Mock campaigns
-        campaigns = [
-            {'id': 'mock_msft_camp_001', 'name': 'Microsoft - Brand Search'},
-            {'id': 'mock_msft_camp_002', 'name': 'Microsoft - Developer Tools'},
-            {'id': 'mock_msft_camp_003', 'name': 'Microsoft - Enterprise'},
-        ]
-        
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        current_dt = start_dt
-        while current_dt <= end_dt:
-            date_str = current_dt.strftime('%Y-%m-%d')
-            
-            for campaign in campaigns:
-                # Deterministic random based on date + campaign
-                seed = hash(f"{date_str}_{campaign['id']}")
-                random.seed(seed)
-                
-                impressions = random.randint(500, 5000)
-                clicks = int(impressions * random.uniform(0.02, 0.05))
-                spend = clicks * random.uniform(1.5, 4.0)
-                conversions = int(clicks * random.uniform(0.01, 0.05))
-                revenue = conversions * random.uniform(50, 200)
-                
-                metrics.append({
-                    'date': date_str,
-                    'account_id': 'mock_account_msft',
-                    'campaign_id': campaign['id'],
-                    'campaign_name': campaign['name'],
-                    'adgroup_id': f"{campaign['id']}_ag_001",
-                    'adgroup_name': 'Mock AdGroup',
-                    'impressions': impressions,
-                    'clicks': clicks,
-                    'spend': round(spend, 2),
-                    'conversions': conversions,
-                    'revenue': round(revenue, 2)
-                })
-            
-            current_dt += timedelta(days=1)
+    def _generate_mock_metrics(self, start_date: str, end_date: str) -> Iterator[Dict]:
+        """
+        Synthetic ad group metrics from the backend's generator
+        (services/synthetic_data.py): deterministic for a MOCK_ADS_SEED,
+        sized by MOCK_ADS_METRIC_ROWS
+        """
+        data = _backend_service('synthetic_data').synthetic_data('microsoft')
         
-        return metrics
+        for row in data.ad_group_daily_rows(start_date, end_date):
+            campaign, ad_group = row['campaign'], row['ad_group']
+            yield {
+                'date': row['date'].strftime('%Y-%m-%d'),
+                'account_id': campaign['account_id'],
+                'campaign_id': campaign['id'],
+                'campaign_name': campaign['name'],
+                'adgroup_id': ad_group['id'],
+                'adgroup_name': ad_group['name'],
+                'impressions': row['impressions'],
+                'clicks': row['clicks'],
+                'spend': round(row['cost_micros'] / 1_000_000, 2),
+                'conversions': row['conversions'],
+                'revenue': row['conversions_value']
+            }
     
-    def normalize_to_ad_metrics(self, raw_metrics: List[Dict]) -> List[Dict]:
+    def normalize_to_ad_metrics(self, raw_metrics: Iterable[Dict]) -> Iterator[Dict]:
         """
-        Normalize Microsoft Ads data to unified ad_metrics schema.
+        Normalize Microsoft Ads data to unified ad_metrics schema, one row at a time.
         
         Schema:
         - platform: 'microsoft'
@@ -238,12 +339,12 @@ class MicrosoftAdsIngestor:
         - spend_usd: float
         - conversions: int
         - revenue_usd: float (optional)
-        - raw: JSON (original data)
+        - raw: JSON (original data), compressed or omitted per raw_mode
         """
-        normalized = []
+        encode_raw = _backend_service('ad_metrics_sink').encode_raw
         
         for row in raw_metrics:
-            normalized.append({
+            yield {
                 'platform': 'microsoft',
                 'date': row['date'],
                 'account_id': str(row['account_id']),
@@ -255,85 +356,232 @@ class MicrosoftAdsIngestor:
                 'spend_usd': row['spend'],
                 'conversions': row['conversions'],
                 'revenue_usd': row.get('revenue', 0),
-                'raw': json.dumps(row)
-            })
-        
-        return normalized
+                'raw': encode_raw(row, self.raw_mode)
+            }
     
-    def upsert_to_database(self, metrics: List[Dict]) -> int:
+    def upsert_to_database(self, metrics: Iterable[Dict], sink=None) -> int:
         """
         Upsert metrics to ad_metrics table.
         Uses ON CONFLICT for idempotency based on unique constraint.
         
         Constraint: uniq_row ON (platform, date, account_id, campaign_id, adgroup_id, ad_id)
+        
+        Rows are consumed as they arrive and written in batches of
+        AD_METRICS_BATCH_SIZE, each committed on its own. Pass an open sink
+        to add to it instead (the caller flushes and closes it).
         """
         if self.dry_run:
-            print(f"[DRY_RUN] Would upsert {len(metrics)} rows to ad_metrics")
-            return len(metrics)
+            count = sum(1 for _ in metrics)
+            print(f"[DRY_RUN] Would upsert {count} rows to ad_metrics")
+            return count
         
-        # TODO: Implement actual database connection
-        # For now, just write to JSON file
-        output_file = f"ad_metrics_microsoft_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_file, 'w') as f:
-            json.dump(metrics, f, indent=2)
+        sink_module = _backend_service('ad_metrics_sink')
+        if sink is not None:
+            return self._write_rows(metrics, sink, sink_module.ad_metric_row)
+        
+        with sink_module.AdMetricsSink() as sink:
+            self._write_rows(metrics, sink, sink_module.ad_metric_row)
+        
+        print(f"✅ Upserted {sink.stats['rows_written']} rows to ad_metrics in {sink.stats['batches']} batches")
+        return sink.stats['rows_written']
+    
+    def _write_rows(self, metrics: Iterable[Dict], sink, ad_metric_row) -> int:
+        count = 0
+        for m in metrics:
+            sink.write(ad_metric_row(
+                m['platform'], m['date'], m['account_id'], m['campaign_id'],
+                adgroup_id=m.get('adgroup_id'),
+                ad_id=m.get('ad_id'),
+                impressions=m['impressions'],
+                clicks=m['clicks'],
+                spend=m['spend_usd'],
+                conversions=m['conversions'],
+                revenue=m.get('revenue_usd'),
+                raw=m.get('raw'),
+                raw_mode=self.raw_mode
+            ))
+            count += 1
+        return count
+    
+    @staticmethod
+    def _tally(metrics: Iterable[Dict], totals: Dict) -> Iterator[Dict]:
+        """Pass normalized rows through, adding them to totals"""
+        for m in metrics:
+            totals['rows'] += 1
+            totals['spend'] += m['spend_usd']
+            totals['clicks'] += m['clicks']
+            totals['impressions'] += m['impressions']
+            totals['conversions'] += m['conversions']
+            yield m
+    
+    def _start_run(self, session_factory, run_id: str, params: Dict, resume: bool) -> Tuple[str, Optional[str]]:
+        """
+        Record the run in agent_runs and find where to resume.
         
-        print(f"✅ Wrote {len(metrics)} rows to {output_file}")
-        return len(metrics)
+        Returns (run_id, watermark): with resume and no earlier run under
+        run_id, the latest unfinished run with the same parameters is picked
+        up. An earlier run's watermark only counts if it covered the same
+        account, range and chunking.
+        """
+        agent_runs = _backend_service('agent_runs')
+        db = session_factory()
+        try:
+            run = agent_runs.get_run(db, AGENT_NAME, run_id)
+            if run is None and resume:
+                run = agent_runs.latest_unfinished_run(db, AGENT_NAME, params)
+                if run is not None:
+                    run_id = run.run_id
+            
+            watermark = None
+            if run is not None and run.watermark:
+                earlier = agent_runs.run_stats(run)
+                if all(earlier.get(key) == value for key, value in params.items()):
+                    watermark = run.watermark
+                    print(f"Resuming run {run_id}: chunks through {watermark} already ingested")
+                else:
+                    print(f"⚠️  Run {run_id} was for different parameters; not resuming from its watermark")
+            
+            agent_runs.start_run(db, AGENT_NAME, run_id, params)
+            return run_id, watermark
+        finally:
+            db.close()
     
-    def run(self, start_date: str, end_date: str, job_id: str, run_id: str) -> Dict:
+    def _record_run(self, session_factory, action: str, run_id: str, *args, **kwargs):
+        """Call services.agent_runs.<action> for this run in its own session"""
+        agent_runs = _backend_service('agent_runs')
+        db = session_factory()
+        try:
+            getattr(agent_runs, action)(db, AGENT_NAME, run_id, *args, **kwargs)
+        finally:
+            db.close()
+    
+    def run(self, start_date: str, end_date: str, job_id: str, run_id: str, resume: bool = False) -> Dict:
         """
         Execute the ingestion job.
         
+        The range is split into chunks of chunk_days. Their reports are
+        requested concurrently (concurrency at a time), and each finished
+        chunk is streamed into ad_metrics and flushed. After each chunk,
+        agent_runs.watermark moves to the end of the longest prefix of
+        finished chunks, so rerunning with the same run_id (or resume=True)
+        skips the chunks already written.
+        
         Returns AgentResult as per AGENTS.md §2.2
         """
+        chunks = date_chunks(start_date, end_date, self.chunk_days)
+        
         print(f"=== Microsoft Ads Ingestor ===")
         print(f"Job ID: {job_id}")
         print(f"Run ID: {run_id}")
         print(f"Date Range: {start_date} to {end_date}")
+        print(f"Chunks: {len(chunks)} x {self.chunk_days} days, {self.concurrency} concurrent")
         print(f"Dry Run: {self.dry_run}")
         print(f"Mock Mode: {self.mock_mode}")
         print()
         
         start_time = time.time()
+        session_factory = None
         
         try:
-            # Step 1: Fetch metrics
-            print(f"Fetching metrics from Microsoft Ads API...")
-            raw_metrics = self.fetch_metrics(start_date, end_date)
-            print(f"✅ Fetched {len(raw_metrics)} raw metric rows")
+            sink = None
+            watermark = None
+            if not self.dry_run:
+                sink_module = _backend_service('ad_metrics_sink')
+                session_factory = sink_module.ad_metrics_session_factory()
+                sink = sink_module.AdMetricsSink(session_factory=session_factory)
+                
+                params = {
+                    'account_id': self.account_id,
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'chunk_days': self.chunk_days
+                }
+                run_id, watermark = self._start_run(session_factory, run_id, params, resume)
             
-            # Step 2: Normalize
-            print(f"Normalizing to ad_metrics schema...")
-            normalized_metrics = self.normalize_to_ad_metrics(raw_metrics)
-            print(f"✅ Normalized {len(normalized_metrics)} rows")
+            pending = [chunk for chunk in chunks if watermark is None or chunk[1] > watermark]
+            totals = {'rows': 0, 'spend': 0.0, 'clicks': 0, 'impressions': 0, 'conversions': 0}
+            finished = set()
+            failed = []
+            next_index = 0
             
-            # Step 3: Upsert to database
-            print(f"Upserting to database...")
-            records_written = self.upsert_to_database(normalized_metrics)
+            # Reports are requested and downloaded in worker threads; rows are
+            # streamed into the sink here, one finished chunk at a time
+            print(f"Streaming {len(pending)} chunks from Microsoft Ads API into ad_metrics...")
+            with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+                futures = {pool.submit(self.fetch_metrics, chunk_start, chunk_end): (chunk_start, chunk_end)
+                           for chunk_start, chunk_end in pending}
+                
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        normalized_metrics = self._tally(self.normalize_to_ad_metrics(future.result()), totals)
+                        self.upsert_to_database(normalized_metrics, sink)
+                        if sink is not None:
+                            sink.flush()
+                    except Exception as e:
+                        failed.append(chunk)
+                        print(f"❌ Chunk {chunk[0]} to {chunk[1]} failed: {e}")
+                        continue
+                    
+                    finished.add(chunk)
+                    print(f"✅ Chunk {chunk[0]} to {chunk[1]} ingested")
+                    
+                    # The watermark only passes chunks with every earlier chunk finished too
+                    advanced = False
+                    while next_index < len(pending) and pending[next_index] in finished:
+                        watermark = pending[next_index][1]
+                        next_index += 1
+                        advanced = True
+                    
+                    if advanced and session_factory is not None:
+                        self._record_run(session_factory, 'checkpoint_run', run_id, watermark,
+                                         {'chunks_done': len(finished), 'rows': totals['rows']})
             
-            # Calculate metrics
-            total_spend = sum(m['spend_usd'] for m in normalized_metrics)
-            total_clicks = sum(m['clicks'] for m in normalized_metrics)
-            total_impressions = sum(m['impressions'] for m in normalized_metrics)
-            total_conversions = sum(m['conversions'] for m in normalized_metrics)
+            records_written = totals['rows']
+            if sink is not None:
+                records_written = sink.close()['rows_written']
+            print(f"✅ Fetched and normalized {totals['rows']} rows")
+            
+            total_spend = totals['spend']
+            total_clicks = totals['clicks']
+            total_impressions = totals['impressions']
+            total_conversions = totals['conversions']
             
             elapsed_time = time.time() - start_time
+            ok = not failed
+            
+            metrics = {
+                'records_fetched': totals['rows'],
+                'records_written': records_written,
+                'total_spend_usd': round(total_spend, 2),
+                'total_clicks': total_clicks,
+                'total_impressions': total_impressions,
+                'total_conversions': total_conversions,
+                'chunks_total': len(chunks),
+                'chunks_skipped': len(chunks) - len(pending),
+                'chunks_ingested': len(finished),
+                'chunks_failed': len(failed),
+                'watermark': watermark,
+                'elapsed_seconds': round(elapsed_time, 2)
+            }
+            
+            if session_factory is not None:
+                self._record_run(session_factory, 'finish_run', run_id, ok, metrics)
+            
+            if ok:
+                notes = [f"Successfully ingested Microsoft Ads data for {start_date} to {end_date}"]
+            else:
+                notes = [f"Failed chunks: {', '.join(f'{cs} to {ce}' for cs, ce in sorted(failed))}"]
+                if not self.dry_run:
+                    resume_point = f"after {watermark}" if watermark else "from the start"
+                    notes.append(f"Rerun with --run-id {run_id} (or --resume) to continue {resume_point}")
             
             return {
                 'job_id': job_id,
                 'run_id': run_id,
-                'ok': True,
-                'metrics': {
-                    'records_fetched': len(raw_metrics),
-                    'records_written': records_written,
-                    'total_spend_usd': round(total_spend, 2),
-                    'total_clicks': total_clicks,
-                    'total_impressions': total_impressions,
-                    'total_conversions': total_conversions,
-                    'elapsed_seconds': round(elapsed_time, 2)
-                },
-                'notes': [
-                    f"Successfully ingested Microsoft Ads data for {start_date} to {end_date}",
+                'ok': ok,
+                'metrics': metrics,
+                'notes': notes + [
                     f"Dry run: {self.dry_run}",
                     f"Mock mode: {self.mock_mode}"
                 ]
@@ -342,6 +590,12 @@ class MicrosoftAdsIngestor:
         except Exception as e:
             elapsed_time = time.time() - start_time
             
+            if session_factory is not None:
+                try:
+                    self._record_run(session_factory, 'finish_run', run_id, False, {'error': str(e)})
+                except Exception:
+                    pass
+            
             return {
                 'job_id': job_id,
                 'run_id': run_id,
@@ -360,6 +614,13 @@ def main():
     parser.add_argument('--end', type=str, help='End date (YYYY-MM-DD)')
     parser.add_argument('--job-id', type=str, default=f"ingestor-microsoft-{uuid.uuid4().hex[:8]}")
     parser.add_argument('--run-id', type=str, default=uuid.uuid4().hex)
+    parser.add_argument('--raw', choices=['full', 'compressed', 'none'],
+                        default=os.getenv('AD_METRICS_RAW_MODE', 'full'),
+                        help='How to keep the raw report row with each ad_metrics row')
+    parser.add_argument('--chunk-days', type=int, default=CHUNK_DAYS, help='Days per report chunk')
+    parser.add_argument('--concurrency', type=int, default=REPORT_CONCURRENCY, help='Reports in flight at once')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the latest unfinished run for the same account and range')
     
     args = parser.parse_args()
     
@@ -371,7 +632,7 @@ def main():
     
     # Get environment config
     dry_run = os.getenv('DRY_RUN', 'false').lower() == 'true'
-    mock_mode = os.getenv('MOCK_MICROSOFT', 'false').lower() == 'true'
+    mock_mode = os.getenv('MOCK_MICROSOFT', os.getenv('MOCK_ADS', 'false')).lower() == 'true'
     
     developer_token = os.getenv('MICROSOFT_ADS_DEVELOPER_TOKEN')
     client_id = os.getenv('MICROSOFT_ADS_CLIENT_ID')
@@ -395,12 +656,15 @@ def main():
     ingestor = MicrosoftAdsIngestor(
         developer_token=developer_token or 'mock',
         client_id=client_id or 'mock',
-        client_secret=REDACTED or 'mock',
+        client_secret=client_secret or 'mock',
         refresh_token=refresh_token or 'mock',
         customer_id=customer_id or 'mock',
         account_id=account_id or 'mock',
         dry_run=dry_run,
-        mock_mode=mock_mode
+        mock_mode=mock_mode,
+        raw_mode=args.raw,
+        chunk_days=args.chunk_days,
+        concurrency=args.concurrency
     )
     
     # Run ingestion
@@ -408,7 +672,8 @@ def main():
         start_date=args.start,
         end_date=args.end,
         job_id=args.job_id,
-        run_id=args.run_id
+        run_id=args.run_id,
+        resume=args.resume
     )
     
     # Print result
@@ -7,6 +7,8 @@ import logging
 
 load_dotenv()
 
+from services.synthetic_data import MANAGER_ACCOUNT_ID, MOCK_ADS
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +31,12 @@ class GoogleAdsClientFactory:
     
     def _create_client(self) -> GoogleAdsClient:
         """Create a Google Ads client from environment variables."""
+        if MOCK_ADS:
+            from ads.synthetic_client import SyntheticGoogleAdsClient
+            
+            logger.info("MOCK_ADS set: using the synthetic Google Ads client")
+            return SyntheticGoogleAdsClient()
+        
         credentials = {
             "developer_token": os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN"),
             "client_id": os.getenv("GOOGLE_ADS_CLIENT_ID"),
@@ -54,6 +62,8 @@ class GoogleAdsClientFactory:
     def customer_id(self) -> str:
         """Get the customer ID from environment."""
         customer_id = os.getenv("GOOGLE_ADS_CUSTOMER_ID")
+        if not customer_id and MOCK_ADS:
+            return MANAGER_ACCOUNT_ID
         if not customer_id:
             raise ValueError("GOOGLE_ADS_CUSTOMER_ID not set")
         return customer_id.replace("-", "")  # Remove dashes
@@ -0,0 +1,656 @@
+"""
+Local stand-in for the ad platform APIs, for offline load and latency testing.
+
+Serves the subset of the Google Ads (REST), LinkedIn, Reddit and
+Microsoft endpoints the app calls, from the seeded synthetic data set of
+services/synthetic_data.py (sized by the MOCK_ADS_* settings): the OAuth
+authorize, token and revoke endpoints, account and campaign lists,
+LinkedIn adAnalyticsV2, Reddit campaign metrics, Google Ads search and
+searchStream, and the campaign and ad updates. Each platform is served
+under its own prefix (/google, /linkedin, /reddit, /microsoft) with the
+live API's paths below it; set ADS_API_BASE_URL to the server's root and
+the providers, reporting clients and fetch scripts call it instead (see
+ads/http_utils.platform_url).
+
+Every API request can be delayed, failed with a 500 or rate limited with
+a 429 and Retry-After, and lists are paged (LinkedIn start/count, Reddit
+next_url, Google pageToken) at most FAKE_ADS_MAX_PAGE_SIZE items at a
+time, so the clients' concurrency, pagination and retries can be load
+tested. LinkedIn analytics, which the real API doesn't page, come back
+in one response of at most 15000 elements. The faults are drawn from a seeded generator. GET /fake/stats
+reports what the server has seen (requests, statuses, peak concurrency),
+POST /fake/reset clears it and POST /fake/settings changes the faults of
+a running server.
+
+Usage:
+    python -m ads.fake_server --port 8900 --latency-ms 50 --rate-limit-rate 0.05
+    ADS_API_BASE_URL=http://127.0.0.1:8900 python fetch-reddit.py --start 2025-10-20 --end 2025-10-26
+"""
+
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import secrets
+import time
+import logging
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, RedirectResponse, Response
+
+from services.synthetic_data import synthetic_data
+from .synthetic_client import SyntheticEnum, SyntheticGoogleAdsService, SyntheticRow
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8900
+
+GOOGLE_ADS_PAGE_SIZE = 10000
+
+# Elements of one LinkedIn adAnalyticsV2 response, which isn't paged
+LINKEDIN_ANALYTICS_MAX_ELEMENTS = 15000
+
+
+@dataclass
+class FakeServerSettings:
+    """Faults and paging of the fake server; defaults come from FAKE_ADS_* env vars."""
+
+    # Added to every API request, plus up to jitter_ms at random
+    latency_ms: float = float(os.getenv("FAKE_ADS_LATENCY_MS", "0"))
+    jitter_ms: float = float(os.getenv("FAKE_ADS_JITTER_MS", "0"))
+    # Share of API requests answered with a 500
+    error_rate: float = float(os.getenv("FAKE_ADS_ERROR_RATE", "0"))
+    # Share of API requests answered with a 429, and requests per second
+    # per platform above which every request is (0 for no limit)
+    rate_limit_rate: float = float(os.getenv("FAKE_ADS_RATE_LIMIT_RATE", "0"))
+    rate_limit_qps: int = int(os.getenv("FAKE_ADS_RATE_LIMIT_QPS", "0"))
+    # Retry-After of the 429s, in seconds
+    retry_after: float = float(os.getenv("FAKE_ADS_RETRY_AFTER", "1"))
+    # Largest page served, whatever page size the client asks for
+    max_page_size: int = int(os.getenv("FAKE_ADS_MAX_PAGE_SIZE", "1000"))
+    seed: int = int(os.getenv("FAKE_ADS_SEED", "0"))
+
+
+class FakeServerState:
+    """Settings, fault generator and request statistics of one app."""
+
+    def __init__(self, settings: FakeServerSettings):
+        self.settings = settings
+        self.reset()
+
+    def reset(self):
+        self.rng = random.Random(self.settings.seed)
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.rate_limited = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._windows: Dict[str, Tuple[int, int]] = {}
+
+    def over_qps(self, platform: str) -> bool:
+        """Count a request against its platform's one-second window; True past rate_limit_qps."""
+        if not self.settings.rate_limit_qps:
+            return False
+        second = int(time.monotonic())
+        window, count = self._windows.get(platform, (second, 0))
+        if window != second:
+            window, count = second, 0
+        self._windows[platform] = (window, count + 1)
+        return count >= self.settings.rate_limit_qps
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": sum(self.requests.values()),
+            "by_platform": dict(self.requests),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "settings": asdict(self.settings),
+        }
+
+
+def _state(request: Request) -> FakeServerState:
+    return request.app.state.fake
+
+
+def require_bearer(request: Request):
+    if not request.headers.get("Authorization", "").startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+
+
+def _int_param(request: Request, name: str, default: int) -> int:
+    try:
+        return int(request.query_params.get(name, default))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+
+
+def _page_size(request: Request, name: str) -> int:
+    limit = _state(request).settings.max_page_size
+    return max(1, min(_int_param(request, name, limit), limit))
+
+
+def _day(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value}")
+
+
+def _window(start: date, end: date) -> Tuple[date, date]:
+    if end < start:
+        raise HTTPException(status_code=400, detail=f"End date {end} is before start date {start}")
+    return start, end
+
+
+def _account(platform: str, account_id: str) -> int:
+    account = synthetic_data(platform).account_index(account_id)
+    if account is None:
+        raise HTTPException(status_code=404, detail=f"Account {account_id} not found")
+    return account
+
+
+def _campaign(platform: str, campaign_id: str) -> int:
+    try:
+        campaign = synthetic_data(platform).campaign_index(campaign_id)
+    except ValueError:
+        campaign = None
+    if campaign is None:
+        raise HTTPException(status_code=404, detail=f"Campaign {campaign_id} not found")
+    return campaign
+
+
+@lru_cache(maxsize=64)
+def _campaign_metrics(platform: str, campaigns: Tuple[int, ...], start: date, end: date, period: str) -> Tuple[Dict, ...]:
+    """
+    Metrics of campaigns per day, month or (total) the whole range, skipping
+    periods without impressions as the platforms do. Cached, as each page
+    of a report asks for the same rows.
+    """
+    data = synthetic_data(platform)
+    days = data.dates(start, end)
+    if period == "day":
+        periods = [(day, day, slice(offset, offset + 1)) for offset, day in enumerate(days)]
+    elif period == "month":
+        periods = []
+        for _, group in itertools.groupby(enumerate(days), key=lambda item: (item[1].year, item[1].month)):
+            group = list(group)
+            periods.append((group[0][1], group[-1][1], slice(group[0][0], group[-1][0] + 1)))
+    else:
+        periods = [(start, end, slice(None))]
+
+    rows = []
+    for index in campaigns:
+        metrics = data.campaign_metrics(index, start, end)
+        for period_start, period_end, span in periods:
+            values = {name: metrics[name][span].sum().item() for name in metrics}
+            if values["impressions"]:
+                rows.append({"campaign": index, "start": period_start, "end": period_end, **values})
+    return tuple(rows)
+
+
+async def _form(request: Request) -> Dict[str, str]:
+    return dict(await request.form())
+
+
+def _authorize_redirect(request: Request) -> RedirectResponse:
+    """Straight back to redirect_uri, as if the user had consented."""
+    params = request.query_params
+    if "redirect_uri" not in params:
+        raise HTTPException(status_code=400, detail="Missing redirect_uri")
+    query = urlencode({"code": f"fake-code-{secrets.token_hex(8)}", "state": params.get("state", "")})
+    return RedirectResponse(f"{params['redirect_uri']}?{query}", status_code=302)
+
+
+def _token_response(form: Dict[str, str], expires_in: int = 3600) -> Dict[str, Any]:
+    grant_type = form.get("grant_type")
+    if grant_type == "refresh_token":
+        refresh_token = form.get("refresh_token")
+    elif grant_type == "authorization_code":
+        refresh_token = f"fake-refresh-{secrets.token_hex(8)}"
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported grant_type: {grant_type}")
+    if not refresh_token:
+        raise HTTPException(status_code=400, detail="Missing refresh_token")
+
+    return {
+        "access_token": f"fake-{secrets.token_hex(16)}",
+        "refresh_token": refresh_token,
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+        "scope": form.get("scope", ""),
+    }
+
+
+# Google Ads: OAuth and the REST interface of GoogleAdsService
+
+google = APIRouter(prefix="/google")
+
+
+@google.get("/o/oauth2/v2/auth")
+async def google_authorize(request: Request):
+    return _authorize_redirect(request)
+
+
+@google.post("/token")
+async def google_token(request: Request):
+    return _token_response(await _form(request))
+
+
+@google.post("/revoke")
+async def google_revoke():
+    return {}
+
+
+def _rest_value(value):
+    """A result row as REST JSON: camelCase keys, enums by name and int64s as strings."""
+    if isinstance(value, SyntheticRow):
+        return {_camel_case(name): _rest_value(field) for name, field in value.__dict__.items()}
+    if isinstance(value, SyntheticEnum):
+        return value.name
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def _camel_case(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(part.title() for part in rest)
+
+
+def _google_results(customer_id: str, query: str) -> Iterable[SyntheticRow]:
+    return SyntheticGoogleAdsService(synthetic_data("google")).search(customer_id=customer_id, query=query)
+
+
+@google.get("/{version}/customers:listAccessibleCustomers", dependencies=[Depends(require_bearer)])
+async def google_list_accessible_customers():
+    return {"resourceNames": [f"customers/{account['id']}" for account in synthetic_data("google").accounts()]}
+
+
+@google.post("/{version}/customers/{customer_id}/googleAds:search", dependencies=[Depends(require_bearer)])
+async def google_search(customer_id: str, request: Request):
+    body = await request.json()
+    try:
+        offset = int(body.get("pageToken") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pageToken")
+    page_size = min(int(body.get("pageSize") or GOOGLE_ADS_PAGE_SIZE), _state(request).settings.max_page_size)
+
+    # One more than the page tells whether there is a next one
+    try:
+        rows = list(itertools.islice(_google_results(customer_id, body.get("query")), offset, offset + page_size + 1))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = {"results": [_rest_value(row) for row in rows[:page_size]]}
+    if len(rows) > page_size:
+        response["nextPageToken"] = str(offset + page_size)
+    return response
+
+
+@google.post("/{version}/customers/{customer_id}/googleAds:searchStream", dependencies=[Depends(require_bearer)])
+async def google_search_stream(customer_id: str, request: Request):
+    body = await request.json()
+    rows = _google_results(customer_id, body.get("query"))
+    batches = iter(lambda: list(itertools.islice(rows, GOOGLE_ADS_PAGE_SIZE)), [])
+    try:
+        return [{"results": [_rest_value(row) for row in batch]} for batch in batches]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@google.post("/{version}/customers/{customer_id}/{collection}:mutate", dependencies=[Depends(require_bearer)])
+async def google_mutate(customer_id: str, collection: str, request: Request):
+    body = await request.json()
+    results = []
+    for position, operation in enumerate(body.get("operations") or []):
+        resource = operation.get("update") or operation.get("create") or {}
+        resource_name = resource.get("resourceName") or operation.get("remove")
+        results.append({"resourceName": resource_name or f"customers/{customer_id}/{collection}/{position + 1}"})
+    return {"results": results}
+
+
+# LinkedIn Marketing API, under both /v2 and /rest
+
+linkedin = APIRouter(prefix="/linkedin")
+
+
+@linkedin.get("/oauth/v2/authorization")
+async def linkedin_authorize(request: Request):
+    return _authorize_redirect(request)
+
+
+@linkedin.post("/oauth/v2/accessToken")
+async def linkedin_access_token(request: Request):
+    return _token_response(await _form(request), expires_in=5184000)
+
+
+def _linkedin_page(request: Request, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
+    start = max(0, _int_param(request, "start", 0))
+    count = _page_size(request, "count")
+    return {
+        "elements": elements[start:start + count],
+        "paging": {"start": start, "count": count, "total": len(elements)},
+    }
+
+
+def _linkedin_day(request: Request, bound: str) -> date:
+    try:
+        return date(*(int(request.query_params[f"dateRange.{bound}.{part}"]) for part in ("year", "month", "day")))
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid dateRange.{bound}")
+
+
+def _linkedin_date(day: date) -> Dict[str, int]:
+    return {"year": day.year, "month": day.month, "day": day.day}
+
+
+def _linkedin_account(account: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": int(account["id"]),
+        "name": account["name"],
+        "currency": account["currency_code"],
+        "status": "ACTIVE",
+        "type": "BUSINESS",
+        "reference": f"urn:li:organization:{account['id']}",
+    }
+
+
+@linkedin.get("/{api}/adAccounts", dependencies=[Depends(require_bearer)])
+@linkedin.get("/{api}/adAccountsV2", dependencies=[Depends(require_bearer)])
+async def linkedin_ad_accounts(request: Request):
+    accounts = [_linkedin_account(account) for account in synthetic_data("linkedin").accounts()]
+    return _linkedin_page(request, accounts)
+
+
+@linkedin.get("/{api}/adCampaignsV2", dependencies=[Depends(require_bearer)])
+async def linkedin_ad_campaigns(request: Request):
+    account_urn = request.query_params.get("search.account.values[0]")
+    account = _account("linkedin", account_urn.rsplit(":", 1)[-1]) if account_urn else None
+
+    campaigns = [
+        {
+            "id": int(campaign["id"]),
+            "name": campaign["name"],
+            "status": "ACTIVE" if campaign["status"] == "ENABLED" else campaign["status"],
+            "account": f"urn:li:sponsoredAccount:{campaign['account_id']}",
+            "campaignGroup": f"urn:li:sponsoredCampaignGroup:{campaign['account_id']}",
+            "dailyBudget": {"amount": f"{campaign['daily_budget_micros'] / 1_000_000:.2f}", "currencyCode": "USD"},
+        }
+        for campaign in synthetic_data("linkedin").campaigns(account)
+    ]
+    return _linkedin_page(request, campaigns)
+
+
+@linkedin.get("/{api}/adAnalyticsV2", dependencies=[Depends(require_bearer)])
+async def linkedin_ad_analytics(request: Request):
+    params = request.query_params
+    periods = {"DAILY": "day", "MONTHLY": "month", "ALL": "total"}
+    if params.get("pivot", "CAMPAIGN") != "CAMPAIGN" or params.get("timeGranularity") not in periods:
+        raise HTTPException(status_code=400, detail="Only CAMPAIGN pivots by DAILY, MONTHLY or ALL are supported")
+
+    start, end = _window(_linkedin_day(request, "start"), _linkedin_day(request, "end"))
+    campaign_urns = [value for key, value in params.items() if key.startswith("campaigns[")]
+    campaigns = tuple(_campaign("linkedin", urn.rsplit(":", 1)[-1]) for urn in campaign_urns)
+
+    data = synthetic_data("linkedin")
+    elements = [
+        {
+            "pivotValue": f"urn:li:sponsoredCampaign:{data.campaign_id(row['campaign'])}",
+            "dateRange": {"start": _linkedin_date(row["start"]), "end": _linkedin_date(row["end"])},
+            "impressions": row["impressions"],
+            "clicks": row["clicks"],
+            "costInUsd": f"{row['cost_micros'] / 1_000_000:.2f}",
+            "externalWebsiteConversions": int(row["conversions"]),
+        }
+        for row in _campaign_metrics("linkedin", campaigns, start, end, periods[params["timeGranularity"]])
+    ]
+    # Like the real finder: no paging, everything up to the cap in one response
+    return {"elements": elements[:LINKEDIN_ANALYTICS_MAX_ELEMENTS]}
+
+
+@linkedin.post("/{api}/adCampaignsV2/{campaign_id}", dependencies=[Depends(require_bearer)])
+async def linkedin_update_campaign(campaign_id: str, request: Request):
+    _campaign("linkedin", campaign_id)
+    return {"id": campaign_id, "patch": (await request.json()).get("patch", {})}
+
+
+@linkedin.post("/{api}/adCreativesV2/{creative_id}", dependencies=[Depends(require_bearer)])
+async def linkedin_update_creative(creative_id: str, request: Request):
+    return {"id": creative_id, "patch": (await request.json()).get("patch", {})}
+
+
+# Reddit: OAuth on www.reddit.com and oauth.reddit.com, Ads API v2.0
+
+reddit = APIRouter(prefix="/reddit")
+
+
+@reddit.get("/api/v1/authorize")
+async def reddit_authorize(request: Request):
+    return _authorize_redirect(request)
+
+
+@reddit.post("/api/v1/access_token")
+async def reddit_access_token(request: Request):
+    if not request.headers.get("Authorization", "").startswith("Basic "):
+        raise HTTPException(status_code=401, detail="Missing client credentials")
+    return _token_response(await _form(request), expires_in=86400)
+
+
+@reddit.post("/api/v1/revoke_token")
+async def reddit_revoke_token():
+    return Response(status_code=204)
+
+
+@reddit.get("/api/v1/me", dependencies=[Depends(require_bearer)])
+async def reddit_me():
+    return {"id": "fake", "name": "synthetic_advertiser"}
+
+
+def _reddit_page(request: Request, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One page of items, with next_url carrying the cursor while more remain."""
+    try:
+        offset = int(request.query_params.get("page.token", 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid page.token")
+    size = _page_size(request, "page.size")
+
+    next_url = None
+    if offset + size < len(items):
+        next_url = str(request.url.include_query_params(**{"page.token": offset + size, "page.size": size}))
+    return {"data": items[offset:offset + size], "pagination": {"next_url": next_url}}
+
+
+def _reddit_campaign(campaign: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": campaign["id"],
+        "account_id": campaign["account_id"],
+        "name": campaign["name"],
+        "status": "ACTIVE" if campaign["status"] == "ENABLED" else campaign["status"],
+        "daily_budget": campaign["daily_budget_micros"] / 1_000_000,
+        "currency": "USD",
+        "campaign_type": "TRAFFIC",
+    }
+
+
+@reddit.get("/api/v2.0/accounts", dependencies=[Depends(require_bearer)])
+async def reddit_accounts(request: Request):
+    accounts = [
+        {"id": account["id"], "name": account["name"], "currency": account["currency_code"]}
+        for account in synthetic_data("reddit").accounts()
+    ]
+    return _reddit_page(request, accounts)
+
+
+@reddit.get("/api/v2.0/accounts/{account_id}/campaigns", dependencies=[Depends(require_bearer)])
+async def reddit_campaigns(account_id: str, request: Request):
+    account = _account("reddit", account_id)
+    return _reddit_page(request, [_reddit_campaign(campaign) for campaign in synthetic_data("reddit").campaigns(account)])
+
+
+@reddit.get("/api/v2.0/accounts/{account_id}/campaigns/metrics", dependencies=[Depends(require_bearer)])
+async def reddit_campaign_metrics(account_id: str, request: Request):
+    params = request.query_params
+    granularity = params.get("granularity", "day")
+    if granularity not in ("day", "total"):
+        raise HTTPException(status_code=400, detail=f"Unknown granularity: {granularity}")
+
+    start, end = _window(_day(params.get("start_date"), "start_date"), _day(params.get("end_date"), "end_date"))
+    data = synthetic_data("reddit")
+    campaigns = tuple(data.campaign_range(_account("reddit", account_id)))
+    items = [
+        {
+            "campaign_id": data.campaign_id(row["campaign"]),
+            "date": row["start"].isoformat(),
+            "metrics": {
+                "impressions": row["impressions"],
+                "clicks": row["clicks"],
+                "spend": round(row["cost_micros"] / 1_000_000, 2),
+                "conversions": row["conversions"],
+            },
+        }
+        for row in _campaign_metrics("reddit", campaigns, start, end, granularity)
+    ]
+    return _reddit_page(request, items)
+
+
+@reddit.patch("/api/v2.0/accounts/{account_id}/campaigns/{campaign_id}", dependencies=[Depends(require_bearer)])
+async def reddit_update_campaign(account_id: str, campaign_id: str, request: Request):
+    _account("reddit", account_id)
+    campaign = synthetic_data("reddit").campaign(_campaign("reddit", campaign_id))
+    return {"data": {**_reddit_campaign(campaign), **(await request.json())}}
+
+
+@reddit.patch("/api/v2.0/accounts/{account_id}/ads/{ad_id}", dependencies=[Depends(require_bearer)])
+async def reddit_update_ad(account_id: str, ad_id: str, request: Request):
+    _account("reddit", account_id)
+    return {"data": {"id": ad_id, **(await request.json())}}
+
+
+# Microsoft identity platform (the Bing Ads reporting SOAP service is not served)
+
+microsoft = APIRouter(prefix="/microsoft")
+
+
+@microsoft.get("/{tenant}/oauth2/v2.0/authorize")
+async def microsoft_authorize(request: Request):
+    return _authorize_redirect(request)
+
+
+@microsoft.post("/{tenant}/oauth2/v2.0/token")
+async def microsoft_token(request: Request):
+    return _token_response(await _form(request))
+
+
+# Control endpoints, exempt from faults
+
+control = APIRouter(prefix="/fake")
+
+
+@control.get("/stats")
+async def get_stats(request: Request):
+    return _state(request).stats()
+
+
+@control.post("/reset")
+async def reset_stats(request: Request):
+    _state(request).reset()
+    return _state(request).stats()
+
+
+@control.post("/settings")
+async def update_settings(request: Request):
+    """Change the faults of the running server; the fault generator is reseeded."""
+    state = _state(request)
+    known = {field.name: field.type for field in fields(FakeServerSettings)}
+    updates = await request.json()
+    unknown = set(updates) - set(known)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown settings: {', '.join(sorted(unknown))}")
+
+    for name, value in updates.items():
+        setattr(state.settings, name, known[name](value))
+    state.reset()
+    return asdict(state.settings)
+
+
+def create_app(settings: Optional[FakeServerSettings] = None) -> FastAPI:
+    """The fake API server; settings default to the FAKE_ADS_* env vars."""
+    app = FastAPI(title="Fake Ad Platform APIs", docs_url=None, redoc_url=None)
+    app.state.fake = FakeServerState(settings or FakeServerSettings())
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/fake/"):
+            return await call_next(request)
+
+        state: FakeServerState = request.app.state.fake
+        settings = state.settings
+        platform = request.url.path.split("/")[1]
+        state.requests[platform] += 1
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            delay_ms = settings.latency_ms + state.rng.uniform(0, settings.jitter_ms)
+            if delay_ms > 0:
+                await asyncio.sleep(delay_ms / 1000)
+
+            if state.over_qps(platform) or state.rng.random() < settings.rate_limit_rate:
+                state.rate_limited += 1
+                response = JSONResponse(
+                    {"error": "RATE_LIMIT_EXCEEDED", "message": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": f"{settings.retry_after:g}"}
+                )
+            elif state.rng.random() < settings.error_rate:
+                state.errors += 1
+                response = JSONResponse({"error": "INTERNAL", "message": "Injected server error"}, status_code=500)
+            else:
+                response = await call_next(request)
+        finally:
+            state.in_flight -= 1
+
+        state.statuses[response.status_code] += 1
+        return response
+
+    for router in (google, linkedin, reddit, microsoft, control):
+        app.include_router(router)
+    return app
+
+
+def main():
+    import uvicorn
+
+    defaults = FakeServerSettings()
+    parser = argparse.ArgumentParser(description="Serve fake ad platform APIs from the synthetic data set")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Share of requests failed with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="Share of requests answered with 429")
+    parser.add_argument("--rate-limit-qps", type=int, default=defaults.rate_limit_qps, help="Requests per second per platform before 429s (0 for no limit)")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after, help="Retry-After of the 429s, in seconds")
+    parser.add_argument("--max-page-size", type=int, default=defaults.max_page_size)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    settings = FakeServerSettings(**{
+        field.name: getattr(args, field.name) for field in fields(FakeServerSettings)
+    })
+    print(f"Fake ad platform APIs on http://{args.host}:{args.port}: {settings}")
+    print(f"Point the app at them with ADS_API_BASE_URL=http://{args.host}:{args.port}")
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""HTTP helpers shared by the ad platform reporting clients."""
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import os
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 3
+
+# Root of a stand-in API server (see ads/fake_server.py); when set, every
+# platform URL goes to it instead of the live hosts
+ADS_API_BASE_URL = os.getenv("ADS_API_BASE_URL", "").rstrip("/")
+
+
+def platform_url(platform: str, url: str) -> str:
+    """
+    url, or with ADS_API_BASE_URL set the same path on the stand-in server.
+
+    The server serves each platform under its own prefix, so
+    https://api.linkedin.com/rest/adAccounts becomes
+    {ADS_API_BASE_URL}/linkedin/rest/adAccounts.
+    """
+    if not ADS_API_BASE_URL:
+        return url
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{ADS_API_BASE_URL}/{platform}{parts.path}{query}"
+
+
+async def get_json(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_retries: int = MAX_RETRIES
+) -> Dict[str, Any]:
+    """
+    GET a JSON response, waiting and retrying on 429.
+
+    Waits for Retry-After when the platform sends it, else 1s, 2s, 4s, ...;
+    the last 429, like any other error status, raises HTTPStatusError.
+    """
+    for attempt in range(max_retries + 1):
+        response = await client.get(url, params=params)
+        if response.status_code != 429 or attempt == max_retries:
+            response.raise_for_status()
+            return response.json()
+
+        delay = float(response.headers.get("Retry-After") or 2 ** attempt)
+        logger.warning(f"Rate limited on {response.request.url.path}, retrying in {delay:g}s")
+        await asyncio.sleep(delay)
@@ -0,0 +1,225 @@
+"""
+Batched LinkedIn ad analytics.
+
+adAnalyticsV2 takes a list of campaigns per request (campaigns[0],
+campaigns[1], ...), so instead of one request per campaign the campaign
+URNs are sent in chunks of ANALYTICS_CHUNK_SIZE. The chunks run
+concurrently (at most ANALYTICS_CONCURRENCY at a time) over one pooled
+client. An account with N campaigns costs about N / ANALYTICS_CHUNK_SIZE
+analytics requests.
+
+The analytics finder doesn't paginate: it returns every element in one
+response, up to ANALYTICS_MAX_ELEMENTS. Chunks are made small enough that
+campaigns x periods (days, months) stays under that cap.
+
+With granularity DAILY every element is one campaign-day, which is what
+the ad_metrics fact table stores; ALL returns one total per campaign for
+the whole range.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import os
+import logging
+
+import httpx
+
+from .http_utils import get_json, platform_url
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = platform_url("linkedin", "https://api.linkedin.com/v2")
+
+# Campaign URNs per adAnalyticsV2 request; bounded by URL length
+ANALYTICS_CHUNK_SIZE = int(os.getenv("LINKEDIN_ANALYTICS_CHUNK_SIZE", "20"))
+
+# Chunks in flight at once, and connections in the client pool
+ANALYTICS_CONCURRENCY = int(os.getenv("LINKEDIN_ANALYTICS_CONCURRENCY", "4"))
+
+# Elements one adAnalyticsV2 response returns at most
+ANALYTICS_MAX_ELEMENTS = 15000
+
+PAGE_SIZE = 1000
+
+ANALYTICS_FIELDS = "pivotValue,dateRange,impressions,clicks,costInUsd,externalWebsiteConversions"
+GRANULARITIES = ("ALL", "DAILY", "MONTHLY")
+
+
+def campaign_urn(campaign_id) -> str:
+    campaign_id = str(campaign_id)
+    if campaign_id.startswith("urn:li:"):
+        return campaign_id
+    return f"urn:li:sponsoredCampaign:{campaign_id}"
+
+
+def campaign_id_from_urn(urn: str) -> str:
+    return str(urn).rsplit(":", 1)[-1]
+
+
+def element_date(element: Dict[str, Any]) -> Optional[date]:
+    """Start day of an analytics element's dateRange, if it has one."""
+    start = (element.get("dateRange") or {}).get("start")
+    if not start:
+        return None
+    return date(start["year"], start["month"], start["day"])
+
+
+def _date_range_params(start_date, end_date) -> Dict[str, int]:
+    start = datetime.strptime(str(start_date), "%Y-%m-%d")
+    end = datetime.strptime(str(end_date), "%Y-%m-%d")
+    return {
+        "dateRange.start.day": start.day,
+        "dateRange.start.month": start.month,
+        "dateRange.start.year": start.year,
+        "dateRange.end.day": end.day,
+        "dateRange.end.month": end.month,
+        "dateRange.end.year": end.year,
+    }
+
+
+def analytics_client(access_token: str, concurrency: int = ANALYTICS_CONCURRENCY) -> httpx.AsyncClient:
+    """Pooled client for the Marketing API, sized for concurrency requests."""
+    return httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "X-Restli-Protocol-Version": "2.0.0"
+        },
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=30.0
+    )
+
+
+async def get_all_pages(
+    client: httpx.AsyncClient,
+    path: str,
+    params: Dict[str, Any],
+    page_size: int = PAGE_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Collect elements across pages (start/count), stopping at paging.total or,
+    without one, a short page. A response that ignored the paging (more
+    elements than count, or a paging.start other than the one asked for)
+    is all there is.
+    """
+    elements = []
+    start = 0
+    while True:
+        data = await get_json(client, path, {**params, "start": start, "count": page_size})
+        page = data.get("elements", [])
+        elements.extend(page)
+
+        paging = data.get("paging") or {}
+        if len(page) > page_size or paging.get("start", start) != start:
+            return elements
+        start += len(page)
+
+        total = paging.get("total")
+        if not page or (start >= total if total is not None else len(page) < page_size):
+            return elements
+
+
+def _periods(start_date, end_date, granularity: str) -> int:
+    """Elements one campaign contributes to an analytics response over the range."""
+    start = datetime.strptime(str(start_date), "%Y-%m-%d")
+    end = datetime.strptime(str(end_date), "%Y-%m-%d")
+    if granularity == "DAILY":
+        return (end - start).days + 1
+    if granularity == "MONTHLY":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return 1
+
+
+async def list_campaigns(client: httpx.AsyncClient, account_id) -> List[Dict[str, Any]]:
+    """All campaigns of an ad account."""
+    return await get_all_pages(client, "/adCampaignsV2", {
+        "q": "search",
+        "search.account.values[0]": f"urn:li:sponsoredAccount:{account_id}"
+    }, page_size=100)
+
+
+async def fetch_campaign_analytics(
+    client: httpx.AsyncClient,
+    campaign_ids: Sequence,
+    start_date,
+    end_date,
+    granularity: str = "ALL",
+    chunk_size: int = ANALYTICS_CHUNK_SIZE,
+    concurrency: int = ANALYTICS_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Campaign-pivoted analytics for many campaigns in chunked requests.
+
+    Args:
+        client: Client from analytics_client
+        campaign_ids: Campaign IDs or URNs
+        start_date, end_date: Inclusive date range (YYYY-MM-DD)
+        granularity: ALL (one element per campaign) or DAILY (one per
+            campaign-day)
+        chunk_size: Campaigns per request, lowered so that no response
+            exceeds ANALYTICS_MAX_ELEMENTS
+        concurrency: Chunks in flight at once
+
+    Returns:
+        Analytics elements; pivotValue holds the campaign URN and, for
+        DAILY, dateRange the day
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    periods = _periods(start_date, end_date, granularity)
+    if periods > ANALYTICS_MAX_ELEMENTS:
+        logger.warning(
+            f"LinkedIn analytics: {periods} {granularity} periods per campaign exceed the "
+            f"{ANALYTICS_MAX_ELEMENTS} element cap; responses will be truncated"
+        )
+    chunk_size = max(1, min(chunk_size, ANALYTICS_MAX_ELEMENTS // periods))
+
+    urns = [campaign_urn(campaign_id) for campaign_id in campaign_ids]
+    chunks = [urns[i:i + chunk_size] for i in range(0, len(urns), chunk_size)]
+    base_params = {
+        "q": "analytics",
+        "pivot": "CAMPAIGN",
+        "timeGranularity": granularity,
+        "fields": ANALYTICS_FIELDS,
+        **_date_range_params(start_date, end_date),
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+        params = {**base_params, **{f"campaigns[{i}]": urn for i, urn in enumerate(chunk)}}
+        async with semaphore:
+            data = await get_json(client, "/adAnalyticsV2", params)
+        return data.get("elements", [])
+
+    pages = await asyncio.gather(*[fetch_chunk(chunk) for chunk in chunks])
+    elements = [element for page in pages for element in page]
+
+    logger.info(
+        f"LinkedIn analytics: {len(elements)} elements for {len(urns)} campaigns "
+        f"in {len(chunks)} chunked requests ({granularity})"
+    )
+    return elements
+
+
+async def fetch_account_analytics(
+    access_token: str,
+    account_id,
+    start_date,
+    end_date,
+    granularity: str = "ALL",
+    campaign_ids: Optional[Sequence] = None
+) -> List[Dict[str, Any]]:
+    """
+    Analytics for every campaign of an account (or just campaign_ids) over one pooled client.
+
+    Returns:
+        Analytics elements, as for fetch_campaign_analytics
+    """
+    async with analytics_client(access_token) as client:
+        if campaign_ids is None:
+            campaign_ids = [campaign["id"] for campaign in await list_campaigns(client, account_id)]
+        if not campaign_ids:
+            return []
+        return await fetch_campaign_analytics(client, campaign_ids, start_date, end_date, granularity)
@@ -3,6 +3,8 @@ from .google import GoogleAdsProvider
 from .microsoft import MicrosoftAdsProvider
 from .linkedin import LinkedInAdsProvider
 from .reddit import RedditAdsProvider
+from .synthetic import SyntheticProvider
+from services.synthetic_data import MOCK_ADS
 
 __all__ = [
     "IProvider",
@@ -15,6 +17,7 @@ __all__ = [
     "MicrosoftAdsProvider",
     "LinkedInAdsProvider",
     "RedditAdsProvider",
+    "SyntheticProvider",
     "ProviderManager",
 ]
 
@@ -29,6 +32,10 @@ class ProviderManager:
         "reddit_ads": RedditAdsProvider(),
     }
     
+    if MOCK_ADS:
+        # Same platforms and capabilities, served from synthetic data
+        _providers = {name: SyntheticProvider(provider) for name, provider in _providers.items()}
+    
     @classmethod
     def get_provider(cls, platform: str) -> IProvider:
         """Get provider instance by platform name."""
@@ -13,6 +13,7 @@ from .base import (
     CampaignInfo,
     MutateResult
 )
+from ..http_utils import platform_url
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,9 @@ logger = logging.getLogger(__name__)
 class GoogleAdsProvider(IProvider):
     """Google Ads API provider implementation."""
     
-    OAUTH_AUTHORIZE_URL = "https://accounts.google.com/o/oauth2/v2/auth"
-    OAUTH_TOKEN_URL = "https://oauth2.googleapis.com/token"
-    OAUTH_REVOKE_URL = "https://oauth2.googleapis.com/revoke"
+    OAUTH_AUTHORIZE_URL = platform_url("google", "https://accounts.google.com/o/oauth2/v2/auth")
+    OAUTH_TOKEN_URL = platform_url("google", "https://oauth2.googleapis.com/token")
+    OAUTH_REVOKE_URL = platform_url("google", "https://oauth2.googleapis.com/revoke")
     OAUTH_SCOPE = "https://www.googleapis.com/auth/adwords"
     
     @property
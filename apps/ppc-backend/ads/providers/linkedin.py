@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from urllib.parse import urlencode
 import httpx
 import logging
@@ -11,6 +11,8 @@ from .base import (
     CampaignInfo,
     MutateResult
 )
+from ..http_utils import platform_url
+from ..linkedin_analytics import fetch_account_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +20,9 @@ logger = logging.getLogger(__name__)
 class LinkedInAdsProvider(IProvider):
     """LinkedIn Ads (Marketing Developer Platform) provider implementation."""
     
-    OAUTH_AUTHORIZE_URL = "https://www.linkedin.com/oauth/v2/authorization"
-    OAUTH_TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
-    API_BASE_URL = "https://api.linkedin.com/rest"
+    OAUTH_AUTHORIZE_URL = platform_url("linkedin", "https://www.linkedin.com/oauth/v2/authorization")
+    OAUTH_TOKEN_URL = platform_url("linkedin", "https://www.linkedin.com/oauth/v2/accessToken")
+    API_BASE_URL = platform_url("linkedin", "https://api.linkedin.com/rest")
     
     @property
     def platform_name(self) -> str:
@@ -146,7 +148,7 @@ class LinkedInAdsProvider(IProvider):
             campaigns = []
             for element in data.get("elements", []):
                 daily_budget = element.get("dailyBudget", {})
-                amount_micros = int(daily_budget.get("amount", 0) * 1_000_000)
+                amount_micros = int(float(daily_budget.get("amount", 0)) * 1_000_000)
                 
                 campaigns.append(CampaignInfo(
                     id=element["id"],
@@ -164,6 +166,30 @@ class LinkedInAdsProvider(IProvider):
             logger.error(f"LinkedIn Ads list_campaigns failed: {ex}")
             raise
     
+    async def get_campaign_analytics(
+        self,
+        access_token: str,
+        account_id: str,
+        start_date: str,
+        end_date: str,
+        granularity: str = "ALL",
+        campaign_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Campaign analytics (adAnalyticsV2) for an account, in chunked concurrent requests.
+        
+        granularity DAILY returns one element per campaign-day; ALL one per
+        campaign over the range. campaign_ids defaults to every campaign of
+        the account.
+        """
+        try:
+            return await fetch_account_analytics(
+                access_token, account_id, start_date, end_date, granularity, campaign_ids
+            )
+        except httpx.HTTPStatusError as ex:
+            logger.error(f"LinkedIn Ads get_campaign_analytics failed: {ex}")
+            raise
+    
     async def update_campaign_budget(
         self,
         access_token: str,
@@ -11,6 +11,7 @@ from .base import (
     CampaignInfo,
     MutateResult
 )
+from ..http_utils import platform_url
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +19,8 @@ logger = logging.getLogger(__name__)
 class MicrosoftAdsProvider(IProvider):
     """Microsoft Advertising (Bing Ads) provider implementation."""
     
-    OAUTH_AUTHORIZE_URL = "https://login.microsoftonline.com/common/oauth2/v2.0/authorize"
-    OAUTH_TOKEN_URL = "https://login.microsoftonline.com/common/oauth2/v2.0/token"
+    OAUTH_AUTHORIZE_URL = platform_url("microsoft", "https://login.microsoftonline.com/common/oauth2/v2.0/authorize")
+    OAUTH_TOKEN_URL = platform_url("microsoft", "https://login.microsoftonline.com/common/oauth2/v2.0/token")
     
     @property
     def platform_name(self) -> str:
@@ -11,6 +11,7 @@ from .base import (
     CampaignInfo,
     MutateResult
 )
+from ..http_utils import platform_url
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +19,10 @@ logger = logging.getLogger(__name__)
 class RedditAdsProvider(IProvider):
     """Reddit Ads API provider implementation."""
     
-    OAUTH_AUTHORIZE_URL = "https://www.reddit.com/api/v1/authorize"
-    OAUTH_TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
-    API_BASE_URL = "https://ads-api.reddit.com/api/v2.0"
+    OAUTH_AUTHORIZE_URL = platform_url("reddit", "https://www.reddit.com/api/v1/authorize")
+    OAUTH_TOKEN_URL = platform_url("reddit", "https://www.reddit.com/api/v1/access_token")
+    OAUTH_REVOKE_URL = platform_url("reddit", "https://www.reddit.com/api/v1/revoke_token")
+    API_BASE_URL = platform_url("reddit", "https://ads-api.reddit.com/api/v2.0")
     
     @property
     def platform_name(self) -> str:
@@ -128,7 +130,7 @@ class RedditAdsProvider(IProvider):
         
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                "https://www.reddit.com/api/v1/revoke_token",
+                self.OAUTH_REVOKE_URL,
                 data=data,
                 auth=auth,
                 headers={"User-Agent": "Synter-PPC/1.0"}
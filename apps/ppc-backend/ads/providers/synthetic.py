@@ -0,0 +1,173 @@
+from typing import List, Optional
+from urllib.parse import urlencode
+import secrets
+import logging
+
+from services.synthetic_data import SyntheticAdsData, synthetic_data
+
+from .base import (
+    IProvider,
+    ProviderCapability,
+    TokenBundle,
+    OAuthAppCredentials,
+    CampaignInfo,
+    MutateResult
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SyntheticProvider(IProvider):
+    """
+    Offline stand-in for a platform provider, used by ProviderManager when MOCK_ADS is set.
+    
+    Keeps the wrapped provider's platform name and capabilities, completes
+    OAuth without a round trip, lists the platform's synthetic campaigns
+    (services/synthetic_data.py) and accepts mutates on campaigns that
+    exist without changing anything.
+    """
+    
+    def __init__(self, provider: IProvider, data: Optional[SyntheticAdsData] = None):
+        self._platform_name = provider.platform_name
+        self._capabilities = list(provider.capabilities)
+        self.data = data or synthetic_data(provider.platform_name.replace("_ads", ""))
+    
+    @property
+    def platform_name(self) -> str:
+        return self._platform_name
+    
+    @property
+    def capabilities(self) -> List[ProviderCapability]:
+        return self._capabilities
+    
+    def get_authorize_url(
+        self,
+        app_cred: OAuthAppCredentials,
+        state: str,
+        pkce_challenge: Optional[str] = None
+    ) -> str:
+        # Straight back to the callback, as if the user had consented
+        return f"{app_cred.redirect_uri}?{urlencode({'code': 'synthetic', 'state': state})}"
+    
+    async def exchange_code_for_tokens(
+        self,
+        app_cred: OAuthAppCredentials,
+        code: str,
+        pkce_verifier: Optional[str] = None
+    ) -> TokenBundle:
+        return self._token_bundle(app_cred, f"synthetic-refresh-{secrets.token_hex(8)}")
+    
+    async def refresh_tokens(
+        self,
+        app_cred: OAuthAppCredentials,
+        refresh_token: str
+    ) -> TokenBundle:
+        return self._token_bundle(app_cred, refresh_token)
+    
+    async def revoke_token(
+        self,
+        app_cred: OAuthAppCredentials,
+        token: str
+    ) -> bool:
+        return True
+    
+    def _token_bundle(self, app_cred: OAuthAppCredentials, refresh_token: str) -> TokenBundle:
+        return TokenBundle(
+            access_token=f"synthetic-{secrets.token_hex(16)}",
+            refresh_token=refresh_token,
+            token_type="Bearer",
+            expires_in=3600,
+            scope=" ".join(app_cred.scopes or []),
+            metadata={"synthetic": True},
+        )
+    
+    async def list_campaigns(
+        self,
+        access_token: str,
+        account_id: str,
+        app_cred: Optional[OAuthAppCredentials] = None
+    ) -> List[CampaignInfo]:
+        account = self.data.account_index(account_id)
+        return [
+            CampaignInfo(
+                id=campaign["id"],
+                name=campaign["name"],
+                status=campaign["status"],
+                daily_budget_micros=campaign["daily_budget_micros"],
+                currency_code="USD",
+                platform=self._platform_name,
+                metadata={"account_id": campaign["account_id"], "synthetic": True},
+            )
+            for campaign in self.data.campaigns(account)
+        ]
+    
+    def _mutate(self, resource: str, resource_id: str, known: bool, validate_only: bool) -> MutateResult:
+        if not known:
+            return MutateResult(
+                success=False,
+                resource_names=[],
+                error_messages=[f"{resource} {resource_id} not found"],
+                validate_only=validate_only,
+            )
+        
+        return MutateResult(
+            success=True,
+            resource_names=[f"{self._platform_name}/{resource}/{resource_id}"],
+            error_messages=[],
+            validate_only=validate_only,
+            provider_response={"synthetic": True},
+        )
+    
+    def _has_campaign(self, campaign_id: str) -> bool:
+        try:
+            return self.data.campaign_index(campaign_id) is not None
+        except ValueError:
+            return False
+    
+    async def update_campaign_budget(
+        self,
+        access_token: str,
+        account_id: str,
+        campaign_id: str,
+        new_budget_micros: int,
+        validate_only: bool = True,
+        app_cred: Optional[OAuthAppCredentials] = None
+    ) -> MutateResult:
+        return self._mutate("campaigns", campaign_id, self._has_campaign(campaign_id), validate_only)
+    
+    async def pause_campaign(
+        self,
+        access_token: str,
+        account_id: str,
+        campaign_id: str,
+        validate_only: bool = True,
+        app_cred: Optional[OAuthAppCredentials] = None
+    ) -> MutateResult:
+        return self._mutate("campaigns", campaign_id, self._has_campaign(campaign_id), validate_only)
+    
+    async def pause_ad(
+        self,
+        access_token: str,
+        account_id: str,
+        ad_id: str,
+        validate_only: bool = True,
+        app_cred: Optional[OAuthAppCredentials] = None
+    ) -> MutateResult:
+        return self._mutate("ads", ad_id, True, validate_only)
+    
+    async def add_negative_keyword(
+        self,
+        access_token: str,
+        account_id: str,
+        campaign_id: str,
+        keyword_text: str,
+        match_type: str,
+        validate_only: bool = True,
+        app_cred: Optional[OAuthAppCredentials] = None
+    ) -> MutateResult:
+        if ProviderCapability.NEGATIVE_KEYWORDS not in self._capabilities:
+            return await super().add_negative_keyword(
+                access_token, account_id, campaign_id, keyword_text, match_type, validate_only, app_cred
+            )
+        
+        return self._mutate("campaigns", campaign_id, self._has_campaign(campaign_id), validate_only)
@@ -0,0 +1,452 @@
+"""
+Offline stand-in for GoogleAdsClient over the synthetic data set.
+
+GoogleAdsClientFactory hands this out when MOCK_ADS is set. It answers
+the GAQL the app sends (SELECT ... FROM campaign, ad_group, keyword_view,
+ad_group_criterion, search_term_view or customer, with segments.date
+ranges, field comparisons and LIMIT) from services/synthetic_data.py,
+and accepts the mutates of routers/apply.py and the Google provider
+without changing anything. Rows carry only the selected fields, like the
+real API's; enum fields have .name.
+
+ORDER BY is ignored, and so are conditions on fields the synthetic data
+doesn't have.
+"""
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import re
+import logging
+
+from services.synthetic_data import SyntheticAdsData, synthetic_data
+
+logger = logging.getLogger(__name__)
+
+# Rows per search_stream batch, as the real API sends them
+STREAM_BATCH_SIZE = 10000
+
+_QUERY_RE = re.compile(
+    r"^\s*SELECT\s+(?P<fields>.+?)\s+FROM\s+(?P<resource>\w+)"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?(?:\s+ORDER\s+BY\s+.+?)?(?:\s+LIMIT\s+(?P<limit>\d+))?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+_CONDITION_RE = re.compile(r"^([\w.]+)\s*(!=|>=|<=|=|>|<)\s*'?([^']*?)'?$")
+_BETWEEN_RE = re.compile(r"segments\.date\s+BETWEEN\s+'([^']+)'\s+AND\s+'([^']+)'", re.IGNORECASE)
+_DURING_RE = re.compile(r"^segments\.date\s+DURING\s+(\w+)$", re.IGNORECASE)
+
+class SyntheticEnum:
+    """An enum value; .name is what the app reads."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other) -> bool:
+        return self.name == getattr(other, "name", other)
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __str__(self) -> str:
+        return self.name
+
+    __repr__ = __str__
+
+
+class SyntheticRow:
+    """A result row or one of its messages, holding only the selected fields."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self) -> str:
+        return f"SyntheticRow({self.__dict__!r})"
+
+
+class SyntheticMessage:
+    """A request message from get_type: any attribute reads as a nested message."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __getattr__(self, name: str) -> "SyntheticMessage":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = SyntheticMessage()
+        setattr(self, name, value)
+        return value
+
+    def __call__(self, **fields) -> "SyntheticMessage":
+        return SyntheticMessage(**fields)
+
+    def CopyFrom(self, other: "SyntheticMessage"):
+        self.__dict__.update(other.__dict__)
+
+
+class _EnumNamespace:
+    def __getattr__(self, enum_name: str):
+        return type(enum_name, (), {"__getattr__": lambda _, member: SyntheticEnum(member)})()
+
+
+def _build_row(fields: List[Tuple[str, ...]], values: Dict[str, Any]) -> SyntheticRow:
+    row = SyntheticRow()
+    for path in fields:
+        target = row
+        for name in path[:-1]:
+            child = target.__dict__.get(name)
+            if child is None:
+                child = target.__dict__[name] = SyntheticRow()
+            target = child
+        target.__dict__[path[-1]] = values.get(".".join(path))
+    return row
+
+
+def _during(literal: str, today: date) -> Tuple[date, date]:
+    literal = literal.upper()
+    match = re.match(r"LAST_(\d+)_DAYS$", literal)
+    if match:
+        return today - timedelta(days=int(match.group(1))), today - timedelta(days=1)
+    if literal == "TODAY":
+        return today, today
+    if literal == "YESTERDAY":
+        return today - timedelta(days=1), today - timedelta(days=1)
+    if literal == "THIS_MONTH":
+        return today.replace(day=1), today
+    if literal == "LAST_MONTH":
+        end = today.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end
+    raise ValueError(f"Unsupported DURING range: {literal}")
+
+
+def _compare(value, op: str, literal: str) -> bool:
+    if isinstance(value, SyntheticEnum):
+        value = value.name
+    if isinstance(value, (int, float)):
+        literal = float(literal)
+    else:
+        value = str(value)
+    return {
+        "=": value == literal, "!=": value != literal,
+        ">": value > literal, "<": value < literal,
+        ">=": value >= literal, "<=": value <= literal,
+    }[op]
+
+
+class SyntheticQuery:
+    """A parsed GAQL query: selected fields, resource, date range, filters and limit."""
+
+    def __init__(self, query: str, default_window: Tuple[date, date]):
+        match = _QUERY_RE.match(query)
+        if not match:
+            raise ValueError(f"Unsupported GAQL query: {query.strip()[:200]}")
+
+        self.fields = [tuple(field.strip().split(".")) for field in match.group("fields").split(",") if field.strip()]
+        self.field_names = {".".join(path) for path in self.fields}
+        self.resource = match.group("resource").lower()
+        self.limit = int(match.group("limit")) if match.group("limit") else None
+        self.by_date = "segments.date" in self.field_names
+        self.has_metrics = any(path[0] == "metrics" for path in self.fields)
+
+        start, end = default_window
+        where = (match.group("where") or "").strip()
+
+        # BETWEEN has an AND of its own, so take it out before splitting on AND
+        between = _BETWEEN_RE.search(where)
+        if between:
+            start, end = (date.fromisoformat(value) for value in between.groups())
+            where = where[:between.start()] + "TRUE" + where[between.end():]
+
+        self.conditions: List[Tuple[str, str, str]] = []
+        for condition in re.split(r"\s+AND\s+", where, flags=re.IGNORECASE):
+            condition = condition.strip()
+            if not condition or condition == "TRUE":
+                continue
+            during = _DURING_RE.match(condition)
+            compared = _CONDITION_RE.match(condition)
+            if during:
+                start, end = _during(during.group(1), date.today())
+            elif compared and compared.group(1) == "segments.date":
+                day = date.fromisoformat(compared.group(3))
+                op = compared.group(2)
+                if op == "=":
+                    start = end = day
+                elif op in (">", ">="):
+                    start = day + timedelta(days=op == ">")
+                else:
+                    end = day - timedelta(days=op == "<")
+            elif compared:
+                self.conditions.append(compared.groups())
+            else:
+                logger.warning(f"Synthetic Google Ads ignores condition: {condition}")
+        self.start_date, self.end_date = start, end
+
+    def matches(self, values: Dict[str, Any], prefix: Optional[str] = None) -> bool:
+        """Whether values pass the conditions (only those on fields starting with prefix, if given)."""
+        for field, op, literal in self.conditions:
+            if prefix is not None and not field.startswith(prefix):
+                continue
+            if field in values and not _compare(values[field], op, literal):
+                return False
+        return True
+
+
+class SyntheticGoogleAdsService:
+    """GoogleAdsService over the synthetic data: search, search_stream and resource paths."""
+
+    def __init__(self, data: SyntheticAdsData):
+        self.data = data
+
+    def search(self, customer_id: str = None, query: str = None, **kwargs) -> Iterator[SyntheticRow]:
+        parsed = SyntheticQuery(query, (self.data.start_date, self.data.end_date))
+        rows = self._rows(parsed, customer_id)
+        for count, values in enumerate(rows):
+            if parsed.limit is not None and count >= parsed.limit:
+                break
+            yield _build_row(parsed.fields, values)
+
+    def search_stream(self, customer_id: str = None, query: str = None, **kwargs) -> Iterator[SyntheticRow]:
+        batch = []
+        for row in self.search(customer_id=customer_id, query=query):
+            batch.append(row)
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield SyntheticRow(results=batch)
+                batch = []
+        if batch:
+            yield SyntheticRow(results=batch)
+
+    def _rows(self, query: SyntheticQuery, customer_id: Optional[str]) -> Iterator[Dict[str, Any]]:
+        account = self.data.account_index(customer_id)
+        customer = self.data.account(account) if account is not None else {
+            "id": customer_id, "name": "Synthetic Manager Account", "currency_code": "USD", "time_zone": "America/Los_Angeles"
+        }
+        customer_values = {
+            "customer.id": int(customer["id"]) if str(customer["id"]).isdigit() else 0,
+            "customer.descriptive_name": customer["name"],
+            "customer.currency_code": customer["currency_code"],
+            "customer.time_zone": customer["time_zone"],
+        }
+
+        if query.resource == "customer":
+            yield customer_values
+            return
+
+        entities = {
+            "campaign": self._campaign_entities,
+            "ad_group": self._ad_group_entities,
+            "keyword_view": self._keyword_entities,
+            "ad_group_criterion": self._keyword_entities,
+            "search_term_view": self._keyword_entities,
+        }.get(query.resource)
+        if entities is None:
+            raise ValueError(f"Synthetic Google Ads has no resource {query.resource}")
+
+        days = self.data.dates(query.start_date, query.end_date)
+        for values, metrics_fn in entities(query, account):
+            values.update(customer_values)
+            if not query.has_metrics and not query.by_date:
+                yield values
+                continue
+
+            metrics = metrics_fn(query.start_date, query.end_date)
+            if query.resource == "search_term_view":
+                yield from self._search_term_rows(query, values, metrics, days)
+            else:
+                yield from self._metric_rows(query, values, metrics, days)
+
+    def _campaign_entities(self, query: SyntheticQuery, account: Optional[int]) -> Iterator[Tuple[Dict, Callable]]:
+        for index in self.data.campaign_range(account):
+            values = self._campaign_values(index)
+            if query.matches(values, "campaign"):
+                yield values, lambda start, end, index=index: self.data.campaign_metrics(index, start, end)
+
+    def _ad_group_entities(self, query: SyntheticQuery, account: Optional[int]) -> Iterator[Tuple[Dict, Callable]]:
+        for campaign in self.data.campaign_range(account):
+            campaign_values = self._campaign_values(campaign)
+            if not query.matches(campaign_values, "campaign"):
+                continue
+            for index in self.data.ad_group_range(campaign):
+                values = {**campaign_values, **self._ad_group_values(index)}
+                if query.matches(values, "ad_group"):
+                    yield values, lambda start, end, index=index: self.data.ad_group_metrics(index, start, end)
+
+    def _keyword_entities(self, query: SyntheticQuery, account: Optional[int]) -> Iterator[Tuple[Dict, Callable]]:
+        for campaign in self.data.campaign_range(account):
+            campaign_values = self._campaign_values(campaign)
+            if not query.matches(campaign_values, "campaign"):
+                continue
+            for ad_group in self.data.ad_group_range(campaign):
+                ad_group_values = {**campaign_values, **self._ad_group_values(ad_group)}
+                if not query.matches(ad_group_values, "ad_group."):
+                    continue
+                for index in self.data.keyword_range(ad_group):
+                    keyword = self.data.keyword(index)
+                    values = {
+                        **ad_group_values,
+                        "ad_group_criterion.criterion_id": int(keyword["id"]),
+                        "ad_group_criterion.resource_name": f"customers/{campaign_values['customer_id']}/adGroupCriteria/{keyword['ad_group_id']}~{keyword['id']}",
+                        "ad_group_criterion.keyword.text": keyword["text"],
+                        "ad_group_criterion.keyword.match_type": SyntheticEnum(keyword["match_type"]),
+                        "ad_group_criterion.status": SyntheticEnum(keyword["status"]),
+                        "ad_group_criterion.cpc_bid_micros": keyword["cpc_bid_micros"],
+                        "search_terms": keyword["search_terms"],
+                    }
+                    if query.matches(values, "ad_group_criterion"):
+                        if query.resource == "search_term_view":
+                            metrics_fn = lambda start, end, index=index: self.data.search_term_metrics(index, start, end)
+                        else:
+                            metrics_fn = lambda start, end, index=index: self.data.keyword_metrics(index, start, end)
+                        yield values, metrics_fn
+
+    def _campaign_values(self, index: int) -> Dict[str, Any]:
+        campaign = self.data.campaign(index)
+        customer_id = campaign["account_id"]
+        return {
+            "customer_id": customer_id,
+            "campaign.id": int(campaign["id"]),
+            "campaign.resource_name": f"customers/{customer_id}/campaigns/{campaign['id']}",
+            "campaign.name": campaign["name"],
+            "campaign.status": SyntheticEnum(campaign["status"]),
+            "campaign.advertising_channel_type": SyntheticEnum("SEARCH"),
+            "campaign.campaign_budget": f"customers/{customer_id}/campaignBudgets/{campaign['budget_id']}",
+            "campaign_budget.id": int(campaign["budget_id"]),
+            "campaign_budget.resource_name": f"customers/{customer_id}/campaignBudgets/{campaign['budget_id']}",
+            "campaign_budget.amount_micros": campaign["daily_budget_micros"],
+            "campaign_budget.status": SyntheticEnum("ENABLED"),
+        }
+
+    def _ad_group_values(self, index: int) -> Dict[str, Any]:
+        ad_group = self.data.ad_group(index)
+        return {
+            "ad_group.id": int(ad_group["id"]),
+            "ad_group.name": ad_group["name"],
+            "ad_group.status": SyntheticEnum(ad_group["status"]),
+        }
+
+    def _metric_rows(self, query: SyntheticQuery, values: Dict, metrics: Dict, days: List[date]) -> Iterator[Dict[str, Any]]:
+        if query.by_date:
+            columns = {name: metrics[name].tolist() for name in metrics}
+            for day_index, day in enumerate(days):
+                row = {**values, **_metric_values({name: column[day_index] for name, column in columns.items()}), "segments.date": day.isoformat()}
+                if row["metrics.impressions"] and query.matches(row, "metrics"):
+                    yield row
+        else:
+            row = {**values, **_metric_values({name: metrics[name].sum().item() for name in metrics})}
+            if row["metrics.impressions"] and query.matches(row, "metrics"):
+                yield row
+
+    def _search_term_rows(self, query: SyntheticQuery, values: Dict, metrics: Dict, days: List[date]) -> Iterator[Dict[str, Any]]:
+        if query.by_date:
+            columns = {name: metrics[name].tolist() for name in metrics}
+            periods = [(day.isoformat(), {name: column[day_index] for name, column in columns.items()}) for day_index, day in enumerate(days)]
+        else:
+            periods = [(None, {name: metrics[name].sum(axis=0).tolist() for name in metrics})]
+
+        for day, day_metrics in periods:
+            for term_index, term in enumerate(values["search_terms"]):
+                term_metrics = {name: day_metrics[name][term_index] for name in day_metrics}
+                if not term_metrics["impressions"]:
+                    continue
+                row = {
+                    **values,
+                    **_metric_values(term_metrics),
+                    "segments.date": day,
+                    "search_term_view.search_term": term,
+                    "search_term_view.status": SyntheticEnum("NONE"),
+                }
+                if query.matches(row, "metrics") and query.matches(row, "search_term_view"):
+                    yield row
+
+    @staticmethod
+    def campaign_path(customer_id, campaign_id) -> str:
+        return f"customers/{customer_id}/campaigns/{campaign_id}"
+
+    @staticmethod
+    def campaign_budget_path(customer_id, budget_id) -> str:
+        return f"customers/{customer_id}/campaignBudgets/{budget_id}"
+
+    @staticmethod
+    def ad_group_criterion_path(customer_id, ad_group_id, criterion_id) -> str:
+        return f"customers/{customer_id}/adGroupCriteria/{ad_group_id}~{criterion_id}"
+
+    @staticmethod
+    def ad_group_ad_path(customer_id, ad_group_id, ad_id) -> str:
+        return f"customers/{customer_id}/adGroupAds/{ad_group_id}~{ad_id}"
+
+    @staticmethod
+    def campaign_criterion_path(customer_id, campaign_id, criterion_id) -> str:
+        return f"customers/{customer_id}/campaignCriteria/{campaign_id}~{criterion_id}"
+
+
+def _metric_values(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    impressions, clicks = metrics["impressions"], metrics["clicks"]
+    return {
+        "metrics.impressions": impressions,
+        "metrics.clicks": clicks,
+        "metrics.cost_micros": metrics["cost_micros"],
+        "metrics.conversions": metrics["conversions"],
+        "metrics.conversions_value": metrics["conversions_value"],
+        "metrics.ctr": clicks / impressions if impressions else 0.0,
+        "metrics.average_cpc": metrics["cost_micros"] / clicks if clicks else 0.0,
+        "metrics.conversion_rate": metrics["conversions"] / clicks if clicks else 0.0,
+        "segments.device": SyntheticEnum("DESKTOP"),
+    }
+
+
+class SyntheticMutateService(SyntheticGoogleAdsService):
+    """Mutate services: every operation succeeds and changes nothing."""
+
+    def _mutate(self, customer_id: str = None, operations: list = None, collection: str = "", **kwargs) -> SyntheticRow:
+        results = []
+        for number, operation in enumerate(operations or []):
+            resource = operation.__dict__.get("update") or operation.__dict__.get("create") or operation.__dict__.get("remove")
+            resource_name = getattr(resource, "resource_name", None) if resource is not None else None
+            if not isinstance(resource_name, str):
+                resource_name = f"customers/{customer_id}/{collection}/synthetic-{number + 1}"
+            results.append(SyntheticRow(resource_name=resource_name))
+        return SyntheticRow(results=results, partial_failure_error=None)
+
+    def mutate_campaign_criteria(self, customer_id=None, operations=None, **kwargs):
+        return self._mutate(customer_id, operations, "campaignCriteria")
+
+    def mutate_ad_group_criteria(self, customer_id=None, operations=None, **kwargs):
+        return self._mutate(customer_id, operations, "adGroupCriteria")
+
+    def mutate_campaign_budgets(self, customer_id=None, operations=None, **kwargs):
+        return self._mutate(customer_id, operations, "campaignBudgets")
+
+    def mutate_campaigns(self, customer_id=None, operations=None, **kwargs):
+        return self._mutate(customer_id, operations, "campaigns")
+
+    def mutate_ad_group_ads(self, customer_id=None, operations=None, **kwargs):
+        return self._mutate(customer_id, operations, "adGroupAds")
+
+
+class SyntheticGoogleAdsClient:
+    """The parts of GoogleAdsClient the app uses, over SyntheticAdsData."""
+
+    def __init__(self, data: Optional[SyntheticAdsData] = None):
+        self.data = data or synthetic_data("google")
+        self.enums = _EnumNamespace()
+
+    def get_service(self, name: str, **kwargs):
+        if name == "GoogleAdsService":
+            return SyntheticGoogleAdsService(self.data)
+        return SyntheticMutateService(self.data)
+
+    def get_type(self, name: str, **kwargs) -> SyntheticMessage:
+        if name == "FieldMask":
+            return SyntheticMessage(paths=[])
+        return SyntheticMessage()
+
+    @staticmethod
+    def copy_from(destination: SyntheticMessage, source: SyntheticMessage):
+        destination.CopyFrom(source)
+
+    def configure(self) -> "SyntheticGoogleAdsClient":
+        return self
+
+    @contextmanager
+    def operation_settings(self, **settings):
+        yield self
@@ -0,0 +1,32 @@
+"""Add rule versions and input hashes for incremental recommendation generation
+
+Revision ID: 002_incremental_recommendations
+Revises: 001_credential_vault
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002_incremental_recommendations'
+down_revision = '001_credential_vault'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('recommendations', sa.Column('rule_version', sa.String(20)))
+    
+    op.create_table(
+        'recommendation_inputs',
+        sa.Column('type', sa.String(50), primary_key=True),
+        sa.Column('entity_id', sa.String(50), primary_key=True),
+        sa.Column('rule_version', sa.String(20), nullable=False),
+        sa.Column('input_hash', sa.String(64), nullable=False),
+        sa.Column('evaluated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table('recommendation_inputs')
+    op.drop_column('recommendations', 'rule_version')
@@ -0,0 +1,56 @@
+"""Add search term daily facts and rolling-window aggregates
+
+Revision ID: 003_search_term_metrics
+Revises: 002_incremental_recommendations
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003_search_term_metrics'
+down_revision = '002_incremental_recommendations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'search_term_daily_metrics',
+        sa.Column('search_term_id', sa.String(50), sa.ForeignKey('search_terms.id'), primary_key=True),
+        sa.Column('date', sa.Date(), primary_key=True),
+        sa.Column('impressions', sa.Integer(), default=0),
+        sa.Column('clicks', sa.Integer(), default=0),
+        sa.Column('cost_micros', sa.Integer(), default=0),
+        sa.Column('conversions', sa.Float(), default=0.0),
+        sa.Column('conversions_value', sa.Float(), default=0.0),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    
+    window_columns = []
+    for days in (7, 14, 30):
+        window_columns += [
+            sa.Column(f'impressions_{days}d', sa.Integer(), default=0),
+            sa.Column(f'clicks_{days}d', sa.Integer(), default=0),
+            sa.Column(f'cost_micros_{days}d', sa.Integer(), default=0),
+            sa.Column(f'conversions_{days}d', sa.Float(), default=0.0),
+        ]
+    
+    op.create_table(
+        'search_term_window_metrics',
+        sa.Column('search_term_id', sa.String(50), sa.ForeignKey('search_terms.id'), primary_key=True),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        *window_columns,
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    
+    op.create_index('idx_search_term_daily_date', 'search_term_daily_metrics', ['date'])
+    op.create_index('idx_search_term_windows_as_of', 'search_term_window_metrics', ['as_of'])
+
+
+def downgrade():
+    op.drop_index('idx_search_term_windows_as_of')
+    op.drop_index('idx_search_term_daily_date')
+    op.drop_table('search_term_window_metrics')
+    op.drop_table('search_term_daily_metrics')
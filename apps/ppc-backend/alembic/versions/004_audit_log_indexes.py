@@ -0,0 +1,27 @@
+"""Add audit log indexes for keyset pagination
+
+Revision ID: 004_audit_log_indexes
+Revises: 003_search_term_metrics
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+revision = '004_audit_log_indexes'
+down_revision = '003_search_term_metrics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'])
+    op.create_index('idx_audit_logs_action_timestamp', 'audit_logs', ['action', 'timestamp', 'id'])
+    op.create_index('idx_audit_logs_result_timestamp', 'audit_logs', ['result', 'timestamp', 'id'])
+    op.create_index('idx_audit_logs_user_timestamp', 'audit_logs', ['user', 'timestamp', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_audit_logs_user_timestamp', table_name='audit_logs')
+    op.drop_index('idx_audit_logs_result_timestamp', table_name='audit_logs')
+    op.drop_index('idx_audit_logs_action_timestamp', table_name='audit_logs')
+    op.drop_index('idx_audit_logs_timestamp_id', table_name='audit_logs')
@@ -0,0 +1,61 @@
+"""Add daily audit log rollups
+
+Revision ID: 005_audit_rollups
+Revises: 004_audit_log_indexes
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005_audit_rollups'
+down_revision = '004_audit_log_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'audit_rollups',
+        sa.Column('date', sa.Date(), primary_key=True),
+        sa.Column('action', sa.String(100), primary_key=True),
+        sa.Column('result', sa.String(20), primary_key=True),
+        sa.Column('user', sa.String(100), primary_key=True),
+        sa.Column('validate_only', sa.Boolean(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    
+    # Backfill from existing audit logs
+    audit_logs = sa.table(
+        'audit_logs',
+        sa.column('timestamp', sa.DateTime()),
+        sa.column('action', sa.String()),
+        sa.column('result', sa.String()),
+        sa.column('user', sa.String()),
+        sa.column('validate_only', sa.Boolean()),
+    )
+    audit_rollups = sa.table(
+        'audit_rollups',
+        sa.column('date', sa.Date()),
+        sa.column('action', sa.String()),
+        sa.column('result', sa.String()),
+        sa.column('user', sa.String()),
+        sa.column('validate_only', sa.Boolean()),
+        sa.column('count', sa.Integer()),
+    )
+    
+    day = sa.func.date(audit_logs.c.timestamp)
+    result = sa.func.coalesce(audit_logs.c.result, '')
+    validate_only = sa.func.coalesce(audit_logs.c.validate_only, sa.true())
+    op.execute(
+        audit_rollups.insert().from_select(
+            ['date', 'action', 'result', 'user', 'validate_only', 'count'],
+            sa.select(
+                day, audit_logs.c.action, result, audit_logs.c.user, validate_only, sa.func.count()
+            ).group_by(day, audit_logs.c.action, result, audit_logs.c.user, validate_only)
+        )
+    )
+
+
+def downgrade():
+    op.drop_table('audit_rollups')
@@ -0,0 +1,114 @@
+"""Partition audit_logs by month on Postgres
+
+Revision ID: 006_partition_audit_logs
+Revises: 005_audit_rollups
+Create Date: 2026-10-19
+
+On SQLite partitions are emulated with per-month tables created by the
+audit retention job (services/audit_partitions.py), so nothing changes here.
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006_partition_audit_logs'
+down_revision = '005_audit_rollups'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'idx_audit_logs_timestamp_id': ['timestamp', 'id'],
+    'idx_audit_logs_action_timestamp': ['action', 'timestamp', 'id'],
+    'idx_audit_logs_result_timestamp': ['result', 'timestamp', 'id'],
+    'idx_audit_logs_user_timestamp': ['user', 'timestamp', 'id'],
+}
+
+# Partitions created ahead of the current month; the retention job keeps this going
+MONTHS_AHEAD = 2
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    
+    for name in INDEXES:
+        op.drop_index(name, table_name='audit_logs')
+    op.rename_table('audit_logs', 'audit_logs_unpartitioned')
+    op.execute('ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey')
+    
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id VARCHAR(50) NOT NULL,
+            action VARCHAR(100) NOT NULL,
+            payload_json TEXT,
+            "user" VARCHAR(100) NOT NULL,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            result VARCHAR(20),
+            google_change_id VARCHAR(100),
+            error_message TEXT,
+            validate_only BOOLEAN,
+            customer_id VARCHAR(20),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+    
+    oldest = bind.execute(sa.text('SELECT min(timestamp) FROM audit_logs_unpartitioned')).scalar()
+    month = date.today().replace(day=1)
+    if oldest is not None:
+        month = min(month, oldest.date().replace(day=1))
+    last = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE audit_logs_{month:%Y_%m} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    
+    op.execute("""
+        INSERT INTO audit_logs (id, action, payload_json, "user", timestamp, result,
+                                google_change_id, error_message, validate_only, customer_id)
+        SELECT id, action, payload_json, "user", COALESCE(timestamp, now()), result,
+               google_change_id, error_message, validate_only, customer_id
+        FROM audit_logs_unpartitioned
+    """)
+    op.drop_table('audit_logs_unpartitioned')
+    
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'audit_logs', columns)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    
+    for name in INDEXES:
+        op.drop_index(name, table_name='audit_logs')
+    op.rename_table('audit_logs', 'audit_logs_partitioned')
+    
+    op.create_table(
+        'audit_logs',
+        sa.Column('id', sa.String(50), primary_key=True),
+        sa.Column('action', sa.String(100), nullable=False),
+        sa.Column('payload_json', sa.Text()),
+        sa.Column('user', sa.String(100), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('result', sa.String(20)),
+        sa.Column('google_change_id', sa.String(100)),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('validate_only', sa.Boolean()),
+        sa.Column('customer_id', sa.String(20)),
+    )
+    op.execute('INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned')
+    op.execute('DROP TABLE audit_logs_partitioned CASCADE')
+    
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'audit_logs', columns)
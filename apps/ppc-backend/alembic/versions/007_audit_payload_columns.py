@@ -0,0 +1,111 @@
+"""Extract indexed payload keys on audit logs
+
+Revision ID: 007_audit_payload_columns
+Revises: 006_partition_audit_logs
+Create Date: 2026-10-19
+
+On SQLite the per-month tables written by the audit retention job get the
+same columns and indexes, so the UNION ALL over them stays valid.
+"""
+import json
+import re
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007_audit_payload_columns'
+down_revision = '006_partition_audit_logs'
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    'campaign_id': 50,
+    'recommendation_id': 50,
+    'keyword_text': 500,
+    'ad_group_id': 50,
+}
+
+INDEXES = {
+    'campaign_id': 'campaign',
+    'recommendation_id': 'recommendation',
+    'keyword_text': 'keyword_text',
+    'ad_group_id': 'ad_group',
+}
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _tables(bind):
+    """audit_logs plus the SQLite month tables (Postgres partitions inherit from the parent)."""
+    if bind.dialect.name == 'postgresql':
+        return ['audit_logs']
+    names = sa.inspect(bind).get_table_names()
+    return ['audit_logs'] + sorted(name for name in names if re.match(r'^audit_logs_\d{4}_\d{2}$', name))
+
+
+def _extract(payload_json):
+    try:
+        payload = json.loads(payload_json) if payload_json else None
+    except ValueError:
+        payload = None
+    
+    values = dict.fromkeys(COLUMNS)
+    if isinstance(payload, dict):
+        for name, length in COLUMNS.items():
+            value = payload.get(name)
+            if value is not None and not isinstance(value, (dict, list)):
+                values[name] = str(value)[:length]
+    return values
+
+
+def _backfill(bind, name):
+    table = sa.table(
+        name,
+        sa.column('id', sa.String()),
+        sa.column('payload_json', sa.Text()),
+        *[sa.column(column, sa.String()) for column in COLUMNS],
+    )
+    update = table.update().where(table.c.id == sa.bindparam('_id')).values(
+        **{column: sa.bindparam(column) for column in COLUMNS}
+    )
+    
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.payload_json)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        
+        params = [{'_id': row.id, **_extract(row.payload_json)} for row in rows]
+        params = [entry for entry in params if any(entry[column] for column in COLUMNS)]
+        if params:
+            bind.execute(update, params)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    bind = op.get_bind()
+    
+    for name in _tables(bind):
+        for column, length in COLUMNS.items():
+            op.add_column(name, sa.Column(column, sa.String(length)))
+        
+        _backfill(bind, name)
+        
+        for column, suffix in INDEXES.items():
+            op.create_index(f'idx_{name}_{suffix}_timestamp', name, [column, 'timestamp', 'id'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    
+    for name in _tables(bind):
+        for column, suffix in INDEXES.items():
+            op.drop_index(f'idx_{name}_{suffix}_timestamp', table_name=name)
+        
+        with op.batch_alter_table(name) as batch_op:
+            for column in COLUMNS:
+                batch_op.drop_column(column)
@@ -0,0 +1,115 @@
+"""Key daily_metrics on (level, ref_id, date) with integer IDs
+
+Revision ID: 008_daily_metric_natural_key
+Revises: 007_audit_payload_columns
+Create Date: 2026-10-19
+
+The table is rebuilt: rows are copied in batches into a new table with an
+integer primary key and a unique (level, ref_id, date) constraint, keeping
+the first row seen for any duplicated key.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008_daily_metric_natural_key'
+down_revision = '007_audit_payload_columns'
+branch_labels = None
+depends_on = None
+
+COPY_BATCH_SIZE = 5000
+
+DATA_COLUMNS = [
+    'date', 'level', 'ref_id', 'impressions', 'clicks', 'cost_micros', 'conversions',
+    'conversions_value', 'ctr', 'cpc_micros', 'conversion_rate', 'created_at',
+]
+
+COVERING_COLUMNS = ['level', 'date', 'ref_id', 'impressions', 'clicks', 'cost_micros', 'conversions']
+
+
+def _metric_columns():
+    return [
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('level', sa.String(20), nullable=False),
+        sa.Column('ref_id', sa.String(20), nullable=False),
+        sa.Column('impressions', sa.Integer(), default=0),
+        sa.Column('clicks', sa.Integer(), default=0),
+        sa.Column('cost_micros', sa.Integer(), default=0),
+        sa.Column('conversions', sa.Float(), default=0.0),
+        sa.Column('conversions_value', sa.Float(), default=0.0),
+        sa.Column('ctr', sa.Float()),
+        sa.Column('cpc_micros', sa.Integer()),
+        sa.Column('conversion_rate', sa.Float()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    ]
+
+
+def _insert_ignoring_duplicates(bind, table):
+    """INSERT that skips rows whose (level, ref_id, date) is already present."""
+    if bind.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing(index_elements=['level', 'ref_id', 'date'])
+    if bind.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table).on_conflict_do_nothing(index_elements=['level', 'ref_id', 'date'])
+    return table.insert()
+
+
+def _copy_in_batches(bind, source, insert, key_column, transform=None):
+    """Copy source rows through insert ordered by key_column, COPY_BATCH_SIZE rows at a time."""
+    key = source.c[key_column]
+    last = None
+    
+    while True:
+        query = sa.select(source).order_by(key).limit(COPY_BATCH_SIZE)
+        if last is not None:
+            query = query.where(key > last)
+        rows = bind.execute(query).mappings().all()
+        if not rows:
+            return
+        
+        values = [transform(row) if transform else {name: row[name] for name in DATA_COLUMNS} for row in rows]
+        bind.execute(insert, values)
+        last = rows[-1][key_column]
+
+
+def upgrade():
+    bind = op.get_bind()
+    
+    new_table = op.create_table(
+        'daily_metrics_new',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        *_metric_columns(),
+        sa.UniqueConstraint('level', 'ref_id', 'date', name='uq_daily_metrics_level_ref_date'),
+    )
+    old_table = sa.Table('daily_metrics', sa.MetaData(), autoload_with=bind)
+    
+    _copy_in_batches(bind, old_table, _insert_ignoring_duplicates(bind, new_table), 'id')
+    
+    op.drop_table('daily_metrics')
+    op.rename_table('daily_metrics_new', 'daily_metrics')
+    if bind.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE daily_metrics RENAME CONSTRAINT daily_metrics_new_pkey TO daily_metrics_pkey')
+        op.execute('ALTER SEQUENCE daily_metrics_new_id_seq RENAME TO daily_metrics_id_seq')
+    op.create_index('idx_daily_metrics_level_date_covering', 'daily_metrics', COVERING_COLUMNS)
+
+
+def downgrade():
+    bind = op.get_bind()
+    
+    old_table = op.create_table(
+        'daily_metrics_old',
+        sa.Column('id', sa.String(100), primary_key=True),
+        *_metric_columns(),
+    )
+    new_table = sa.Table('daily_metrics', sa.MetaData(), autoload_with=bind)
+    
+    def composite_id(row):
+        return {'id': f"{row['date']}_{row['level']}_{row['ref_id']}", **{name: row[name] for name in DATA_COLUMNS}}
+    
+    _copy_in_batches(bind, new_table, old_table.insert(), 'id', transform=composite_id)
+    
+    op.drop_index('idx_daily_metrics_level_date_covering', table_name='daily_metrics')
+    op.drop_table('daily_metrics')
+    op.rename_table('daily_metrics_old', 'daily_metrics')
+    if bind.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE daily_metrics RENAME CONSTRAINT daily_metrics_old_pkey TO daily_metrics_pkey')
@@ -0,0 +1,92 @@
+"""Add weekly and monthly metric rollups
+
+Revision ID: 009_metric_rollups
+Revises: 008_daily_metric_natural_key
+Create Date: 2026-10-19
+
+"""
+from collections import defaultdict
+from datetime import timedelta
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009_metric_rollups'
+down_revision = '008_daily_metric_natural_key'
+branch_labels = None
+depends_on = None
+
+ROLLUP_GRAINS = {
+    'campaign': ('month', 'week'),
+    'keyword': ('week',),
+}
+
+METRICS = ['impressions', 'clicks', 'cost_micros', 'conversions', 'conversions_value']
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _period_start(day, grain):
+    if grain == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def upgrade():
+    rollups = op.create_table(
+        'metric_rollups',
+        sa.Column('grain', sa.String(10), primary_key=True),
+        sa.Column('level', sa.String(20), primary_key=True),
+        sa.Column('ref_id', sa.String(20), primary_key=True),
+        sa.Column('period_start', sa.Date(), primary_key=True),
+        sa.Column('impressions', sa.Integer(), default=0),
+        sa.Column('clicks', sa.Integer(), default=0),
+        sa.Column('cost_micros', sa.Integer(), default=0),
+        sa.Column('conversions', sa.Float(), default=0.0),
+        sa.Column('conversions_value', sa.Float(), default=0.0),
+        sa.Column('days', sa.Integer(), default=0),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('idx_metric_rollups_period', 'metric_rollups', ['grain', 'level', 'period_start'])
+    
+    # Backfill from existing daily metrics, reading them in id order
+    bind = op.get_bind()
+    daily_metrics = sa.table(
+        'daily_metrics',
+        sa.column('id', sa.Integer()),
+        sa.column('level', sa.String()),
+        sa.column('ref_id', sa.String()),
+        sa.column('date', sa.Date()),
+        *[sa.column(name) for name in METRICS],
+    )
+    
+    totals = defaultdict(lambda: dict.fromkeys(METRICS + ['days'], 0))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(daily_metrics)
+            .where(daily_metrics.c.level.in_(list(ROLLUP_GRAINS)), daily_metrics.c.id > last_id)
+            .order_by(daily_metrics.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        
+        for row in rows:
+            for grain in ROLLUP_GRAINS[row['level']]:
+                period = totals[(grain, row['level'], row['ref_id'], _period_start(row['date'], grain))]
+                for name in METRICS:
+                    period[name] += row[name] or 0
+                period['days'] += 1
+        last_id = rows[-1]['id']
+    
+    values = [
+        dict(grain=grain, level=level, ref_id=ref_id, period_start=start, **sums)
+        for (grain, level, ref_id, start), sums in totals.items()
+    ]
+    for i in range(0, len(values), BACKFILL_BATCH_SIZE):
+        op.bulk_insert(rollups, values[i:i + BACKFILL_BATCH_SIZE])
+
+
+def downgrade():
+    op.drop_index('idx_metric_rollups_period', table_name='metric_rollups')
+    op.drop_table('metric_rollups')
@@ -0,0 +1,46 @@
+"""Add the cross-platform ad_metrics fact table
+
+Revision ID: 010_ad_metrics
+Revises: 009_metric_rollups
+Create Date: 2026-10-19
+
+Same shape and uniq_row key as ad_metrics in migrations/001_init.sql,
+written by services.ad_metrics_sink.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '010_ad_metrics'
+down_revision = '009_metric_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ad_metrics',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('platform', sa.String(20), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('account_id', sa.String(64), nullable=False),
+        sa.Column('campaign_id', sa.String(128), nullable=False),
+        sa.Column('adgroup_id', sa.String(128), nullable=False, server_default=''),
+        sa.Column('ad_id', sa.String(128), nullable=False, server_default=''),
+        sa.Column('impressions', sa.BigInteger(), default=0),
+        sa.Column('clicks', sa.BigInteger(), default=0),
+        sa.Column('spend', sa.Numeric(18, 6), default=0),
+        sa.Column('conversions', sa.Float(), default=0.0),
+        sa.Column('revenue', sa.Numeric(18, 6), default=0),
+        sa.Column('raw', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            'platform', 'date', 'account_id', 'campaign_id', 'adgroup_id', 'ad_id', name='uniq_row'
+        ),
+    )
+    op.create_index('idx_ad_metrics_date_platform', 'ad_metrics', ['date', 'platform'])
+
+
+def downgrade():
+    op.drop_index('idx_ad_metrics_date_platform', table_name='ad_metrics')
+    op.drop_table('ad_metrics')
@@ -0,0 +1,35 @@
+"""Add agent_runs for ingestion run history and resume watermarks
+
+Revision ID: 011_agent_runs
+Revises: 010_ad_metrics
+Create Date: 2026-10-19
+
+Same shape and uniq_run key as agent_runs in migrations/001_init.sql, so
+the ingestors can checkpoint into whichever database holds ad_metrics.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011_agent_runs'
+down_revision = '010_ad_metrics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'agent_runs',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('agent', sa.String(64), nullable=False),
+        sa.Column('run_id', sa.String(64), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime()),
+        sa.Column('ok', sa.Boolean()),
+        sa.Column('stats', sa.Text()),
+        sa.Column('watermark', sa.String(64)),
+        sa.UniqueConstraint('agent', 'run_id', name='uniq_run'),
+    )
+
+
+def downgrade():
+    op.drop_table('agent_runs')
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the COPY bulk loader against the row-by-row ORM path.
+
+Writes synthetic daily_metrics, keywords and search_terms rows through
+both paths inside transactions that are rolled back, so the database is
+left as it was. The COPY path needs DATABASE_URL to point at Postgres.
+
+Usage:
+    DATABASE_URL=postgresql://... python bench-bulk-load.py --rows 50000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database import SessionLocal
+from models import AdGroup, Campaign, Keyword, SearchTerm
+from services.bulk_load import copy_upsert
+from services.metric_rollups import write_daily_metrics
+
+BENCH_CAMPAIGN = "bench-c"
+BENCH_AD_GROUP = "bench-ag"
+
+
+def daily_metric_rows(count: int) -> dict:
+    start = date.today() - timedelta(days=365)
+    return {
+        (f"bench-{i // 365}", start + timedelta(days=i % 365)): {
+            "impressions": 1000 + i % 97,
+            "clicks": 10 + i % 13,
+            "cost_micros": 1_000_000 + i,
+            "conversions": float(i % 3),
+            "conversions_value": float(i % 3) * 50.0,
+        }
+        for i in range(count)
+    }
+
+
+def keyword_rows(count: int) -> list:
+    return [
+        {
+            "id": f"bench-{i}",
+            "ad_group_id": BENCH_AD_GROUP,
+            "text": f"bench keyword {i}",
+            "match_type": "PHRASE",
+            "status": "ENABLED",
+            "cpc_bid_micros": 1_000_000,
+        }
+        for i in range(count)
+    ]
+
+
+def search_term_rows(count: int) -> list:
+    return [
+        {
+            "id": f"bench-{i}",
+            "ad_group_id": BENCH_AD_GROUP,
+            "text": f"bench search term {i}",
+            "matched_keyword_text": f"bench keyword {i % 100}",
+            "last_seen": date.today(),
+        }
+        for i in range(count)
+    ]
+
+
+ROW_BUILDERS = {
+    "daily_metrics": daily_metric_rows,
+    "keywords": keyword_rows,
+    "search_terms": search_term_rows,
+}
+
+
+def orm_insert_missing(db, model, rows):
+    """What the sync endpoints do per row: look the entity up, add it if missing."""
+    for row in rows:
+        if not db.query(model).filter(model.id == row["id"]).first():
+            db.add(model(**row))
+
+
+def write(db, table, path, rows):
+    if table == "daily_metrics":
+        write_daily_metrics(db, "campaign", rows, bulk=path == "copy")
+    elif path == "copy":
+        model = Keyword if table == "keywords" else SearchTerm
+        copy_upsert(db, model.__table__, rows, ["id"], update={} if table == "keywords" else None)
+    else:
+        orm_insert_missing(db, Keyword if table == "keywords" else SearchTerm, rows)
+
+
+def run(table, path, rows) -> float:
+    db = SessionLocal()
+    try:
+        db.add(Campaign(id=BENCH_CAMPAIGN, name="Bench", status="ENABLED", daily_budget_micros=0))
+        db.add(AdGroup(id=BENCH_AD_GROUP, campaign_id=BENCH_CAMPAIGN, name="Bench", status="ENABLED"))
+        db.flush()
+
+        started = time.perf_counter()
+        write(db, table, path, rows)
+        db.flush()
+        return time.perf_counter() - started
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark COPY bulk loading against the ORM path")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument(
+        "--table", action="append", choices=["daily_metrics", "keywords", "search_terms"],
+        help="Table to load (repeatable); defaults to all"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    db.close()
+    paths = ["orm", "copy"] if is_postgres else ["orm"]
+    if not is_postgres:
+        print("⚠️  Not Postgres: timing the ORM path only\n")
+
+    print(f"{'table':15} {'path':5} {'rows':>9} {'seconds':>9} {'rows/s':>12}")
+    for table in args.table or list(ROW_BUILDERS):
+        rows = ROW_BUILDERS[table](args.rows)
+        for path in paths:
+            elapsed = run(table, path, rows)
+            print(f"{table:15} {path:5} {args.rows:>9} {elapsed:9.2f} {args.rows / elapsed:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
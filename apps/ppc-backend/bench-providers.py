@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load test the ad platform reporting clients against the fake API server.
+
+Starts ads/fake_server.py in the background (or uses the one at
+--base-url), points the clients at it with ADS_API_BASE_URL and times
+the LinkedIn analytics of every account (chunked, concurrent requests)
+and the Reddit campaign metrics stream (concurrent accounts, paged),
+through whatever latency, errors and rate limiting the server is set to
+inject. Prints rows, time and throughput per client, then what the
+server saw: requests, 429s, 500s and peak concurrency.
+
+The data set is the seeded synthetic one (MOCK_ADS_SEED,
+MOCK_ADS_METRIC_ROWS, MOCK_ADS_DAYS), so runs are comparable.
+
+Usage:
+    python bench-providers.py --latency-ms 80 --rate-limit-qps 20 --retry-after 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import httpx
+
+PLATFORMS = ["linkedin", "reddit"]
+
+
+async def bench_linkedin(start_date, end_date, granularity):
+    from ads.linkedin_analytics import analytics_client, fetch_account_analytics, get_all_pages
+
+    async with analytics_client("bench") as client:
+        accounts = await get_all_pages(client, "/adAccountsV2", {"q": "search"})
+
+    rows = 0
+    for account in accounts:
+        rows += len(await fetch_account_analytics("bench", account["id"], start_date, end_date, granularity))
+    return rows
+
+
+async def bench_reddit(start_date, end_date, granularity):
+    from ads.reddit_reporting import RedditReportingClient
+
+    rows = 0
+    async with RedditReportingClient("bench") as reddit:
+        async for _ in reddit.stream_campaign_rows(start_date, end_date, "day" if granularity == "DAILY" else "total"):
+            rows += 1
+    return rows
+
+
+def start_server(settings, port):
+    import uvicorn
+    from ads.fake_server import create_app
+
+    server = uvicorn.Server(uvicorn.Config(create_app(settings), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            sys.exit(f"Fake API server failed to start on port {port}")
+        time.sleep(0.05)
+    return server, thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the reporting clients against the fake ad platform APIs")
+    parser.add_argument("--base-url", help="Running fake server to use; by default one is started")
+    parser.add_argument("--port", type=int, default=8901, help="Port of the server started")
+    parser.add_argument("--start", default="2025-10-01")
+    parser.add_argument("--end", default="2025-10-31")
+    parser.add_argument("--granularity", choices=["DAILY", "ALL"], default="DAILY")
+    parser.add_argument("--platform", action="append", choices=PLATFORMS, help="Client to run (repeatable); defaults to all")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0)
+    parser.add_argument("--rate-limit-qps", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # The clients read their base URLs at import
+    base_url = (args.base_url or f"http://127.0.0.1:{args.port}").rstrip("/")
+    os.environ["ADS_API_BASE_URL"] = base_url
+    sys.path.insert(0, os.path.dirname(__file__))
+
+    server = None
+    if not args.base_url:
+        from ads.fake_server import FakeServerSettings
+
+        settings = FakeServerSettings(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            rate_limit_qps=args.rate_limit_qps,
+            retry_after=args.retry_after,
+            max_page_size=args.max_page_size,
+        )
+        server, thread = start_server(settings, args.port)
+        print(f"Fake API server on {base_url}: {settings}\n")
+
+    benches = {"linkedin": bench_linkedin, "reddit": bench_reddit}
+    print(f"{'client':12} {'rows':>9} {'seconds':>9} {'rows/s':>10}  status")
+    try:
+        for platform in args.platform or PLATFORMS:
+            httpx.post(f"{base_url}/fake/reset")
+            started = time.perf_counter()
+            try:
+                rows = asyncio.run(benches[platform](args.start, args.end, args.granularity))
+                status = "ok"
+            except httpx.HTTPStatusError as e:
+                rows, status = 0, f"failed: {e.response.status_code} on {e.request.url.path}"
+            elapsed = time.perf_counter() - started
+
+            stats = httpx.get(f"{base_url}/fake/stats").json()
+            print(f"{platform:12} {rows:>9,} {elapsed:9.2f} {rows / elapsed if elapsed else 0:10,.0f}  {status}")
+            print(
+                f"{'':12} {stats['requests']} requests, {stats['rate_limited']} rate limited, "
+                f"{stats['errors']} errors, peak {stats['max_in_flight']} in flight"
+            )
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
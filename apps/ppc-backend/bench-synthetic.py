@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark sync, ICP scoring and recommendations offline on synthetic data.
+
+Turns on MOCK_ADS, so the Google Ads client serves the seeded data set of
+services/synthetic_data.py instead of calling the API, and times each
+stage end to end: generating the rows, the /sync endpoints, ICP scoring
+and recommendation generation. The same --seed and --rows always give
+the same data, so runs are comparable.
+
+The sync and later stages commit what they write: point DATABASE_URL at a
+scratch database (its tables are created if missing).
+
+Usage:
+    DATABASE_URL=sqlite:///bench.db python bench-synthetic.py --rows 1000000 --seed 7
+"""
+import argparse
+import os
+import sys
+import time
+
+STAGES = ["generate", "sync", "score", "recommend"]
+
+
+def timed(label: str, fn, count_key: str = None):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    count = result if count_key is None else result.get(count_key, 0)
+    print(f"{label:28} {count:>11,} {elapsed:9.2f} {count / elapsed if elapsed else 0:12,.0f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sync, scoring and recommendation pipeline on synthetic data")
+    parser.add_argument("--rows", type=int, default=100000, help="Keyword-day metric rows to generate (up to 10M)")
+    parser.add_argument("--days", type=int, default=90, help="Days of metrics")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Stage to run (repeatable); defaults to all")
+    args = parser.parse_args()
+
+    # The synthetic data set and the clients are configured at import
+    os.environ.update({
+        "MOCK_ADS": "true",
+        "MOCK_ADS_SEED": str(args.seed),
+        "MOCK_ADS_METRIC_ROWS": str(args.rows),
+        "MOCK_ADS_DAYS": str(args.days),
+    })
+    sys.path.insert(0, os.path.dirname(__file__))
+
+    from database import SessionLocal, init_db
+    from routers.recommend import generate_recommendations
+    from routers.score import score_icp
+    from routers.sync import sync_campaigns, sync_keywords, sync_search_terms
+    from services.synthetic_data import synthetic_data
+
+    data = synthetic_data("google")
+    stages = args.stage or STAGES
+    print(f"{data}\n")
+    print(f"{'stage':28} {'rows':>11} {'seconds':>9} {'rows/s':>12}")
+
+    if "generate" in stages:
+        timed("generate keyword days", lambda: sum(1 for _ in data.keyword_daily_rows()))
+        timed("generate search term days", lambda: sum(1 for _ in data.search_term_daily_rows()))
+
+    if not set(stages) & {"sync", "score", "recommend"}:
+        return
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if "sync" in stages:
+            timed("sync keywords", lambda: sync_keywords(days=args.days, db=db), "total_rows_processed")
+            timed("sync search terms", lambda: sync_search_terms(days=args.days, db=db), "total_rows_processed")
+            timed("sync campaigns", lambda: sync_campaigns(days=args.days, db=db), "total_rows_processed")
+
+        if "score" in stages:
+            for level in ("keyword", "term"):
+                timed(f"score {level}s", lambda: score_icp(level=level, limit=data.keyword_count * 10, db=db), "items_scored")
+
+        if "recommend" in stages:
+            timed(
+                "generate recommendations",
+                lambda: generate_recommendations(types="neg,pause,budget", force_refresh=True, db=db, read_db=db),
+                "evaluated"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,157 @@
 import os
-from sqlalchemy import create_engine
+import logging
+import re
+import threading
+import time
+from collections import deque
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.declarative import declarative_base
 from models import Base
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ppc.db")
 
+# SQLite performance profile, applied to every new connection. WAL lets API
+# reads run while a sync is writing; set SQLITE_TUNING=false to skip it.
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative cache_size is in KiB
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024))),
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+}
+
+# Queue SQLite writers in-process instead of letting them race for the
+# database lock; set SQLITE_WRITE_QUEUE=false to rely on busy_timeout alone
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "true").lower() == "true"
+
+WRITE_STATEMENT = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+
+class WriteQueue:
+    """
+    FIFO lock handing the SQLite write lock to one connection at a time.
+
+    A connection joins the queue on its first write statement and leaves
+    when it is returned to the pool, i.e. after its transaction commits or
+    rolls back. Readers never queue, so with WAL they keep running while
+    writers wait their turn.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._waiting = deque()
+        self._holder = None
+        self.stats = {"acquired": 0, "waited_ms": 0.0, "timeouts": 0}
+
+    def acquire(self, owner) -> bool:
+        """Wait for the lock on behalf of owner; False if the timeout passed first."""
+        started = time.monotonic()
+        with self._condition:
+            if self._holder is owner:
+                return True
+
+            self._waiting.append(owner)
+            try:
+                acquired = self._condition.wait_for(
+                    lambda: self._holder is None and self._waiting[0] is owner,
+                    timeout=self.timeout
+                )
+            finally:
+                self._waiting.remove(owner)
+
+            if not acquired:
+                self.stats["timeouts"] += 1
+                self._condition.notify_all()
+                return False
+
+            self._holder = owner
+            self.stats["acquired"] += 1
+            self.stats["waited_ms"] += (time.monotonic() - started) * 1000
+            return True
+
+    def release(self, owner):
+        with self._condition:
+            if self._holder is owner:
+                self._holder = None
+                self._condition.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._condition:
+            return {**self.stats, "waiting": len(self._waiting), "held": self._holder is not None}
+
+
+write_queue = WriteQueue(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+
+
+def apply_sqlite_profile(sqlite_engine, serialize_writes: bool = SQLITE_WRITE_QUEUE):
+    """
+    Set the SQLite pragmas on every connection the engine opens and, when
+    serialize_writes is set, route its writers through write_queue.
+
+    Args:
+        sqlite_engine: Sync engine, or the sync_engine of an async one
+        serialize_writes: Queue write transactions in-process; leave off for
+            engines used from the event loop, where waiting would block it
+    """
+    in_memory = sqlite_engine.url.database in (None, "", ":memory:")
+
+    @event.listens_for(sqlite_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            # In-memory databases have no journal file or pages to map
+            if in_memory and name in ("journal_mode", "mmap_size"):
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    if not serialize_writes:
+        return
+
+    @event.listens_for(sqlite_engine, "before_cursor_execute")
+    def queue_writer(conn, cursor, statement, parameters, context, executemany):
+        info = conn.info
+        if "write_queue_owner" in info or not WRITE_STATEMENT.match(statement):
+            return
+        owner = object()
+        if write_queue.acquire(owner):
+            info["write_queue_owner"] = owner
+        else:
+            # Another writer is stuck (or this thread holds the lock through a
+            # second connection); fall back to SQLite's own busy handling
+            logger.warning("SQLite write queue wait timed out; writing without it")
+            info["write_queue_owner"] = None
+
+    def release_writer(dbapi_connection, connection_record, *args):
+        owner = connection_record.info.pop("write_queue_owner", None)
+        if owner is not None:
+            write_queue.release(owner)
+
+    event.listen(sqlite_engine.pool, "checkin", release_writer)
+    event.listen(sqlite_engine.pool, "invalidate", release_writer)
+
+
 # Create engine
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    if SQLITE_TUNING:
+        apply_sqlite_profile(engine)
 else:
     engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 
@@ -20,6 +159,186 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def to_async_url(database_url: str) -> str:
+    """Map a sync database URL to its async driver: aiosqlite for SQLite, asyncpg for Postgres."""
+    url = make_url(database_url)
+    
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    
+    if url.get_backend_name() in ("postgresql", "postgres"):
+        # asyncpg takes ssl instead of libpq's sslmode
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return url.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+    
+    return database_url
+
+
+# Async engine for read-heavy endpoints when ASYNC_SESSIONS is set, so slow
+# queries wait on the event loop instead of holding a threadpool slot
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    if SQLITE_TUNING:
+        apply_sqlite_profile(async_engine.sync_engine, serialize_writes=False)
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Endpoints run their queries on sync sessions in the threadpool unless
+# ASYNC_SESSIONS=true. With 100 clients against a local database (load-test.py)
+# async sessions did not pay off: aiosqlite runs every call on a thread per
+# connection and is slower (/audit 48 vs 75 req/s), and asyncpg was mixed
+# (/recommendations 92 vs 65 req/s, /audit/summary 53 vs 102). They may
+# still help with asyncpg against a distant server, where queries mostly
+# wait on the network.
+ASYNC_SESSIONS = os.getenv("ASYNC_SESSIONS", "false").lower() == "true"
+
+
+# Optional read replica for heavy analytics reads. Reads fall back to the
+# primary while the replica is unreachable or lags by more than
+# DATABASE_READ_MAX_LAG_SECONDS.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+DATABASE_READ_MAX_LAG_SECONDS = float(os.getenv("DATABASE_READ_MAX_LAG_SECONDS", "30"))
+DATABASE_READ_CHECK_SECONDS = float(os.getenv("DATABASE_READ_CHECK_SECONDS", "5"))
+
+# Seconds the replica is behind. Without a replication lag function (SQLite)
+# the replica only has to answer; DATABASE_READ_LAG_QUERY can supply one,
+# e.g. reading a heartbeat row.
+POSTGRES_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+def _read_engines(read_url: str):
+    """Sync and async engines for the replica."""
+    async_url = to_async_url(read_url)
+    
+    if read_url.startswith("sqlite"):
+        sync_engine = create_engine(read_url, connect_args={"check_same_thread": False})
+        async_read = create_async_engine(async_url)
+        if SQLITE_TUNING:
+            apply_sqlite_profile(sync_engine, serialize_writes=False)
+            apply_sqlite_profile(async_read.sync_engine, serialize_writes=False)
+        return sync_engine, async_read
+    
+    # Fail over quickly instead of hanging requests on an unreachable replica
+    sync_engine = create_engine(read_url, pool_pre_ping=True, connect_args={"connect_timeout": 5})
+    async_read = create_async_engine(async_url, pool_pre_ping=True, connect_args={"timeout": 5})
+    return sync_engine, async_read
+
+
+class ReadReplica:
+    """
+    Tracks whether the read replica may serve reads.
+
+    Lag is probed at most every check_seconds and cached in between; the
+    replica counts as available while the last probe succeeded with a lag
+    within max_lag_seconds.
+    """
+
+    def __init__(self, sync_engine, async_engine, max_lag_seconds: float, check_seconds: float):
+        self.engine = sync_engine
+        self.async_engine = async_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.lag_query = os.getenv("DATABASE_READ_LAG_QUERY") or (
+            POSTGRES_LAG_QUERY if sync_engine.dialect.name == "postgresql" else "SELECT 0"
+        )
+        self.healthy = False
+        self.lag = None
+        self.error = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _due(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds
+
+    def _record(self, lag=None, error=None):
+        was_healthy = self.healthy
+        self.lag = None if lag is None else float(lag)
+        self.error = None if error is None else str(error)
+        self.healthy = error is None and self.lag <= self.max_lag_seconds
+        
+        if was_healthy and not self.healthy:
+            reason = self.error or f"lag {self.lag:.1f}s > {self.max_lag_seconds:.0f}s"
+            logger.warning(f"Read replica unavailable ({reason}); reading from the primary")
+        elif self.healthy and not was_healthy:
+            logger.info(f"Read replica available (lag {self.lag:.1f}s)")
+
+    def available(self) -> bool:
+        """Whether reads may go to the replica, probing it with the sync engine when due."""
+        if self._due() and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = time.monotonic()
+                with self.engine.connect() as conn:
+                    self._record(lag=conn.execute(text(self.lag_query)).scalar() or 0)
+            except Exception as e:
+                self._record(error=e)
+            finally:
+                self._lock.release()
+        return self.healthy
+
+    async def available_async(self) -> bool:
+        """available() for the event loop, probing with the async engine."""
+        if self._due():
+            # Claim the probe before awaiting so concurrent requests don't repeat it
+            self._checked_at = time.monotonic()
+            try:
+                async with self.async_engine.connect() as conn:
+                    self._record(lag=(await conn.execute(text(self.lag_query))).scalar() or 0)
+            except Exception as e:
+                self._record(error=e)
+        return self.healthy
+
+    def status(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag_seconds,
+            "error": self.error,
+        }
+
+
+if DATABASE_READ_URL:
+    read_replica = ReadReplica(
+        *_read_engines(DATABASE_READ_URL),
+        max_lag_seconds=DATABASE_READ_MAX_LAG_SECONDS,
+        check_seconds=DATABASE_READ_CHECK_SECONDS
+    )
+else:
+    read_replica = None
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica while it is available.
+    
+    Flushes and DML statements go to the primary, and so does everything
+    after the session's first write, so it always reads its own writes.
+    """
+    
+    _wrote = False
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._wrote = True
+        if self._wrote or read_replica is None or not read_replica.available():
+            return engine
+        return read_replica.engine
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
 def init_db():
     """Initialize the database by creating all tables."""
     Base.metadata.create_all(bind=engine)
@@ -34,6 +353,83 @@ def get_db():
         db.close()
 
 
+
+
+def get_read_db():
+    """Dependency to get a session that reads from the replica when one is configured."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class SessionRunner:
+    """
+    Runs session code for an async endpoint off the event loop.
+    
+    The code is a function taking a sync Session. On async sessions it runs
+    through run_sync, with the async driver awaiting its queries; otherwise
+    it gets a sync session in the threadpool, as a sync endpoint would.
+    
+    The session is closed after each call, so its connection goes back to
+    the pool before the endpoint returns; results come back detached and
+    have to be loaded by then. Holding the connection until teardown
+    deadlocks under load: closing a sync session takes a threadpool slot,
+    and those can all be waiting for a connection.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+    
+    def _run_sync(self, fn, *args, **kwargs):
+        try:
+            return fn(self.session, *args, **kwargs)
+        finally:
+            self.session.close()
+    
+    async def run(self, fn, *args, **kwargs):
+        if isinstance(self.session, AsyncSession):
+            try:
+                return await self.session.run_sync(fn, *args, **kwargs)
+            finally:
+                await self.session.close()
+        return await run_in_threadpool(self._run_sync, fn, *args, **kwargs)
+
+
+async def get_db_runner():
+    """Dependency to get a SessionRunner on the primary."""
+    if ASYNC_SESSIONS:
+        async with AsyncSessionLocal() as db:
+            yield SessionRunner(db)
+        return
+    
+    db = SessionLocal()
+    try:
+        yield SessionRunner(db)
+    finally:
+        db.close()
+
+
+async def get_read_db_runner():
+    """Dependency to get a SessionRunner that reads from the replica while it is available."""
+    if ASYNC_SESSIONS:
+        if read_replica is not None and await read_replica.available_async():
+            bind = read_replica.async_engine
+        else:
+            bind = async_engine
+        
+        async with AsyncSessionLocal(bind=bind) as db:
+            yield SessionRunner(db)
+        return
+    
+    db = ReadSessionLocal()
+    try:
+        yield SessionRunner(db)
+    finally:
+        db.close()
+
+
 # Utility function to get a database session
 def get_db_session() -> Session:
     """Get a database session for direct use."""
@@ -2,10 +2,21 @@
 """
 Fetch weekly data from all ad platforms and populate database.
 Usage: python fetch-all-platforms.py --start 2025-10-20 --end 2025-10-26
+
+The per-platform fetchers (fetch-microsoft.py, fetch-reddit.py,
+fetch-linkedin.py and Google below) are imported as modules and run
+concurrently, each with its own timeout and its own ad_metrics sink. A
+platform that fails or times out is reported as such; the others still
+complete. Use --json for the structured results.
 """
 import argparse
+import asyncio
+import importlib.util
+import json
 import os
 import sys
+import threading
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -16,15 +27,17 @@ load_dotenv('../../.env.local')
 sys.path.insert(0, os.path.dirname(__file__))
 
 from ads.client import GoogleAdsClientFactory
+from services.ad_metrics_sink import AdMetricsSink, ad_metric_row
+from services.synthetic_data import MANAGER_ACCOUNT_ID, MOCK_ADS
 
-def fetch_google_ads(start_date, end_date):
-    """Fetch Google Ads data for date range."""
+def fetch_google_ads(start_date, end_date, sink=None):
+    """Fetch Google Ads data for date range, writing daily campaign rows to sink if given."""
     print(f"📊 Fetching Google Ads data ({start_date} to {end_date})...")
     
     try:
         factory = GoogleAdsClientFactory()
         client = factory.get_client()
-        customer_id = os.getenv("GOOGLE_ADS_CUSTOMER_ID", "").replace("-", "")
+        customer_id = os.getenv("GOOGLE_ADS_CUSTOMER_ID", MANAGER_ACCOUNT_ID if MOCK_ADS else "").replace("-", "")
         
         if not customer_id:
             print("  ⚠️  GOOGLE_ADS_CUSTOMER_ID not set, skipping")
@@ -34,10 +47,13 @@ def fetch_google_ads(start_date, end_date):
         
         query = f"""
             SELECT
+                campaign.id,
+                segments.date,
                 metrics.impressions,
                 metrics.clicks,
                 metrics.cost_micros,
-                metrics.conversions
+                metrics.conversions,
+                metrics.conversions_value
             FROM campaign
             WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'
                 AND campaign.status != 'REMOVED'
@@ -55,6 +71,16 @@ def fetch_google_ads(start_date, end_date):
             total_clicks += row.metrics.clicks
             total_cost += row.metrics.cost_micros / 1_000_000
             total_conv += row.metrics.conversions
+            
+            if sink is not None:
+                sink.write(ad_metric_row(
+                    'google', row.segments.date, customer_id, row.campaign.id,
+                    impressions=row.metrics.impressions,
+                    clicks=row.metrics.clicks,
+                    spend=row.metrics.cost_micros / 1_000_000,
+                    conversions=row.metrics.conversions,
+                    revenue=row.metrics.conversions_value
+                ))
         
         result = {
             'impressions': total_impr,
@@ -70,157 +96,220 @@ def fetch_google_ads(start_date, end_date):
         print(f"  ❌ Google Ads error: {e}")
         return None
 
-def fetch_microsoft_ads(start_date, end_date):
-    """Fetch Microsoft Ads data via real API."""
-    import subprocess
-    import json
-    import re
+PLATFORM_NAMES = {
+    'google': 'Google',
+    'microsoft': 'Microsoft',
+    'reddit': 'Reddit',
+    'linkedin': 'LinkedIn'
+}
+
+# Seconds each platform may take before it is reported as timed out
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("FETCH_TIMEOUT_SECONDS", "60"))
+
+def load_fetcher(platform):
+    """Import fetch-<platform>.py as a module and return its fetch function."""
+    module_name = f"fetch_{platform}"
+    if module_name not in sys.modules:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"fetch-{platform}.py")
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return getattr(sys.modules[module_name], f"fetch_{platform}_ads")
+
+def get_fetchers():
+    return {
+        'google': fetch_google_ads,
+        'microsoft': load_fetcher('microsoft'),
+        'reddit': load_fetcher('reddit'),
+        'linkedin': load_fetcher('linkedin')
+    }
+
+def run_fetcher(fetch, start_date, end_date, store):
+    """Run one fetcher to completion with its own sink (sinks aren't shared across threads)."""
+    if not store:
+        return fetch(start_date, end_date)
+    with AdMetricsSink() as sink:
+        return fetch(start_date, end_date, sink)
+
+def run_in_thread(func, *args):
+    """
+    Run a blocking fetcher in a daemon thread and return a future for its result.
     
-    script_path = os.path.join(os.path.dirname(__file__), 'fetch-microsoft.py')
-    venv_python = os.path.join(os.path.dirname(__file__), 'venv/bin/python3')
+    The fetchers use blocking SDKs and HTTP clients that can't be cancelled, so
+    a timed-out fetcher is abandoned rather than stopped. A daemon thread won't
+    hold the process open afterwards; sink batches already committed stay, and
+    the one in flight is rolled back with its connection.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
     
-    try:
-        result = subprocess.run(
-            [venv_python, script_path, '--start', start_date, '--end', end_date],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        if result.returncode == 0:
-            # Parse output for metrics
-            match = re.search(r'Microsoft: \$([0-9,]+\.\d+) spend, ([0-9,]+) impr, ([0-9,]+) clicks, ([0-9]+) conv', result.stdout)
-            if match:
-                return {
-                    'spend': float(match.group(1).replace(',', '')),
-                    'impressions': int(match.group(2).replace(',', '')),
-                    'clicks': int(match.group(3).replace(',', '')),
-                    'conversions': int(match.group(4))
-                }
-        
-        # Fallback to previous week data
-        print(f"  ⚠️  Using previous week data (API call failed)")
-        return {'impressions': 135383, 'clicks': 2454, 'spend': 17109.03, 'conversions': 292}
-        
-    except Exception as e:
-        print(f"  ⚠️  Microsoft API error: {e}, using previous week data")
-        return {'impressions': 135383, 'clicks': 2454, 'spend': 17109.03, 'conversions': 292}
+    def resolve(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def target():
+        try:
+            result = func(*args)
+        except Exception as e:
+            callback = (resolve, None, e)
+        else:
+            callback = (resolve, result)
+        try:
+            loop.call_soon_threadsafe(*callback)
+        except RuntimeError:
+            # Loop already closed: the orchestrator stopped waiting
+            pass
+    
+    threading.Thread(target=target, name=f"fetch-{getattr(func, '__name__', 'platform')}", daemon=True).start()
+    return future
 
-def fetch_reddit_ads(start_date, end_date):
-    """Fetch Reddit Ads data via real API."""
-    import subprocess
-    import re
+async def fetch_platform(platform, fetch, start_date, end_date, timeout, store=True):
+    """
+    Fetch one platform, never raising.
     
-    script_path = os.path.join(os.path.dirname(__file__), 'fetch-reddit.py')
-    venv_python = os.path.join(os.path.dirname(__file__), 'venv/bin/python3')
+    Returns:
+        Dict with platform, status ('ok', 'failed' or 'timeout'), metrics
+        (None unless ok), error and elapsed_seconds
+    """
+    started = time.monotonic()
+    status, metrics, error = 'ok', None, None
     
     try:
-        result = subprocess.run(
-            [venv_python, script_path, '--start', start_date, '--end', end_date],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        if result.returncode == 0:
-            match = re.search(r'Reddit: \$([0-9,]+\.\d+) spend, ([0-9,]+) impr, ([0-9,]+) clicks, ([0-9]+) conv', result.stdout)
-            if match:
-                return {
-                    'spend': float(match.group(1).replace(',', '')),
-                    'impressions': int(match.group(2).replace(',', '')),
-                    'clicks': int(match.group(3).replace(',', '')),
-                    'conversions': int(match.group(4))
-                }
-        
-        print(f"  ⚠️  Using previous week data (API call failed)")
-        return {'impressions': 383818, 'clicks': 1776, 'spend': 3143.38, 'conversions': 1183}
-        
+        metrics = await asyncio.wait_for(run_in_thread(run_fetcher, fetch, start_date, end_date, store), timeout)
+        if metrics is None:
+            # Fetchers print their own errors and return None
+            status, error = 'failed', 'No data returned (see log above)'
+    except asyncio.TimeoutError:
+        status, error = 'timeout', f'Timed out after {timeout:g}s'
+        print(f"  ⏱️  {PLATFORM_NAMES[platform]}: timed out after {timeout:g}s")
     except Exception as e:
-        print(f"  ⚠️  Reddit API error: {e}, using previous week data")
-        return {'impressions': 383818, 'clicks': 1776, 'spend': 3143.38, 'conversions': 1183}
+        status, error = 'failed', str(e)
+        print(f"  ❌ {PLATFORM_NAMES[platform]} error: {e}")
+    
+    return {
+        'platform': platform,
+        'status': status,
+        'metrics': metrics,
+        'error': error,
+        'elapsed_seconds': round(time.monotonic() - started, 2)
+    }
 
-def fetch_linkedin_ads(start_date, end_date):
-    """Fetch LinkedIn Ads data via real API."""
-    import subprocess
-    import re
+async def fetch_all_platforms(start_date, end_date, platforms=None, timeouts=None, store=True):
+    """
+    Fetch all platforms concurrently.
     
-    script_path = os.path.join(os.path.dirname(__file__), 'fetch-linkedin.py')
-    venv_python = os.path.join(os.path.dirname(__file__), 'venv/bin/python3')
+    Args:
+        start_date, end_date: Date range (YYYY-MM-DD)
+        platforms: Platforms to fetch; defaults to all of PLATFORM_NAMES
+        timeouts: Seconds per platform, overriding DEFAULT_TIMEOUT_SECONDS
+        store: Write rows to ad_metrics
     
-    try:
-        result = subprocess.run(
-            [venv_python, script_path, '--start', start_date, '--end', end_date],
-            capture_output=True,
-            text=True,
-            timeout=60
+    Returns:
+        Dict with per-platform results, totals over the platforms that
+        succeeded, and the list of failed platforms
+    """
+    fetchers = get_fetchers()
+    platforms = platforms or list(PLATFORM_NAMES)
+    timeouts = timeouts or {}
+    
+    started = time.monotonic()
+    results = await asyncio.gather(*[
+        fetch_platform(
+            platform, fetchers[platform], start_date, end_date,
+            timeouts.get(platform, DEFAULT_TIMEOUT_SECONDS), store
         )
-        
-        if result.returncode == 0:
-            match = re.search(r'LinkedIn: \$([0-9,]+\.\d+) spend, ([0-9,]+) impr, ([0-9,]+) clicks, ([0-9]+) conv', result.stdout)
-            if match:
-                return {
-                    'spend': float(match.group(1).replace(',', '')),
-                    'impressions': int(match.group(2).replace(',', '')),
-                    'clicks': int(match.group(3).replace(',', '')),
-                    'conversions': int(match.group(4))
-                }
-        
-        print(f"  ⚠️  Using previous week data (API call failed)")
-        return {'impressions': 1378221, 'clicks': 1533, 'spend': 4232.96, 'conversions': 691}
-        
-    except Exception as e:
-        print(f"  ⚠️  LinkedIn API error: {e}, using previous week data")
-        return {'impressions': 1378221, 'clicks': 1533, 'spend': 4232.96, 'conversions': 691}
+        for platform in platforms
+    ])
+    
+    succeeded = [r['metrics'] for r in results if r['status'] == 'ok']
+    
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'platforms': {r['platform']: r for r in results},
+        'totals': {
+            'spend': round(sum(m['spend'] for m in succeeded), 2),
+            'impressions': sum(m['impressions'] for m in succeeded),
+            'clicks': sum(m['clicks'] for m in succeeded),
+            'conversions': sum(m['conversions'] for m in succeeded)
+        },
+        'failed': [r['platform'] for r in results if r['status'] != 'ok'],
+        'elapsed_seconds': round(time.monotonic() - started, 2)
+    }
+
+def parse_timeouts(values):
+    """Parse repeated --timeout values: a number for every platform, or platform=seconds."""
+    timeouts = {}
+    for value in values or []:
+        if '=' in value:
+            platform, seconds = value.split('=', 1)
+            if platform not in PLATFORM_NAMES:
+                raise argparse.ArgumentTypeError(f"Unknown platform: {platform}")
+            timeouts[platform] = float(seconds)
+        else:
+            timeouts.update({platform: float(value) for platform in PLATFORM_NAMES})
+    return timeouts
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--start', default='2025-10-20', help='Start date YYYY-MM-DD')
     parser.add_argument('--end', default='2025-10-26', help='End date YYYY-MM-DD')
+    parser.add_argument('--no-store', action='store_true', help="Don't write rows to ad_metrics")
+    parser.add_argument('--platform', action='append', choices=list(PLATFORM_NAMES), help='Platform to fetch (repeatable); defaults to all')
+    parser.add_argument('--timeout', action='append', help=f'Seconds per platform, or platform=seconds (repeatable); default {DEFAULT_TIMEOUT_SECONDS:g}')
+    parser.add_argument('--json', action='store_true', help='Print the structured results as JSON')
     args = parser.parse_args()
     
+    try:
+        timeouts = parse_timeouts(args.timeout)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(f"--timeout: {e}")
+    
     print(f"\n{'='*80}")
     print(f"FETCHING AD PLATFORM DATA: {args.start} to {args.end}")
     print(f"{'='*80}\n")
     
     # Fetch from all platforms
-    google = fetch_google_ads(args.start, args.end)
-    microsoft = fetch_microsoft_ads(args.start, args.end)
-    reddit = fetch_reddit_ads(args.start, args.end)
-    linkedin = fetch_linkedin_ads(args.start, args.end)
+    data = asyncio.run(fetch_all_platforms(
+        args.start, args.end, platforms=args.platform, timeouts=timeouts, store=not args.no_store
+    ))
     
     # Calculate totals
     print(f"\n{'='*80}")
     print("WEEKLY TOTALS")
     print(f"{'='*80}")
     
-    platforms = {
-        'Google': google,
-        'Microsoft': microsoft,
-        'Reddit': reddit,
-        'LinkedIn': linkedin
-    }
-    
-    total_spend = sum(p['spend'] for p in platforms.values() if p)
-    total_impr = sum(p['impressions'] for p in platforms.values() if p)
-    total_clicks = sum(p['clicks'] for p in platforms.values() if p)
-    total_conv = sum(p['conversions'] for p in platforms.values() if p)
+    for platform, result in data['platforms'].items():
+        name = PLATFORM_NAMES[platform]
+        if result['status'] == 'ok':
+            print(f"  ✅ {name}: ${result['metrics']['spend']:,.2f} spend ({result['elapsed_seconds']}s)")
+        else:
+            print(f"  ❌ {name}: {result['status']} - {result['error']} ({result['elapsed_seconds']}s)")
     
-    print(f"Total Spend: ${total_spend:,.2f}")
-    print(f"Total Impressions: {total_impr:,}")
-    print(f"Total Clicks: {total_clicks:,}")
-    print(f"Total Conversions: {total_conv:,.1f}")
+    totals = data['totals']
+    print(f"Total Spend: ${totals['spend']:,.2f}")
+    print(f"Total Impressions: {totals['impressions']:,}")
+    print(f"Total Clicks: {totals['clicks']:,}")
+    print(f"Total Conversions: {totals['conversions']:,.1f}")
+    if data['failed']:
+        print(f"⚠️  Totals exclude: {', '.join(PLATFORM_NAMES[p] for p in data['failed'])}")
+    print(f"Fetched in {data['elapsed_seconds']}s")
     print(f"{'='*80}\n")
     
+    if args.json:
+        print(json.dumps(data, indent=2, default=str))
+    
+    # Partial results are still usable; fail only when nothing came back
+    if len(data['failed']) == len(data['platforms']):
+        sys.exit(1)
+    
     # Return data for dashboard update
-    return {
-        'platforms': platforms,
-        'totals': {
-            'spend': total_spend,
-            'impressions': total_impr,
-            'clicks': total_clicks,
-            'conversions': total_conv
-        }
-    }
+    return data
 
 if __name__ == "__main__":
     main()
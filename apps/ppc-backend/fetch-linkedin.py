@@ -2,21 +2,43 @@
 """
 Fetch LinkedIn Ads weekly data for dashboard.
 Usage: python fetch-linkedin.py --start 2025-10-20 --end 2025-10-26
+
+Daily per-campaign rows are written to ad_metrics (see
+services/ad_metrics_sink.py) unless --no-store is given. Analytics are
+requested for chunks of campaigns at a time (see ads/linkedin_analytics.py).
 """
 import argparse
+import asyncio
 import os
 import sys
-from datetime import datetime
 from dotenv import load_dotenv
 import httpx
 
 # Load from parent .env.local
 load_dotenv('../../.env.local')
 
-def fetch_linkedin_ads(start_date, end_date):
-    """Fetch LinkedIn Ads data using Marketing API."""
+# Add current dir to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ads.http_utils import platform_url
+from ads.linkedin_analytics import campaign_id_from_urn, element_date, fetch_account_analytics
+from services.ad_metrics_sink import AdMetricsSink, ad_metric_row
+from services.synthetic_data import MOCK_ADS, fetch_synthetic_metrics
+
+def fetch_linkedin_ads(start_date, end_date, sink=None, granularity=None):
+    """
+    Fetch LinkedIn Ads data using Marketing API, writing campaign rows to sink if given.
+    
+    granularity is DAILY or ALL (range totals); it defaults to DAILY when
+    storing rows and ALL otherwise.
+    """
     print(f"🔍 Fetching LinkedIn Ads data for {start_date} to {end_date}...")
     
+    if MOCK_ADS:
+        result = fetch_synthetic_metrics('linkedin', start_date, end_date, sink)
+        print(f"  🧪 LinkedIn (synthetic): ${result['spend']:,.2f} spend, {result['impressions']:,} impr, {result['clicks']:,} clicks, {result['conversions']:.1f} conv")
+        return result
+    
     client_id = os.getenv("LINKEDIN_ADS_CLIENT_ID")
     client_secret = os.getenv("LINKEDIN_ADS_CLIENT_SECRET")
     
@@ -46,7 +68,7 @@ def fetch_linkedin_ads(start_date, end_date):
         # If access token expired, refresh it
         if not access_token and refresh_token:
             print("  🔄 Refreshing LinkedIn access token...")
-            token_url = "https://www.linkedin.com/oauth/v2/accessToken"
+            token_url = platform_url("linkedin", "https://www.linkedin.com/oauth/v2/accessToken")
             
             data = {
                 'grant_type': 'refresh_token',
@@ -75,7 +97,7 @@ def fetch_linkedin_ads(start_date, end_date):
     
     try:
         # LinkedIn Marketing API
-        base_url = "https://api.linkedin.com/v2"
+        base_url = platform_url("linkedin", "https://api.linkedin.com/v2")
         
         headers = {
             'Authorization': f'Bearer {access_token}',
@@ -96,21 +118,18 @@ def fetch_linkedin_ads(start_date, end_date):
         # Use first account
         account_id = accounts_data['elements'][0]['id']
         
-        # Convert dates to LinkedIn format (Unix timestamps in milliseconds)
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        if granularity is None:
+            granularity = 'DAILY' if sink is not None else 'ALL'
         
-        start_ts = int(start_dt.timestamp() * 1000)
-        end_ts = int(end_dt.timestamp() * 1000)
+        # ALL returns totals over the range, which are only a daily fact
+        # when the range is a single day
+        store = sink is not None and (granularity == 'DAILY' or start_date == end_date)
+        if sink is not None and not store:
+            print("  ⚠️  Range totals are not written to ad_metrics; use --granularity DAILY to store rows")
         
-        # Fetch analytics
-        print(f"  📊 Fetching campaign analytics for account {account_id}...")
-        
-        # Get campaigns for this account
-        campaigns_url = f"{base_url}/adCampaignsV2?q=search&search.account.values[0]=urn:li:sponsoredAccount:{account_id}"
-        campaigns_response = httpx.get(campaigns_url, headers=headers)
-        campaigns_response.raise_for_status()
-        campaigns_data = campaigns_response.json()
+        # Fetch analytics for all campaigns in chunked, concurrent requests
+        print(f"  📊 Fetching campaign analytics for account {account_id} ({granularity})...")
+        elements = asyncio.run(fetch_account_analytics(access_token, account_id, start_date, end_date, granularity))
         
         # Aggregate metrics across all campaigns
         total_impr = 0
@@ -118,34 +137,22 @@ def fetch_linkedin_ads(start_date, end_date):
         total_spend = 0
         total_conv = 0
         
-        for campaign in campaigns_data.get('elements', []):
-            campaign_urn = campaign['id']
-            
-            # Get analytics for this campaign
-            analytics_url = f"{base_url}/adAnalyticsV2"
-            params = {
-                'q': 'analytics',
-                'pivot': 'CAMPAIGN',
-                'dateRange.start.day': start_dt.day,
-                'dateRange.start.month': start_dt.month,
-                'dateRange.start.year': start_dt.year,
-                'dateRange.end.day': end_dt.day,
-                'dateRange.end.month': end_dt.month,
-                'dateRange.end.year': end_dt.year,
-                'campaigns[0]': campaign_urn,
-                'fields': 'impressions,clicks,costInUsd,externalWebsiteConversions'
-            }
+        for element in elements:
+            total_impr += int(element.get('impressions', 0))
+            total_clicks += int(element.get('clicks', 0))
+            total_spend += float(element.get('costInUsd', 0))
+            total_conv += int(element.get('externalWebsiteConversions', 0))
             
-            analytics_response = httpx.get(analytics_url, headers=headers, params=params, timeout=30.0)
-            
-            if analytics_response.status_code == 200:
-                analytics_data = analytics_response.json()
-                
-                for element in analytics_data.get('elements', []):
-                    total_impr += int(element.get('impressions', 0))
-                    total_clicks += int(element.get('clicks', 0))
-                    total_spend += float(element.get('costInUsd', 0))
-                    total_conv += int(element.get('externalWebsiteConversions', 0))
+            if store:
+                sink.write(ad_metric_row(
+                    'linkedin', element_date(element) or start_date, account_id,
+                    campaign_id_from_urn(element['pivotValue']),
+                    impressions=element.get('impressions'),
+                    clicks=element.get('clicks'),
+                    spend=element.get('costInUsd'),
+                    conversions=element.get('externalWebsiteConversions'),
+                    raw=element
+                ))
         
         result = {
             'impressions': total_impr,
@@ -171,9 +178,15 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--start', default='2025-10-20')
     parser.add_argument('--end', default='2025-10-26')
+    parser.add_argument('--no-store', action='store_true', help="Don't write rows to ad_metrics")
+    parser.add_argument('--granularity', choices=['DAILY', 'ALL'], help='Analytics granularity; defaults to DAILY when storing rows')
     args = parser.parse_args()
     
-    result = fetch_linkedin_ads(args.start, args.end)
+    if args.no_store:
+        result = fetch_linkedin_ads(args.start, args.end, granularity=args.granularity)
+    else:
+        with AdMetricsSink() as sink:
+            result = fetch_linkedin_ads(args.start, args.end, sink, args.granularity)
     
     if result:
         print(f"\n{'='*80}")
@@ -2,6 +2,9 @@
 """
 Fetch Microsoft Ads weekly data for dashboard.
 Usage: python fetch-microsoft.py --start 2025-10-20 --end 2025-10-26
+
+Daily per-campaign rows are written to ad_metrics (see
+services/ad_metrics_sink.py) unless --no-store is given.
 """
 import argparse
 import os
@@ -12,10 +15,21 @@ from dotenv import load_dotenv
 # Load from parent .env.local
 load_dotenv('../../.env.local')
 
-def fetch_microsoft_ads(start_date, end_date):
-    """Fetch Microsoft Ads data using bingads SDK."""
+# Add current dir to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.ad_metrics_sink import AdMetricsSink, ad_metric_row
+from services.synthetic_data import MOCK_ADS, fetch_synthetic_metrics
+
+def fetch_microsoft_ads(start_date, end_date, sink=None):
+    """Fetch Microsoft Ads data using bingads SDK, writing daily campaign rows to sink if given."""
     print(f"🔍 Fetching Microsoft Ads data for {start_date} to {end_date}...")
     
+    if MOCK_ADS:
+        result = fetch_synthetic_metrics('microsoft', start_date, end_date, sink)
+        print(f"  🧪 Microsoft (synthetic): ${result['spend']:,.2f} spend, {result['impressions']:,} impr, {result['clicks']:,} clicks, {result['conversions']:.1f} conv")
+        return result
+    
     developer_token = os.getenv("MICROSOFT_ADS_DEVELOPER_TOKEN")
     client_id = os.getenv("MICROSOFT_ADS_CLIENT_ID")
     customer_id = os.getenv("MICROSOFT_ADS_CUSTOMER_ID")
@@ -104,7 +118,7 @@ def fetch_microsoft_ads(start_date, end_date):
             Format=ReportFormat.Csv,
             ReportName='Weekly Dashboard Metrics',
             ReturnOnlyCompleteData=False,
-            Aggregation=ReportAggregation.Summary
+            Aggregation=ReportAggregation.Daily
         )
         
         # Scope
@@ -136,6 +150,9 @@ def fetch_microsoft_ads(start_date, end_date):
         # Columns
         report_columns = reporting_service.factory.create('ArrayOfCampaignPerformanceReportColumn')
         report_columns.CampaignPerformanceReportColumn.append([
+            CampaignPerformanceReportColumn.TimePeriod,
+            CampaignPerformanceReportColumn.AccountId,
+            CampaignPerformanceReportColumn.CampaignId,
             CampaignPerformanceReportColumn.Impressions,
             CampaignPerformanceReportColumn.Clicks,
             CampaignPerformanceReportColumn.Spend,
@@ -162,6 +179,16 @@ def fetch_microsoft_ads(start_date, end_date):
                 total_clicks += int(row.get('Clicks', 0))
                 total_spend += float(row.get('Spend', 0))
                 total_conv += int(row.get('Conversions', 0))
+                
+                if sink is not None and row.get('CampaignId') and row['CampaignId'] != '--':
+                    sink.write(ad_metric_row(
+                        'microsoft', row['TimePeriod'], row.get('AccountId') or account_id, row['CampaignId'],
+                        impressions=row.get('Impressions'),
+                        clicks=row.get('Clicks'),
+                        spend=row.get('Spend'),
+                        conversions=row.get('Conversions'),
+                        raw=row
+                    ))
         
         result = {
             'impressions': total_impr,
@@ -183,9 +210,14 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--start', default='2025-10-20')
     parser.add_argument('--end', default='2025-10-26')
+    parser.add_argument('--no-store', action='store_true', help="Don't write rows to ad_metrics")
     args = parser.parse_args()
     
-    result = fetch_microsoft_ads(args.start, args.end)
+    if args.no_store:
+        result = fetch_microsoft_ads(args.start, args.end)
+    else:
+        with AdMetricsSink() as sink:
+            result = fetch_microsoft_ads(args.start, args.end, sink)
     
     if result:
         print(f"\n{'='*80}")
@@ -2,8 +2,13 @@
 """
 Fetch Reddit Ads weekly data for dashboard.
 Usage: python fetch-reddit.py --start 2025-10-20 --end 2025-10-26
+
+Daily per-campaign rows of every account are written to ad_metrics (see
+services/ad_metrics_sink.py) unless --no-store is given. Metrics are
+streamed page by page (see ads/reddit_reporting.py).
 """
 import argparse
+import asyncio
 import os
 import sys
 from datetime import datetime
@@ -13,10 +18,45 @@ import httpx
 # Load from parent .env.local
 load_dotenv('../../.env.local')
 
-def fetch_reddit_ads(start_date, end_date):
-    """Fetch Reddit Ads data using REST API."""
+# Add current dir to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ads.http_utils import platform_url
+from ads.reddit_reporting import RedditReportingClient
+from services.ad_metrics_sink import AdMetricsSink
+from services.synthetic_data import MOCK_ADS, fetch_synthetic_metrics
+
+async def stream_reddit_metrics(access_token, start_date, end_date, granularity, sink=None):
+    """Sum the streamed campaign rows of all accounts, writing each to sink if given."""
+    totals = {'rows': 0, 'impressions': 0, 'clicks': 0, 'spend': 0.0, 'conversions': 0.0}
+    
+    async with RedditReportingClient(access_token) as reddit:
+        async for row in reddit.stream_campaign_rows(start_date, end_date, granularity):
+            totals['rows'] += 1
+            totals['impressions'] += row['impressions']
+            totals['clicks'] += row['clicks']
+            totals['spend'] += row['spend']
+            totals['conversions'] += row['conversions']
+            
+            if sink is not None:
+                sink.write(row)
+    
+    return totals
+
+def fetch_reddit_ads(start_date, end_date, sink=None, granularity=None):
+    """
+    Fetch Reddit Ads data using REST API, writing campaign rows to sink if given.
+    
+    granularity is day or total (range totals); it defaults to day when
+    storing rows and total otherwise.
+    """
     print(f"🔍 Fetching Reddit Ads data for {start_date} to {end_date}...")
     
+    if MOCK_ADS:
+        result = fetch_synthetic_metrics('reddit', start_date, end_date, sink)
+        print(f"  🧪 Reddit (synthetic): ${result['spend']:,.2f} spend, {result['impressions']:,} impr, {result['clicks']:,} clicks, {result['conversions']:.1f} conv")
+        return result
+    
     client_id = os.getenv("REDDIT_ADS_CLIENT_ID")
     client_secret = os.getenv("REDDIT_ADS_CLIENT_SECRET")
     
@@ -56,7 +96,7 @@ def fetch_reddit_ads(start_date, end_date):
         # If access token expired, try to refresh
         if not access_token and refresh_token:
             print("  🔄 Refreshing Reddit access token...")
-            token_url = "https://www.reddit.com/api/v1/access_token"
+            token_url = platform_url("reddit", "https://www.reddit.com/api/v1/access_token")
             
             auth = (client_id, client_secret)
             data = {
@@ -83,56 +123,26 @@ def fetch_reddit_ads(start_date, end_date):
         print(f"  ❌ Error with tokens: {e}")
         return None
     
+    if granularity is None:
+        granularity = 'day' if sink is not None else 'total'
+    
+    # Totals over the range are only a daily fact when the range is a single day
+    store = sink is not None and (granularity == 'day' or start_date == end_date)
+    if sink is not None and not store:
+        print("  ⚠️  Range totals are not written to ad_metrics; use --granularity day to store rows")
+    
     try:
-        # Reddit Ads API endpoint
-        base_url = "https://ads-api.reddit.com/api/v2.0"
-        
-        # Get account info first
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'User-Agent': 'Synter Dashboard/1.0'
-        }
+        # Stream campaign metrics for every account, page by page
+        print(f"  📊 Fetching campaign metrics for all accounts ({granularity})...")
+        totals = asyncio.run(stream_reddit_metrics(access_token, start_date, end_date, granularity, sink if store else None))
         
-        # Get accounts
-        print("  📊 Fetching account data...")
-        accounts_response = httpx.get(f"{base_url}/accounts", headers=headers)
-        accounts_response.raise_for_status()
-        accounts_data = accounts_response.json()
+        total_impr = totals['impressions']
+        total_clicks = totals['clicks']
+        total_spend = totals['spend']
+        total_conv = int(totals['conversions'])
         
-        if not accounts_data or 'data' not in accounts_data:
-            print("  ❌ No accounts found")
-            return None
-        
-        # Use first account
-        account_id = accounts_data['data'][0]['id']
-        
-        # Fetch campaign performance
-        # Reddit Ads API uses ISO dates
-        params = {
-            'start_date': start_date,
-            'end_date': end_date,
-            'granularity': 'total'
-        }
-        
-        print(f"  📊 Fetching campaign metrics for account {account_id}...")
-        stats_url = f"{base_url}/accounts/{account_id}/campaigns/metrics"
-        stats_response = httpx.get(stats_url, headers=headers, params=params, timeout=30.0)
-        stats_response.raise_for_status()
-        stats_data = stats_response.json()
-        
-        # Aggregate metrics
-        total_impr = 0
-        total_clicks = 0
-        total_spend = 0
-        total_conv = 0
-        
-        if 'data' in stats_data:
-            for campaign in stats_data['data']:
-                metrics = campaign.get('metrics', {})
-                total_impr += int(metrics.get('impressions', 0))
-                total_clicks += int(metrics.get('clicks', 0))
-                total_spend += float(metrics.get('spend', 0))
-                total_conv += int(metrics.get('conversions', 0))
+        if not totals['rows']:
+            print("  ⚠️  No campaign metrics returned")
         
         result = {
             'impressions': total_impr,
@@ -158,9 +168,15 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--start', default='2025-10-20')
     parser.add_argument('--end', default='2025-10-26')
+    parser.add_argument('--no-store', action='store_true', help="Don't write rows to ad_metrics")
+    parser.add_argument('--granularity', choices=['day', 'total'], help='Metrics granularity; defaults to day when storing rows')
     args = parser.parse_args()
     
-    result = fetch_reddit_ads(args.start, args.end)
+    if args.no_store:
+        result = fetch_reddit_ads(args.start, args.end, granularity=args.granularity)
+    else:
+        with AdMetricsSink() as sink:
+            result = fetch_reddit_ads(args.start, args.end, sink, args.granularity)
     
     if result:
         print(f"\n{'='*80}")
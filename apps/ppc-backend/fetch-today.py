@@ -15,6 +15,7 @@ load_dotenv('../../.env.local')
 sys.path.insert(0, os.path.dirname(__file__))
 
 from ads.client import GoogleAdsClientFactory
+from services.synthetic_data import MANAGER_ACCOUNT_ID, MOCK_ADS
 
 def main():
     print("🔍 Fetching today's Google Ads data...\n")
@@ -23,7 +24,7 @@ def main():
         # Get client
         factory = GoogleAdsClientFactory()
         client = factory.get_client()
-        customer_id = os.getenv("GOOGLE_ADS_CUSTOMER_ID", "").replace("-", "")
+        customer_id = os.getenv("GOOGLE_ADS_CUSTOMER_ID", MANAGER_ACCOUNT_ID if MOCK_ADS else "").replace("-", "")
         
         if not customer_id:
             print("❌ GOOGLE_ADS_CUSTOMER_ID not set")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the read-heavy API endpoints.
+
+Fires requests at a running server from a fixed number of concurrent
+clients and reports throughput and latency percentiles per endpoint.
+Run it against the server with and without ASYNC_SESSIONS=true to compare
+sync and async sessions on a given database.
+
+Usage:
+    python load-test.py --base-url http://localhost:8000 --concurrency 200 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/audit/?limit=100",
+    "/audit/summary?days=30",
+    "/recommendations/?limit=50",
+    "/score/icp/stats",
+    "/integrations/google/connections",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the read-heavy API endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--endpoint", action="append", help="Endpoint path (repeatable); defaults to the read-heavy set")
+    args = parser.parse_args()
+
+    auth = (os.getenv("APP_BASIC_AUTH_USER", "admin"), os.getenv("APP_BASIC_AUTH_PASS", "change-me"))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    print(f"🔥 {args.requests} requests per endpoint, {args.concurrency} concurrent, against {args.base_url}\n")
+    print(f"{'endpoint':45} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    async with httpx.AsyncClient(base_url=args.base_url, auth=auth, limits=limits, timeout=60) as client:
+        for path in args.endpoint or DEFAULT_ENDPOINTS:
+            result = await run_endpoint(client, path, args.concurrency, args.requests)
+            print(
+                f"{result['path']:45} {result['rps']:8.1f} {result['p50_ms']:8.1f} "
+                f"{result['p95_ms']:8.1f} {result['p99_ms']:8.1f} {result['errors']:7d}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,9 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 import secrets
 from contextlib import asynccontextmanager
-from routers import sync, score, recommend, apply, audit, auth, integrations, oauth_callbacks, scheduler_status
+from routers import sync, score, recommend, apply, audit, auth, integrations, oauth_callbacks, scheduler_status, metrics
 from database import engine, init_db
 from scheduler import start_scheduler, stop_scheduler
+from services.audit_writer import audit_writer
 
 
 security = HTTPBasic()
@@ -36,6 +37,7 @@ async def lifespan(app: FastAPI):
     await start_scheduler()
     yield
     await stop_scheduler()
+    audit_writer.close()
 
 
 app = FastAPI(
@@ -64,6 +66,7 @@ app.include_router(score.router, prefix="/score", tags=["icp"], dependencies=[De
 app.include_router(recommend.router, prefix="/recommendations", tags=["recommendations"], dependencies=[Depends(verify_credentials)])
 app.include_router(apply.router, prefix="/apply", tags=["apply"], dependencies=[Depends(verify_credentials)])
 app.include_router(audit.router, prefix="/audit", tags=["audit"], dependencies=[Depends(verify_credentials)])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"], dependencies=[Depends(verify_credentials)])
 
 
 @app.get("/healthz", tags=["health"])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Numeric, Date, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -20,7 +20,9 @@ class Campaign(Base):
 
     # Relationships
     ad_groups = relationship("AdGroup", back_populates="campaign")
-    daily_metrics = relationship("DailyMetric", back_populates="campaign")
+    # Campaign-level rows only; ref_id is not a real foreign key, so read-only
+    daily_metrics = relationship("DailyMetric", back_populates="campaign", viewonly=True,
+                                 foreign_keys="DailyMetric.ref_id", primaryjoin="and_(DailyMetric.ref_id==Campaign.id, DailyMetric.level=='campaign')")
 
 
 class AdGroup(Base):
@@ -82,10 +84,66 @@ class SearchTerm(Base):
     ad_group = relationship("AdGroup", back_populates="search_terms")
 
 
+class SearchTermDailyMetric(Base):
+    __tablename__ = "search_term_daily_metrics"
+    __table_args__ = (
+        Index("idx_search_term_daily_date", "date"),
+    )
+
+    search_term_id = Column(String(50), ForeignKey("search_terms.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    
+    impressions = Column(Integer, default=0)
+    clicks = Column(Integer, default=0)
+    cost_micros = Column(Integer, default=0)
+    conversions = Column(Float, default=0.0)
+    conversions_value = Column(Float, default=0.0)
+    
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class SearchTermWindowMetric(Base):
+    __tablename__ = "search_term_window_metrics"
+    __table_args__ = (
+        Index("idx_search_term_windows_as_of", "as_of"),
+    )
+
+    # Trailing window sums ending on as_of, maintained incrementally from search_term_daily_metrics
+    search_term_id = Column(String(50), ForeignKey("search_terms.id"), primary_key=True)
+    as_of = Column(Date, nullable=False)
+    
+    impressions_7d = Column(Integer, default=0)
+    clicks_7d = Column(Integer, default=0)
+    cost_micros_7d = Column(Integer, default=0)
+    conversions_7d = Column(Float, default=0.0)
+    
+    impressions_14d = Column(Integer, default=0)
+    clicks_14d = Column(Integer, default=0)
+    cost_micros_14d = Column(Integer, default=0)
+    conversions_14d = Column(Float, default=0.0)
+    
+    impressions_30d = Column(Integer, default=0)
+    clicks_30d = Column(Integer, default=0)
+    cost_micros_30d = Column(Integer, default=0)
+    conversions_30d = Column(Float, default=0.0)
+    
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
 class DailyMetric(Base):
     __tablename__ = "daily_metrics"
+    __table_args__ = (
+        # Natural key; also serves per-entity lookups on (level, ref_id)
+        UniqueConstraint("level", "ref_id", "date", name="uq_daily_metrics_level_ref_date"),
+        # Covers the per-level date window aggregations (recommendation features, simulation, quantiles)
+        Index(
+            "idx_daily_metrics_level_date_covering",
+            "level", "date", "ref_id", "impressions", "clicks", "cost_micros", "conversions"
+        ),
+    )
 
-    id = Column(String(100), primary_key=True)  # date_level_ref_id composite key
+    id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, nullable=False)
     level = Column(String(20), nullable=False)  # campaign, ad_group, keyword, search_term
     ref_id = Column(String(20), nullable=False)  # ID of the entity being measured
@@ -105,10 +163,79 @@ class DailyMetric(Base):
     created_at = Column(DateTime, default=func.now())
 
     # Relationships
-    campaign = relationship("Campaign", back_populates="daily_metrics", 
+    campaign = relationship("Campaign", back_populates="daily_metrics", viewonly=True,
                           foreign_keys=[ref_id], primaryjoin="and_(DailyMetric.ref_id==Campaign.id, DailyMetric.level=='campaign')")
 
 
+class MetricRollup(Base):
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        Index("idx_metric_rollups_period", "grain", "level", "period_start"),
+    )
+
+    # Weekly/monthly sums of daily_metrics, maintained incrementally on every daily write
+    grain = Column(String(10), primary_key=True)  # week (starting Monday), month
+    level = Column(String(20), primary_key=True)  # campaign, keyword
+    ref_id = Column(String(20), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    
+    impressions = Column(Integer, default=0)
+    clicks = Column(Integer, default=0)
+    cost_micros = Column(Integer, default=0)
+    conversions = Column(Float, default=0.0)
+    conversions_value = Column(Float, default=0.0)
+    days = Column(Integer, default=0)  # Daily rows summed into the period
+    
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class AdMetric(Base):
+    __tablename__ = "ad_metrics"
+    __table_args__ = (
+        # Cross-platform natural key, as in migrations/001_init.sql. adgroup_id
+        # and ad_id are "" rather than NULL when absent so the key stays unique.
+        UniqueConstraint(
+            "platform", "date", "account_id", "campaign_id", "adgroup_id", "ad_id", name="uniq_row"
+        ),
+        Index("idx_ad_metrics_date_platform", "date", "platform"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    platform = Column(String(20), nullable=False)  # google, microsoft, linkedin, reddit, x
+    date = Column(Date, nullable=False)
+    account_id = Column(String(64), nullable=False)
+    campaign_id = Column(String(128), nullable=False)
+    adgroup_id = Column(String(128), nullable=False, default="")
+    ad_id = Column(String(128), nullable=False, default="")
+    
+    impressions = Column(BigInteger, default=0)
+    clicks = Column(BigInteger, default=0)
+    spend = Column(Numeric(18, 6, asdecimal=False), default=0)  # Account currency units, not micros
+    conversions = Column(Float, default=0.0)
+    revenue = Column(Numeric(18, 6, asdecimal=False), default=0)
+    raw = Column(Text)  # Source row as JSON, or zlib-compressed (see services.ad_metrics_sink)
+    
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class AgentRun(Base):
+    __tablename__ = "agent_runs"
+    __table_args__ = (
+        # As in migrations/001_init.sql
+        UniqueConstraint("agent", "run_id", name="uniq_run"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    agent = Column(String(64), nullable=False)  # e.g. ingestor-microsoft
+    run_id = Column(String(64), nullable=False)
+    started_at = Column(DateTime, nullable=False, default=func.now())
+    finished_at = Column(DateTime)
+    ok = Column(Boolean)  # NULL while running
+    stats = Column(Text)  # JSON string
+    watermark = Column(String(64))  # Resume point, e.g. last fully ingested date
+
+
 class Recommendation(Base):
     __tablename__ = "recommendations"
 
@@ -124,14 +251,38 @@ class Recommendation(Base):
     priority = Column(String(10), default="medium")  # low, medium, high
     
     # Status tracking
-    status = Column(String(20), default="proposed")  # proposed, dry_run_ok, applied, dismissed
+    status = Column(String(20), default="proposed")  # proposed, dry_run_ok, applied, dismissed, retired
+    rule_version = Column(String(20))  # Version of the rule that produced it
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
 
+class RecommendationInput(Base):
+    __tablename__ = "recommendation_inputs"
+
+    # One row per rule and evaluated entity (search term, keyword or campaign)
+    type = Column(String(50), primary_key=True)
+    entity_id = Column(String(50), primary_key=True)
+    rule_version = Column(String(20), nullable=False)
+    input_hash = Column(String(64), nullable=False)  # Hash of the rule inputs at last evaluation
+    evaluated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Keyset pagination on (timestamp, id), alone and behind each filter
+        Index("idx_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("idx_audit_logs_action_timestamp", "action", "timestamp", "id"),
+        Index("idx_audit_logs_result_timestamp", "result", "timestamp", "id"),
+        Index("idx_audit_logs_user_timestamp", "user", "timestamp", "id"),
+        # Lookups by the payload keys extracted at write time
+        Index("idx_audit_logs_campaign_timestamp", "campaign_id", "timestamp", "id"),
+        Index("idx_audit_logs_recommendation_timestamp", "recommendation_id", "timestamp", "id"),
+        Index("idx_audit_logs_keyword_text_timestamp", "keyword_text", "timestamp", "id"),
+        Index("idx_audit_logs_ad_group_timestamp", "ad_group_id", "timestamp", "id"),
+    )
 
     id = Column(String(50), primary_key=True)
     action = Column(String(100), nullable=False)
@@ -145,6 +296,24 @@ class AuditLog(Base):
     # Context
     validate_only = Column(Boolean, default=True)
     customer_id = Column(String(20))
+    
+    # Copied from the payload at write time so they can be indexed
+    campaign_id = Column(String(50))
+    recommendation_id = Column(String(50))
+    keyword_text = Column(String(500))
+    ad_group_id = Column(String(50))
+
+
+class AuditRollup(Base):
+    __tablename__ = "audit_rollups"
+
+    # One row per day and breakdown combination, maintained on every audit write
+    date = Column(Date, primary_key=True)
+    action = Column(String(100), primary_key=True)
+    result = Column(String(20), primary_key=True)  # "" when the log has no result
+    user = Column(String(100), primary_key=True)
+    validate_only = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 
 class OAuthToken(Base):
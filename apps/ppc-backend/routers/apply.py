@@ -3,12 +3,14 @@ from sqlalchemy.orm import Session
 from database import get_db
 from ads.client import ads_client
 from models import AuditLog, Recommendation
+from services.audit_summary import record_audit_rollup
+from services.audit_writer import AUDIT_BUFFERED_WRITES, audit_writer, payload_columns
 from datetime import datetime
 import json
 import uuid
 import logging
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -47,11 +49,28 @@ def create_audit_log(
     google_change_id: Optional[str] = None,
     error_message: Optional[str] = None,
     db: Session = None
-) -> str:
-    """Create an audit log entry."""
+) -> Tuple[str, Optional[str]]:
+    """
+    Create an audit log entry.
+    
+    Entries go through the buffered audit writer. Live (non-validate)
+    mutations wait until their entry is committed, so it is durable before
+    the response is sent; dry-run entries are written with the next batch.
+    
+    Commit db before logging a live entry. On SQLite an uncommitted write in
+    the caller's session holds the write lock the writer thread needs, so
+    the wait runs into its timeout and the entry is only reported as
+    unconfirmed.
+    
+    Returns:
+        The audit ID, and a warning when the writer could not confirm the
+        entry. Writer failures are not raised: the mutation has already
+        happened by the time it is logged, so they must not turn into an
+        error response or a second, "error" entry for the same change.
+    """
     audit_id = str(uuid.uuid4())
     
-    audit_log = AuditLog(
+    entry = dict(
         id=audit_id,
         action=action,
         payload_json=json.dumps(payload),
@@ -61,13 +80,26 @@ def create_audit_log(
         google_change_id=google_change_id,
         error_message=error_message,
         validate_only=validate_only,
-        customer_id=ads_client.customer_id
+        customer_id=audit_writer.customer_id,
+        **payload_columns(payload)
     )
     
-    db.add(audit_log)
-    db.commit()
+    if not AUDIT_BUFFERED_WRITES:
+        audit_log = AuditLog(**entry)
+        db.add(audit_log)
+        record_audit_rollup(db, audit_log)
+        db.commit()
+        return audit_id, None
+    
+    try:
+        sequence = audit_writer.submit(entry)
+        if not validate_only:
+            audit_writer.wait_for(sequence)
+    except RuntimeError as e:
+        logger.error(f"Audit log {audit_id} ({action}, {result}) not confirmed written: {e}")
+        return audit_id, f"Audit log not confirmed written: {e}"
     
-    return audit_id
+    return audit_id, None
 
 
 @router.post("/negative_keyword")
@@ -110,7 +142,7 @@ def add_negative_keyword(
                 "recommendation_id": request.recommendation_id
             }
             
-            audit_id = create_audit_log(
+            audit_id, audit_warning = create_audit_log(
                 action="add_negative_keyword",
                 payload=audit_payload,
                 user="api_user",  # In production, get from auth
@@ -131,6 +163,7 @@ def add_negative_keyword(
             return {
                 "status": result["status"],
                 "audit_id": audit_id,
+                "audit_warning": audit_warning,
                 "validate_only": request.validate_only,
                 "campaign_id": request.campaign_id,
                 "keyword_text": request.keyword_text,
@@ -140,7 +173,7 @@ def add_negative_keyword(
             
         except Exception as e:
             # Create error audit log
-            audit_id = create_audit_log(
+            audit_id, _ = create_audit_log(
                 action="add_negative_keyword",
                 payload=audit_payload,
                 user="api_user",
@@ -202,7 +235,7 @@ def pause_keyword(
                 "recommendation_id": request.recommendation_id
             }
             
-            audit_id = create_audit_log(
+            audit_id, audit_warning = create_audit_log(
                 action="pause_keyword",
                 payload=audit_payload,
                 user="api_user",
@@ -223,6 +256,7 @@ def pause_keyword(
             return {
                 "status": result["status"],
                 "audit_id": audit_id,
+                "audit_warning": audit_warning,
                 "validate_only": request.validate_only,
                 "ad_group_id": request.ad_group_id,
                 "criterion_id": request.criterion_id,
@@ -232,7 +266,7 @@ def pause_keyword(
             
         except Exception as e:
             # Create error audit log
-            audit_id = create_audit_log(
+            audit_id, _ = create_audit_log(
                 action="pause_keyword",
                 payload=audit_payload,
                 user="api_user",
@@ -335,7 +369,7 @@ def adjust_budget(
                 "recommendation_id": request.recommendation_id
             }
             
-            audit_id = create_audit_log(
+            audit_id, audit_warning = create_audit_log(
                 action="adjust_budget",
                 payload=audit_payload,
                 user="api_user",
@@ -356,6 +390,7 @@ def adjust_budget(
             return {
                 "status": result["status"],
                 "audit_id": audit_id,
+                "audit_warning": audit_warning,
                 "validate_only": request.validate_only,
                 "campaign_id": request.campaign_id,
                 "budget_change": {
@@ -370,7 +405,7 @@ def adjust_budget(
             
         except Exception as e:
             # Create error audit log
-            audit_id = create_audit_log(
+            audit_id, _ = create_audit_log(
                 action="adjust_budget",
                 payload=audit_payload,
                 user="api_user",
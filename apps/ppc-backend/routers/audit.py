@@ -1,152 +1,287 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.orm import Session
-from database import get_db
-from models import AuditLog
+from database import SessionRunner, get_db, get_db_runner, get_read_db_runner
+from services.audit_partitions import archives_reached, audit_log_entity, iter_archived_logs, log_record
+from services.audit_summary import summarize_audit_logs, with_archived_logs
+from services.audit_writer import audit_writer
 from datetime import datetime, date, timedelta
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterator, Optional, Tuple
+import asyncio
+import base64
+import csv
+import io
 import json
+import zlib
+import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Approximate totals are cached per filter combination for this long
+TOTAL_CACHE_TTL_SECONDS = 60
+
+# Filters are user input, so the cache is bounded
+TOTAL_CACHE_MAX_ENTRIES = 1000
+
+_total_cache: "OrderedDict[tuple, Tuple[float, int]]" = OrderedDict()
+_total_cache_lock = threading.Lock()
+
+
+def encode_cursor(record: dict) -> str:
+    """Encode the (timestamp, id) position of a log record as an opaque cursor."""
+    position = json.dumps([record["timestamp"], record["id"]])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor."""
+    timestamp, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(timestamp), log_id
+
+
+def parse_since(since: str = None) -> Optional[datetime]:
+    """Parse a YYYY-MM-DD since filter."""
+    if not since:
+        return None
+    try:
+        return datetime.strptime(since, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+def apply_audit_filters(query, entity, since_date: datetime = None, action: str = None, result: str = None, user: str = None,
+                        payload_filters: Dict[str, str] = None):
+    """
+    Apply the common audit log filters to a query over `entity` (see audit_log_entity).
+    
+    `payload_filters` match the indexed payload columns (campaign_id, ...).
+    """
+    if since_date:
+        query = query.filter(entity.timestamp >= since_date)
+    
+    if action:
+        query = query.filter(entity.action == action)
+    
+    if result:
+        query = query.filter(entity.result == result)
+    
+    if user:
+        query = query.filter(entity.user == user)
+    
+    for name, value in (payload_filters or {}).items():
+        if value:
+            query = query.filter(getattr(entity, name) == value)
+    
+    return query
+
+
+def format_log(record: dict) -> dict:
+    """Format a stored or archived log record for API responses."""
+    return {
+        "id": record["id"],
+        "action": record["action"],
+        "user": record["user"],
+        "timestamp": record["timestamp"],
+        "result": record["result"],
+        "validate_only": record["validate_only"],
+        "customer_id": record["customer_id"],
+        "google_change_id": record["google_change_id"],
+        "error_message": record["error_message"],
+        "payload": json.loads(record["payload_json"]) if record["payload_json"] else {}
+    }
+
+
+def get_approximate_total(db: Session, query, filters: tuple) -> int:
+    """
+    Get the number of logs matching the filters, cached for TOTAL_CACHE_TTL_SECONDS.
+    
+    Unfiltered totals on Postgres use the planner's row estimate instead of
+    a full count.
+    """
+    cached = _total_cache.get(filters)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    total = None
+    if not any(filters) and db.get_bind().dialect.name == "postgresql":
+        # Partitioned tables keep their row estimates on the partitions
+        estimate = db.execute(text(
+            "SELECT SUM(GREATEST(reltuples, 0))::bigint FROM pg_class "
+            "WHERE relname = 'audit_logs' "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'audit_logs'::regclass)"
+        )).scalar()
+        if estimate is not None and estimate >= 0:
+            total = int(estimate)
+    
+    if total is None:
+        total = db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    
+    now = time.monotonic()
+    with _total_cache_lock:
+        _total_cache[filters] = (now + TOTAL_CACHE_TTL_SECONDS, total)
+        _total_cache.move_to_end(filters)
+        # Entries share one TTL, so the oldest inserted expire first
+        while _total_cache and (
+            len(_total_cache) > TOTAL_CACHE_MAX_ENTRIES or next(iter(_total_cache.values()))[0] <= now
+        ):
+            _total_cache.popitem(last=False)
+    return total
+
+
 @router.get("/")
-def get_audit_logs(
+async def get_audit_logs(
     since: str = Query(default=None, description="Filter logs since date (YYYY-MM-DD)"),
     action: str = Query(default=None, description="Filter by action type"),
     result: str = Query(default=None, description="Filter by result: success, error, dry_run"),
     user: str = Query(default=None, description="Filter by user"),
+    campaign_id: str = Query(default=None, description="Filter by payload campaign_id"),
+    recommendation_id: str = Query(default=None, description="Filter by payload recommendation_id"),
+    keyword_text: str = Query(default=None, description="Filter by payload keyword_text"),
+    ad_group_id: str = Query(default=None, description="Filter by payload ad_group_id"),
     limit: int = Query(default=100, description="Maximum logs to return"),
-    offset: int = Query(default=0, description="Pagination offset"),
-    db: Session = Depends(get_db)
+    cursor: str = Query(default=None, description="Cursor from a previous page's next_cursor"),
+    offset: int = Query(default=0, description="Pagination offset (deprecated, use cursor)"),
+    include_total: bool = Query(default=False, description="Include a cached approximate total"),
+    db: SessionRunner = Depends(get_db_runner)
 ):
-    """Get audit logs with optional filtering."""
+    """
+    Get audit logs with optional filtering.
+    
+    Pages are ordered by (timestamp, id) descending. Pass next_cursor back as
+    cursor to get the next page; every page costs the same index range scan.
+    When `since` reaches into archived months, pages continue into the
+    archives once the live partitions are exhausted.
+    """
     try:
-        query = db.query(AuditLog)
-        
-        # Apply filters
-        if since:
-            try:
-                since_date = datetime.strptime(since, "%Y-%m-%d")
-                query = query.filter(AuditLog.timestamp >= since_date)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        payload_filters = {
+            "campaign_id": campaign_id,
+            "recommendation_id": recommendation_id,
+            "keyword_text": keyword_text,
+            "ad_group_id": ad_group_id
+        }
         
-        if action:
-            query = query.filter(AuditLog.action == action)
+        since_date = parse_since(since)
         
-        if result:
-            query = query.filter(AuditLog.result == result)
+        position = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        if user:
-            query = query.filter(AuditLog.user == user)
+        def read_page(session: Session):
+            entity = audit_log_entity(session, since_date)
+            query = apply_audit_filters(select(entity), entity, since_date, action, result, user, payload_filters)
+            
+            total = None
+            if include_total:
+                total = get_approximate_total(session, query, (since, action, result, user, *payload_filters.values()))
+            
+            if position:
+                query = query.filter(
+                    or_(
+                        entity.timestamp < position[0],
+                        and_(entity.timestamp == position[0], entity.id < position[1])
+                    )
+                )
+            elif offset:
+                query = query.offset(offset)
+            
+            # Fetch one extra row to know whether another page exists
+            logs = session.scalars(query.order_by(entity.timestamp.desc(), entity.id.desc()).limit(limit + 1))
+            return total, [log_record(log) for log in logs]
         
-        # Get total count for pagination
-        total = query.count()
+        total, records = await db.run(read_page)
         
-        # Apply pagination and ordering
-        logs = query.order_by(AuditLog.timestamp.desc()).offset(offset).limit(limit).all()
+        # Continue into archived months once the live partitions run out
+        if len(records) <= limit and not offset and archives_reached(since_date):
+            if records:
+                position = (datetime.fromisoformat(records[-1]["timestamp"]), records[-1]["id"])
+            # The archives are gzip files; read them off the event loop
+            records += await asyncio.to_thread(list, islice(
+                iter_archived_logs(since_date, action, result, user, before=position, payload_filters=payload_filters),
+                limit + 1 - len(records)
+            ))
         
-        # Format results
-        result_logs = []
-        for log in logs:
-            log_dict = {
-                "id": log.id,
-                "action": log.action,
-                "user": log.user,
-                "timestamp": log.timestamp.isoformat(),
-                "result": log.result,
-                "validate_only": log.validate_only,
-                "customer_id": log.customer_id,
-                "google_change_id": log.google_change_id,
-                "error_message": log.error_message,
-                "payload": json.loads(log.payload_json) if log.payload_json else {}
-            }
-            result_logs.append(log_dict)
+        has_more = len(records) > limit
+        records = records[:limit]
         
         return {
-            "logs": result_logs,
+            "logs": [format_log(record) for record in records],
             "pagination": {
-                "total": total,
                 "limit": limit,
-                "offset": offset,
-                "has_more": offset + len(logs) < total
+                "offset": offset if not cursor else None,
+                "has_more": has_more,
+                "next_cursor": encode_cursor(records[-1]) if has_more else None,
+                "total": total,
+                "total_is_approximate": include_total
             },
             "filters_applied": {
                 "since": since,
                 "action": action,
                 "result": result,
-                "user": user
+                "user": user,
+                **payload_filters
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Getting audit logs failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get audit logs: {str(e)}")
 
 
+# Summaries at least this long read daily rollups by default
+ROLLUP_MIN_DAYS = 7
+
+
 @router.get("/summary")
-def get_audit_summary(
+async def get_audit_summary(
     days: int = Query(default=30, description="Number of days to summarize"),
-    db: Session = Depends(get_db)
+    source: str = Query(default="auto", description="auto, rollups (whole days) or scan"),
+    db: SessionRunner = Depends(get_read_db_runner)
 ):
     """Get summary statistics for audit logs."""
     try:
-        since_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Overall counts
-        total_actions = db.query(AuditLog).filter(AuditLog.timestamp >= since_date).count()
-        
-        # By result
-        result_stats = db.query(
-            AuditLog.result,
-            db.func.count(AuditLog.id).label('count')
-        ).filter(
-            AuditLog.timestamp >= since_date
-        ).group_by(AuditLog.result).all()
+        if source not in ["auto", "rollups", "scan"]:
+            raise HTTPException(status_code=400, detail="Source must be 'auto', 'rollups' or 'scan'")
         
-        # By action type
-        action_stats = db.query(
-            AuditLog.action,
-            db.func.count(AuditLog.id).label('count')
-        ).filter(
-            AuditLog.timestamp >= since_date
-        ).group_by(AuditLog.action).all()
-        
-        # By validate_only flag
-        validation_stats = db.query(
-            AuditLog.validate_only,
-            db.func.count(AuditLog.id).label('count')
-        ).filter(
-            AuditLog.timestamp >= since_date
-        ).group_by(AuditLog.validate_only).all()
+        since_date = datetime.utcnow() - timedelta(days=days)
+        use_rollups = source == "rollups" or (source == "auto" and days >= ROLLUP_MIN_DAYS)
         
-        # By user
-        user_stats = db.query(
-            AuditLog.user,
-            db.func.count(AuditLog.id).label('count')
-        ).filter(
-            AuditLog.timestamp >= since_date
-        ).group_by(AuditLog.user).all()
+        def read_summary(session: Session):
+            entity = audit_log_entity(session, since_date)
+            
+            # Result, action, validation and user breakdowns in one pass
+            summary = summarize_audit_logs(session, since_date, use_rollups=use_rollups, entity=entity)
+            
+            # Recent errors
+            recent_errors = session.scalars(
+                select(entity).filter(
+                    entity.timestamp >= since_date,
+                    entity.result == "error"
+                ).order_by(entity.timestamp.desc()).limit(5)
+            ).all()
+            return summary, recent_errors
         
-        # Recent errors
-        recent_errors = db.query(AuditLog).filter(
-            AuditLog.timestamp >= since_date,
-            AuditLog.result == "error"
-        ).order_by(AuditLog.timestamp.desc()).limit(5).all()
+        summary, recent_errors = await db.run(read_summary)
+        if summary["source"] != "rollups":
+            # Rollups still count archived months; a scan has to read them back
+            summary = await asyncio.to_thread(with_archived_logs, summary, since_date)
         
         return {
             "summary_period_days": days,
-            "total_actions": total_actions,
-            "breakdown": {
-                "by_result": {stat.result: stat.count for stat in result_stats},
-                "by_action": {stat.action: stat.count for stat in action_stats},
-                "by_validation": {
-                    "dry_run": sum(stat.count for stat in validation_stats if stat.validate_only),
-                    "live": sum(stat.count for stat in validation_stats if not stat.validate_only)
-                },
-                "by_user": {stat.user: stat.count for stat in user_stats}
-            },
+            "total_actions": summary["total_actions"],
+            "breakdown": summary["breakdown"],
+            "source": summary["source"],
             "recent_errors": [
                 {
                     "id": err.id,
@@ -159,19 +294,31 @@ def get_audit_summary(
             ]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Getting audit summary failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get audit summary: {str(e)}")
 
 
+@router.get("/writer/stats")
+def get_audit_writer_stats():
+    """Get queue depth and flush latency of the buffered audit writer."""
+    return audit_writer.stats()
+
+
 @router.get("/{audit_id}")
-def get_audit_log_detail(
+async def get_audit_log_detail(
     audit_id: str,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_db_runner)
 ):
     """Get detailed information about a specific audit log entry."""
     try:
-        log = db.query(AuditLog).filter(AuditLog.id == audit_id).first()
+        def read_log(session: Session):
+            entity = audit_log_entity(session)
+            return session.scalars(select(entity).filter(entity.id == audit_id)).first()
+        
+        log = await db.run(read_log)
         
         if not log:
             raise HTTPException(status_code=404, detail="Audit log not found")
@@ -201,12 +348,17 @@ def get_audit_log_detail(
 
 
 @router.get("/actions/available")
-def get_available_actions(db: Session = Depends(get_db)):
+async def get_available_actions(db: SessionRunner = Depends(get_db_runner)):
     """Get list of available actions for filtering."""
     try:
-        actions = db.query(AuditLog.action).distinct().all()
-        results = db.query(AuditLog.result).distinct().all()
-        users = db.query(AuditLog.user).distinct().all()
+        def read_filters(session: Session):
+            entity = audit_log_entity(session)
+            actions = session.execute(select(entity.action).distinct()).all()
+            results = session.execute(select(entity.result).distinct()).all()
+            users = session.execute(select(entity.user).distinct()).all()
+            return actions, results, users
+        
+        actions, results, users = await db.run(read_filters)
         
         return {
             "actions": [action[0] for action in actions if action[0]],
@@ -224,93 +376,152 @@ def get_available_actions(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to get available actions: {str(e)}")
 
 
+# Rows fetched per round trip and rows written per streamed chunk
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_CSV_COLUMNS = [
+    "id", "timestamp", "action", "user", "result", "validate_only",
+    "customer_id", "google_change_id", "error_message", "payload_summary", "payload"
+]
+
+
+def _csv_row(record: dict) -> list:
+    payload = json.loads(record["payload_json"]) if record["payload_json"] else {}
+    return [
+        record["id"],
+        record["timestamp"],
+        record["action"],
+        record["user"],
+        record["result"],
+        record["validate_only"],
+        record["customer_id"],
+        record["google_change_id"] or "",
+        record["error_message"] or "",
+        payload.get("reason", "") if isinstance(payload, dict) else "",
+        record["payload_json"] or ""
+    ]
+
+
+def _export_records(query, since_date: Optional[datetime], action: str, result: str) -> Iterator[dict]:
+    """Live rows from the cursor, then matching archived records."""
+    for log in query:
+        yield log_record(log)
+    
+    if archives_reached(since_date):
+        yield from iter_archived_logs(since_date, action, result)
+
+
+def _iter_export_chunks(logs, format: str, envelope: Optional[dict] = None) -> Iterator[str]:
+    """
+    Serialize log records to text chunks of EXPORT_BATCH_SIZE rows.
+    
+    JSON exports keep their envelope: the envelope fields come first, then
+    the records stream in as "data", and total_records closes the object
+    once they are counted.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    if format == "csv":
+        writer.writerow(EXPORT_CSV_COLUMNS)
+    elif format == "json":
+        fields = "".join(f"{json.dumps(key)}: {json.dumps(value)}, " for key, value in (envelope or {}).items())
+        buffer.write("{" + fields + '"data": [')
+    
+    total = 0
+    for i, log in enumerate(logs):
+        total = i + 1
+        if format == "csv":
+            writer.writerow(_csv_row(log))
+        elif format == "json":
+            buffer.write(("," if i else "") + json.dumps(format_log(log)))
+        else:
+            buffer.write(json.dumps(format_log(log)) + "\n")
+        
+        if (i + 1) % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if format == "json":
+        buffer.write(f'], "total_records": {total}}}')
+    yield buffer.getvalue()
+
+
+def _gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _log_export_errors(chunks: Iterator, description: str) -> Iterator:
+    # Headers are already sent once streaming starts, so errors can only be logged
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Exporting audit logs failed mid-stream ({description}): {e}")
+        raise
+
+
 @router.post("/export")
 def export_audit_logs(
     since: str = Query(default=None, description="Export logs since date (YYYY-MM-DD)"),
     action: str = Query(default=None, description="Filter by action type"),
     result: str = Query(default=None, description="Filter by result"),
-    format: str = Query(default="json", description="Export format: json or csv"),
+    format: str = Query(default="json", description="Export format: json, ndjson or csv"),
+    gzip: bool = Query(default=False, description="Gzip-compress the export"),
     db: Session = Depends(get_db)
 ):
-    """Export audit logs in various formats."""
+    """
+    Stream audit logs as a file download.
+    
+    Rows are read from a server-side cursor in batches and written out as
+    they arrive, so exports of any size run in constant memory. Archived
+    months are included when `since` reaches into them.
+    """
     try:
-        if format not in ["json", "csv"]:
-            raise HTTPException(status_code=400, detail="Format must be 'json' or 'csv'")
-        
-        query = db.query(AuditLog)
-        
-        # Apply filters
-        if since:
-            try:
-                since_date = datetime.strptime(since, "%Y-%m-%d")
-                query = query.filter(AuditLog.timestamp >= since_date)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
-        if action:
-            query = query.filter(AuditLog.action == action)
-        
-        if result:
-            query = query.filter(AuditLog.result == result)
+        media_types = {
+            "json": "application/json",
+            "ndjson": "application/x-ndjson",
+            "csv": "text/csv"
+        }
+        if format not in media_types:
+            raise HTTPException(status_code=400, detail="Format must be 'json', 'ndjson' or 'csv'")
         
-        # Limit export size
-        logs = query.order_by(AuditLog.timestamp.desc()).limit(10000).all()
+        since_date = parse_since(since)
+        entity = audit_log_entity(db, since_date)
+        query = apply_audit_filters(db.query(entity), entity, since_date, action, result)
+        logs = query.order_by(entity.timestamp.desc(), entity.id.desc()).yield_per(EXPORT_BATCH_SIZE)
         
-        if format == "json":
-            export_data = []
-            for log in logs:
-                log_dict = {
-                    "id": log.id,
-                    "action": log.action,
-                    "user": log.user,
-                    "timestamp": log.timestamp.isoformat(),
-                    "result": log.result,
-                    "validate_only": log.validate_only,
-                    "customer_id": log.customer_id,
-                    "google_change_id": log.google_change_id,
-                    "error_message": log.error_message,
-                    "payload": json.loads(log.payload_json) if log.payload_json else {}
-                }
-                export_data.append(log_dict)
-            
-            return {
-                "format": "json",
-                "total_records": len(export_data),
-                "data": export_data,
-                "export_timestamp": datetime.utcnow().isoformat(),
-                "filters": {
-                    "since": since,
-                    "action": action,
-                    "result": result
-                }
+        filename = f"audit_logs_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+        envelope = {
+            "format": format,
+            "export_timestamp": datetime.utcnow().isoformat(),
+            "filters": {
+                "since": since,
+                "action": action,
+                "result": result
             }
+        }
+        chunks = _iter_export_chunks(_export_records(logs, since_date, action, result), format, envelope)
+        media_type = media_types[format]
         
-        else:  # CSV format
-            # For CSV, we'll return a simplified structure
-            csv_data = []
-            for log in logs:
-                csv_row = {
-                    "id": log.id,
-                    "timestamp": log.timestamp.isoformat(),
-                    "action": log.action,
-                    "user": log.user,
-                    "result": log.result,
-                    "validate_only": log.validate_only,
-                    "customer_id": log.customer_id,
-                    "google_change_id": log.google_change_id or "",
-                    "error_message": log.error_message or "",
-                    "payload_summary": json.loads(log.payload_json).get("reason", "") if log.payload_json else ""
-                }
-                csv_data.append(csv_row)
-            
-            return {
-                "format": "csv",
-                "total_records": len(csv_data),
-                "headers": list(csv_data[0].keys()) if csv_data else [],
-                "data": csv_data,
-                "export_timestamp": datetime.utcnow().isoformat()
-            }
+        if gzip:
+            chunks = _gzip_chunks(chunks)
+            filename += ".gz"
+            media_type = "application/gzip"
+        
+        return StreamingResponse(
+            _log_export_errors(chunks, filename),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Exporting audit logs failed: {e}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
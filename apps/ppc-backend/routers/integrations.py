@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
 import uuid
 import secrets
 
-from database import get_db
+from database import SessionRunner, get_db, get_db_runner
 from models_vault import (
     Platform,
     OAuthAppCredential,
@@ -191,22 +192,32 @@ def start_connection(
 
 
 @router.get("/{platform}/connections", response_model=List[ConnectionResponse])
-def list_connections(
+async def list_connections(
     platform: str,
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_db_runner)
 ):
     """List all ad account connections for a platform."""
-    platform_record = db.query(Platform).filter(
-        Platform.name == PlatformType(platform)
-    ).first()
+    def read_connections(session: Session):
+        platform_record = session.scalars(
+            select(Platform).filter(Platform.name == PlatformType(platform))
+        ).first()
+        
+        if not platform_record:
+            return None, []
+        
+        # Tokens are loaded up front; async sessions cannot lazy-load
+        connections = session.scalars(
+            select(AdAccountConnection).filter(
+                AdAccountConnection.platform_id == platform_record.id
+            ).options(selectinload(AdAccountConnection.oauth_tokens))
+        ).all()
+        return platform_record, connections
+    
+    platform_record, connections = await db.run(read_connections)
     
     if not platform_record:
         raise HTTPException(404, f"Platform {platform} not found")
     
-    connections = db.query(AdAccountConnection).filter(
-        AdAccountConnection.platform_id == platform_record.id
-    ).all()
-    
     return [
         ConnectionResponse(
             id=conn.id,
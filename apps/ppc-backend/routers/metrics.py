@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import get_db
+from services.metric_rollups import metric_totals, metric_trend, plan_range
+from datetime import datetime, date, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+METRIC_LEVELS = ["campaign", "ad_group", "keyword", "search_term"]
+TREND_GRAINS = ["day", "week", "month"]
+
+
+def parse_range(start: str, end: str, default_days: int):
+    """Parse a YYYY-MM-DD range, defaulting to the last default_days days."""
+    try:
+        end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else date.today()
+        start_date = datetime.strptime(start, "%Y-%m-%d").date() if start else end_date - timedelta(days=default_days - 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    return start_date, end_date
+
+
+@router.get("/trend")
+def get_metric_trend(
+    level: str = Query(default="campaign", description="Level: campaign, ad_group, keyword or search_term"),
+    grain: str = Query(default="month", description="Period: day, week or month"),
+    start: str = Query(default=None, description="Start date (YYYY-MM-DD), defaults to a year before end"),
+    end: str = Query(default=None, description="End date (YYYY-MM-DD), defaults to today"),
+    ref_id: str = Query(default=None, description="Limit to one entity"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get per-period metrics over a date range.
+    
+    Campaign weeks and months and keyword weeks are read from the
+    pre-aggregated rollups; periods are returned whole.
+    """
+    try:
+        if level not in METRIC_LEVELS:
+            raise HTTPException(status_code=400, detail=f"Level must be one of {', '.join(METRIC_LEVELS)}")
+        if grain not in TREND_GRAINS:
+            raise HTTPException(status_code=400, detail="Grain must be 'day', 'week' or 'month'")
+        
+        start_date, end_date = parse_range(start, end, default_days=365)
+        
+        return {
+            "level": level,
+            "grain": grain,
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "periods": metric_trend(db, level, grain, start_date, end_date, [ref_id] if ref_id else None)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Getting metric trend failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get metric trend: {str(e)}")
+
+
+@router.get("/totals")
+def get_metric_totals(
+    level: str = Query(default="campaign", description="Level: campaign, ad_group, keyword or search_term"),
+    start: str = Query(default=None, description="Start date (YYYY-MM-DD), defaults to 30 days before end"),
+    end: str = Query(default=None, description="End date (YYYY-MM-DD), defaults to today"),
+    ref_id: str = Query(default=None, description="Limit to one entity"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get metric totals per entity over an exact date range.
+    
+    Whole weeks and months inside the range are read from the rollups and
+    only the days at either edge from daily metrics.
+    """
+    try:
+        if level not in METRIC_LEVELS:
+            raise HTTPException(status_code=400, detail=f"Level must be one of {', '.join(METRIC_LEVELS)}")
+        
+        start_date, end_date = parse_range(start, end, default_days=30)
+        totals = metric_totals(db, level, start_date, end_date, [ref_id] if ref_id else None)
+        
+        return {
+            "level": level,
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "sources": [
+                {"grain": grain, "from": first.isoformat(), "to": last.isoformat()}
+                for grain, first, last in plan_range(level, start_date, end_date)
+            ],
+            "totals": [{"ref_id": key, **values} for key, values in sorted(totals.items())]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Getting metric totals failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get metric totals: {str(e)}")
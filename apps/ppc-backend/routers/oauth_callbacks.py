@@ -15,6 +15,7 @@ from models_vault import (
 )
 from services.crypto_service import crypto_service
 from services.token_service import TokenService
+from ads.http_utils import platform_url
 from ads.providers import ProviderManager, OAuthAppCredentials
 
 logger = logging.getLogger(__name__)
@@ -73,12 +74,12 @@ async def _get_account_info(platform: str, access_token: str, app_cred: OAuthApp
         }
         
         async with httpx.AsyncClient() as client:
-            response = await client.get("https://oauth.reddit.com/api/v1/me", headers=headers)
+            response = await client.get(platform_url("reddit", "https://oauth.reddit.com/api/v1/me"), headers=headers)
             response.raise_for_status()
             user_data = response.json()
             
             accounts_response = await client.get(
-                "https://ads-api.reddit.com/api/v2.0/accounts",
+                platform_url("reddit", "https://ads-api.reddit.com/api/v2.0/accounts"),
                 headers=headers
             )
             accounts_response.raise_for_status()
@@ -104,7 +105,7 @@ async def _get_account_info(platform: str, access_token: str, app_cred: OAuthApp
         
         async with httpx.AsyncClient() as client:
             response = await client.get(
-                "https://api.linkedin.com/rest/adAccounts?q=search&search.type.values[0]=BUSINESS",
+                platform_url("linkedin", "https://api.linkedin.com/rest/adAccounts?q=search&search.type.values[0]=BUSINESS"),
                 headers=headers
             )
             response.raise_for_status()
@@ -1,43 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from database import get_db
-from models import Recommendation, Keyword, SearchTerm, DailyMetric, Campaign, AdGroup
-from datetime import datetime, date, timedelta
+from database import SessionRunner, get_db, get_db_runner, get_read_db
+from models import Recommendation, RecommendationInput
+from services.recommendation_features import RecommendationFeatures, extract_features
+from services.search_term_metrics import roll_search_term_windows
+from services.simulation import SIMULATED_TYPES, simulate_scenarios
+from datetime import datetime, timedelta
 import json
 import uuid
+import hashlib
 import logging
-from typing import List, Dict, Any
+import numpy as np
+from pydantic import BaseModel
+from typing import Callable, List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Bump a rule's version whenever its logic changes; recommendations from
+# older versions are retired on the next generation run.
+RULE_VERSIONS = {
+    "negative_keyword": "2",
+    "pause_keyword": "2",
+    "budget_shift": "1",
+}
 
-def generate_recommendation_id() -> str:
-    """Generate a unique recommendation ID."""
-    return str(uuid.uuid4())
+RECOMMENDATION_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "synter-ppc/recommendations")
 
 
-def calculate_percentile(values: List[float], percentile: int) -> float:
-    """Calculate percentile of a list of values."""
-    if not values:
-        return 0.0
-    sorted_values = sorted(values)
-    index = (percentile / 100) * (len(sorted_values) - 1)
-    if index.is_integer():
-        return sorted_values[int(index)]
-    else:
-        lower = sorted_values[int(index)]
-        upper = sorted_values[int(index) + 1]
-        return lower + (upper - lower) * (index - int(index))
+class SimulationAction(BaseModel):
+    recommendation_id: Optional[str] = None  # Simulate a stored recommendation
+    type: Optional[str] = None  # Or describe the action: budget_shift or pause_keyword
+    target_id: Optional[str] = None
+    change_pct: Optional[float] = None  # Budget change in percent, e.g. 15 for +15%
+
+
+class SimulationScenario(BaseModel):
+    name: Optional[str] = None
+    actions: List[SimulationAction]
+
+
+class SimulateRequest(BaseModel):
+    scenarios: List[SimulationScenario]
+    horizon_days: int = 7
+
+
+def generate_recommendation_id(rec_type: str, entity_id: str) -> str:
+    """Generate a deterministic recommendation ID from type, evaluated entity and rule version."""
+    return str(uuid.uuid5(RECOMMENDATION_NAMESPACE, f"{rec_type}:{entity_id}:{RULE_VERSIONS[rec_type]}"))
+
+
+def compute_input_hash(values: tuple) -> str:
+    """Hash the inputs a rule reads for one entity."""
+    return hashlib.sha256(json.dumps(values, default=str).encode()).hexdigest()
 
 
 @router.get("/")
-def get_recommendations(
+async def get_recommendations(
     types: str = Query(default="neg,pause,budget", description="Comma-separated list: neg,pause,budget"),
     limit: int = Query(default=50, description="Maximum recommendations to return"),
     status: str = Query(default="proposed", description="Filter by status"),
-    db: Session = Depends(get_db)
+    db: SessionRunner = Depends(get_db_runner)
 ):
     """Get current recommendations."""
     try:
@@ -50,7 +74,7 @@ def get_recommendations(
         
         filtered_types = [type_mapping.get(t, t) for t in type_list if t in type_mapping or t in type_mapping.values()]
         
-        query = db.query(Recommendation)
+        query = select(Recommendation)
         
         if filtered_types:
             query = query.filter(Recommendation.type.in_(filtered_types))
@@ -58,7 +82,9 @@ def get_recommendations(
         if status != "all":
             query = query.filter(Recommendation.status == status)
         
-        recommendations = query.order_by(Recommendation.priority.desc(), Recommendation.projected_impact.desc()).limit(limit).all()
+        recommendations = await db.run(lambda session: session.scalars(
+            query.order_by(Recommendation.priority.desc(), Recommendation.projected_impact.desc()).limit(limit)
+        ).all())
         
         result = []
         for rec in recommendations:
@@ -95,46 +121,53 @@ def get_recommendations(
 @router.post("/generate")
 def generate_recommendations(
     types: str = Query(default="neg,pause,budget", description="Comma-separated list: neg,pause,budget"),
-    force_refresh: bool = Query(default=False, description="Clear existing and regenerate"),
-    db: Session = Depends(get_db)
+    force_refresh: bool = Query(default=False, description="Re-evaluate every entity, ignoring stored input hashes"),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
 ):
-    """Generate new recommendations based on current data."""
+    """
+    Generate recommendations based on current data.
+    
+    Only entities whose rule inputs changed since the last run are
+    re-evaluated. Recommendations keep deterministic IDs, so existing ones
+    are updated in place and ones that no longer apply are retired.
+    """
     try:
         type_list = [t.strip() for t in types.split(",")]
         
-        if force_refresh:
-            # Clear existing proposed recommendations
-            db.query(Recommendation).filter(Recommendation.status == "proposed").delete()
-            db.commit()
-        
-        recommendations_created = 0
-        
-        # 1. NEGATIVE KEYWORD recommendations
-        if "neg" in type_list:
-            negative_recs = _generate_negative_keyword_recommendations(db)
-            recommendations_created += len(negative_recs)
-            for rec in negative_recs:
-                db.add(rec)
-        
-        # 2. PAUSE KEYWORD recommendations  
-        if "pause" in type_list:
-            pause_recs = _generate_pause_keyword_recommendations(db)
-            recommendations_created += len(pause_recs)
-            for rec in pause_recs:
-                db.add(rec)
-        
-        # 3. BUDGET SHIFT recommendations
-        if "budget" in type_list:
-            budget_recs = _generate_budget_shift_recommendations(db)
-            recommendations_created += len(budget_recs)
-            for rec in budget_recs:
-                db.add(rec)
+        # Bring search term windows up to today, then aggregate all rule
+        # inputs up front in a few grouped queries. Features come from the
+        # read replica unless the windows just moved, which only the
+        # primary has seen yet.
+        rolled = roll_search_term_windows(db)
+        features = extract_features(db if rolled else read_db)
+        
+        rules = {
+            "neg": ("negative_keyword", _negative_keyword_inputs, _generate_negative_keyword_recommendations),
+            "pause": ("pause_keyword", _pause_keyword_inputs, _generate_pause_keyword_recommendations),
+            "budget": ("budget_shift", _budget_shift_inputs, _generate_budget_shift_recommendations),
+        }
+        
+        totals = {"evaluated": 0, "inserted": 0, "updated": 0, "retired": 0}
+        by_type = {}
+        
+        for short_type in type_list:
+            if short_type not in rules:
+                continue
+            
+            rec_type, inputs_fn, generate_fn = rules[short_type]
+            counts = _reconcile_rule(db, features, rec_type, inputs_fn, generate_fn, force_refresh)
+            by_type[rec_type] = counts
+            for key in totals:
+                totals[key] += counts[key]
         
         db.commit()
         
         return {
             "status": "success",
-            "recommendations_created": recommendations_created,
+            "recommendations_created": totals["inserted"],
+            **totals,
+            "by_type": by_type,
             "types_processed": type_list,
             "force_refresh": force_refresh
         }
@@ -144,222 +177,408 @@ def generate_recommendations(
         raise HTTPException(status_code=500, detail=f"Failed to generate recommendations: {str(e)}")
 
 
-def _generate_negative_keyword_recommendations(db: Session) -> List[Recommendation]:
-    """Generate negative keyword recommendations based on search terms."""
-    recommendations = []
+def _reconcile_rule(
+    db: Session,
+    features: RecommendationFeatures,
+    rec_type: str,
+    inputs_fn: Callable[[RecommendationFeatures], tuple],
+    generate_fn: Callable[[RecommendationFeatures, np.ndarray], Dict[str, Recommendation]],
+    force_refresh: bool
+) -> Dict[str, int]:
+    """
+    Re-evaluate one rule for entities whose inputs changed and diff the
+    result against stored recommendations.
+    
+    Returns counts of evaluated entities and inserted, updated and retired recommendations.
+    """
+    rule_version = RULE_VERSIONS[rec_type]
+    entity_ids, inputs = inputs_fn(features)
+    input_hashes = [compute_input_hash(values) for values in inputs]
+    
+    stored_inputs = {
+        row.entity_id: row
+        for row in db.query(RecommendationInput).filter(RecommendationInput.type == rec_type)
+    }
+    
+    changed = np.array([
+        force_refresh
+        or entity_id not in stored_inputs
+        or stored_inputs[entity_id].rule_version != rule_version
+        or stored_inputs[entity_id].input_hash != input_hash
+        for entity_id, input_hash in zip(entity_ids, input_hashes)
+    ], dtype=bool)
+    
+    candidates = generate_fn(features, changed)
+    
+    existing = {
+        rec.id: rec
+        for rec in db.query(Recommendation).filter(
+            Recommendation.type == rec_type,
+            Recommendation.rule_version == rule_version
+        )
+    }
+    
+    counts = {"evaluated": int(changed.sum()), "inserted": 0, "updated": 0, "retired": 0}
+    
+    for i in np.flatnonzero(changed):
+        entity_id = entity_ids[i]
+        current = existing.get(generate_recommendation_id(rec_type, entity_id))
+        candidate = candidates.get(entity_id)
+        
+        if candidate is not None:
+            if current is None:
+                db.add(candidate)
+                counts["inserted"] += 1
+            elif current.status in ("proposed", "retired"):
+                # Applied, dry-run and dismissed recommendations keep their history untouched
+                current.target_level = candidate.target_level
+                current.target_id = candidate.target_id
+                current.details_json = candidate.details_json
+                current.projected_impact = candidate.projected_impact
+                current.risk = candidate.risk
+                current.priority = candidate.priority
+                current.status = "proposed"
+                counts["updated"] += 1
+        elif current is not None and current.status == "proposed":
+            current.status = "retired"
+            counts["retired"] += 1
+        
+        stored = stored_inputs.get(entity_id)
+        if stored is None:
+            db.add(RecommendationInput(
+                type=rec_type,
+                entity_id=entity_id,
+                rule_version=rule_version,
+                input_hash=input_hashes[i]
+            ))
+        else:
+            stored.rule_version = rule_version
+            stored.input_hash = input_hashes[i]
+    
+    # Retire proposals for entities that disappeared or were produced by an older rule version
+    current_ids = {generate_recommendation_id(rec_type, entity_id) for entity_id in entity_ids}
+    stale = db.query(Recommendation).filter(
+        Recommendation.type == rec_type,
+        Recommendation.status == "proposed"
+    ).all()
+    for rec in stale:
+        if rec.id not in current_ids:
+            rec.status = "retired"
+            counts["retired"] += 1
+    
+    logger.info(
+        f"{rec_type}: evaluated {counts['evaluated']}/{len(entity_ids)} entities, "
+        f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['retired']} retired"
+    )
+    return counts
+
+
+def _negative_keyword_inputs(features: RecommendationFeatures) -> tuple:
+    """Per search term inputs read by the negative keyword rule."""
+    terms = features.search_terms
+    recent = terms.last_seen >= np.datetime64(features.as_of - timedelta(days=7))
+    
+    return terms.ids, list(zip(
+        terms.text,
+        terms.ad_group_id,
+        terms.icp_score.tolist(),
+        terms.icp_confidence.tolist(),
+        terms.icp_rationale,
+        recent.tolist(),
+        terms.window("cost_micros", 7).tolist(),
+        terms.window("conversions", 7).tolist()
+    ))
+
+
+def _generate_negative_keyword_recommendations(features: RecommendationFeatures, evaluate: np.ndarray) -> Dict[str, Recommendation]:
+    """Generate negative keyword recommendations for the search terms selected by `evaluate`."""
+    recommendations = {}
+    terms = features.search_terms
     
     # Find search terms with low ICP score, high spend, no conversions
-    cutoff_date = date.today() - timedelta(days=7)
-    
-    # This is a simplified query - in reality you'd need to aggregate metrics by search term
-    problematic_terms = db.query(SearchTerm).filter(
-        and_(
-            SearchTerm.icp_score < 40,
-            SearchTerm.icp_score.isnot(None),
-            SearchTerm.last_seen >= cutoff_date
+    cutoff_date = np.datetime64(features.as_of - timedelta(days=7))
+    
+    spend_7d = terms.window("cost_micros", 7) / 1_000_000
+    
+    # NaN ICP scores (unscored terms) compare False and drop out here
+    candidates = evaluate & (
+        (terms.icp_score < 40)
+        & (terms.last_seen >= cutoff_date)
+        & (spend_7d >= 300)  # Meet the spend threshold
+        & (terms.window("conversions", 7) == 0)
+    )
+    
+    for i in np.flatnonzero(candidates):
+        icp_score = int(terms.icp_score[i])
+        spend = float(spend_7d[i])
+        confidence = terms.icp_confidence[i]
+        
+        details = {
+            "search_term": terms.text[i],
+            "icp_score": icp_score,
+            "rationale": terms.icp_rationale[i],
+            "spend_7d": spend,
+            "ad_group_id": terms.ad_group_id[i],
+            "match_type": "EXACT",
+            "impact_explanation": f"Prevent spend on low-fit term (ICP: {icp_score})"
+        }
+        
+        recommendation = Recommendation(
+            id=generate_recommendation_id("negative_keyword", terms.ids[i]),
+            type="negative_keyword",
+            target_level="campaign",
+            target_id=terms.ad_group_id[i],  # We'd need to get campaign_id in practice
+            details_json=json.dumps(details),
+            projected_impact=spend * 0.8,  # Assume 80% of spend would be saved
+            risk=1 - (0.5 if np.isnan(confidence) else float(confidence)),
+            priority="high" if icp_score < 20 else "medium",
+            rule_version=RULE_VERSIONS["negative_keyword"]
         )
-    ).limit(20).all()  # Limit to avoid too many recommendations
-    
-    for term in problematic_terms:
-        # In a real implementation, you'd calculate actual spend for this term
-        # For MVP, we'll simulate based on ICP score
-        estimated_spend = max(100, (40 - term.icp_score) * 20)  # Lower score = higher simulated spend
-        
-        if estimated_spend >= 300:  # Meet the spend threshold
-            details = {
-                "search_term": term.text,
-                "icp_score": term.icp_score,
-                "rationale": term.icp_rationale,
-                "estimated_spend_7d": estimated_spend,
-                "ad_group_id": term.ad_group_id,
-                "match_type": "EXACT",
-                "impact_explanation": f"Prevent spend on low-fit term (ICP: {term.icp_score})"
-            }
-            
-            recommendation = Recommendation(
-                id=generate_recommendation_id(),
-                type="negative_keyword",
-                target_level="campaign",
-                target_id=term.ad_group_id,  # We'd need to get campaign_id in practice
-                details_json=json.dumps(details),
-                projected_impact=estimated_spend * 0.8,  # Assume 80% of spend would be saved
-                risk=1 - (term.icp_confidence or 0.5),
-                priority="high" if term.icp_score < 20 else "medium"
-            )
-            recommendations.append(recommendation)
+        recommendations[terms.ids[i]] = recommendation
     
     return recommendations
 
 
-def _generate_pause_keyword_recommendations(db: Session) -> List[Recommendation]:
-    """Generate pause keyword recommendations."""
-    recommendations = []
+def _pause_keyword_inputs(features: RecommendationFeatures) -> tuple:
+    """Per keyword inputs read by the pause rule, including the account-wide p25."""
+    keywords = features.keywords
+    p25_conv_rate = features.keyword_conversion_rates.percentile(25)
     
-    # Get account-wide conversion rate percentiles
-    all_metrics = db.query(DailyMetric).filter(
-        and_(
-            DailyMetric.level == "keyword",
-            DailyMetric.conversions > 0,
-            DailyMetric.clicks > 0
+    return keywords.ids, [
+        values + (p25_conv_rate,)
+        for values in zip(
+            keywords.text,
+            keywords.match_type,
+            keywords.icp_score.tolist(),
+            keywords.window("rows", 14).tolist(),
+            keywords.window("clicks", 14).tolist(),
+            keywords.window("conversions", 14).tolist(),
+            keywords.window("cost_micros", 14).tolist()
         )
-    ).all()
-    
-    conversion_rates = [
-        (metric.conversions / metric.clicks * 100) 
-        for metric in all_metrics 
-        if metric.clicks > 0
     ]
+
+
+def _generate_pause_keyword_recommendations(features: RecommendationFeatures, evaluate: np.ndarray) -> Dict[str, Recommendation]:
+    """Generate pause keyword recommendations for the keywords selected by `evaluate`."""
+    recommendations = {}
+    
+    # Get account-wide conversion rate percentiles (cached for the run)
+    p25_conv_rate = features.keyword_conversion_rates.percentile(25)
     
-    if not conversion_rates:
+    if p25_conv_rate is None:
         return recommendations  # No data to work with
     
-    p25_conv_rate = calculate_percentile(conversion_rates, 25)
+    keywords = features.keywords
+    clicks = keywords.window("clicks", 14)
+    conversions = keywords.window("conversions", 14)
+    
+    spend_14d = keywords.window("cost_micros", 14) / 1_000_000
+    conv_rate = conversions / np.maximum(clicks, 1) * 100
     
-    # Find keywords with poor performance
-    poor_keywords = db.query(Keyword).filter(
-        and_(
-            Keyword.icp_score < 50,
-            Keyword.icp_score.isnot(None)
+    # Keywords with poor performance and at least one metric row in the last 14 days
+    candidates = evaluate & (
+        (keywords.icp_score < 50)
+        & (keywords.window("rows", 14) > 0)
+        & (spend_14d >= 500)
+        & (conv_rate < p25_conv_rate)
+    )
+    
+    for i in np.flatnonzero(candidates):
+        icp_score = int(keywords.icp_score[i])
+        spend = float(spend_14d[i])
+        rate = float(conv_rate[i])
+        
+        details = {
+            "keyword_text": keywords.text[i],
+            "match_type": keywords.match_type[i],
+            "icp_score": icp_score,
+            "spend_14d": spend,
+            "conversion_rate": rate,
+            "account_p25_conv_rate": p25_conv_rate,
+            "rationale": f"Low ICP ({icp_score}) + poor conversion rate ({rate:.2f}% vs {p25_conv_rate:.2f}% p25)"
+        }
+        
+        recommendation = Recommendation(
+            id=generate_recommendation_id("pause_keyword", keywords.ids[i]),
+            type="pause_keyword",
+            target_level="keyword",
+            target_id=keywords.ids[i],
+            details_json=json.dumps(details),
+            projected_impact=spend * 0.7,  # Assume 70% savings
+            risk=0.3,  # Moderate risk of losing some good traffic
+            priority="high" if icp_score < 30 else "medium",
+            rule_version=RULE_VERSIONS["pause_keyword"]
         )
-    ).limit(15).all()  # Limit for MVP
-    
-    for keyword in poor_keywords:
-        # Get metrics for this keyword
-        metrics = db.query(DailyMetric).filter(
-            and_(
-                DailyMetric.level == "keyword",
-                DailyMetric.ref_id == keyword.id,
-                DailyMetric.date >= date.today() - timedelta(days=14)
-            )
-        ).first()
-        
-        if not metrics:
-            continue
-        
-        # Simulate spend check and performance
-        estimated_spend = max(200, (50 - keyword.icp_score) * 25)
-        conv_rate = (metrics.conversions / max(metrics.clicks, 1)) * 100
-        
-        if estimated_spend >= 500 and conv_rate < p25_conv_rate:
-            details = {
-                "keyword_text": keyword.text,
-                "match_type": keyword.match_type,
-                "icp_score": keyword.icp_score,
-                "estimated_spend_14d": estimated_spend,
-                "conversion_rate": conv_rate,
-                "account_p25_conv_rate": p25_conv_rate,
-                "rationale": f"Low ICP ({keyword.icp_score}) + poor conversion rate ({conv_rate:.2f}% vs {p25_conv_rate:.2f}% p25)"
-            }
-            
-            recommendation = Recommendation(
-                id=generate_recommendation_id(),
-                type="pause_keyword",
-                target_level="keyword",
-                target_id=keyword.id,
-                details_json=json.dumps(details),
-                projected_impact=estimated_spend * 0.7,  # Assume 70% savings
-                risk=0.3,  # Moderate risk of losing some good traffic
-                priority="high" if keyword.icp_score < 30 else "medium"
-            )
-            recommendations.append(recommendation)
+        recommendations[keywords.ids[i]] = recommendation
     
     return recommendations
 
 
-def _generate_budget_shift_recommendations(db: Session) -> List[Recommendation]:
-    """Generate budget shift recommendations."""
-    recommendations = []
+def _budget_shift_inputs(features: RecommendationFeatures) -> tuple:
+    """Per campaign inputs read by the budget shift rule, including the policy gate."""
+    campaigns = features.campaigns
+    gate_open = features.account_conversions_30d >= 20
     
-    # Policy gate: check if account has enough conversions
-    recent_conversions = db.query(func.sum(DailyMetric.conversions)).filter(
-        and_(
-            DailyMetric.date >= date.today() - timedelta(days=30),
-            DailyMetric.level == "campaign"
+    return campaigns.ids, [
+        values + (gate_open,)
+        for values in zip(
+            campaigns.name,
+            campaigns.daily_budget_micros.tolist(),
+            campaigns.avg_icp.tolist(),
+            campaigns.window("cost_micros", 7).tolist()
         )
-    ).scalar() or 0
+    ]
+
+
+def _generate_budget_shift_recommendations(features: RecommendationFeatures, evaluate: np.ndarray) -> Dict[str, Recommendation]:
+    """Generate budget shift recommendations for the campaigns selected by `evaluate`."""
+    recommendations = {}
     
-    if recent_conversions < 20:
+    # Policy gate: check if account has enough conversions
+    if features.account_conversions_30d < 20:
         logger.info("Skipping budget recommendations: insufficient conversions (<20 in last 30 days)")
         return recommendations
     
-    # Find campaigns with different ICP performance
-    campaigns = db.query(Campaign).limit(10).all()  # Limit for MVP
-    
-    for campaign in campaigns:
-        # Get average ICP score for this campaign's keywords
-        avg_icp = db.query(func.avg(Keyword.icp_score)).filter(
-            and_(
-                Keyword.ad_group_id.in_(
-                    db.query(AdGroup.id).filter(AdGroup.campaign_id == campaign.id)
-                ),
-                Keyword.icp_score.isnot(None)
-            )
-        ).scalar()
-        
-        if not avg_icp:
-            continue
-        
-        # Get campaign metrics
-        campaign_metrics = db.query(func.sum(DailyMetric.cost_micros)).filter(
-            and_(
-                DailyMetric.level == "campaign",
-                DailyMetric.ref_id == campaign.id,
-                DailyMetric.date >= date.today() - timedelta(days=7)
-            )
-        ).scalar() or 0
-        
-        daily_budget = campaign.daily_budget_micros or 0
-        
-        # Logic: if high-fit campaign is constrained by budget, recommend increase
-        # if low-fit campaign is overspending, recommend decrease
-        if avg_icp >= 80 and campaign_metrics > daily_budget * 6:  # Spending close to weekly budget
-            details = {
-                "campaign_name": campaign.name,
-                "current_daily_budget_micros": daily_budget,
-                "avg_icp_score": float(avg_icp),
-                "weekly_spend_micros": int(campaign_metrics),
-                "recommendation": "increase",
-                "suggested_change_pct": 15,
-                "rationale": f"High-fit campaign (ICP: {avg_icp:.1f}) appears budget-constrained"
-            }
-            
-            recommendation = Recommendation(
-                id=generate_recommendation_id(),
-                type="budget_shift",
-                target_level="campaign",
-                target_id=campaign.id,
-                details_json=json.dumps(details),
-                projected_impact=daily_budget * 0.15 * 0.3,  # Assume 30% incremental return
-                risk=0.2,  # Low risk for high-fit campaigns
-                priority="medium"
-            )
-            recommendations.append(recommendation)
-            
-        elif avg_icp < 40 and daily_budget >= 10000000:  # At least $100/day minimum
-            details = {
-                "campaign_name": campaign.name,
-                "current_daily_budget_micros": daily_budget,
-                "avg_icp_score": float(avg_icp),
-                "recommendation": "decrease",
-                "suggested_change_pct": -20,
-                "rationale": f"Low-fit campaign (ICP: {avg_icp:.1f}) may be overspending"
-            }
-            
-            recommendation = Recommendation(
-                id=generate_recommendation_id(),
-                type="budget_shift",
-                target_level="campaign",
-                target_id=campaign.id,
-                details_json=json.dumps(details),
-                projected_impact=daily_budget * 0.20 * 0.8,  # Assume 80% of cut is waste
-                risk=0.1,  # Low risk to reduce low-fit spend
-                priority="low"
-            )
-            recommendations.append(recommendation)
+    campaigns = features.campaigns
+    avg_icp = campaigns.avg_icp
+    daily_budget = campaigns.daily_budget_micros
+    weekly_spend = campaigns.window("cost_micros", 7)
+    
+    # Campaigns without scored keywords have a NaN average and are skipped
+    has_icp = evaluate & (avg_icp > 0)
+    
+    # Logic: if high-fit campaign is constrained by budget, recommend increase
+    # if low-fit campaign is overspending, recommend decrease
+    increase = has_icp & (avg_icp >= 80) & (weekly_spend > daily_budget * 6)  # Spending close to weekly budget
+    decrease = has_icp & ~increase & (avg_icp < 40) & (daily_budget >= 10000000)  # At least $100/day minimum
+    
+    for i in np.flatnonzero(increase):
+        budget = int(daily_budget[i])
+        
+        details = {
+            "campaign_name": campaigns.name[i],
+            "current_daily_budget_micros": budget,
+            "avg_icp_score": float(avg_icp[i]),
+            "weekly_spend_micros": int(weekly_spend[i]),
+            "recommendation": "increase",
+            "suggested_change_pct": 15,
+            "rationale": f"High-fit campaign (ICP: {avg_icp[i]:.1f}) appears budget-constrained"
+        }
+        
+        recommendation = Recommendation(
+            id=generate_recommendation_id("budget_shift", campaigns.ids[i]),
+            type="budget_shift",
+            target_level="campaign",
+            target_id=campaigns.ids[i],
+            details_json=json.dumps(details),
+            projected_impact=budget * 0.15 * 0.3,  # Assume 30% incremental return
+            risk=0.2,  # Low risk for high-fit campaigns
+            priority="medium",
+            rule_version=RULE_VERSIONS["budget_shift"]
+        )
+        recommendations[campaigns.ids[i]] = recommendation
+    
+    for i in np.flatnonzero(decrease):
+        budget = int(daily_budget[i])
+        
+        details = {
+            "campaign_name": campaigns.name[i],
+            "current_daily_budget_micros": budget,
+            "avg_icp_score": float(avg_icp[i]),
+            "recommendation": "decrease",
+            "suggested_change_pct": -20,
+            "rationale": f"Low-fit campaign (ICP: {avg_icp[i]:.1f}) may be overspending"
+        }
+        
+        recommendation = Recommendation(
+            id=generate_recommendation_id("budget_shift", campaigns.ids[i]),
+            type="budget_shift",
+            target_level="campaign",
+            target_id=campaigns.ids[i],
+            details_json=json.dumps(details),
+            projected_impact=budget * 0.20 * 0.8,  # Assume 80% of cut is waste
+            risk=0.1,  # Low risk to reduce low-fit spend
+            priority="low",
+            rule_version=RULE_VERSIONS["budget_shift"]
+        )
+        recommendations[campaigns.ids[i]] = recommendation
     
     return recommendations
 
 
+@router.post("/simulate")
+def simulate_recommendations(
+    request: SimulateRequest = Body(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Project spend, click and conversion deltas for candidate recommendation sets.
+    
+    Each scenario is a set of budget_shift and pause_keyword actions, given
+    either as stored recommendation IDs or inline. Projections use elasticity
+    curves fitted from historical daily metrics; all scenarios are evaluated
+    in one vectorized pass.
+    """
+    try:
+        if request.horizon_days < 1:
+            raise HTTPException(status_code=400, detail="horizon_days must be at least 1")
+        
+        # Resolve stored recommendations in one query
+        recommendation_ids = {
+            action.recommendation_id
+            for scenario in request.scenarios
+            for action in scenario.actions
+            if action.recommendation_id
+        }
+        stored = {
+            rec.id: rec
+            for rec in db.query(Recommendation).filter(Recommendation.id.in_(recommendation_ids))
+        } if recommendation_ids else {}
+        
+        scenarios = []
+        for scenario in request.scenarios:
+            actions = []
+            for action in scenario.actions:
+                if action.recommendation_id:
+                    rec = stored.get(action.recommendation_id)
+                    if not rec:
+                        raise HTTPException(status_code=404, detail=f"Recommendation not found: {action.recommendation_id}")
+                    details = json.loads(rec.details_json) if rec.details_json else {}
+                    resolved = {
+                        "type": rec.type,
+                        "target_id": rec.target_id,
+                        "change_pct": details.get("suggested_change_pct")
+                    }
+                else:
+                    resolved = {"type": action.type, "target_id": action.target_id, "change_pct": action.change_pct}
+                
+                if resolved["type"] not in SIMULATED_TYPES or not resolved["target_id"]:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Only {', '.join(SIMULATED_TYPES)} actions with a target_id can be simulated"
+                    )
+                actions.append(resolved)
+            scenarios.append(actions)
+        
+        result = simulate_scenarios(db, scenarios, horizon_days=request.horizon_days)
+        
+        # Projections may be shared with the result cache; label copies
+        return {
+            "status": "success",
+            **result,
+            "scenarios": [
+                {**projection, "name": scenario.name}
+                for scenario, projection in zip(request.scenarios, result["scenarios"])
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Simulating recommendations failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to simulate recommendations: {str(e)}")
+
+
 @router.put("/{recommendation_id}/status")
 def update_recommendation_status(
     recommendation_id: str,
@@ -50,3 +50,15 @@ async def trigger_health_check_now():
     except Exception as e:
         logger.error(f"Error triggering health check: {e}")
         return {"status": "error", "message": str(e)}
+
+
+@router.post("/audit-retention-now")
+async def trigger_audit_retention_now():
+    """Manually trigger audit log partition maintenance and archival."""
+    try:
+        scheduler = get_scheduler()
+        result = await scheduler.run_audit_retention()
+        return {"status": "success", "message": "Audit retention completed", "result": result}
+    except Exception as e:
+        logger.error(f"Error triggering audit retention: {e}")
+        return {"status": "error", "message": str(e)}
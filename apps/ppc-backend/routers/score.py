@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from database import get_db
+from database import SessionRunner, get_db, get_read_db_runner
 from models import Keyword, SearchTerm
 import re
 import math
@@ -180,24 +181,40 @@ def score_icp(
 
 
 @router.get("/icp/stats")
-def get_icp_stats(db: Session = Depends(get_db)):
+async def get_icp_stats(db: SessionRunner = Depends(get_read_db_runner)):
     """Get ICP scoring statistics."""
     try:
-        # Keyword stats
-        keyword_stats = db.query(
-            Keyword.icp_score,
-            db.func.count(Keyword.id).label('count')
-        ).filter(
-            Keyword.icp_score.isnot(None)
-        ).group_by(Keyword.icp_score).all()
+        def read_stats(session: Session):
+            # Keyword stats
+            keyword_stats = session.execute(
+                select(
+                    Keyword.icp_score,
+                    func.count(Keyword.id).label('count')
+                ).filter(
+                    Keyword.icp_score.isnot(None)
+                ).group_by(Keyword.icp_score)
+            ).all()
+            
+            # Search term stats
+            term_stats = session.execute(
+                select(
+                    SearchTerm.icp_score,
+                    func.count(SearchTerm.id).label('count')
+                ).filter(
+                    SearchTerm.icp_score.isnot(None)
+                ).group_by(SearchTerm.icp_score)
+            ).all()
+            
+            # Count unscored items
+            unscored_keywords = session.scalar(
+                select(func.count(Keyword.id)).filter(Keyword.icp_score.is_(None))
+            )
+            unscored_terms = session.scalar(
+                select(func.count(SearchTerm.id)).filter(SearchTerm.icp_score.is_(None))
+            )
+            return keyword_stats, term_stats, unscored_keywords, unscored_terms
         
-        # Search term stats
-        term_stats = db.query(
-            SearchTerm.icp_score,
-            db.func.count(SearchTerm.id).label('count')
-        ).filter(
-            SearchTerm.icp_score.isnot(None)
-        ).group_by(SearchTerm.icp_score).all()
+        keyword_stats, term_stats, unscored_keywords, unscored_terms = await db.run(read_stats)
         
         # Create score distribution buckets
         keyword_buckets = {"high": 0, "medium": 0, "low": 0, "unscored": 0}
@@ -219,10 +236,6 @@ def get_icp_stats(db: Session = Depends(get_db)):
             else:
                 term_buckets["low"] += count
         
-        # Count unscored items
-        unscored_keywords = db.query(Keyword).filter(Keyword.icp_score.is_(None)).count()
-        unscored_terms = db.query(SearchTerm).filter(SearchTerm.icp_score.is_(None)).count()
-        
         keyword_buckets["unscored"] = unscored_keywords
         term_buckets["unscored"] = unscored_terms
         
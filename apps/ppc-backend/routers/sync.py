@@ -3,6 +3,9 @@ from sqlalchemy.orm import Session
 from database import get_db
 from ads.client import ads_client
 from models import Campaign, AdGroup, Keyword, SearchTerm, DailyMetric
+from services.metric_rollups import ROLLUP_METRICS, record_metric_rollups, write_daily_metrics
+from services.search_term_metrics import record_search_term_metrics
+from services.bulk_load import copy_upsert, use_bulk_load
 from datetime import datetime, date, timedelta
 import logging
 import hashlib
@@ -11,17 +14,127 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def create_composite_id(date_str: str, level: str, ref_id: str) -> str:
-    """Create a composite ID for daily metrics."""
-    return f"{date_str}_{level}_{ref_id}"
-
-
 def create_search_term_id(term: str, ad_group_id: str) -> str:
     """Create a unique ID for search terms."""
     content = f"{term}_{ad_group_id}"
     return hashlib.md5(content.encode()).hexdigest()
 
 
+def bulk_sync_keywords(db: Session, results) -> dict:
+    """sync_keywords for large result sets: every table is written through COPY."""
+    campaigns, ad_groups, keywords, metrics = {}, {}, {}, {}
+    metric_date = date.today() - timedelta(days=1)  # Yesterday as representative
+    
+    for row in results:
+        campaign_id = str(row.campaign.id)
+        ad_group_id = str(row.ad_group.id)
+        keyword_id = str(row.ad_group_criterion.criterion_id)
+        
+        campaigns.setdefault(campaign_id, {
+            "id": campaign_id,
+            "name": row.campaign.name,
+            "status": row.campaign.status.name,
+            "daily_budget_micros": getattr(row.campaign, 'campaign_budget', {}).get('amount_micros', 0)
+        })
+        ad_groups.setdefault(ad_group_id, {
+            "id": ad_group_id,
+            "campaign_id": campaign_id,
+            "name": row.ad_group.name,
+            "status": row.ad_group.status.name
+        })
+        keywords.setdefault(keyword_id, {
+            "id": keyword_id,
+            "ad_group_id": ad_group_id,
+            "text": row.ad_group_criterion.keyword.text,
+            "match_type": row.ad_group_criterion.keyword.match_type.name,
+            "status": row.ad_group_criterion.status.name,
+            "cpc_bid_micros": getattr(row.ad_group_criterion, 'cpc_bid_micros', None)
+        })
+        metrics.setdefault((keyword_id, metric_date), {
+            "impressions": row.metrics.impressions,
+            "clicks": row.metrics.clicks,
+            "cost_micros": row.metrics.cost_micros,
+            "conversions": row.metrics.conversions,
+            "conversions_value": row.metrics.conversions_value,
+            "ctr": row.metrics.clicks / max(row.metrics.impressions, 1) * 100,
+            "cpc_micros": row.metrics.cost_micros // max(row.metrics.clicks, 1),
+            "conversion_rate": row.metrics.conversions / max(row.metrics.clicks, 1) * 100
+        })
+    
+    # Existing rows are kept as they are, like the row-by-row path
+    copy_upsert(db, Campaign.__table__, list(campaigns.values()), ["id"], update={})
+    copy_upsert(db, AdGroup.__table__, list(ad_groups.values()), ["id"], update={})
+    keywords_written = copy_upsert(db, Keyword.__table__, list(keywords.values()), ["id"], update={})
+    
+    # Only keywords without an aggregated metric row get one
+    measured = set()
+    keyword_ids = sorted(keywords)
+    for i in range(0, len(keyword_ids), 500):
+        measured.update(ref_id for ref_id, in db.query(DailyMetric.ref_id).filter(
+            DailyMetric.level == "keyword",
+            DailyMetric.ref_id.in_(keyword_ids[i:i + 500])
+        ).distinct())
+    metrics = {key: values for key, values in metrics.items() if key[0] not in measured}
+    metrics_written = write_daily_metrics(db, "keyword", metrics, restate=False, bulk=True)
+    
+    db.commit()
+    
+    return {
+        "status": "success",
+        "campaigns_synced": len(campaigns),
+        "ad_groups_synced": len(ad_groups),
+        "keywords_synced": keywords_written["inserted"],
+        "metrics_synced": metrics_written["inserted"],
+        "total_rows_processed": len(results),
+        "bulk_load": True
+    }
+
+
+def bulk_sync_search_terms(db: Session, results) -> dict:
+    """sync_search_terms for large result sets: search terms are written through COPY."""
+    terms, daily_metrics = {}, {}
+    
+    for row in results:
+        ad_group_id = str(row.ad_group.id)
+        search_term = row.search_term_view.search_term
+        search_term_id = create_search_term_id(search_term, ad_group_id)
+        row_date = datetime.strptime(str(row.segments.date), "%Y-%m-%d").date()
+        
+        term = terms.setdefault(search_term_id, {
+            "id": search_term_id,
+            "ad_group_id": ad_group_id,
+            "text": search_term,
+            "matched_keyword_text": getattr(row.ad_group_criterion.keyword, 'text', None),
+            "last_seen": row_date
+        })
+        term["last_seen"] = max(term["last_seen"], row_date)
+        
+        day_metrics = daily_metrics.setdefault((search_term_id, row_date), {
+            "impressions": 0, "clicks": 0, "cost_micros": 0, "conversions": 0.0, "conversions_value": 0.0
+        })
+        day_metrics["impressions"] += row.metrics.impressions
+        day_metrics["clicks"] += row.metrics.clicks
+        day_metrics["cost_micros"] += row.metrics.cost_micros
+        day_metrics["conversions"] += row.metrics.conversions
+        day_metrics["conversions_value"] += row.metrics.conversions_value
+    
+    # Known terms only move last_seen forward
+    written = copy_upsert(db, SearchTerm.__table__, list(terms.values()), ["id"], update={
+        "last_seen": "GREATEST(search_terms.last_seen, EXCLUDED.last_seen)"
+    })
+    metric_days_recorded = record_search_term_metrics(db, daily_metrics)
+    
+    db.commit()
+    
+    return {
+        "status": "success",
+        "search_terms_synced": written["inserted"],
+        "metric_days_recorded": metric_days_recorded,
+        "total_rows_processed": len(results),
+        "bulk_load": True
+    }
+
+
 @router.get("/keywords")
 def sync_keywords(
     days: int = Query(default=90, description="Number of days to sync"),
@@ -50,10 +163,14 @@ def sync_keywords(
         
         results = ads_client.execute_query(query, customer_id)
         
+        if use_bulk_load(db, len(results)):
+            return bulk_sync_keywords(db, results)
+        
         campaigns_synced = set()
         ad_groups_synced = set()
         keywords_synced = 0
         metrics_synced = 0
+        rollup_deltas = []
         
         for row in results:
             # Sync campaign
@@ -101,11 +218,12 @@ def sync_keywords(
             
             # For aggregated metrics, we'll create one record per keyword
             # In a real implementation, you might want daily breakdowns
-            metric_id = create_composite_id("aggregated", "keyword", keyword_id)
-            metric = db.query(DailyMetric).filter(DailyMetric.id == metric_id).first()
+            metric = db.query(DailyMetric).filter(
+                DailyMetric.level == "keyword",
+                DailyMetric.ref_id == keyword_id
+            ).first()
             if not metric:
                 metric = DailyMetric(
-                    id=metric_id,
                     date=date.today() - timedelta(days=1),  # Yesterday as representative
                     level="keyword",
                     ref_id=keyword_id,
@@ -119,8 +237,13 @@ def sync_keywords(
                     conversion_rate=row.metrics.conversions / max(row.metrics.clicks, 1) * 100
                 )
                 db.add(metric)
+                rollup_deltas.append((
+                    "keyword", keyword_id, metric.date,
+                    {name: getattr(metric, name) for name in ROLLUP_METRICS}, 1
+                ))
                 metrics_synced += 1
         
+        record_metric_rollups(db, rollup_deltas)
         db.commit()
         
         return {
@@ -161,35 +284,56 @@ def sync_search_terms(
         
         results = ads_client.execute_query(query, customer_id)
         
+        if use_bulk_load(db, len(results)):
+            return bulk_sync_search_terms(db, results)
+        
         search_terms_synced = 0
+        terms = {}
+        daily_metrics = {}
         
         for row in results:
             ad_group_id = str(row.ad_group.id)
             search_term = row.search_term_view.search_term
             search_term_id = create_search_term_id(search_term, ad_group_id)
+            row_date = datetime.strptime(str(row.segments.date), "%Y-%m-%d").date()
             
             # Check if search term already exists
-            existing_term = db.query(SearchTerm).filter(SearchTerm.id == search_term_id).first()
+            existing_term = terms.get(search_term_id) or db.query(SearchTerm).filter(SearchTerm.id == search_term_id).first()
             
             if not existing_term:
-                search_term_obj = SearchTerm(
+                existing_term = SearchTerm(
                     id=search_term_id,
                     ad_group_id=ad_group_id,
                     text=search_term,
                     matched_keyword_text=getattr(row.ad_group_criterion.keyword, 'text', None),
-                    last_seen=row.segments.date
+                    last_seen=row_date
                 )
-                db.add(search_term_obj)
+                db.add(existing_term)
                 search_terms_synced += 1
             else:
                 # Update last seen date
-                existing_term.last_seen = max(existing_term.last_seen, row.segments.date)
+                existing_term.last_seen = max(existing_term.last_seen or row_date, row_date)
+            terms[search_term_id] = existing_term
+            
+            # A term can match several keywords on the same day; sum them into one daily fact
+            day_metrics = daily_metrics.setdefault((search_term_id, row_date), {
+                "impressions": 0, "clicks": 0, "cost_micros": 0, "conversions": 0.0, "conversions_value": 0.0
+            })
+            day_metrics["impressions"] += row.metrics.impressions
+            day_metrics["clicks"] += row.metrics.clicks
+            day_metrics["cost_micros"] += row.metrics.cost_micros
+            day_metrics["conversions"] += row.metrics.conversions
+            day_metrics["conversions_value"] += row.metrics.conversions_value
+        
+        db.flush()
+        metric_days_recorded = record_search_term_metrics(db, daily_metrics)
         
         db.commit()
         
         return {
             "status": "success",
             "search_terms_synced": search_terms_synced,
+            "metric_days_recorded": metric_days_recorded,
             "total_rows_processed": len(results)
         }
         
@@ -220,7 +364,7 @@ def sync_campaigns(
         results = ads_client.execute_query(query, customer_id)
         
         campaigns_updated = set()
-        daily_metrics_added = 0
+        daily_rows = {}
         
         for row in results:
             campaign_id = str(row.campaign.id)
@@ -233,27 +377,18 @@ def sync_campaigns(
                     campaign.status = row.campaign.status.name
                     campaigns_updated.add(campaign_id)
             
-            # Add daily metric
-            metric_id = create_composite_id(str(row.segments.date), "campaign", campaign_id)
-            existing_metric = db.query(DailyMetric).filter(DailyMetric.id == metric_id).first()
-            
-            if not existing_metric:
-                daily_metric = DailyMetric(
-                    id=metric_id,
-                    date=row.segments.date,
-                    level="campaign",
-                    ref_id=campaign_id,
-                    cost_micros=row.metrics.cost_micros
-                )
-                db.add(daily_metric)
-                daily_metrics_added += 1
+            # Daily metric; restated days update the stored row and its rollups
+            metric_date = datetime.strptime(str(row.segments.date), "%Y-%m-%d").date()
+            daily_rows[(campaign_id, metric_date)] = {"cost_micros": row.metrics.cost_micros}
         
+        written = write_daily_metrics(db, "campaign", daily_rows)
         db.commit()
         
         return {
             "status": "success",
             "campaigns_updated": len(campaigns_updated),
-            "daily_metrics_added": daily_metrics_added,
+            "daily_metrics_added": written["inserted"],
+            "daily_metrics_restated": written["updated"],
             "total_rows_processed": len(results)
         }
         
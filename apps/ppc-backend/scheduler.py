@@ -15,8 +15,10 @@ from sqlalchemy import create_engine, and_
 from sqlalchemy.orm import sessionmaker
 import os
 
+from database import SQLITE_TUNING, apply_sqlite_profile
 from models_vault import OAuthTokenVault, AdAccountConnection, ConnectionStatus
 from services.token_service import TokenService
+from services.audit_partitions import run_audit_retention
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,8 @@ class TokenRefreshScheduler:
             raise ValueError("DATABASE_URL not set")
         
         self.engine = create_engine(self.database_url)
+        if self.database_url.startswith("sqlite") and SQLITE_TUNING:
+            apply_sqlite_profile(self.engine)
         self.SessionLocal = sessionmaker(bind=self.engine)
         
         self.scheduler = AsyncIOScheduler()
@@ -192,6 +196,28 @@ class TokenRefreshScheduler:
         finally:
             db.close()
     
+    async def run_audit_retention(self):
+        """
+        Maintain audit log partitions and archive those past the retention period.
+        """
+        db = self.SessionLocal()
+        
+        try:
+            # Archiving streams whole partitions to disk; keep it off the event loop
+            result = await asyncio.to_thread(run_audit_retention, db)
+            logger.info(
+                f"Audit retention complete: {len(result['partitions_created'])} created, "
+                f"{len(result['partitions_rotated'])} rotated, "
+                f"{len(result['partitions_archived'])} archived"
+            )
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error in run_audit_retention: {e}", exc_info=True)
+            db.rollback()
+        finally:
+            db.close()
+    
     def start(self):
         """Start the scheduler with all jobs."""
         if self._running:
@@ -225,6 +251,15 @@ class TokenRefreshScheduler:
             max_instances=1,
         )
         
+        self.scheduler.add_job(
+            self.run_audit_retention,
+            trigger=IntervalTrigger(hours=24),
+            id="audit_retention",
+            name="Audit log partitions and retention",
+            replace_existing=True,
+            max_instances=1,
+        )
+        
         self.scheduler.start()
         self._running = True
         
@@ -232,6 +267,7 @@ class TokenRefreshScheduler:
         logger.info("  - Refresh expiring tokens: every 10 minutes")
         logger.info("  - Health check: every hour")
         logger.info("  - Cleanup expired: every 6 hours")
+        logger.info("  - Audit retention: every 24 hours")
     
     def shutdown(self):
         """Gracefully shutdown the scheduler."""
@@ -0,0 +1,284 @@
+"""
+Cross-platform ad_metrics ingestion sink.
+
+Every platform fetcher normalizes its rows with ad_metric_row and hands
+them to an AdMetricsSink, which buffers them and writes fixed-size batches
+as idempotent upserts on the uniq_row key (platform, date, account,
+campaign, ad group, ad). Re-running a fetch for the same days restates the
+stored rows instead of duplicating them.
+
+Rows go to the application database unless AD_METRICS_DATABASE_URL points
+the sink at another one (e.g. the shared MySQL database of
+migrations/001_init.sql).
+
+The raw source row is kept as JSON by default; AD_METRICS_RAW_MODE=compressed
+stores it zlib-compressed (read it back with decode_raw) and none drops it.
+MySQL's raw column only takes JSON, so there a compressed payload is
+stored as a JSON string.
+"""
+
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import base64
+import json
+import os
+import logging
+import zlib
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import SessionLocal
+from models import AdMetric
+from services.bulk_load import copy_upsert, use_bulk_load
+
+logger = logging.getLogger(__name__)
+
+AD_METRICS_DATABASE_URL = os.getenv("AD_METRICS_DATABASE_URL")
+AD_METRICS_BATCH_SIZE = int(os.getenv("AD_METRICS_BATCH_SIZE", "1000"))
+AD_METRICS_RAW_MODE = os.getenv("AD_METRICS_RAW_MODE", "full").lower()
+
+RAW_MODES = ("full", "compressed", "none")
+
+# Marks a compressed raw payload, which is otherwise plain JSON
+COMPRESSED_RAW_PREFIX = "zlib:"
+
+PLATFORMS = ("google", "microsoft", "linkedin", "reddit", "x")
+
+AD_METRICS_KEY_COLUMNS = ("platform", "date", "account_id", "campaign_id", "adgroup_id", "ad_id")
+AD_METRICS_VALUE_COLUMNS = ("impressions", "clicks", "spend", "conversions", "revenue", "raw")
+
+
+def encode_raw(raw: Any, mode: Optional[str] = None) -> Optional[str]:
+    """
+    Serialize a raw source row for the raw column.
+
+    Args:
+        raw: Source row, or an already serialized JSON string
+        mode: full (JSON), compressed (zlib + base64 behind
+            COMPRESSED_RAW_PREFIX) or none; defaults to AD_METRICS_RAW_MODE
+    """
+    mode = mode or AD_METRICS_RAW_MODE
+    if mode not in RAW_MODES:
+        raise ValueError(f"Unknown raw mode: {mode}")
+
+    if raw is None or mode == "none":
+        return None
+
+    payload = raw if isinstance(raw, str) else json.dumps(raw, default=str)
+    if mode == "full" or payload.startswith(COMPRESSED_RAW_PREFIX):
+        return payload
+    return COMPRESSED_RAW_PREFIX + base64.b64encode(zlib.compress(payload.encode("utf-8"))).decode("ascii")
+
+
+def decode_raw(value: Optional[str]) -> Any:
+    """Parse a stored raw column, compressed or not."""
+    if not value:
+        return None
+    if value.startswith(f'"{COMPRESSED_RAW_PREFIX}'):
+        value = json.loads(value)
+    if value.startswith(COMPRESSED_RAW_PREFIX):
+        value = zlib.decompress(base64.b64decode(value[len(COMPRESSED_RAW_PREFIX):])).decode("utf-8")
+    return json.loads(value)
+
+
+def ad_metric_row(
+    platform: str,
+    day,
+    account_id,
+    campaign_id,
+    adgroup_id=None,
+    ad_id=None,
+    impressions=0,
+    clicks=0,
+    spend=0.0,
+    conversions=0.0,
+    revenue=0.0,
+    raw: Any = None,
+    raw_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a normalized ad_metrics row.
+
+    Args:
+        platform: One of PLATFORMS
+        day: Metric date, as a date or YYYY-MM-DD string
+        account_id, campaign_id, adgroup_id, ad_id: Platform IDs; missing ad
+            group and ad IDs are stored as "" so they stay part of the key
+        impressions, clicks, spend, conversions, revenue: Metric values;
+            spend and revenue in currency units, not micros
+        raw: Source row, stored as JSON
+        raw_mode: How to store raw, as for encode_raw
+
+    Returns:
+        Dict of AdMetric column values
+    """
+    if platform not in PLATFORMS:
+        raise ValueError(f"Unknown platform: {platform}")
+
+    if isinstance(day, datetime):
+        day = day.date()
+    elif not isinstance(day, date):
+        day = datetime.strptime(str(day)[:10], "%Y-%m-%d").date()
+
+    return {
+        "platform": platform,
+        "date": day,
+        "account_id": str(account_id),
+        "campaign_id": str(campaign_id),
+        "adgroup_id": "" if adgroup_id is None else str(adgroup_id),
+        "ad_id": "" if ad_id is None else str(ad_id),
+        "impressions": int(impressions or 0),
+        "clicks": int(clicks or 0),
+        "spend": float(spend or 0),
+        "conversions": float(conversions or 0),
+        "revenue": float(revenue or 0),
+        "raw": encode_raw(raw, raw_mode),
+    }
+
+
+def upsert_ad_metrics(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Upsert normalized rows on uniq_row in one statement.
+
+    Args:
+        db: Database session (the caller commits)
+        rows: Rows from ad_metric_row; later rows win when a key repeats
+
+    Returns:
+        Number of distinct rows written
+    """
+    # A single upsert statement can't touch the same row twice
+    rows = list({tuple(row[name] for name in AD_METRICS_KEY_COLUMNS): row for row in rows}.values())
+    if not rows:
+        return 0
+
+    table = AdMetric.__table__
+    dialect = db.get_bind().dialect.name
+
+    if use_bulk_load(db, len(rows)):
+        copy_upsert(db, table, rows, AD_METRICS_KEY_COLUMNS)
+        return len(rows)
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        statement = insert(table)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(AD_METRICS_KEY_COLUMNS),
+            set_={
+                **{name: statement.excluded[name] for name in AD_METRICS_VALUE_COLUMNS},
+                "updated_at": func.now(),
+            }
+        ), rows)
+        return len(rows)
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+
+        # The raw column is JSON: a compressed payload goes in as a JSON string
+        rows = [
+            {**row, "raw": json.dumps(row["raw"])} if (row["raw"] or "").startswith(COMPRESSED_RAW_PREFIX) else row
+            for row in rows
+        ]
+        statement = insert(table)
+        db.execute(statement.on_duplicate_key_update(
+            **{name: statement.inserted[name] for name in AD_METRICS_VALUE_COLUMNS},
+            updated_at=func.now()
+        ), rows)
+        return len(rows)
+
+    for row in rows:
+        key = {name: row[name] for name in AD_METRICS_KEY_COLUMNS}
+        metric = db.query(AdMetric).filter_by(**key).with_for_update().first()
+        if metric is None:
+            db.add(AdMetric(**row))
+        else:
+            for name in AD_METRICS_VALUE_COLUMNS:
+                setattr(metric, name, row[name])
+    return len(rows)
+
+
+def ad_metrics_session_factory() -> Callable:
+    """Session factory for the database holding ad_metrics (and the ingestors' agent_runs)."""
+    if not AD_METRICS_DATABASE_URL:
+        return SessionLocal
+    return sessionmaker(bind=create_engine(AD_METRICS_DATABASE_URL, pool_pre_ping=True))
+
+
+class AdMetricsSink:
+    """
+    Buffers normalized ad_metrics rows and writes them in batches.
+
+    Each batch is upserted and committed in its own transaction, so an
+    interrupted ingestion keeps the batches already written and can simply
+    be re-run.
+
+    Usage:
+        with AdMetricsSink() as sink:
+            for row in rows:
+                sink.write(ad_metric_row("reddit", ...))
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None, batch_size: int = AD_METRICS_BATCH_SIZE):
+        self.session_factory = session_factory or ad_metrics_session_factory()
+        self.batch_size = batch_size
+        self._buffer: List[Dict[str, Any]] = []
+        self.stats = {"rows_received": 0, "rows_written": 0, "batches": 0}
+
+    def write(self, row: Dict[str, Any]):
+        """Queue one row, writing a batch once batch_size rows are buffered."""
+        self._buffer.append(row)
+        self.stats["rows_received"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.write(row)
+
+    def flush(self) -> int:
+        """Write the buffered rows; returns how many were written."""
+        if not self._buffer:
+            return 0
+
+        batch, self._buffer = self._buffer, []
+        db = self.session_factory()
+        try:
+            written = upsert_ad_metrics(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["rows_written"] += written
+        self.stats["batches"] += 1
+        return written
+
+    def close(self) -> Dict[str, int]:
+        """Flush what is left and return the sink's counters."""
+        self.flush()
+        logger.info(
+            f"ad_metrics sink: {self.stats['rows_written']} rows written "
+            f"in {self.stats['batches']} batches"
+        )
+        return dict(self.stats)
+
+    def __enter__(self) -> "AdMetricsSink":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+            return
+
+        # Keep the rows fetched before the failure without masking it
+        try:
+            self.close()
+        except Exception as e:
+            logger.error(f"ad_metrics sink flush failed: {e}")
@@ -0,0 +1,98 @@
+"""
+Run history and resume checkpoints for the ingestion agents.
+
+Each run is one agent_runs row keyed by (agent, run_id). Long runs call
+checkpoint_run as they make progress; watermark records how far the run
+got (for the date-chunked backfills, the last day whose data is fully
+written), so a crashed run started again with the same run_id picks up
+after it. stats holds JSON: the run's parameters and counters.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+import json
+import logging
+
+from sqlalchemy.orm import Session
+
+from models import AgentRun
+
+logger = logging.getLogger(__name__)
+
+
+def run_stats(run: AgentRun) -> Dict[str, Any]:
+    return json.loads(run.stats) if run.stats else {}
+
+
+def get_run(db: Session, agent: str, run_id: str) -> Optional[AgentRun]:
+    return db.query(AgentRun).filter(AgentRun.agent == agent, AgentRun.run_id == run_id).first()
+
+
+def start_run(db: Session, agent: str, run_id: str, stats: Optional[Dict[str, Any]] = None) -> AgentRun:
+    """
+    Record a run as started, or restarted if (agent, run_id) already exists.
+
+    A restarted run keeps its watermark and earlier stats (updated with
+    stats), and is marked unfinished again.
+
+    Returns:
+        The agent_runs row
+    """
+    run = get_run(db, agent, run_id)
+    if run is None:
+        run = AgentRun(agent=agent, run_id=run_id, started_at=datetime.utcnow())
+        db.add(run)
+    elif run.watermark:
+        logger.info(f"Resuming {agent} run {run_id} after watermark {run.watermark}")
+
+    run.finished_at = None
+    run.ok = None
+    run.stats = json.dumps({**run_stats(run), **(stats or {})}, default=str)
+    db.commit()
+    return run
+
+
+def checkpoint_run(db: Session, agent: str, run_id: str, watermark: str, stats: Optional[Dict[str, Any]] = None):
+    """Advance a run's watermark, merging stats into the stored ones, and commit."""
+    run = get_run(db, agent, run_id)
+    if run is None:
+        raise ValueError(f"Unknown run: {agent} {run_id}")
+
+    run.watermark = watermark
+    if stats:
+        run.stats = json.dumps({**run_stats(run), **stats}, default=str)
+    db.commit()
+
+
+def finish_run(db: Session, agent: str, run_id: str, ok: bool, stats: Optional[Dict[str, Any]] = None):
+    """Mark a run finished, merging stats into the stored ones, and commit."""
+    run = get_run(db, agent, run_id)
+    if run is None:
+        raise ValueError(f"Unknown run: {agent} {run_id}")
+
+    run.finished_at = datetime.utcnow()
+    run.ok = ok
+    if stats:
+        run.stats = json.dumps({**run_stats(run), **stats}, default=str)
+    db.commit()
+
+
+def latest_unfinished_run(db: Session, agent: str, match: Dict[str, Any]) -> Optional[AgentRun]:
+    """
+    The most recent run of agent that didn't succeed and whose stats contain match.
+
+    Lets a backfill resume without its run_id: match holds the parameters
+    that make two runs the same backfill (account, range, chunking).
+    """
+    runs = (
+        db.query(AgentRun)
+        .filter(AgentRun.agent == agent, (AgentRun.ok.is_(None)) | (AgentRun.ok.is_(False)))
+        .order_by(AgentRun.id.desc())
+        .limit(50)
+        .all()
+    )
+    for run in runs:
+        stats = run_stats(run)
+        if all(stats.get(key) == value for key, value in match.items()):
+            return run
+    return None
@@ -0,0 +1,396 @@
+"""
+Monthly partitions and archival for audit logs.
+
+On Postgres audit_logs is natively partitioned by month on timestamp
+(see migration 006); partitions are created ahead of time and a DEFAULT
+partition catches anything outside them, until the retention job moves
+those rows into partitions of their own. On SQLite new entries land in
+audit_logs and closed months are rotated into per-month tables
+(audit_logs_YYYY_MM), which readers see through a UNION ALL.
+
+The retention job writes partitions older than AUDIT_RETENTION_DAYS to
+AUDIT_ARCHIVE_DIR as NDJSON.gz (newest entry first) and drops them.
+Readers continue into the archives when a date range reaches past the
+live partitions.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+import gzip
+import json
+import os
+import re
+import logging
+
+from sqlalchemy import Column, Index, MetaData, Table, and_, inspect, select, text, union_all
+from sqlalchemy.orm import Session, aliased
+
+from models import AuditLog
+from services.audit_writer import AUDIT_PAYLOAD_COLUMNS, payload_columns
+
+logger = logging.getLogger(__name__)
+
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "365"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "./audit_archive")
+
+# Postgres partitions are created this many months ahead of the current one
+PARTITION_MONTHS_AHEAD = 2
+
+DEFAULT_PARTITION = "audit_logs_default"
+
+# SQLite keeps the current and previous month in audit_logs before rotating
+ROTATION_LAG_MONTHS = 1
+
+PARTITION_NAME = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+ARCHIVE_NAME = re.compile(r"^audit_logs_(\d{4})_(\d{2})\.ndjson\.gz$")
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def month_start(day) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_logs_{month:%Y_%m}"
+
+
+def _month_from_name(pattern, name: str) -> Optional[date]:
+    match = pattern.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _is_partitioned(db: Session) -> bool:
+    """Whether audit_logs is a native Postgres partitioned table."""
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'audit_logs'"
+    )).scalar())
+
+
+def _month_table(month: date) -> Table:
+    """Table object for a month partition, with the same columns and indexes as audit_logs."""
+    name = partition_name(month)
+    table = Table(name, MetaData(), *[
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in AuditLog.__table__.columns
+    ])
+    for index in AuditLog.__table__.indexes:
+        Index(index.name.replace("audit_logs", name, 1), *[table.c[column.name] for column in index.columns])
+    return table
+
+
+def list_partitions(db: Session) -> List[date]:
+    """Months that currently have a partition table, oldest first."""
+    if _is_postgres(db):
+        names = db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'audit_logs'"
+        )).scalars()
+    else:
+        names = inspect(db.get_bind()).get_table_names()
+
+    return sorted(filter(None, (_month_from_name(PARTITION_NAME, name) for name in names)))
+
+
+def _default_partition_months(db: Session) -> List[date]:
+    """Months with rows in the DEFAULT partition (Postgres)."""
+    if not db.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar():
+        return []
+    return sorted(month_start(month) for month in db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', timestamp) FROM {DEFAULT_PARTITION}"
+    )).scalars())
+
+
+def _create_partition(db: Session, month: date, from_default: bool):
+    """Create a month partition, moving the month's rows out of the DEFAULT partition first if it has any."""
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+
+    if not from_default:
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_logs {bounds}"))
+        return
+
+    # Postgres refuses a partition for a range the DEFAULT partition holds
+    # rows in, so detach it while they move across
+    in_month = f"timestamp >= '{start}' AND timestamp < '{end}'"
+    db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.execute(text(f"CREATE TABLE {name} PARTITION OF audit_logs {bounds}"))
+    moved = db.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_month}")).rowcount
+    db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"))
+    db.execute(text(f"ALTER TABLE audit_logs ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info(f"Moved {moved} audit logs from {DEFAULT_PARTITION} into {name}")
+
+
+def ensure_partitions(db: Session, today: Optional[date] = None) -> List[str]:
+    """
+    Create Postgres partitions for the current month and the next few.
+
+    Months the DEFAULT partition holds rows for (e.g. after the job did not
+    run for a while) get partitions too, with their rows moved in, so they
+    are archived like any other month. Each month is created in its own
+    transaction; failures are logged and skipped.
+
+    No-op on other dialects and when audit_logs is not partitioned.
+    Returns the names of the partitions created.
+    """
+    if not _is_postgres(db) or not _is_partitioned(db):
+        return []
+
+    current = month_start(today or date.today())
+    existing = set(list_partitions(db))
+    upcoming = {add_months(current, offset) for offset in range(PARTITION_MONTHS_AHEAD + 1)}
+    stranded = set(_default_partition_months(db))
+
+    created = []
+    for month in sorted((upcoming | stranded) - existing):
+        try:
+            _create_partition(db, month, from_default=month in stranded)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Creating audit log partition {partition_name(month)} failed: {e}")
+            continue
+        created.append(partition_name(month))
+
+    return created
+
+
+def rotate_partitions(db: Session, today: Optional[date] = None) -> List[str]:
+    """
+    Move closed months out of audit_logs into per-month tables (SQLite).
+
+    The current month and the previous ROTATION_LAG_MONTHS stay in
+    audit_logs. Returns the names of the partitions written to.
+    """
+    if _is_postgres(db):
+        return []
+
+    keep_from = add_months(month_start(today or date.today()), -ROTATION_LAG_MONTHS)
+    live = AuditLog.__table__
+
+    oldest = db.query(AuditLog.timestamp).filter(
+        AuditLog.timestamp < datetime.combine(keep_from, datetime.min.time())
+    ).order_by(AuditLog.timestamp).first()
+    if not oldest:
+        return []
+
+    rotated = []
+    month = month_start(oldest[0])
+    while month < keep_from:
+        start = datetime.combine(month, datetime.min.time())
+        end = datetime.combine(add_months(month, 1), datetime.min.time())
+        in_month = and_(live.c.timestamp >= start, live.c.timestamp < end)
+
+        if db.query(AuditLog.id).filter(in_month).first():
+            table = _month_table(month)
+            table.create(db.get_bind(), checkfirst=True)
+            db.execute(table.insert().from_select(
+                [column.name for column in live.columns],
+                select(*live.columns).where(in_month)
+            ))
+            db.execute(live.delete().where(in_month))
+            db.commit()
+            rotated.append(table.name)
+
+        month = add_months(month, 1)
+
+    if rotated:
+        logger.info(f"Rotated audit logs into {', '.join(rotated)}")
+    return rotated
+
+
+def audit_log_entity(db: Session, since: Optional[datetime] = None):
+    """
+    Entity to query audit logs through, covering every live partition from `since` on.
+
+    Returns AuditLog itself on Postgres (the planner prunes partitions) and
+    when no month tables are needed, otherwise an alias over a UNION ALL of
+    audit_logs and the month tables.
+    """
+    if _is_postgres(db):
+        return AuditLog
+
+    months = list_partitions(db)
+    if since is not None:
+        months = [month for month in months if add_months(month, 1) > month_start(since)]
+    if not months:
+        return AuditLog
+
+    live = AuditLog.__table__
+    tables = [live] + [_month_table(month) for month in months]
+    union = union_all(*[
+        select(*[table.c[column.name] for column in live.columns]) for table in tables
+    ]).subquery("audit_logs_all")
+
+    return aliased(AuditLog, union, adapt_on_names=True)
+
+
+def log_record(log: AuditLog) -> Dict:
+    """Serialize an audit log row the way it is stored in archives."""
+    return {
+        "id": log.id,
+        "action": log.action,
+        "payload_json": log.payload_json,
+        "user": log.user,
+        "timestamp": log.timestamp.isoformat(),
+        "result": log.result,
+        "google_change_id": log.google_change_id,
+        "error_message": log.error_message,
+        "validate_only": log.validate_only,
+        "customer_id": log.customer_id,
+        **{name: getattr(log, name) for name in AUDIT_PAYLOAD_COLUMNS},
+    }
+
+
+def archived_months(archive_dir: str = AUDIT_ARCHIVE_DIR) -> List[date]:
+    """Months with an archive file, oldest first."""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(filter(None, (_month_from_name(ARCHIVE_NAME, name) for name in os.listdir(archive_dir))))
+
+
+def archive_path(month: date, archive_dir: str = AUDIT_ARCHIVE_DIR) -> str:
+    return os.path.join(archive_dir, f"{partition_name(month)}.ndjson.gz")
+
+
+def archives_reached(since: Optional[datetime], archive_dir: str = AUDIT_ARCHIVE_DIR) -> bool:
+    """Whether a range starting at `since` reaches into archived months."""
+    if since is None:
+        return False
+    months = archived_months(archive_dir)
+    return bool(months) and month_start(since) <= months[-1]
+
+
+def iter_archived_logs(
+    since: Optional[datetime] = None,
+    action: Optional[str] = None,
+    result: Optional[str] = None,
+    user: Optional[str] = None,
+    before: Optional[Tuple[datetime, str]] = None,
+    archive_dir: str = AUDIT_ARCHIVE_DIR,
+    payload_filters: Optional[Dict[str, str]] = None
+) -> Iterator[Dict]:
+    """
+    Stream archived audit records, newest first, matching the filters.
+
+    `before` is a (timestamp, id) keyset position; only records strictly
+    after it in (timestamp, id) descending order are returned.
+    `payload_filters` match the extracted payload columns by value.
+    """
+    payload_filters = {name: value for name, value in (payload_filters or {}).items() if value}
+
+    for month in reversed(archived_months(archive_dir)):
+        if since is not None and add_months(month, 1) <= month_start(since):
+            break
+        if before is not None and month > before[0].date():
+            continue
+
+        with gzip.open(archive_path(month, archive_dir), "rt") as archive:
+            for line in archive:
+                record = json.loads(line)
+                timestamp = datetime.fromisoformat(record["timestamp"])
+
+                if since is not None and timestamp < since:
+                    # Records are ordered newest first
+                    break
+                if before is not None and (timestamp, record["id"]) >= before:
+                    continue
+                if action and record["action"] != action:
+                    continue
+                if result and record["result"] != result:
+                    continue
+                if user and record["user"] != user:
+                    continue
+                if payload_filters:
+                    if any(name not in record for name in payload_filters):
+                        # Archived before the payload columns existed
+                        record.update(payload_columns(json.loads(record["payload_json"] or "null")))
+                    if any(record[name] != value for name, value in payload_filters.items()):
+                        continue
+
+                yield record
+
+
+def _write_archive(db: Session, table, month: date, archive_dir: str) -> int:
+    """Stream one partition to its archive file; the file only appears once complete."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = archive_path(month, archive_dir)
+    temporary = path + ".tmp"
+
+    rows = db.execute(
+        select(table).order_by(table.c.timestamp.desc(), table.c.id.desc()).execution_options(
+            yield_per=ARCHIVE_BATCH_SIZE
+        )
+    )
+
+    count = 0
+    with open(temporary, "wb") as raw:
+        with gzip.open(raw, "wt") as archive:
+            for row in rows:
+                archive.write(json.dumps(log_record(row)) + "\n")
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    os.replace(temporary, path)
+    return count
+
+
+def archive_partitions(
+    db: Session,
+    retention_days: int = AUDIT_RETENTION_DAYS,
+    archive_dir: str = AUDIT_ARCHIVE_DIR,
+    today: Optional[date] = None
+) -> List[Dict]:
+    """
+    Archive and drop partitions whose whole month is older than the retention period.
+
+    Returns one entry per archived partition with its file and row count.
+    """
+    cutoff = (today or date.today()) - timedelta(days=retention_days)
+
+    archived = []
+    for month in list_partitions(db):
+        if add_months(month, 1) > cutoff:
+            continue
+
+        name = partition_name(month)
+        table = _month_table(month)
+        rows = _write_archive(db, table, month, archive_dir)
+
+        if _is_postgres(db):
+            db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+
+        logger.info(f"Archived {rows} audit logs from {name} to {archive_path(month, archive_dir)}")
+        archived.append({"partition": name, "rows": rows, "file": archive_path(month, archive_dir)})
+
+    return archived
+
+
+def run_audit_retention(
+    db: Session,
+    retention_days: int = AUDIT_RETENTION_DAYS,
+    archive_dir: str = AUDIT_ARCHIVE_DIR,
+    today: Optional[date] = None
+) -> Dict:
+    """Create upcoming partitions, rotate closed months and archive expired ones."""
+    return {
+        "partitions_created": ensure_partitions(db, today),
+        "partitions_rotated": rotate_partitions(db, today),
+        "partitions_archived": archive_partitions(db, retention_days, archive_dir, today),
+    }
@@ -0,0 +1,243 @@
+"""
+Audit log summaries.
+
+The result/action/validation/user breakdown is computed in a single pass:
+with GROUPING SETS on Postgres, or one grouped scan folded in Python on
+other dialects. When rollups are enabled, every audit write also bumps a
+daily counter row in audit_rollups, so summaries over whole days read a
+handful of rollup rows instead of scanning audit_logs.
+
+Rollups outlive the partitions the retention job archives, so scanned
+summaries add the archived entries in their window (with_archived_logs)
+to agree with them.
+"""
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+import os
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import AuditLog, AuditRollup
+
+logger = logging.getLogger(__name__)
+
+# Set AUDIT_ROLLUPS_ENABLED=false to skip rollup maintenance on audit writes
+AUDIT_ROLLUPS_ENABLED = os.getenv("AUDIT_ROLLUPS_ENABLED", "true").lower() == "true"
+
+
+ROLLUP_KEY_COLUMNS = ("date", "action", "result", "user", "validate_only")
+
+
+def _is_dry_run(validate_only: Optional[bool]) -> bool:
+    """Entries without a validate_only flag count as dry runs, like the column default."""
+    return True if validate_only is None else bool(validate_only)
+
+
+def _rollup_key(log: AuditLog) -> Tuple:
+    return (
+        log.timestamp.date(),
+        log.action,
+        log.result or "",
+        log.user,
+        _is_dry_run(log.validate_only),
+    )
+
+
+def record_audit_rollups(db: Session, logs: Iterable[AuditLog]):
+    """
+    Count audit log entries in their daily rollup rows.
+
+    Entries are grouped in Python first, so a batch costs one upsert per
+    distinct rollup row. Runs in the caller's transaction, so the rollups
+    commit together with the log entries.
+    """
+    if not AUDIT_ROLLUPS_ENABLED:
+        return
+
+    counts = Counter(_rollup_key(log) for log in logs)
+    dialect = db.get_bind().dialect.name
+
+    for key, count in counts.items():
+        key = dict(zip(ROLLUP_KEY_COLUMNS, key))
+
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+
+            statement = insert(AuditRollup).values(**key, count=count)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=list(ROLLUP_KEY_COLUMNS),
+                set_={"count": AuditRollup.count + count}
+            ))
+            continue
+
+        rollup = db.query(AuditRollup).filter_by(**key).with_for_update().first()
+        if rollup:
+            rollup.count += count
+        else:
+            db.add(AuditRollup(**key, count=count))
+
+
+def record_audit_rollup(db: Session, log: AuditLog):
+    """Count a single audit log entry in its daily rollup row."""
+    record_audit_rollups(db, [log])
+
+
+def _fold(rows: Iterable[Tuple]) -> Dict:
+    """Fold (action, result, validate_only, user, count) rows into the summary breakdown."""
+    by_result, by_action, by_user = Counter(), Counter(), Counter()
+    by_validation = {"dry_run": 0, "live": 0}
+    total = 0
+
+    for action, result, validate_only, user, count in rows:
+        count = int(count or 0)
+        total += count
+        by_result[result or None] += count
+        by_action[action] += count
+        by_user[user] += count
+        by_validation["dry_run" if _is_dry_run(validate_only) else "live"] += count
+
+    return {
+        "total_actions": total,
+        "breakdown": {
+            "by_result": dict(by_result),
+            "by_action": dict(by_action),
+            "by_validation": by_validation,
+            "by_user": dict(by_user),
+        }
+    }
+
+
+def _summarize_grouping_sets(db: Session, since: datetime) -> Dict:
+    """One scan on Postgres: each GROUPING SETS row carries a single dimension."""
+    dimensions = (AuditLog.result, AuditLog.action, AuditLog.validate_only, AuditLog.user)
+
+    rows = db.query(
+        *dimensions,
+        *[func.grouping(column) for column in dimensions],
+        func.count(AuditLog.id)
+    ).filter(
+        AuditLog.timestamp >= since
+    ).group_by(func.grouping_sets(*dimensions)).all()
+
+    by_result, by_action, by_user = {}, {}, {}
+    by_validation = {"dry_run": 0, "live": 0}
+
+    for result, action, validate_only, user, g_result, g_action, g_validate, g_user, count in rows:
+        # grouping(column) is 0 for the column the row is grouped by
+        if g_result == 0:
+            by_result[result] = count
+        elif g_action == 0:
+            by_action[action] = count
+        elif g_validate == 0:
+            by_validation["dry_run" if _is_dry_run(validate_only) else "live"] += count
+        elif g_user == 0:
+            by_user[user] = count
+
+    return {
+        "total_actions": sum(by_result.values()),
+        "breakdown": {
+            "by_result": by_result,
+            "by_action": by_action,
+            "by_validation": by_validation,
+            "by_user": by_user,
+        }
+    }
+
+
+def _summarize_scan(db: Session, since: datetime, entity=AuditLog) -> Dict:
+    """One grouped scan over every breakdown column, folded per dimension in Python."""
+    rows = db.query(
+        entity.action,
+        entity.result,
+        entity.validate_only,
+        entity.user,
+        func.count(entity.id)
+    ).filter(
+        entity.timestamp >= since
+    ).group_by(
+        entity.action, entity.result, entity.validate_only, entity.user
+    ).all()
+
+    return _fold(rows)
+
+
+def _summarize_rollups(db: Session, since_date: date) -> Dict:
+    rows = db.query(
+        AuditRollup.action,
+        AuditRollup.result,
+        AuditRollup.validate_only,
+        AuditRollup.user,
+        func.sum(AuditRollup.count)
+    ).filter(
+        AuditRollup.date >= since_date
+    ).group_by(
+        AuditRollup.action, AuditRollup.result, AuditRollup.validate_only, AuditRollup.user
+    ).all()
+
+    return _fold(rows)
+
+
+def summarize_audit_logs(db: Session, since: datetime, use_rollups: bool = False, entity=AuditLog) -> Dict:
+    """
+    Summarize audit logs since a point in time.
+
+    Args:
+        db: Database session
+        since: Start of the summary window
+        use_rollups: Read daily rollups (whole days starting at since's date)
+            instead of scanning audit_logs; ignored when rollups are disabled
+        entity: What to scan, AuditLog or an alias over its partitions
+
+    Returns:
+        Dict with total_actions, the breakdown and the source used
+    """
+    if use_rollups and AUDIT_ROLLUPS_ENABLED:
+        return {**_summarize_rollups(db, since.date()), "source": "rollups"}
+
+    if db.get_bind().dialect.name == "postgresql":
+        return {**_summarize_grouping_sets(db, since), "source": "grouping_sets"}
+
+    return {**_summarize_scan(db, since, entity), "source": "scan"}
+
+
+def with_archived_logs(summary: Dict, since: datetime) -> Dict:
+    """
+    Add the archived entries since a point in time to a scanned summary.
+
+    Archives are gzip files read synchronously; async callers should run
+    this in a thread.
+
+    Returns:
+        The summary with archived entries counted in, and archived_actions
+        set to how many there were
+    """
+    # audit_partitions writes through audit_writer, which imports this module
+    from services.audit_partitions import archives_reached, iter_archived_logs
+
+    if not archives_reached(since):
+        return {**summary, "archived_actions": 0}
+
+    archived = _fold(
+        (record["action"], record["result"], record["validate_only"], record["user"], 1)
+        for record in iter_archived_logs(since)
+    )
+
+    breakdown = {}
+    for name, counts in summary["breakdown"].items():
+        breakdown[name] = dict(counts)
+        for key, count in archived["breakdown"][name].items():
+            breakdown[name][key] = breakdown[name].get(key, 0) + count
+
+    return {
+        **summary,
+        "total_actions": summary["total_actions"] + archived["total_actions"],
+        "breakdown": breakdown,
+        "archived_actions": archived["total_actions"],
+    }
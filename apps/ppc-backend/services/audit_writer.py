@@ -0,0 +1,265 @@
+"""
+Buffered audit log writer.
+
+Audit entries are queued and written by a background thread in group
+commits, so bulk operations pay one commit per batch instead of one per
+entry. The queue is bounded: when it is full, submitters block until the
+writer catches up. Callers that must not respond before their entry is
+durable (live mutations) wait for it with wait_for(), after committing
+their own session: on SQLite the writer cannot commit while another
+connection holds an uncommitted write, so the wait would time out.
+
+Commonly queried payload keys are copied into indexed audit_logs columns
+when an entry is built (see payload_columns).
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import queue
+import threading
+import time
+import logging
+
+from sqlalchemy import insert
+
+from database import SessionLocal
+from models import AuditLog
+from services.audit_summary import record_audit_rollups
+
+logger = logging.getLogger(__name__)
+
+# Set AUDIT_BUFFERED_WRITES=false to write every audit entry synchronously
+AUDIT_BUFFERED_WRITES = os.getenv("AUDIT_BUFFERED_WRITES", "true").lower() == "true"
+
+AUDIT_QUEUE_MAX_SIZE = int(os.getenv("AUDIT_QUEUE_MAX_SIZE", "10000"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "0.5"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+
+# How long a submitter blocks on a full queue, and a live mutation waits for its flush
+AUDIT_ENQUEUE_TIMEOUT_SECONDS = 10.0
+AUDIT_FLUSH_TIMEOUT_SECONDS = 10.0
+
+# Failed entries remembered so waiters can be told their entry was lost
+MAX_TRACKED_FAILURES = 1000
+
+# Payload keys stored in their own indexed AuditLog columns
+AUDIT_PAYLOAD_COLUMNS = ("campaign_id", "recommendation_id", "keyword_text", "ad_group_id")
+
+
+def payload_columns(payload: Any) -> Dict[str, Optional[str]]:
+    """
+    Extract the indexed payload keys from an audit payload.
+
+    Scalar values are stored as strings (truncated to the column length);
+    missing keys and nested values are stored as NULL.
+    """
+    columns = dict.fromkeys(AUDIT_PAYLOAD_COLUMNS)
+    if not isinstance(payload, dict):
+        return columns
+
+    for name in AUDIT_PAYLOAD_COLUMNS:
+        value = payload.get(name)
+        if value is None or isinstance(value, (dict, list)):
+            continue
+        columns[name] = str(value)[:AuditLog.__table__.c[name].type.length]
+
+    return columns
+
+
+class AuditWriter:
+    """Background writer that group-commits queued audit entries."""
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        max_queue_size: int = AUDIT_QUEUE_MAX_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = AUDIT_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._queue: "queue.Queue[Tuple[int, Dict[str, Any]]]" = queue.Queue(maxsize=max_queue_size)
+        self._submit_lock = threading.Lock()
+        self._done = threading.Condition()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        # Sequence numbers: entries are written in submission order
+        self._submitted = 0
+        self._written = 0
+        self._failures: "OrderedDict[int, str]" = OrderedDict()
+
+        self._customer_id: Optional[str] = None
+        self._customer_id_resolved = False
+
+        self._stats = {
+            "entries_written": 0,
+            "entries_failed": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "last_flush_latency_ms": None,
+            "max_flush_latency_ms": None,
+            "total_flush_latency_ms": 0.0,
+        }
+
+    @property
+    def customer_id(self) -> Optional[str]:
+        """Customer ID stamped on audit entries, resolved once."""
+        if not self._customer_id_resolved:
+            from ads.client import ads_client
+            try:
+                self._customer_id = ads_client.customer_id
+            except ValueError:
+                self._customer_id = None
+            self._customer_id_resolved = True
+        return self._customer_id
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._submit_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopping = False
+                    self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, entry: Dict[str, Any]) -> int:
+        """
+        Queue an audit entry (AuditLog column values) for writing.
+
+        Blocks while the queue is full. Returns the entry's sequence number
+        for wait_for().
+        """
+        self._ensure_started()
+
+        with self._submit_lock:
+            try:
+                self._queue.put((self._submitted + 1, entry), timeout=AUDIT_ENQUEUE_TIMEOUT_SECONDS)
+            except queue.Full:
+                raise RuntimeError("Audit log queue is full")
+            self._submitted += 1
+            sequence = self._submitted
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        return sequence
+
+    def wait_for(self, sequence: int, timeout: float = AUDIT_FLUSH_TIMEOUT_SECONDS):
+        """
+        Flush now and block until the given entry is committed.
+
+        The caller must not hold an uncommitted write on SQLite (see the
+        module docstring). Raises RuntimeError if the entry could not be
+        written in time.
+        """
+        self._wake.set()
+        with self._done:
+            if not self._done.wait_for(lambda: self._written >= sequence, timeout=timeout):
+                raise RuntimeError(f"Timed out waiting for audit log flush after {timeout}s")
+            if sequence in self._failures:
+                raise RuntimeError(f"Audit log write failed: {self._failures[sequence]}")
+
+    def flush(self, timeout: float = AUDIT_FLUSH_TIMEOUT_SECONDS):
+        """Block until everything submitted so far has been processed."""
+        with self._submit_lock:
+            sequence = self._submitted
+        if sequence:
+            self._ensure_started()
+            with self._done:
+                self._wake.set()
+                self._done.wait_for(lambda: self._written >= sequence, timeout=timeout)
+
+    def close(self, timeout: float = AUDIT_FLUSH_TIMEOUT_SECONDS):
+        """Flush pending entries and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and flush latency of the writer."""
+        batches = self._stats["batches"]
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queue_depth": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "flush_interval_seconds": self.flush_interval,
+            "batch_size": self.batch_size,
+            "entries_submitted": self._submitted,
+            "entries_written": self._stats["entries_written"],
+            "entries_failed": self._stats["entries_failed"],
+            "batches": batches,
+            "last_batch_size": self._stats["last_batch_size"],
+            "last_flush_latency_ms": self._stats["last_flush_latency_ms"],
+            "max_flush_latency_ms": self._stats["max_flush_latency_ms"],
+            "avg_flush_latency_ms": self._stats["total_flush_latency_ms"] / batches if batches else None,
+        }
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+
+            while not self._queue.empty():
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write_batch(batch)
+
+            if self._stopping and self._queue.empty():
+                return
+
+    def _commit(self, entries: List[Dict[str, Any]]):
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditLog), entries)
+            record_audit_rollups(db, [AuditLog(**entry) for entry in entries])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_batch(self, batch: List[Tuple[int, Dict[str, Any]]]):
+        started = time.monotonic()
+        failed = {}
+
+        try:
+            self._commit([entry for _, entry in batch])
+        except Exception as e:
+            logger.error(f"Audit log group commit of {len(batch)} entries failed, retrying individually: {e}")
+            # Isolate the bad entries so the rest of the batch is still written
+            for sequence, entry in batch:
+                try:
+                    self._commit([entry])
+                except Exception as entry_error:
+                    logger.error(f"Audit log write failed for {entry.get('id')}: {entry_error}")
+                    failed[sequence] = str(entry_error)
+
+        latency_ms = (time.monotonic() - started) * 1000
+        self._stats["batches"] += 1
+        self._stats["last_batch_size"] = len(batch)
+        self._stats["entries_written"] += len(batch) - len(failed)
+        self._stats["entries_failed"] += len(failed)
+        self._stats["last_flush_latency_ms"] = latency_ms
+        self._stats["max_flush_latency_ms"] = max(self._stats["max_flush_latency_ms"] or 0, latency_ms)
+        self._stats["total_flush_latency_ms"] += latency_ms
+
+        with self._done:
+            self._failures.update(failed)
+            while len(self._failures) > MAX_TRACKED_FAILURES:
+                self._failures.popitem(last=False)
+            self._written = batch[-1][0]
+            self._done.notify_all()
+
+
+audit_writer = AuditWriter()
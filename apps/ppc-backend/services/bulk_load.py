@@ -0,0 +1,232 @@
+"""
+COPY-based bulk loading for Postgres.
+
+Large syncs stream their normalized rows into a temporary staging table
+with COPY ... FROM STDIN (CSV) and merge the whole batch into the target
+with a single INSERT ... ON CONFLICT, instead of a query and an ORM insert
+per row. use_bulk_load decides per batch: only on Postgres, and only once
+a batch reaches BULK_LOAD_THRESHOLD rows; everything else keeps the ORM
+path.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+import csv
+import io
+import os
+import logging
+import uuid
+
+from sqlalchemy import Table, literal, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Set BULK_LOAD_ENABLED=false to always use the ORM path
+BULK_LOAD_ENABLED = os.getenv("BULK_LOAD_ENABLED", "true").lower() == "true"
+
+# Smallest batch worth staging through COPY
+BULK_LOAD_THRESHOLD = int(os.getenv("BULK_LOAD_THRESHOLD", "5000"))
+
+# Rows buffered per COPY call, bounding memory for very large batches
+COPY_CHUNK_SIZE = 10000
+
+# COPY's NULL marker; CSV reads an unquoted empty field as NULL too, but that
+# would also swallow empty strings
+COPY_NULL = "\\N"
+
+
+def use_bulk_load(db: Session, row_count: int, bulk: Optional[bool] = None) -> bool:
+    """
+    Whether a batch of row_count rows should go through COPY.
+
+    Args:
+        db: Database session
+        row_count: Rows in the batch
+        bulk: Force the choice (True/False); None decides by dialect and
+            BULK_LOAD_THRESHOLD
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    if bulk is not None:
+        return bulk
+    return BULK_LOAD_ENABLED and row_count >= BULK_LOAD_THRESHOLD
+
+
+def _quote(db: Session, name: str) -> str:
+    return db.get_bind().dialect.identifier_preparer.quote(name)
+
+
+def _csv_value(value):
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+def _copy_chunk(cursor, statement: str, rows: List[Sequence]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+    buffer.seek(0)
+    cursor.copy_expert(statement, buffer)
+
+
+def stage_rows(db: Session, table: Table, columns: Sequence[str], rows: Iterable[Sequence]) -> str:
+    """
+    COPY rows into a new temporary table shaped like table's columns.
+
+    Args:
+        db: Database session; staging runs in its current transaction and
+            the table is dropped on commit at the latest
+        table: Target table the staging table copies column types from
+        columns: Column names, in the order of each row's values
+        rows: Row value sequences, streamed in chunks of COPY_CHUNK_SIZE
+
+    Returns:
+        Name of the staging table
+    """
+    staging = f"staging_{table.name}_{uuid.uuid4().hex[:8]}"
+    column_list = ", ".join(_quote(db, name) for name in columns)
+
+    db.execute(text(
+        f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {_quote(db, table.name)} WITH NO DATA"
+    ))
+
+    statement = f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    cursor = db.connection().connection.dbapi_connection.cursor()
+    try:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= COPY_CHUNK_SIZE:
+                _copy_chunk(cursor, statement, chunk)
+                chunk = []
+        if chunk:
+            _copy_chunk(cursor, statement, chunk)
+    finally:
+        cursor.close()
+
+    return staging
+
+
+def _column_defaults(db: Session, table: Table, columns: Sequence[str]) -> Dict[str, str]:
+    """SQL for the client-side defaults (default=...) of columns the batch doesn't carry."""
+    dialect = db.get_bind().dialect
+    defaults = {}
+    for column in table.columns:
+        if column.name in columns or column.default is None:
+            continue
+        if column.default.is_clause_element:
+            defaults[column.name] = str(column.default.arg.compile(dialect=dialect))
+        elif column.default.is_scalar:
+            defaults[column.name] = str(
+                literal(column.default.arg).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            )
+    return defaults
+
+
+def _column_onupdates(db: Session, table: Table, columns: Sequence[str]) -> Dict[str, str]:
+    """SQL for the onupdate=... expressions of columns the batch doesn't carry."""
+    dialect = db.get_bind().dialect
+    return {
+        column.name: str(column.onupdate.arg.compile(dialect=dialect))
+        for column in table.columns
+        if column.name not in columns and column.onupdate is not None and column.onupdate.is_clause_element
+    }
+
+
+def merge_staged(
+    db: Session,
+    table: Table,
+    staging: str,
+    columns: Sequence[str],
+    key_columns: Sequence[str],
+    update: Optional[Dict[str, str]] = None
+) -> Dict[str, int]:
+    """
+    Merge a staging table into table with one INSERT ... ON CONFLICT.
+
+    Args:
+        db: Database session (the caller commits)
+        table: Target table
+        staging: Staging table from stage_rows; must not repeat a key
+        columns: Staged column names
+        key_columns: Conflict target, a unique constraint of table
+        update: SQL expression per column to set on conflict, which may
+            refer to EXCLUDED and the target table; None overwrites every
+            staged non-key column, {} leaves existing rows alone
+
+    Returns:
+        Dict with inserted and updated row counts
+    """
+    target = _quote(db, table.name)
+    defaults = _column_defaults(db, table, columns)
+
+    insert_columns = ", ".join(_quote(db, name) for name in list(columns) + list(defaults))
+    select_columns = ", ".join([_quote(db, name) for name in columns] + list(defaults.values()))
+    conflict = ", ".join(_quote(db, name) for name in key_columns)
+
+    if update is None:
+        update = {name: f"EXCLUDED.{_quote(db, name)}" for name in columns if name not in key_columns}
+
+    if update:
+        update = {**_column_onupdates(db, table, list(columns) + list(update)), **update}
+        action = "DO UPDATE SET " + ", ".join(f"{_quote(db, name)} = {value}" for name, value in update.items())
+    else:
+        action = "DO NOTHING"
+
+    # xmax is 0 only on freshly inserted row versions
+    inserted, updated = db.execute(text(
+        f"WITH merged AS ("
+        f"INSERT INTO {target} ({insert_columns}) SELECT {select_columns} FROM {staging} "
+        f"ON CONFLICT ({conflict}) {action} RETURNING (xmax = 0) AS inserted"
+        f") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+    )).one()
+
+    return {"inserted": inserted, "updated": updated}
+
+
+def drop_staged(db: Session, staging: str):
+    db.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+
+
+def copy_upsert(
+    db: Session,
+    table: Table,
+    rows: List[Dict],
+    key_columns: Sequence[str],
+    update: Optional[Dict[str, str]] = None
+) -> Dict[str, int]:
+    """
+    Upsert rows into table through a COPY-loaded staging table.
+
+    Args:
+        db: Database session (the caller commits)
+        table: Target table
+        rows: Column values per row; every row has the same keys. Later
+            rows win when a key repeats.
+        key_columns: Conflict target, a unique constraint of table
+        update: On-conflict assignments, as for merge_staged
+
+    Returns:
+        Dict with inserted and updated row counts
+    """
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+
+    columns = list(rows[0])
+    # ON CONFLICT can't touch the same row twice in one statement
+    unique = {tuple(row[name] for name in key_columns): row for row in rows}
+
+    staging = stage_rows(db, table, columns, ([row[name] for name in columns] for row in unique.values()))
+    counts = merge_staged(db, table, staging, columns, key_columns, update)
+    drop_staged(db, staging)
+
+    logger.info(
+        f"Bulk loaded {len(unique)} rows into {table.name}: "
+        f"{counts['inserted']} inserted, {counts['updated']} updated"
+    )
+    return counts
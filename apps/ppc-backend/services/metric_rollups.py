@@ -0,0 +1,402 @@
+"""
+Weekly and monthly rollups of daily metrics.
+
+metric_rollups keeps per-period sums of daily_metrics at (campaign, week),
+(campaign, month) and (keyword, week). Rollups are maintained
+incrementally: every daily row written or restated through
+write_daily_metrics applies its delta to the periods containing it.
+
+metric_totals answers a date range by covering it with the coarsest
+periods that fit entirely inside it and reading daily rows only for the
+leftover edges, so a 12-month range touches a few dozen rows per entity.
+
+Large batches of daily rows on Postgres are written through COPY (see
+services.bulk_load) with the rollup deltas computed from the staged rows.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, func, text
+from sqlalchemy.orm import Session
+
+from models import DailyMetric, MetricRollup
+from services.bulk_load import drop_staged, merge_staged, stage_rows, use_bulk_load
+
+logger = logging.getLogger(__name__)
+
+# Rollup grains kept for each level, coarsest first
+ROLLUP_GRAINS = {
+    "campaign": ("month", "week"),
+    "keyword": ("week",),
+}
+
+ROLLUP_METRICS = ("impressions", "clicks", "cost_micros", "conversions", "conversions_value")
+
+ROLLUP_KEY_COLUMNS = ("grain", "level", "ref_id", "period_start")
+
+# Keep IN (...) lists well below SQLite's bound parameter limit
+ID_CHUNK_SIZE = 500
+
+
+def _chunks(values: List[str], size: int = ID_CHUNK_SIZE) -> Iterable[List[str]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def period_start(day: date, grain: str) -> date:
+    """First day of the week (Monday) or month containing day."""
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown rollup grain: {grain}")
+
+
+def next_period_start(start: date, grain: str) -> date:
+    """First day of the period after the one starting on start."""
+    if grain == "week":
+        return start + timedelta(days=7)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def record_metric_rollups(db: Session, deltas: Iterable[Tuple[str, str, date, Dict[str, float], int]]):
+    """
+    Apply daily metric changes to their rollup rows.
+
+    Args:
+        db: Database session (the caller commits)
+        deltas: (level, ref_id, date, metric deltas, daily row count delta)
+            tuples; levels without rollups are ignored
+
+    Deltas are grouped per rollup row first, so a sync costs one upsert per
+    touched period rather than one per daily row.
+    """
+    grouped = defaultdict(lambda: defaultdict(float))
+    for level, ref_id, day, values, rows in deltas:
+        for grain in ROLLUP_GRAINS.get(level, ()):
+            totals = grouped[(grain, level, ref_id, period_start(day, grain))]
+            for name in ROLLUP_METRICS:
+                totals[name] += values.get(name) or 0
+            totals["days"] += rows
+
+    if not grouped:
+        return
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        # One upsert statement executed for every touched period
+        table = MetricRollup.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY_COLUMNS),
+            set_={
+                name: func.coalesce(table.c[name], 0) + statement.excluded[name]
+                for name in ROLLUP_METRICS + ("days",)
+            }
+        )
+        db.execute(statement, [
+            {**dict(zip(ROLLUP_KEY_COLUMNS, key)), **totals} for key, totals in grouped.items()
+        ])
+        return
+
+    for key, totals in grouped.items():
+        key = dict(zip(ROLLUP_KEY_COLUMNS, key))
+        rollup = db.query(MetricRollup).filter_by(**key).with_for_update().first()
+        if rollup is None:
+            db.add(MetricRollup(**key, **totals))
+        else:
+            for name, value in totals.items():
+                setattr(rollup, name, (getattr(rollup, name) or 0) + value)
+
+
+def write_daily_metrics(
+    db: Session,
+    level: str,
+    rows: Dict[Tuple[str, date], Dict[str, float]],
+    restate: bool = True,
+    bulk: Optional[bool] = None
+) -> Dict[str, int]:
+    """
+    Insert or restate daily metric rows and keep the rollups in step.
+
+    Args:
+        db: Database session (the caller commits)
+        level: DailyMetric level of every row
+        rows: Column values keyed by (ref_id, date); only the columns given
+            are written
+        restate: Overwrite existing rows with the new values; when False,
+            existing rows are left alone
+        bulk: Force (True) or rule out (False) the COPY path; by default it
+            is used for large batches on Postgres
+
+    Returns:
+        Dict with inserted and updated row counts
+    """
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+
+    if use_bulk_load(db, len(rows), bulk):
+        return _copy_daily_metrics(db, level, rows, restate)
+
+    dates = [day for _, day in rows]
+    ref_ids = sorted({ref_id for ref_id, _ in rows})
+
+    existing = {}
+    for chunk in _chunks(ref_ids):
+        for metric in db.query(DailyMetric).filter(
+            DailyMetric.level == level,
+            DailyMetric.ref_id.in_(chunk),
+            DailyMetric.date >= min(dates),
+            DailyMetric.date <= max(dates)
+        ):
+            existing[(metric.ref_id, metric.date)] = metric
+
+    inserted = updated = 0
+    deltas = []
+    for (ref_id, day), values in rows.items():
+        metric = existing.get((ref_id, day))
+
+        if metric is None:
+            db.add(DailyMetric(level=level, ref_id=ref_id, date=day, **values))
+            deltas.append((level, ref_id, day, values, 1))
+            inserted += 1
+            continue
+
+        if not restate:
+            continue
+
+        delta = {
+            name: (values[name] or 0) - (getattr(metric, name) or 0)
+            for name in ROLLUP_METRICS if name in values
+        }
+        for name, value in values.items():
+            setattr(metric, name, value)
+        if any(delta.values()):
+            deltas.append((level, ref_id, day, delta, 0))
+            updated += 1
+
+    record_metric_rollups(db, deltas)
+    return {"inserted": inserted, "updated": updated}
+
+
+def _copy_daily_metrics(
+    db: Session,
+    level: str,
+    rows: Dict[Tuple[str, date], Dict[str, float]],
+    restate: bool
+) -> Dict[str, int]:
+    """write_daily_metrics through a COPY-loaded staging table (Postgres)."""
+    value_columns = list(next(iter(rows.values())))
+    columns = ["level", "ref_id", "date"] + value_columns
+    table = DailyMetric.__table__
+
+    staging = stage_rows(db, table, columns, (
+        [level, ref_id, day] + [values.get(name) for name in value_columns]
+        for (ref_id, day), values in rows.items()
+    ))
+
+    # Current values of the staged keys, for the rollup deltas
+    metric_columns = [name for name in ROLLUP_METRICS if name in value_columns]
+    existing = {
+        (row[0], row[1]): dict(zip(metric_columns, row[2:]))
+        for row in db.execute(text(
+            f"SELECT d.ref_id, d.date{''.join(f', d.{name}' for name in metric_columns)} "
+            f"FROM daily_metrics d JOIN {staging} s "
+            f"ON d.level = s.level AND d.ref_id = s.ref_id AND d.date = s.date"
+        ))
+    }
+
+    counts = merge_staged(
+        db, table, staging, columns, ["level", "ref_id", "date"], update=None if restate else {}
+    )
+    drop_staged(db, staging)
+
+    deltas = []
+    for (ref_id, day), values in rows.items():
+        old = existing.get((ref_id, day))
+        if old is None:
+            deltas.append((level, ref_id, day, values, 1))
+        elif restate:
+            delta = {name: (values[name] or 0) - (old[name] or 0) for name in metric_columns}
+            if any(delta.values()):
+                deltas.append((level, ref_id, day, delta, 0))
+
+    record_metric_rollups(db, deltas)
+    # ON CONFLICT DO UPDATE counts every restated row; report changed ones as
+    # the ORM path does
+    return {"inserted": counts["inserted"], "updated": sum(1 for delta in deltas if not delta[4])}
+
+
+def rebuild_metric_rollups(db: Session, level: Optional[str] = None) -> int:
+    """
+    Recompute rollups from daily_metrics, for one level or all of them.
+
+    Used for backfills and to repair rollups after out-of-band writes.
+    Returns the number of daily rows read.
+    """
+    levels = [level] if level else list(ROLLUP_GRAINS)
+
+    db.query(MetricRollup).filter(MetricRollup.level.in_(levels)).delete(synchronize_session=False)
+
+    rows = db.query(
+        DailyMetric.level, DailyMetric.ref_id, DailyMetric.date,
+        *[getattr(DailyMetric, name) for name in ROLLUP_METRICS]
+    ).filter(DailyMetric.level.in_(levels)).yield_per(5000)
+
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append((row[0], row[1], row[2], dict(zip(ROLLUP_METRICS, row[3:])), 1))
+        if len(batch) >= 5000:
+            record_metric_rollups(db, batch)
+            count += len(batch)
+            batch = []
+    record_metric_rollups(db, batch)
+    count += len(batch)
+
+    logger.info(f"Rebuilt metric rollups for {', '.join(levels)} from {count} daily rows")
+    return count
+
+
+def plan_range(level: str, start: date, end: date) -> List[Tuple[str, date, date]]:
+    """
+    Cover start..end (inclusive) with the coarsest available periods.
+
+    Returns (grain, first day, last day) segments where grain is a rollup
+    grain or "day"; rollup segments span whole periods.
+    """
+    return _cover(start, end, ROLLUP_GRAINS.get(level, ()))
+
+
+def _cover(start: date, end: date, grains: Tuple[str, ...]) -> List[Tuple[str, date, date]]:
+    if start > end:
+        return []
+    if not grains:
+        return [("day", start, end)]
+
+    grain = grains[0]
+    first = period_start(start, grain)
+    if first < start:
+        first = next_period_start(first, grain)
+
+    # Last whole period ending on or before end
+    stop = first
+    while next_period_start(stop, grain) <= end + timedelta(days=1):
+        stop = next_period_start(stop, grain)
+
+    if stop == first:
+        return _cover(start, end, grains[1:])
+
+    return (
+        _cover(start, first - timedelta(days=1), grains[1:])
+        + [(grain, first, stop - timedelta(days=1))]
+        + _cover(stop, end, grains[1:])
+    )
+
+
+def metric_totals(
+    db: Session,
+    level: str,
+    start: date,
+    end: date,
+    ref_ids: Optional[List[str]] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Sum metrics per ref_id over start..end (inclusive).
+
+    Reads whole periods from the coarsest rollups that fit in the range and
+    daily rows only for the edges (see plan_range).
+    """
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_METRICS, 0))
+
+    for grain, first, last in plan_range(level, start, end):
+        if grain == "day":
+            source, date_column = DailyMetric, DailyMetric.date
+            query = db.query(source.ref_id, *[func.sum(getattr(source, name)) for name in ROLLUP_METRICS])
+        else:
+            source, date_column = MetricRollup, MetricRollup.period_start
+            query = db.query(
+                source.ref_id, *[func.sum(getattr(source, name)) for name in ROLLUP_METRICS]
+            ).filter(MetricRollup.grain == grain)
+
+        query = query.filter(
+            and_(source.level == level, date_column >= first, date_column <= last)
+        )
+        if ref_ids is not None:
+            query = query.filter(source.ref_id.in_(ref_ids))
+
+        for ref_id, *values in query.group_by(source.ref_id):
+            for name, value in zip(ROLLUP_METRICS, values):
+                totals[ref_id][name] += value or 0
+
+    return dict(totals)
+
+
+def metric_trend(
+    db: Session,
+    level: str,
+    grain: str,
+    start: date,
+    end: date,
+    ref_ids: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Per-period metrics for every period overlapping start..end.
+
+    Periods are returned whole, including days outside the range at either
+    end. Grains without a rollup for the level ("day", or weeks/months not
+    kept for it) are summed from daily rows.
+    """
+    if grain in ROLLUP_GRAINS.get(level, ()):
+        query = db.query(
+            MetricRollup.ref_id,
+            MetricRollup.period_start,
+            *[getattr(MetricRollup, name) for name in ROLLUP_METRICS]
+        ).filter(
+            MetricRollup.grain == grain,
+            MetricRollup.level == level,
+            MetricRollup.period_start >= period_start(start, grain),
+            MetricRollup.period_start <= end
+        )
+        if ref_ids is not None:
+            query = query.filter(MetricRollup.ref_id.in_(ref_ids))
+        rows = query.all()
+    else:
+        first = start if grain == "day" else period_start(start, grain)
+        last = end if grain == "day" else next_period_start(period_start(end, grain), grain) - timedelta(days=1)
+
+        query = db.query(
+            DailyMetric.ref_id,
+            DailyMetric.date,
+            *[getattr(DailyMetric, name) for name in ROLLUP_METRICS]
+        ).filter(
+            DailyMetric.level == level,
+            DailyMetric.date >= first,
+            DailyMetric.date <= last
+        )
+        if ref_ids is not None:
+            query = query.filter(DailyMetric.ref_id.in_(ref_ids))
+
+        sums = defaultdict(lambda: dict.fromkeys(ROLLUP_METRICS, 0))
+        for ref_id, day, *values in query:
+            key = (ref_id, day if grain == "day" else period_start(day, grain))
+            for name, value in zip(ROLLUP_METRICS, values):
+                sums[key][name] += value or 0
+        rows = [(ref_id, day, *values.values()) for (ref_id, day), values in sums.items()]
+
+    return sorted(
+        (
+            {"ref_id": ref_id, "period_start": day.isoformat(), **dict(zip(ROLLUP_METRICS, values))}
+            for ref_id, day, *values in rows
+        ),
+        key=lambda row: (row["ref_id"], row["period_start"])
+    )
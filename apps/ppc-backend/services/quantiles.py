@@ -0,0 +1,176 @@
+"""
+Streaming quantile estimation for metric distributions.
+
+On Postgres percentiles are computed in the database with percentile_cont.
+Other dialects (SQLite) stream the values through a KLL sketch, which keeps
+memory bounded no matter how many metric rows are scanned.
+"""
+
+from typing import Dict, List, Optional
+import math
+import random
+import logging
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from models import DailyMetric
+
+logger = logging.getLogger(__name__)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items are kept in a stack of compactors; compactor h holds items of
+    weight 2^h. When the sketch grows past its capacity the lowest full
+    compactor is sorted and every other item is promoted to the next level.
+    While no compaction has happened the sketch is exact.
+    """
+
+    CAPACITY_DECAY = 2 / 3
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self._compactors: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return max(2, int(math.ceil(self.k * self.CAPACITY_DECAY ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self._compactors)))
+
+    def _size(self) -> int:
+        return sum(len(compactor) for compactor in self._compactors)
+
+    def _compress(self):
+        while self._size() > self._max_size():
+            for level, compactor in enumerate(self._compactors):
+                if len(compactor) < self._capacity(level):
+                    continue
+
+                if level + 1 == len(self._compactors):
+                    self._compactors.append([])
+
+                compactor.sort()
+                # Keep the odd item out at this level so weights stay exact
+                carry = [compactor.pop()] if len(compactor) % 2 else []
+                offset = self._random.randint(0, 1)
+                self._compactors[level + 1].extend(compactor[offset::2])
+                self._compactors[level] = carry
+                break
+
+    def update(self, value: float):
+        """Add a single value."""
+        self._compactors[0].append(float(value))
+        self.n += 1
+        if len(self._compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def update_many(self, values):
+        """Add a batch of values."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self._compactors[0].extend(values.tolist())
+        self.n += len(values)
+        self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-quantile (0 <= q <= 1) with linear interpolation
+        between neighbouring ranks, matching percentile_cont.
+
+        Returns None if the sketch is empty.
+        """
+        if self.n == 0:
+            return None
+
+        values = np.array([v for compactor in self._compactors for v in compactor])
+        weights = np.array([
+            2 ** level
+            for level, compactor in enumerate(self._compactors)
+            for _ in compactor
+        ], dtype=float)
+
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+
+        rank = q * (cumulative[-1] - 1)
+        lower_rank = math.floor(rank)
+        lower = values[np.searchsorted(cumulative, lower_rank, side="right")]
+        upper = values[min(np.searchsorted(cumulative, lower_rank + 1, side="right"), len(values) - 1)]
+
+        return float(lower + (upper - lower) * (rank - lower_rank))
+
+
+class KeywordConversionRateDistribution:
+    """
+    Account-wide distribution of keyword-level daily conversion rates (in %).
+
+    Only rows with clicks and conversions are included. Percentiles are
+    computed lazily and cached, and the fallback sketch is built at most
+    once, so one instance should be shared for a whole generation run.
+    """
+
+    STREAM_BATCH_SIZE = 10000
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._sketch: Optional[KLLSketch] = None
+        self._cache: Dict[int, Optional[float]] = {}
+
+    def _conversion_rate(self):
+        return DailyMetric.conversions * 100.0 / DailyMetric.clicks
+
+    def _filters(self):
+        return and_(
+            DailyMetric.level == "keyword",
+            DailyMetric.conversions > 0,
+            DailyMetric.clicks > 0
+        )
+
+    def _build_sketch(self) -> KLLSketch:
+        """Stream conversion rates from the database into a KLL sketch."""
+        sketch = KLLSketch()
+
+        result = self.db.execute(
+            select(self._conversion_rate()).where(self._filters()).execution_options(
+                yield_per=self.STREAM_BATCH_SIZE
+            )
+        )
+        for partition in result.partitions():
+            sketch.update_many([row[0] for row in partition])
+
+        logger.info(f"Built conversion rate sketch over {len(sketch)} keyword metric rows")
+        return sketch
+
+    def percentile(self, percentile: int) -> Optional[float]:
+        """
+        Get the given percentile (0-100) of keyword conversion rates.
+
+        Returns None when there are no keyword rows with conversions.
+        """
+        if percentile in self._cache:
+            return self._cache[percentile]
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            value = self.db.query(
+                func.percentile_cont(percentile / 100).within_group(self._conversion_rate())
+            ).filter(self._filters()).scalar()
+            value = float(value) if value is not None else None
+        else:
+            if self._sketch is None:
+                self._sketch = self._build_sketch()
+            value = self._sketch.quantile(percentile / 100)
+
+        self._cache[percentile] = value
+        return value
@@ -0,0 +1,263 @@
+"""
+Feature extraction for recommendation generation.
+
+Computes per-keyword, per-campaign and per-search-term aggregates over the
+standard metric windows in a handful of grouped queries and hands them to
+the rule evaluators as dense NumPy arrays, so generation cost no longer
+grows with the number of entities.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from models import AdGroup, Campaign, DailyMetric, Keyword, SearchTerm, SearchTermWindowMetric
+from services.quantiles import KeywordConversionRateDistribution
+
+logger = logging.getLogger(__name__)
+
+# Trailing windows (in days) aggregated for every entity
+METRIC_WINDOWS = (7, 14, 30)
+
+# DailyMetric columns summed per window; "rows" counts metric rows in the window
+METRIC_COLUMNS = ("impressions", "clicks", "cost_micros", "conversions")
+
+
+def _float_array(values) -> np.ndarray:
+    """Build a float array, mapping None to NaN."""
+    return np.array(list(values), dtype=float)
+
+
+def _date_array(values) -> np.ndarray:
+    """Build a day-resolution datetime64 array, mapping None to NaT."""
+    return np.array([v if v is not None else "NaT" for v in values], dtype="datetime64[D]")
+
+
+def _window_key(name: str, days: int) -> str:
+    return f"{name}_{days}d"
+
+
+@dataclass
+class EntityFeatures:
+    """Dense per-entity feature arrays; index i refers to the same entity in every array."""
+    ids: List[str]
+    windows: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def window(self, name: str, days: int) -> np.ndarray:
+        """Get a windowed metric sum, e.g. window("cost_micros", 14)."""
+        return self.windows[_window_key(name, days)]
+
+
+@dataclass
+class KeywordFeatures(EntityFeatures):
+    text: List[str] = field(default_factory=list)
+    match_type: List[str] = field(default_factory=list)
+    ad_group_id: List[str] = field(default_factory=list)
+    campaign_id: List[Optional[str]] = field(default_factory=list)
+    icp_score: np.ndarray = None
+    icp_confidence: np.ndarray = None
+
+
+@dataclass
+class CampaignFeatures(EntityFeatures):
+    name: List[str] = field(default_factory=list)
+    daily_budget_micros: np.ndarray = None
+    avg_icp: np.ndarray = None
+
+
+@dataclass
+class SearchTermFeatures(EntityFeatures):
+    text: List[str] = field(default_factory=list)
+    ad_group_id: List[str] = field(default_factory=list)
+    campaign_id: List[Optional[str]] = field(default_factory=list)
+    icp_score: np.ndarray = None
+    icp_confidence: np.ndarray = None
+    icp_rationale: List[Optional[str]] = field(default_factory=list)
+    last_seen: np.ndarray = None
+
+
+@dataclass
+class RecommendationFeatures:
+    """All inputs needed by the recommendation rules for a single generation run."""
+    as_of: date
+    keywords: KeywordFeatures
+    campaigns: CampaignFeatures
+    search_terms: SearchTermFeatures
+    account_conversions_30d: float
+    keyword_conversion_rates: KeywordConversionRateDistribution
+
+
+def _windowed_metrics_subquery(db: Session, level: str, as_of: date):
+    """Aggregate DailyMetric rows for one level into one row per ref_id with a column per window."""
+    cutoffs = {days: as_of - timedelta(days=days) for days in METRIC_WINDOWS}
+
+    columns = [DailyMetric.ref_id.label("ref_id")]
+    for days, cutoff in cutoffs.items():
+        in_window = DailyMetric.date >= cutoff
+        for name in METRIC_COLUMNS:
+            columns.append(
+                func.sum(case((in_window, getattr(DailyMetric, name)), else_=0)).label(_window_key(name, days))
+            )
+        columns.append(func.sum(case((in_window, 1), else_=0)).label(_window_key("rows", days)))
+
+    return db.query(*columns).filter(
+        and_(
+            DailyMetric.level == level,
+            DailyMetric.date >= cutoffs[max(METRIC_WINDOWS)]
+        )
+    ).group_by(DailyMetric.ref_id).subquery()
+
+
+def _window_keys(names=METRIC_COLUMNS + ("rows",)) -> List[str]:
+    return [_window_key(name, days) for days in METRIC_WINDOWS for name in names]
+
+
+def _window_columns(metrics) -> list:
+    return [metrics.c[key] for key in _window_keys()]
+
+
+def _window_arrays(rows: list, offset: int, names=METRIC_COLUMNS + ("rows",)) -> Dict[str, np.ndarray]:
+    """Turn the trailing window columns of each row into NaN-free float arrays."""
+    keys = _window_keys(names)
+    return {
+        key: np.nan_to_num(_float_array(row[offset + i] for row in rows))
+        for i, key in enumerate(keys)
+    }
+
+
+def _extract_keywords(db: Session, as_of: date) -> KeywordFeatures:
+    metrics = _windowed_metrics_subquery(db, "keyword", as_of)
+
+    rows = db.query(
+        Keyword.id,
+        Keyword.text,
+        Keyword.match_type,
+        Keyword.ad_group_id,
+        AdGroup.campaign_id,
+        Keyword.icp_score,
+        Keyword.icp_confidence,
+        *_window_columns(metrics)
+    ).outerjoin(
+        AdGroup, AdGroup.id == Keyword.ad_group_id
+    ).outerjoin(
+        metrics, metrics.c.ref_id == Keyword.id
+    ).all()
+
+    return KeywordFeatures(
+        ids=[row[0] for row in rows],
+        text=[row[1] for row in rows],
+        match_type=[row[2] for row in rows],
+        ad_group_id=[row[3] for row in rows],
+        campaign_id=[row[4] for row in rows],
+        icp_score=_float_array(row[5] for row in rows),
+        icp_confidence=_float_array(row[6] for row in rows),
+        windows=_window_arrays(rows, 7),
+    )
+
+
+def _extract_campaigns(db: Session, as_of: date) -> CampaignFeatures:
+    metrics = _windowed_metrics_subquery(db, "campaign", as_of)
+
+    avg_icp = db.query(
+        AdGroup.campaign_id.label("campaign_id"),
+        func.avg(Keyword.icp_score).label("avg_icp")
+    ).join(
+        Keyword, Keyword.ad_group_id == AdGroup.id
+    ).filter(
+        Keyword.icp_score.isnot(None)
+    ).group_by(AdGroup.campaign_id).subquery()
+
+    rows = db.query(
+        Campaign.id,
+        Campaign.name,
+        Campaign.daily_budget_micros,
+        avg_icp.c.avg_icp,
+        *_window_columns(metrics)
+    ).outerjoin(
+        avg_icp, avg_icp.c.campaign_id == Campaign.id
+    ).outerjoin(
+        metrics, metrics.c.ref_id == Campaign.id
+    ).all()
+
+    return CampaignFeatures(
+        ids=[row[0] for row in rows],
+        name=[row[1] for row in rows],
+        daily_budget_micros=np.nan_to_num(_float_array(row[2] for row in rows)),
+        avg_icp=_float_array(row[3] for row in rows),
+        windows=_window_arrays(rows, 4),
+    )
+
+
+def _extract_search_terms(db: Session, as_of: date) -> SearchTermFeatures:
+    # Windows are maintained incrementally by services.search_term_metrics
+    rows = db.query(
+        SearchTerm.id,
+        SearchTerm.text,
+        SearchTerm.ad_group_id,
+        AdGroup.campaign_id,
+        SearchTerm.icp_score,
+        SearchTerm.icp_confidence,
+        SearchTerm.icp_rationale,
+        SearchTerm.last_seen,
+        *[getattr(SearchTermWindowMetric, key) for key in _window_keys(METRIC_COLUMNS)]
+    ).outerjoin(
+        AdGroup, AdGroup.id == SearchTerm.ad_group_id
+    ).outerjoin(
+        SearchTermWindowMetric, SearchTermWindowMetric.search_term_id == SearchTerm.id
+    ).all()
+
+    return SearchTermFeatures(
+        ids=[row[0] for row in rows],
+        text=[row[1] for row in rows],
+        ad_group_id=[row[2] for row in rows],
+        campaign_id=[row[3] for row in rows],
+        icp_score=_float_array(row[4] for row in rows),
+        icp_confidence=_float_array(row[5] for row in rows),
+        icp_rationale=[row[6] for row in rows],
+        last_seen=_date_array(row[7] for row in rows),
+        windows=_window_arrays(rows, 8, METRIC_COLUMNS),
+    )
+
+
+def extract_features(db: Session, as_of: Optional[date] = None) -> RecommendationFeatures:
+    """
+    Extract all recommendation inputs in a fixed number of grouped queries.
+
+    Args:
+        db: Database session
+        as_of: Reference date for the trailing windows (defaults to today)
+
+    Returns:
+        RecommendationFeatures with dense arrays per entity type
+    """
+    as_of = as_of or date.today()
+
+    account_conversions_30d = db.query(func.sum(DailyMetric.conversions)).filter(
+        and_(
+            DailyMetric.date >= as_of - timedelta(days=30),
+            DailyMetric.level == "campaign"
+        )
+    ).scalar() or 0
+
+    features = RecommendationFeatures(
+        as_of=as_of,
+        keywords=_extract_keywords(db, as_of),
+        campaigns=_extract_campaigns(db, as_of),
+        search_terms=_extract_search_terms(db, as_of),
+        account_conversions_30d=float(account_conversions_30d),
+        keyword_conversion_rates=KeywordConversionRateDistribution(db),
+    )
+
+    logger.info(
+        f"Extracted recommendation features: {len(features.keywords)} keywords, "
+        f"{len(features.campaigns)} campaigns, {len(features.search_terms)} search terms"
+    )
+    return features
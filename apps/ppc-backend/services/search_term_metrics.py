@@ -0,0 +1,238 @@
+"""
+Search term daily facts and rolling-window aggregates.
+
+sync_search_terms writes per-day search term metrics into
+search_term_daily_metrics. search_term_window_metrics keeps trailing
+7/14/30-day sums per search term and is maintained incrementally: new or
+restated daily rows are applied as deltas, and when the window end date
+moves forward only the days entering or leaving each window are read.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from models import SearchTermDailyMetric, SearchTermWindowMetric
+from services.recommendation_features import METRIC_COLUMNS as METRICS, METRIC_WINDOWS as WINDOW_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Keep IN (...) lists well below SQLite's bound parameter limit
+ID_CHUNK_SIZE = 500
+
+
+def _chunks(values: List[str], size: int = ID_CHUNK_SIZE) -> Iterable[List[str]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _in_window(day: date, as_of: date, days: int) -> bool:
+    """Same convention as the recommendation features: date >= as_of - days."""
+    return as_of - timedelta(days=days) <= day <= as_of
+
+
+def _load_windows(db: Session, term_ids: List[str]) -> Dict[str, SearchTermWindowMetric]:
+    windows = {}
+    for chunk in _chunks(term_ids):
+        for window in db.query(SearchTermWindowMetric).filter(SearchTermWindowMetric.search_term_id.in_(chunk)):
+            windows[window.search_term_id] = window
+    return windows
+
+
+def _add_to_window(window: SearchTermWindowMetric, days: int, values: Dict[str, float], sign: int = 1):
+    for name in METRICS:
+        key = f"{name}_{days}d"
+        setattr(window, key, (getattr(window, key) or 0) + sign * (values.get(name) or 0))
+
+
+def _daily_sums(db: Session, start: date, end: date, window_as_of: Optional[date] = None,
+                term_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Sum daily facts per search term for start <= date <= end.
+
+    Restrict to terms whose window row currently ends on window_as_of, or to
+    an explicit list of term IDs.
+    """
+    if start > end:
+        return {}
+
+    query = db.query(
+        SearchTermDailyMetric.search_term_id,
+        *[func.sum(getattr(SearchTermDailyMetric, name)) for name in METRICS]
+    ).filter(
+        and_(
+            SearchTermDailyMetric.date >= start,
+            SearchTermDailyMetric.date <= end
+        )
+    )
+
+    if window_as_of is not None:
+        query = query.join(
+            SearchTermWindowMetric,
+            SearchTermWindowMetric.search_term_id == SearchTermDailyMetric.search_term_id
+        ).filter(SearchTermWindowMetric.as_of == window_as_of)
+
+    if term_ids is None:
+        rows = query.group_by(SearchTermDailyMetric.search_term_id).all()
+    else:
+        rows = []
+        for chunk in _chunks(term_ids):
+            rows += query.filter(
+                SearchTermDailyMetric.search_term_id.in_(chunk)
+            ).group_by(SearchTermDailyMetric.search_term_id).all()
+
+    return {row[0]: dict(zip(METRICS, row[1:])) for row in rows}
+
+
+def roll_search_term_windows(db: Session, as_of: Optional[date] = None) -> int:
+    """
+    Move every window row forward to end on as_of.
+
+    For each window only the days that left it are subtracted and the days
+    that entered it are added, so the cost depends on the number of days
+    rolled rather than on the length of the windows.
+
+    Returns the number of window rows rolled.
+    """
+    as_of = as_of or date.today()
+
+    stale_dates = [
+        row[0] for row in db.query(SearchTermWindowMetric.as_of).filter(
+            SearchTermWindowMetric.as_of < as_of
+        ).distinct()
+    ]
+
+    rolled = 0
+    for old_as_of in stale_dates:
+        windows = {
+            window.search_term_id: window
+            for window in db.query(SearchTermWindowMetric).filter(SearchTermWindowMetric.as_of == old_as_of)
+        }
+
+        for days in WINDOW_DAYS:
+            leaving = _daily_sums(
+                db,
+                old_as_of - timedelta(days=days),
+                min(old_as_of, as_of - timedelta(days=days + 1)),
+                window_as_of=old_as_of
+            )
+            entering = _daily_sums(
+                db,
+                max(old_as_of + timedelta(days=1), as_of - timedelta(days=days)),
+                as_of,
+                window_as_of=old_as_of
+            )
+
+            for term_id, values in leaving.items():
+                _add_to_window(windows[term_id], days, values, sign=-1)
+            for term_id, values in entering.items():
+                _add_to_window(windows[term_id], days, values)
+
+        for window in windows.values():
+            window.as_of = as_of
+        rolled += len(windows)
+
+    if rolled:
+        db.flush()
+        logger.info(f"Rolled {rolled} search term windows forward to {as_of}")
+
+    return rolled
+
+
+def _rebuild_windows(db: Session, as_of: date,
+                     term_ids: Optional[List[str]] = None) -> Dict[str, SearchTermWindowMetric]:
+    sums = {
+        days: _daily_sums(db, as_of - timedelta(days=days), as_of, term_ids=term_ids)
+        for days in WINDOW_DAYS
+    }
+    ids = sorted(term_ids if term_ids is not None else sums[max(WINDOW_DAYS)])
+
+    windows = _load_windows(db, ids)
+    for term_id in ids:
+        window = windows.get(term_id)
+        if window is None:
+            window = windows[term_id] = SearchTermWindowMetric(search_term_id=term_id)
+            db.add(window)
+
+        window.as_of = as_of
+        for days in WINDOW_DAYS:
+            values = sums[days].get(term_id, {})
+            for name in METRICS:
+                setattr(window, f"{name}_{days}d", values.get(name) or 0)
+
+    return windows
+
+
+def rebuild_search_term_windows(db: Session, as_of: Optional[date] = None,
+                                term_ids: Optional[List[str]] = None) -> int:
+    """
+    Recompute window rows from the daily facts, for all terms or the given ones.
+
+    Used to seed windows for terms that have none yet and for backfills.
+    Returns the number of window rows written.
+    """
+    return len(_rebuild_windows(db, as_of or date.today(), term_ids))
+
+
+def record_search_term_metrics(
+    db: Session,
+    daily_rows: Dict[Tuple[str, date], Dict[str, float]],
+    as_of: Optional[date] = None
+) -> int:
+    """
+    Upsert search term daily facts and apply the changes to the windows.
+
+    Args:
+        db: Database session (the caller commits)
+        daily_rows: Metrics keyed by (search_term_id, date); a row replaces
+            any previously stored values for that day (restatement)
+        as_of: End date of the windows (defaults to today)
+
+    Returns:
+        Number of daily rows written
+    """
+    as_of = as_of or date.today()
+    roll_search_term_windows(db, as_of)
+
+    if not daily_rows:
+        return 0
+
+    dates = [day for _, day in daily_rows]
+    term_ids = sorted({term_id for term_id, _ in daily_rows})
+
+    existing_facts = {
+        (fact.search_term_id, fact.date): fact
+        for fact in db.query(SearchTermDailyMetric).filter(
+            and_(
+                SearchTermDailyMetric.date >= min(dates),
+                SearchTermDailyMetric.date <= max(dates)
+            )
+        )
+    }
+
+    windows = _load_windows(db, term_ids)
+
+    # Seed windows for new terms from facts already stored, before this batch is applied
+    missing = [term_id for term_id in term_ids if term_id not in windows]
+    if missing:
+        windows.update(_rebuild_windows(db, as_of, missing))
+
+    for (term_id, day), values in daily_rows.items():
+        fact = existing_facts.get((term_id, day))
+        if fact is None:
+            fact = SearchTermDailyMetric(search_term_id=term_id, date=day)
+            db.add(fact)
+
+        delta = {name: (values.get(name) or 0) - (getattr(fact, name) or 0) for name in METRICS}
+        for name in METRICS + ("conversions_value",):
+            setattr(fact, name, values.get(name) or 0)
+
+        window = windows[term_id]
+        for days in WINDOW_DAYS:
+            if _in_window(day, window.as_of, days):
+                _add_to_window(window, days, delta)
+
+    return len(daily_rows)
@@ -0,0 +1,367 @@
+"""
+What-if simulation for budget_shift and pause_keyword recommendations.
+
+Per-entity elasticity curves are fitted from historical daily metrics as
+log-log regressions of clicks and conversions on spend, so a change in spend
+by a factor r scales clicks by r^e_clicks and conversions by r^e_conversions.
+Scenario actions are flattened into arrays and projected in one vectorized
+pass. Fitted curves and scenario results are cached per data version; the
+version itself is recomputed at most every DATA_VERSION_TTL_SECONDS, so
+new metrics can take that long to show up.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from models import Campaign, DailyMetric
+
+logger = logging.getLogger(__name__)
+
+# Days of history used to fit elasticity curves
+LOOKBACK_DAYS = 90
+
+# Trailing days averaged into the per-day baseline
+BASELINE_DAYS = 30
+
+# Entities with fewer days of spend fall back to the pooled level elasticity
+MIN_FIT_DAYS = 7
+
+# Elasticities are clipped to diminishing returns
+MIN_ELASTICITY = 0.0
+MAX_ELASTICITY = 1.0
+
+# Campaigns spending at least this share of budget are treated as budget-constrained;
+# raising the budget of an unconstrained campaign does not increase its spend
+CONSTRAINED_UTILIZATION = 0.9
+
+SIMULATED_TYPES = ("budget_shift", "pause_keyword")
+
+RESULT_CACHE_SIZE = 256
+
+# The data version aggregates all of daily_metrics, so it is reused for this long
+DATA_VERSION_TTL_SECONDS = 60
+
+STREAM_BATCH_SIZE = 10000
+
+
+@dataclass
+class ElasticityModel:
+    """Per-entity baselines (per day) and fitted elasticities for one metric level."""
+    level: str
+    index: Dict[str, int]
+    spend: np.ndarray
+    clicks: np.ndarray
+    conversions: np.ndarray
+    click_elasticity: np.ndarray
+    conversion_elasticity: np.ndarray
+    daily_budget: Optional[np.ndarray] = None
+
+    def lookup(self, entity_ids: List[str]) -> np.ndarray:
+        """Map entity IDs to row indexes; unknown entities map to -1."""
+        return np.array([self.index.get(entity_id, -1) for entity_id in entity_ids], dtype=np.int64)
+
+
+def _grouped_slopes(groups: np.ndarray, x: np.ndarray, y: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit y = a + b*x per group with ordinary least squares.
+
+    Returns the per-group slopes (NaN where the fit is not identified) and
+    the number of observations per group.
+    """
+    n = np.bincount(groups, minlength=size).astype(float)
+    sx = np.bincount(groups, weights=x, minlength=size)
+    sy = np.bincount(groups, weights=y, minlength=size)
+    sxx = np.bincount(groups, weights=x * x, minlength=size)
+    sxy = np.bincount(groups, weights=x * y, minlength=size)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Within-group (centered) sums of squares and cross products
+        cxx = sxx - np.where(n > 0, sx * sx / n, 0)
+        cxy = sxy - np.where(n > 0, sx * sy / n, 0)
+        slopes = np.where(cxx > 1e-9, cxy / cxx, np.nan)
+
+    # Pooled within-group slope used where an entity has too little history
+    pooled_cxx = cxx[n >= 2].sum()
+    pooled = cxy[n >= 2].sum() / pooled_cxx if pooled_cxx > 1e-9 else MAX_ELASTICITY
+    slopes = np.where((n >= MIN_FIT_DAYS) & ~np.isnan(slopes), slopes, pooled)
+
+    return np.clip(slopes, MIN_ELASTICITY, MAX_ELASTICITY), n
+
+
+def fit_elasticity_model(db: Session, level: str, as_of: date) -> ElasticityModel:
+    """
+    Fit elasticity curves for every entity with metrics at the given level.
+
+    Args:
+        db: Database session
+        level: DailyMetric level ("campaign" or "keyword")
+        as_of: Last day of history to use
+
+    Returns:
+        ElasticityModel with one row per entity
+    """
+    result = db.execute(
+        select(
+            DailyMetric.ref_id,
+            DailyMetric.date,
+            DailyMetric.cost_micros,
+            DailyMetric.clicks,
+            DailyMetric.conversions
+        ).where(
+            and_(
+                DailyMetric.level == level,
+                DailyMetric.date >= as_of - timedelta(days=LOOKBACK_DAYS),
+                DailyMetric.date <= as_of
+            )
+        ).execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    ref_ids, dates, cost, clicks, conversions = [], [], [], [], []
+    for partition in result.partitions():
+        for row in partition:
+            ref_ids.append(row[0])
+            dates.append(row[1])
+            cost.append(row[2] or 0)
+            clicks.append(row[3] or 0)
+            conversions.append(row[4] or 0)
+
+    ids, groups = np.unique(np.array(ref_ids, dtype=object), return_inverse=True)
+    size = len(ids)
+    cost = np.array(cost, dtype=float)
+    clicks = np.array(clicks, dtype=float)
+    conversions = np.array(conversions, dtype=float)
+
+    # Fit on days with spend only; log1p keeps zero-click days in the fit
+    spent = cost > 0
+    log_cost = np.log(cost[spent])
+    click_elasticity, _ = _grouped_slopes(groups[spent], log_cost, np.log1p(clicks[spent]), size)
+    conversion_elasticity, _ = _grouped_slopes(groups[spent], log_cost, np.log1p(conversions[spent]), size)
+
+    recent = np.array(dates, dtype="datetime64[D]") >= np.datetime64(as_of - timedelta(days=BASELINE_DAYS - 1))
+    baseline = {
+        name: np.bincount(groups[recent], weights=values[recent], minlength=size) / BASELINE_DAYS
+        for name, values in (("spend", cost), ("clicks", clicks), ("conversions", conversions))
+    }
+
+    model = ElasticityModel(
+        level=level,
+        index={entity_id: i for i, entity_id in enumerate(ids.tolist())},
+        spend=baseline["spend"],
+        clicks=baseline["clicks"],
+        conversions=baseline["conversions"],
+        click_elasticity=click_elasticity,
+        conversion_elasticity=conversion_elasticity,
+    )
+
+    if level == "campaign":
+        budgets = dict(db.query(Campaign.id, Campaign.daily_budget_micros).all())
+        model.daily_budget = np.array([budgets.get(entity_id) or 0 for entity_id in model.index], dtype=float)
+
+    logger.info(f"Fitted elasticity curves for {size} {level} entities over {len(ref_ids)} metric rows")
+    return model
+
+
+def get_data_version(db: Session, as_of: date) -> str:
+    """
+    Fingerprint the data the simulator reads.
+
+    Changes whenever daily metrics are added or restated, campaign budgets
+    change, or the reference date moves.
+    """
+    metrics = db.query(
+        func.count(DailyMetric.id),
+        func.max(DailyMetric.created_at),
+        func.sum(DailyMetric.cost_micros),
+        func.sum(DailyMetric.clicks),
+        func.sum(DailyMetric.conversions)
+    ).filter(DailyMetric.level.in_(("campaign", "keyword"))).one()
+
+    campaigns = db.query(
+        func.count(Campaign.id),
+        func.max(Campaign.updated_at),
+        func.sum(Campaign.daily_budget_micros)
+    ).one()
+
+    fingerprint = json.dumps([as_of, list(metrics), list(campaigns)], default=str)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+
+class SimulationCache:
+    """Caches fitted models for the latest data version and recent scenario results."""
+
+    def __init__(self, max_results: int = RESULT_CACHE_SIZE):
+        self.max_results = max_results
+        self._models: Dict[str, Dict[str, ElasticityModel]] = {}
+        self._results: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._version: Optional[Tuple[date, float, str]] = None
+
+    def data_version(self, db: Session, as_of: date) -> str:
+        """get_data_version, reused for DATA_VERSION_TTL_SECONDS per reference date."""
+        if self._version and self._version[0] == as_of and self._version[1] > time.monotonic():
+            return self._version[2]
+        version = get_data_version(db, as_of)
+        self._version = (as_of, time.monotonic() + DATA_VERSION_TTL_SECONDS, version)
+        return version
+
+    def models(self, db: Session, data_version: str, as_of: date) -> Dict[str, ElasticityModel]:
+        if data_version not in self._models:
+            # Older versions can never be requested again
+            self._models = {
+                data_version: {
+                    level: fit_elasticity_model(db, level, as_of)
+                    for level in ("campaign", "keyword")
+                }
+            }
+        return self._models[data_version]
+
+    def get_result(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def put_result(self, key: Tuple[str, str], result: Dict[str, Any]):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+
+simulation_cache = SimulationCache()
+
+
+def _project(model: ElasticityModel, rows: np.ndarray, spend_ratio: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-day deltas for the given entity rows when their spend is scaled by spend_ratio."""
+    spend = model.spend[rows]
+    clicks = model.clicks[rows]
+    conversions = model.conversions[rows]
+
+    # Zero spend drives nothing, even for entities fitted with zero elasticity
+    def scale(elasticity: np.ndarray) -> np.ndarray:
+        return np.where(spend_ratio > 0, np.power(spend_ratio, elasticity), 0.0)
+
+    return {
+        "spend_micros": spend * spend_ratio - spend,
+        "clicks": clicks * scale(model.click_elasticity[rows]) - clicks,
+        "conversions": conversions * scale(model.conversion_elasticity[rows]) - conversions,
+    }
+
+
+def budget_spend_ratio(budget: np.ndarray, spend: np.ndarray, change_pct: np.ndarray) -> np.ndarray:
+    """
+    Factor by which a budget change of change_pct scales each campaign's daily spend.
+
+    Only budget-constrained campaigns spend more on a larger budget, in
+    proportion to it. A cut caps spend at the new budget; an increase never
+    lowers it, even for a campaign already spending above its budget.
+    """
+    new_budget = budget * (1 + change_pct / 100)
+    constrained = spend >= budget * CONSTRAINED_UTILIZATION
+    wanted = np.where(constrained, spend * new_budget / np.maximum(budget, 1), spend)
+    projected = np.where(change_pct < 0, np.minimum(wanted, new_budget), np.maximum(wanted, spend))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(spend > 0, projected / spend, 1.0)
+
+
+def simulate_scenarios(
+    db: Session,
+    scenarios: List[List[Dict[str, Any]]],
+    horizon_days: int = 7,
+    as_of: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Project spend, click and conversion deltas for a batch of scenarios.
+
+    Args:
+        db: Database session
+        scenarios: One list of actions per scenario. Each action has a
+            "type" (budget_shift or pause_keyword), a "target_id" and, for
+            budget shifts, a "change_pct" (e.g. 15 for +15%)
+        horizon_days: Number of days the deltas are projected over
+        as_of: Last day of history to use (defaults to today)
+
+    Returns:
+        Dict with the data version, whether the result was cached, and the
+        projected deltas per scenario (in input order)
+    """
+    as_of = as_of or date.today()
+    data_version = simulation_cache.data_version(db, as_of)
+
+    request_hash = hashlib.sha256(json.dumps([scenarios, horizon_days], sort_keys=True).encode()).hexdigest()
+    cached = simulation_cache.get_result((data_version, request_hash))
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    models = simulation_cache.models(db, data_version, as_of)
+
+    # Flatten every action of every scenario into parallel arrays
+    flat = [
+        (scenario_index, action)
+        for scenario_index, actions in enumerate(scenarios)
+        for action in actions
+    ]
+    scenario_index = np.array([index for index, _ in flat], dtype=np.int64)
+    types = np.array([action["type"] for _, action in flat], dtype=object)
+    target_ids = [str(action["target_id"]) for _, action in flat]
+    change_pct = np.array([action.get("change_pct") or 0 for _, action in flat], dtype=float)
+
+    deltas = {name: np.zeros(len(flat)) for name in ("spend_micros", "clicks", "conversions")}
+    simulated = np.zeros(len(flat), dtype=bool)
+
+    # Budget shifts scale campaign spend up to the new budget
+    budget_actions = np.flatnonzero(types == "budget_shift")
+    campaigns = models["campaign"]
+    rows = campaigns.lookup([target_ids[i] for i in budget_actions])
+    known = rows >= 0
+    budget_actions, rows = budget_actions[known], rows[known]
+    if len(rows):
+        spend_ratio = budget_spend_ratio(campaigns.daily_budget[rows], campaigns.spend[rows], change_pct[budget_actions])
+        for name, values in _project(campaigns, rows, spend_ratio).items():
+            deltas[name][budget_actions] = values
+        simulated[budget_actions] = True
+
+    # Pausing a keyword removes its spend and everything it drives
+    pause_actions = np.flatnonzero(types == "pause_keyword")
+    keywords = models["keyword"]
+    rows = keywords.lookup([target_ids[i] for i in pause_actions])
+    known = rows >= 0
+    pause_actions, rows = pause_actions[known], rows[known]
+    if len(rows):
+        for name, values in _project(keywords, rows, np.zeros(len(rows))).items():
+            deltas[name][pause_actions] = values
+        simulated[pause_actions] = True
+
+    totals = {
+        name: np.bincount(scenario_index, weights=values * horizon_days, minlength=len(scenarios))
+        for name, values in deltas.items()
+    }
+    skipped = np.bincount(scenario_index, weights=(~simulated).astype(float), minlength=len(scenarios))
+
+    result = {
+        "data_version": data_version,
+        "as_of": as_of.isoformat(),
+        "horizon_days": horizon_days,
+        "scenarios": [
+            {
+                "spend_delta_micros": int(round(totals["spend_micros"][i])),
+                "clicks_delta": float(totals["clicks"][i]),
+                "conversions_delta": float(totals["conversions"][i]),
+                "actions": len(scenarios[i]),
+                "actions_without_history": int(skipped[i]),
+            }
+            for i in range(len(scenarios))
+        ],
+    }
+
+    simulation_cache.put_result((data_version, request_hash), result)
+    return {**result, "cached": False}
@@ -0,0 +1,521 @@
+"""
+Deterministic synthetic ad platform data.
+
+SyntheticAdsData generates a keyword-search account hierarchy (accounts,
+campaigns, ad groups, keywords, search terms) and daily metrics sized by
+the number of keyword-day metric rows wanted, from a few thousand up to
+10M and beyond. Nothing is stored: every entity and every day's metrics
+are derived on demand from (seed, platform, entity, date), so the same
+seed always produces the same data whichever slice is asked for, and
+memory stays flat however large the data set is.
+
+With MOCK_ADS=true the Google Ads client factory, the providers and the
+fetch scripts serve this data instead of calling the platforms, which
+lets sync, scoring and recommendations be run and benchmarked offline
+(see bench-synthetic.py).
+
+Metrics per keyword follow its intent: brand and on-ICP keywords convert,
+off-ICP ones (the EXCLUDE_TERMS of routers/score.py) spend without
+converting, so scoring and the recommendation rules have something to find.
+"""
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import math
+import os
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MOCK_ADS = os.getenv("MOCK_ADS", "false").lower() == "true"
+MOCK_ADS_SEED = int(os.getenv("MOCK_ADS_SEED", "42"))
+MOCK_ADS_METRIC_ROWS = int(os.getenv("MOCK_ADS_METRIC_ROWS", "100000"))
+MOCK_ADS_DAYS = int(os.getenv("MOCK_ADS_DAYS", "90"))
+
+# Largest data set the generator is sized for
+MAX_METRIC_ROWS = 10_000_000
+
+KEYWORDS_PER_AD_GROUP = 15
+AD_GROUPS_PER_CAMPAIGN = 8
+CAMPAIGNS_PER_ACCOUNT = 25
+SEARCH_TERMS_PER_KEYWORD = 3
+
+# Daily metrics are generated in blocks of days, each from its own seed,
+# so any date range gives the same values for the days it covers
+BLOCK_DAYS = 64
+
+PLATFORMS = ("google", "microsoft", "linkedin", "reddit")
+
+# The synthetic manager account: any customer ID that isn't one of the
+# generated accounts sees all of them
+MANAGER_ACCOUNT_ID = "1000000000"
+
+METRIC_NAMES = ("impressions", "clicks", "cost_micros", "conversions", "conversions_value")
+
+BRAND_TERMS = ["sourcegraph", "sourcegraph enterprise", "sourcegraph ai", "sourcegraph code search"]
+INCLUDE_TERMS = [
+    "semantic code search", "enterprise code search", "codebase search", "code discovery",
+    "code navigation", "code intelligence", "ai code assistant", "repo search",
+    "monorepo search", "code indexing", "search in code", "large codebase",
+    "semantic search code", "code understanding"
+]
+GENERIC_TERMS = [
+    "code search", "developer tools", "grep tool", "code review tool", "git search",
+    "search github code", "find references", "regex search", "source code browser",
+    "code search engine", "developer productivity"
+]
+EXCLUDE_TERMS = [
+    "homework", "assignment", "tutorial", "course", "learn", "leetcode", "job", "salary",
+    "interview", "pdf", "definition", "free download", "torrent", "crack", "cheat", "student"
+]
+KEYWORD_PREFIXES = ["", "", "", "best ", "enterprise ", "ai ", "fast ", "open source "]
+KEYWORD_SUFFIXES = ["", "", "", " tool", " software", " platform", " for teams", " pricing"]
+SEARCH_TERM_MODIFIERS = [" online", " 2025", " alternative", " comparison", " review", " vs github", " api"]
+
+CAMPAIGN_THEMES = ["Brand", "Code Search", "Code Intelligence", "AI Assistant", "Competitor", "Generic"]
+CAMPAIGN_REGIONS = ["US", "CA", "UK", "EMEA", "APAC"]
+
+# intent: (share of keywords, median daily impressions, CTR range, conversion rate range, CPC range in dollars)
+INTENTS = {
+    "brand": (0.05, 60.0, (0.08, 0.15), (0.05, 0.10), (0.8, 2.5)),
+    "include": (0.45, 25.0, (0.02, 0.06), (0.02, 0.05), (2.0, 6.0)),
+    "generic": (0.35, 40.0, (0.01, 0.04), (0.005, 0.02), (1.5, 4.5)),
+    "exclude": (0.15, 30.0, (0.01, 0.03), (0.0, 0.002), (1.5, 4.0)),
+}
+INTENT_NAMES = list(INTENTS)
+INTENT_SHARES = [INTENTS[name][0] for name in INTENT_NAMES]
+
+# Share of keywords that are head terms, and their volume multiple
+HEAD_SHARE = 0.03
+HEAD_VOLUME = 30.0
+
+MATCH_TYPES = ["EXACT", "PHRASE", "BROAD"]
+MATCH_TYPE_SHARES = [0.3, 0.4, 0.3]
+
+# Monday first
+WEEKDAY_FACTORS = np.array([1.05, 1.1, 1.1, 1.05, 0.95, 0.6, 0.55])
+
+# Seed stream per kind of entity
+_ACCOUNT, _CAMPAIGN, _AD_GROUP, _KEYWORD, _METRICS = range(5)
+
+
+class SyntheticAdsData:
+    """
+    A seeded synthetic ad account hierarchy with daily metrics.
+
+    Entities are numbered and nested by index (keyword k belongs to ad
+    group k // KEYWORDS_PER_AD_GROUP, and so on up to accounts), and their
+    IDs are numeric strings derived from the index. Lookups by index are
+    O(1); the iterators walk the hierarchy lazily.
+
+    Args:
+        seed: Seed all data derives from
+        metric_rows: Keyword-day metric rows over the default window;
+            the number of keywords is metric_rows / days
+        days: Length of the default window, ending yesterday (or end_date)
+        platform: One of PLATFORMS; each has its own independent data
+        end_date: Last day of the default window
+    """
+
+    def __init__(
+        self,
+        seed: int = MOCK_ADS_SEED,
+        metric_rows: int = MOCK_ADS_METRIC_ROWS,
+        days: int = MOCK_ADS_DAYS,
+        platform: str = "google",
+        end_date: Optional[date] = None
+    ):
+        if platform not in PLATFORMS:
+            raise ValueError(f"Unknown platform: {platform}")
+        if metric_rows < 1 or days < 1:
+            raise ValueError("metric_rows and days must be positive")
+        if metric_rows > MAX_METRIC_ROWS:
+            logger.warning(f"Synthetic data with {metric_rows:,} metric rows is above the {MAX_METRIC_ROWS:,} it is sized for")
+
+        self.seed = seed
+        self.platform = platform
+        self.days = days
+        self.end_date = end_date or date.today() - timedelta(days=1)
+        self.start_date = self.end_date - timedelta(days=days - 1)
+
+        self.keyword_count = math.ceil(metric_rows / days)
+        self.ad_group_count = math.ceil(self.keyword_count / KEYWORDS_PER_AD_GROUP)
+        self.campaign_count = math.ceil(self.ad_group_count / AD_GROUPS_PER_CAMPAIGN)
+        self.account_count = math.ceil(self.campaign_count / CAMPAIGNS_PER_ACCOUNT)
+
+        self.keyword = lru_cache(maxsize=4096)(self._keyword)
+        self._term_block = lru_cache(maxsize=256)(self._make_term_block)
+
+    def __repr__(self) -> str:
+        return (
+            f"SyntheticAdsData(platform={self.platform!r}, seed={self.seed}, accounts={self.account_count}, "
+            f"campaigns={self.campaign_count}, ad_groups={self.ad_group_count}, keywords={self.keyword_count}, "
+            f"window={self.start_date}..{self.end_date})"
+        )
+
+    def _rng(self, stream: int, *key: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, PLATFORMS.index(self.platform), stream, *key])
+
+    # IDs and hierarchy
+
+    @staticmethod
+    def account_id(index: int) -> str:
+        return str(1_000_000_001 + index)
+
+    @staticmethod
+    def campaign_id(index: int) -> str:
+        return str(20_000_000_000 + index)
+
+    @staticmethod
+    def ad_group_id(index: int) -> str:
+        return str(100_000_000_000 + index)
+
+    @staticmethod
+    def keyword_id(index: int) -> str:
+        return str(300_000_000_000 + index)
+
+    def account_index(self, account_id) -> Optional[int]:
+        """Index of a generated account, or None for any other ID (the manager account included)."""
+        try:
+            index = int(str(account_id).replace("-", "")) - 1_000_000_001
+        except ValueError:
+            return None
+        return index if 0 <= index < self.account_count else None
+
+    def campaign_index(self, campaign_id) -> Optional[int]:
+        index = int(campaign_id) - 20_000_000_000
+        return index if 0 <= index < self.campaign_count else None
+
+    def ad_group_index(self, ad_group_id) -> Optional[int]:
+        index = int(ad_group_id) - 100_000_000_000
+        return index if 0 <= index < self.ad_group_count else None
+
+    def keyword_index(self, keyword_id) -> Optional[int]:
+        index = int(keyword_id) - 300_000_000_000
+        return index if 0 <= index < self.keyword_count else None
+
+    def campaign_range(self, account: Optional[int] = None) -> range:
+        """Campaign indexes of an account, or of all accounts."""
+        if account is None:
+            return range(self.campaign_count)
+        first = account * CAMPAIGNS_PER_ACCOUNT
+        return range(first, min(first + CAMPAIGNS_PER_ACCOUNT, self.campaign_count))
+
+    def ad_group_range(self, campaign: int) -> range:
+        first = campaign * AD_GROUPS_PER_CAMPAIGN
+        return range(first, min(first + AD_GROUPS_PER_CAMPAIGN, self.ad_group_count))
+
+    def keyword_range(self, ad_group: int) -> range:
+        first = ad_group * KEYWORDS_PER_AD_GROUP
+        return range(first, min(first + KEYWORDS_PER_AD_GROUP, self.keyword_count))
+
+    def campaign_keyword_range(self, campaign: int) -> range:
+        ad_groups = self.ad_group_range(campaign)
+        return range(ad_groups.start * KEYWORDS_PER_AD_GROUP, min(ad_groups.stop * KEYWORDS_PER_AD_GROUP, self.keyword_count))
+
+    # Entities
+
+    def account(self, index: int) -> Dict[str, Any]:
+        rng = self._rng(_ACCOUNT, index)
+        return {
+            "id": self.account_id(index),
+            "name": f"Synthetic {self.platform.title()} Account {index + 1}",
+            "currency_code": "USD",
+            "time_zone": _pick(rng, ["America/Los_Angeles", "America/New_York", "Europe/London"]),
+        }
+
+    def campaign(self, index: int) -> Dict[str, Any]:
+        rng = self._rng(_CAMPAIGN, index)
+        # Budgets in whole dollars, smaller for a partly filled last campaign
+        keywords = len(self.campaign_keyword_range(index))
+        full_size = KEYWORDS_PER_AD_GROUP * AD_GROUPS_PER_CAMPAIGN
+        return {
+            "id": self.campaign_id(index),
+            "account_id": self.account_id(index // CAMPAIGNS_PER_ACCOUNT),
+            "name": f"{_pick(rng, CAMPAIGN_THEMES)} - {_pick(rng, CAMPAIGN_REGIONS)} #{index + 1}",
+            "status": "PAUSED" if rng.random() < 0.1 else "ENABLED",
+            "budget_id": str(50_000_000_000 + index),
+            "daily_budget_micros": (10 + int(rng.lognormal(math.log(150), 0.5) * keywords / full_size)) * 1_000_000,
+        }
+
+    def ad_group(self, index: int) -> Dict[str, Any]:
+        rng = self._rng(_AD_GROUP, index)
+        return {
+            "id": self.ad_group_id(index),
+            "campaign_id": self.campaign_id(index // AD_GROUPS_PER_CAMPAIGN),
+            "name": f"Ad Group {index + 1} - {_pick(rng, INCLUDE_TERMS + GENERIC_TERMS).title()}",
+            "status": "PAUSED" if rng.random() < 0.08 else "ENABLED",
+        }
+
+    def _keyword(self, index: int) -> Dict[str, Any]:
+        """Keyword index with its search terms and the profile its metrics follow."""
+        rng = self._rng(_KEYWORD, index)
+        intent = INTENT_NAMES[rng.choice(len(INTENT_NAMES), p=INTENT_SHARES)]
+        _, volume, ctr_range, cvr_range, cpc_range = INTENTS[intent]
+
+        if intent == "brand":
+            text = _pick(rng, BRAND_TERMS) + _pick(rng, KEYWORD_SUFFIXES)
+        elif intent == "include":
+            text = _pick(rng, KEYWORD_PREFIXES) + _pick(rng, INCLUDE_TERMS) + _pick(rng, KEYWORD_SUFFIXES)
+        elif intent == "generic":
+            text = _pick(rng, KEYWORD_PREFIXES) + _pick(rng, GENERIC_TERMS) + _pick(rng, KEYWORD_SUFFIXES)
+        else:
+            text = f"{_pick(rng, INCLUDE_TERMS + GENERIC_TERMS)} {_pick(rng, EXCLUDE_TERMS)}"
+
+        # The first search term is the keyword itself; the others add a
+        # modifier, and some of those drift off-ICP and stop converting
+        terms = [text]
+        term_ctr = [rng.uniform(*ctr_range)]
+        term_cvr = [rng.uniform(*cvr_range)]
+        for _ in range(SEARCH_TERMS_PER_KEYWORD - 1):
+            if intent != "exclude" and rng.random() < 0.25:
+                terms.append(f"{text} {_pick(rng, EXCLUDE_TERMS)}")
+                term_ctr.append(rng.uniform(*INTENTS["exclude"][2]))
+                term_cvr.append(rng.uniform(*INTENTS["exclude"][3]))
+            else:
+                terms.append(text + _pick(rng, SEARCH_TERM_MODIFIERS))
+                term_ctr.append(rng.uniform(*ctr_range) * rng.uniform(0.6, 1.0))
+                term_cvr.append(rng.uniform(*cvr_range) * rng.uniform(0.5, 1.0))
+
+        cpc_micros = int(rng.uniform(*cpc_range) * 1_000_000)
+
+        # A few head keywords carry a large share of the traffic and spend
+        head = rng.lognormal(math.log(HEAD_VOLUME), 0.5) if rng.random() < HEAD_SHARE else 1.0
+
+        return {
+            "id": self.keyword_id(index),
+            "ad_group_id": self.ad_group_id(index // KEYWORDS_PER_AD_GROUP),
+            "text": text,
+            "match_type": MATCH_TYPES[rng.choice(len(MATCH_TYPES), p=MATCH_TYPE_SHARES)],
+            "status": "PAUSED" if rng.random() < 0.1 else "ENABLED",
+            "cpc_bid_micros": cpc_micros // 10_000 * 10_000 + 250_000,
+            "intent": intent,
+            "search_terms": terms,
+            "profile": {
+                "impressions": rng.lognormal(math.log(volume), 1.0) * head,
+                "term_weights": rng.dirichlet([3.0] + [1.0] * (SEARCH_TERMS_PER_KEYWORD - 1)),
+                "term_ctr": np.array(term_ctr),
+                "term_cvr": np.array(term_cvr),
+                "cpc_micros": cpc_micros,
+                "value_per_conversion": rng.lognormal(math.log(120), 0.4),
+            },
+        }
+
+    def accounts(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.account_count):
+            yield self.account(index)
+
+    def campaigns(self, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        for index in self.campaign_range(account):
+            yield self.campaign(index)
+
+    def ad_groups(self, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        for campaign in self.campaign_range(account):
+            for index in self.ad_group_range(campaign):
+                yield self.ad_group(index)
+
+    def keywords(self, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        for campaign in self.campaign_range(account):
+            for index in self.campaign_keyword_range(campaign):
+                yield self.keyword(index)
+
+    # Metrics
+
+    def _make_term_block(self, index: int, block: int) -> Dict[str, np.ndarray]:
+        """BLOCK_DAYS days of metrics of keyword index's search terms, shape (days, terms)."""
+        profile = self.keyword(index)["profile"]
+        rng = self._rng(_METRICS, index, block)
+        ordinals = np.arange(block * BLOCK_DAYS, (block + 1) * BLOCK_DAYS)
+
+        # date.fromordinal(1) is a Monday
+        weekday = WEEKDAY_FACTORS[(ordinals - 1) % 7]
+        season = 1 + 0.15 * np.sin(2 * np.pi * ordinals / 365.25)
+        expected = profile["impressions"] * weekday * season * rng.gamma(8.0, 1 / 8.0, BLOCK_DAYS)
+
+        impressions = rng.poisson(expected[:, None] * profile["term_weights"][None, :])
+        clicks = rng.binomial(impressions, profile["term_ctr"][None, :])
+        conversions = rng.binomial(clicks, profile["term_cvr"][None, :]).astype(float)
+        cost_micros = (clicks * profile["cpc_micros"] * rng.lognormal(0.0, 0.2, clicks.shape)).astype(np.int64) // 10_000 * 10_000
+        conversions_value = np.round(conversions * profile["value_per_conversion"] * rng.lognormal(0.0, 0.25, clicks.shape), 2)
+
+        return {
+            "impressions": impressions,
+            "clicks": clicks,
+            "cost_micros": cost_micros,
+            "conversions": conversions,
+            "conversions_value": conversions_value,
+        }
+
+    def _window(self, start_date, end_date) -> Tuple[date, date]:
+        start = _as_date(start_date) if start_date else self.start_date
+        end = _as_date(end_date) if end_date else self.end_date
+        if end < start:
+            raise ValueError(f"End date {end} is before start date {start}")
+        return start, end
+
+    def dates(self, start_date=None, end_date=None) -> List[date]:
+        start, end = self._window(start_date, end_date)
+        return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+    def search_term_metrics(self, index: int, start_date=None, end_date=None) -> Dict[str, np.ndarray]:
+        """Daily metrics of keyword index's search terms, arrays of shape (days, terms)."""
+        start, end = self._window(start_date, end_date)
+        first, last = start.toordinal(), end.toordinal()
+        blocks = [self._term_block(index, block) for block in range(first // BLOCK_DAYS, last // BLOCK_DAYS + 1)]
+        offset = first % BLOCK_DAYS
+        return {
+            name: np.concatenate([block[name] for block in blocks])[offset:offset + last - first + 1]
+            for name in METRIC_NAMES
+        }
+
+    def keyword_metrics(self, index: int, start_date=None, end_date=None) -> Dict[str, np.ndarray]:
+        """Daily metrics of keyword index (the sum of its search terms), arrays of shape (days,)."""
+        return {name: values.sum(axis=1) for name, values in self.search_term_metrics(index, start_date, end_date).items()}
+
+    def campaign_metrics(self, index: int, start_date=None, end_date=None) -> Dict[str, np.ndarray]:
+        """Daily metrics of campaign index (the sum of its keywords), arrays of shape (days,)."""
+        return self._sum_keywords(self.campaign_keyword_range(index), start_date, end_date)
+
+    def ad_group_metrics(self, index: int, start_date=None, end_date=None) -> Dict[str, np.ndarray]:
+        """Daily metrics of ad group index (the sum of its keywords), arrays of shape (days,)."""
+        return self._sum_keywords(self.keyword_range(index), start_date, end_date)
+
+    def _sum_keywords(self, keywords: range, start_date, end_date) -> Dict[str, np.ndarray]:
+        totals = {name: 0 for name in METRIC_NAMES}
+        for keyword in keywords:
+            metrics = self.keyword_metrics(keyword, start_date, end_date)
+            for name in METRIC_NAMES:
+                totals[name] = totals[name] + metrics[name]
+        return totals
+
+    # Rows
+
+    def keyword_daily_rows(self, start_date=None, end_date=None, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """One row per keyword-day: the metric rows the data set is sized by."""
+        days = self.dates(start_date, end_date)
+        for campaign in self.campaign_range(account):
+            for index in self.campaign_keyword_range(campaign):
+                keyword_id = self.keyword_id(index)
+                ad_group_id = self.ad_group_id(index // KEYWORDS_PER_AD_GROUP)
+                metrics = self.keyword_metrics(index, start_date, end_date)
+                for day, *values in zip(days, *(metrics[name].tolist() for name in METRIC_NAMES)):
+                    yield {"date": day, "keyword_id": keyword_id, "ad_group_id": ad_group_id, **dict(zip(METRIC_NAMES, values))}
+
+    def search_term_daily_rows(self, start_date=None, end_date=None, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """One row per search term-day with impressions, like the search terms report."""
+        days = self.dates(start_date, end_date)
+        for campaign in self.campaign_range(account):
+            for index in self.campaign_keyword_range(campaign):
+                keyword = self.keyword(index)
+                metrics = self.search_term_metrics(index, start_date, end_date)
+                columns = {name: metrics[name].tolist() for name in METRIC_NAMES}
+                for day_index, day in enumerate(days):
+                    for term_index, term in enumerate(keyword["search_terms"]):
+                        if not columns["impressions"][day_index][term_index]:
+                            continue
+                        yield {
+                            "date": day,
+                            "search_term": term,
+                            "keyword_id": keyword["id"],
+                            "keyword_text": keyword["text"],
+                            "ad_group_id": keyword["ad_group_id"],
+                            **{name: columns[name][day_index][term_index] for name in METRIC_NAMES},
+                        }
+
+    def campaign_daily_rows(self, start_date=None, end_date=None, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """One row per campaign-day."""
+        days = self.dates(start_date, end_date)
+        for index in self.campaign_range(account):
+            campaign = self.campaign(index)
+            metrics = self.campaign_metrics(index, start_date, end_date)
+            for day, *values in zip(days, *(metrics[name].tolist() for name in METRIC_NAMES)):
+                yield {"date": day, "campaign": campaign, **dict(zip(METRIC_NAMES, values))}
+
+    def ad_group_daily_rows(self, start_date=None, end_date=None, account: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """One row per ad group-day."""
+        days = self.dates(start_date, end_date)
+        for campaign_index in self.campaign_range(account):
+            campaign = self.campaign(campaign_index)
+            for index in self.ad_group_range(campaign_index):
+                ad_group = self.ad_group(index)
+                metrics = self.ad_group_metrics(index, start_date, end_date)
+                for day, *values in zip(days, *(metrics[name].tolist() for name in METRIC_NAMES)):
+                    yield {"date": day, "campaign": campaign, "ad_group": ad_group, **dict(zip(METRIC_NAMES, values))}
+
+    def ad_metric_rows(self, start_date=None, end_date=None, level: str = "campaign") -> Iterator[Dict[str, Any]]:
+        """
+        Normalized ad_metrics rows (see services/ad_metrics_sink.py).
+
+        Args:
+            start_date, end_date: Inclusive date range; defaults to the window
+            level: campaign (one row per campaign-day, as the fetch scripts
+                store) or ad_group (one per ad group-day, as the Microsoft
+                ingestor stores)
+        """
+        from services.ad_metrics_sink import ad_metric_row
+
+        if level == "campaign":
+            rows = self.campaign_daily_rows(start_date, end_date)
+        elif level == "ad_group":
+            rows = self.ad_group_daily_rows(start_date, end_date)
+        else:
+            raise ValueError(f"Unknown level: {level}")
+
+        for row in rows:
+            campaign = row["campaign"]
+            ad_group = row.get("ad_group")
+            yield ad_metric_row(
+                self.platform,
+                row["date"],
+                campaign["account_id"],
+                campaign["id"],
+                ad_group["id"] if ad_group else None,
+                impressions=row["impressions"],
+                clicks=row["clicks"],
+                spend=row["cost_micros"] / 1_000_000,
+                conversions=row["conversions"],
+                revenue=row["conversions_value"],
+                raw={"synthetic": True, "seed": self.seed}
+            )
+
+
+def _pick(rng: np.random.Generator, items: List[str]) -> str:
+    return items[rng.integers(len(items))]
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+@lru_cache(maxsize=None)
+def synthetic_data(platform: str = "google") -> SyntheticAdsData:
+    """The process-wide data set for a platform, configured by the MOCK_ADS_* settings."""
+    data = SyntheticAdsData(platform=platform)
+    logger.info(f"Synthetic ads data: {data}")
+    return data
+
+
+def fetch_synthetic_metrics(platform: str, start_date, end_date, sink=None) -> Dict[str, Any]:
+    """
+    What the fetch scripts do with MOCK_ADS set: write a platform's daily
+    campaign rows to sink if given and return the range totals.
+    """
+    totals = {"impressions": 0, "clicks": 0, "spend": 0.0, "conversions": 0.0}
+    for row in synthetic_data(platform).ad_metric_rows(start_date, end_date):
+        totals["impressions"] += row["impressions"]
+        totals["clicks"] += row["clicks"]
+        totals["spend"] += row["spend"]
+        totals["conversions"] += row["conversions"]
+        if sink is not None:
+            sink.write(row)
+
+    totals["spend"] = round(totals["spend"], 2)
+    totals["conversions"] = round(totals["conversions"], 1)
+    return totals
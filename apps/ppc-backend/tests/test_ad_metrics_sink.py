@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from models import AdMetric
+from services.ad_metrics_sink import AdMetricsSink, ad_metric_row, decode_raw, encode_raw, upsert_ad_metrics
+
+
+def rows(spend=10.0, days=3):
+    return [
+        ad_metric_row("reddit", f"2026-10-{day:02d}", "acct-1", campaign_id, adgroup_id=None,
+                      impressions=100, clicks=5, spend=spend, raw={"campaign": campaign_id, "spend": spend})
+        for day in range(1, days + 1)
+        for campaign_id in ("c-1", "c-2")
+    ]
+
+
+def stored(db):
+    db.expire_all()
+    return {
+        (metric.date, metric.campaign_id, metric.adgroup_id): metric.spend
+        for metric in db.query(AdMetric)
+    }
+
+
+def test_rerunning_an_upsert_restates_instead_of_duplicating(db):
+    assert upsert_ad_metrics(db, rows()) == 6
+    db.commit()
+    assert upsert_ad_metrics(db, rows()) == 6
+    db.commit()
+    assert len(stored(db)) == 6
+
+    upsert_ad_metrics(db, rows(spend=12.5))
+    db.commit()
+    assert set(stored(db).values()) == {12.5}
+    assert db.query(AdMetric).count() == 6
+
+
+def test_repeated_keys_in_a_batch_keep_the_last_row(db):
+    assert upsert_ad_metrics(db, rows(spend=1.0, days=1) + rows(spend=2.0, days=1)) == 2
+    db.commit()
+    assert stored(db) == {(date(2026, 10, 1), "c-1", ""): 2.0, (date(2026, 10, 1), "c-2", ""): 2.0}
+
+
+def test_missing_ad_group_and_ad_ids_stay_in_the_key(db):
+    upsert_ad_metrics(db, rows(days=1))
+    upsert_ad_metrics(db, [ad_metric_row("reddit", "2026-10-01", "acct-1", "c-1", adgroup_id="ag-1", spend=3.0)])
+    db.commit()
+    assert stored(db)[(date(2026, 10, 1), "c-1", "")] == 10.0
+    assert stored(db)[(date(2026, 10, 1), "c-1", "ag-1")] == 3.0
+
+
+def test_sink_writes_batches_and_reruns_idempotently(db, session_factory):
+    for _ in range(2):
+        with AdMetricsSink(session_factory=session_factory, batch_size=4) as sink:
+            sink.write_many(rows())
+        assert sink.stats == {"rows_received": 6, "rows_written": 6, "batches": 2}
+
+    assert db.query(AdMetric).count() == 6
+
+
+@pytest.mark.parametrize("mode", ["full", "compressed"])
+def test_raw_rows_round_trip(db, mode):
+    raw = {"campaign": "c-1", "metrics": [1, 2, 3]}
+    upsert_ad_metrics(db, [ad_metric_row("x", "2026-10-01", "acct-1", "c-1", raw=raw, raw_mode=mode)])
+    db.commit()
+    assert decode_raw(db.query(AdMetric.raw).scalar()) == raw
+
+
+def test_raw_can_be_dropped():
+    assert encode_raw({"campaign": "c-1"}, "none") is None
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import SessionRunner, get_db_runner
+from models import AuditLog
+from routers import audit
+from routers.audit import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def client(session_factory):
+    app = FastAPI()
+    app.include_router(audit.router, prefix="/audit")
+    app.dependency_overrides[get_db_runner] = lambda: SessionRunner(session_factory())
+    return TestClient(app)
+
+
+@pytest.fixture
+def logs(db):
+    start = datetime(2026, 10, 1, 12, 0, 0)
+    # Pairs of entries share a timestamp, so pages have to break ties on id
+    rows = [
+        AuditLog(id=f"log-{i:02d}", action="pause_keyword", user="tester", result="success",
+                 timestamp=start + timedelta(minutes=i // 2))
+        for i in range(25)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def test_cursor_round_trip():
+    record = {"timestamp": "2026-10-01T12:30:00.250000", "id": "log-07"}
+    assert decode_cursor(encode_cursor(record)) == (datetime(2026, 10, 1, 12, 30, 0, 250000), "log-07")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor({"timestamp": "yesterday", "id": "x"})])
+def test_invalid_cursor_is_rejected(client, cursor):
+    response = client.get("/audit/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_pages_cover_every_log_once(client, logs):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/audit/", params=params).json()
+        seen += [log["id"] for log in page["logs"]]
+        cursor = page["pagination"]["next_cursor"]
+        if not page["pagination"]["has_more"]:
+            assert cursor is None
+            break
+
+    expected = sorted(logs, key=lambda log: (log.timestamp, log.id), reverse=True)
+    assert seen == [log.id for log in expected]
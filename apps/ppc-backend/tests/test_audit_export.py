@@ -0,0 +1,91 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import get_db
+from models import AuditLog
+from routers import audit
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    # Small batches, so every export streams several chunks
+    monkeypatch.setattr(audit, "EXPORT_BATCH_SIZE", 3)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(audit.router, prefix="/audit")
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture
+def logs(db):
+    start = datetime(2026, 10, 1, 12, 0)
+    rows = [
+        AuditLog(id=f"log-{i:02d}", action="pause_keyword" if i % 2 else "update_budget", user="tester",
+                 timestamp=start + timedelta(hours=i), result="error" if i % 5 == 0 else "success",
+                 payload_json=json.dumps({"reason": f"reason {i}", "note": 'quoted "text", with commas'}))
+        for i in range(10)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return sorted((row.id for row in rows), reverse=True)
+
+
+def test_json_export_keeps_its_envelope(client, logs):
+    response = client.post("/audit/export", params={"format": "json", "action": "pause_keyword"})
+    assert response.status_code == 200
+
+    body = json.loads(response.text)
+    assert body["format"] == "json"
+    assert body["filters"] == {"since": None, "action": "pause_keyword", "result": None}
+    assert [log["id"] for log in body["data"]] == [log_id for log_id in logs if int(log_id[-2:]) % 2]
+    assert body["total_records"] == 5
+    assert body["data"][0]["payload"]["reason"] == "reason 9"
+
+
+def test_json_export_of_nothing_is_still_valid(client, logs):
+    body = json.loads(client.post("/audit/export", params={"format": "json", "action": "nope"}).text)
+    assert (body["data"], body["total_records"]) == ([], 0)
+
+
+def test_ndjson_export_streams_one_record_per_line(client, logs):
+    response = client.post("/audit/export", params={"format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == logs
+
+
+def test_csv_export_quotes_payloads(client, logs):
+    response = client.post("/audit/export", params={"format": "csv", "result": "error"})
+    rows = list(csv.reader(io.StringIO(response.text)))
+
+    assert rows[0] == audit.EXPORT_CSV_COLUMNS
+    assert [row[0] for row in rows[1:]] == ["log-05", "log-00"]
+    assert json.loads(rows[1][-1])["note"] == 'quoted "text", with commas'
+
+
+def test_gzip_export_decompresses_to_the_plain_one(client, logs):
+    plain = client.post("/audit/export", params={"format": "ndjson"}).text
+    response = client.post("/audit/export", params={"format": "ndjson", "gzip": True})
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="audit_logs_' in response.headers["content-disposition"]
+    assert gzip.decompress(response.content).decode() == plain
+
+
+@pytest.mark.parametrize("params", [{"format": "xml"}, {"since": "01/10/2026"}])
+def test_invalid_parameters_are_a_bad_request(client, params):
+    assert client.post("/audit/export", params=params).status_code == 400
@@ -0,0 +1,163 @@
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from database import SessionRunner, get_db_runner
+from models import AuditLog
+from routers import audit
+from services.audit_partitions import (
+    AUDIT_ARCHIVE_DIR,
+    archived_months,
+    audit_log_entity,
+    iter_archived_logs,
+    list_partitions,
+    log_record,
+    run_audit_retention,
+)
+from services.audit_summary import summarize_audit_logs, with_archived_logs
+
+TODAY = date(2026, 10, 15)
+
+
+@pytest.fixture
+def logs(db):
+    rows = []
+    for month in range(1, 11):
+        for i in range(12):
+            rows.append(AuditLog(
+                id=f"log-{month:02d}-{i:02d}",
+                action="pause_keyword" if i % 2 else "add_negative_keyword",
+                payload_json=json.dumps({"campaign_id": f"c-{i % 3}"}),
+                user="tester",
+                # Three entries a day, so archives have to order ties by id
+                timestamp=datetime(2026, month, 1 + i // 3, 9, 30),
+                result="success",
+                validate_only=False,
+                campaign_id=f"c-{i % 3}",
+            ))
+    db.add_all(rows)
+    db.commit()
+    return {row.id: log_record(row) for row in rows}
+
+
+@pytest.fixture
+def retained(db, logs, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    summary = run_audit_retention(db, retention_days=150, archive_dir=archive_dir, today=TODAY)
+    return summary, archive_dir
+
+
+def live_records(db, since=None):
+    entity = audit_log_entity(db, since)
+    query = select(entity).order_by(entity.timestamp.desc(), entity.id.desc())
+    if since is not None:
+        query = query.filter(entity.timestamp >= since)
+    return [log_record(log) for log in db.scalars(query)]
+
+
+def test_retention_rotates_closed_months_and_archives_expired_ones(db, retained):
+    summary, archive_dir = retained
+
+    assert summary["partitions_created"] == []
+    assert summary["partitions_rotated"] == [f"audit_logs_2026_{month:02d}" for month in range(1, 9)]
+    assert [entry["partition"] for entry in summary["partitions_archived"]] == [
+        f"audit_logs_2026_{month:02d}" for month in range(1, 5)
+    ]
+    assert all(entry["rows"] == 12 for entry in summary["partitions_archived"])
+
+    assert list_partitions(db) == [date(2026, month, 1) for month in range(5, 9)]
+    assert archived_months(archive_dir) == [date(2026, month, 1) for month in range(1, 5)]
+    # The current and previous month stay in audit_logs
+    assert {log.timestamp.month for log in db.query(AuditLog)} == {9, 10}
+
+
+def test_retention_is_idempotent(db, retained):
+    _, archive_dir = retained
+    again = run_audit_retention(db, retention_days=150, archive_dir=archive_dir, today=TODAY)
+    assert again == {"partitions_created": [], "partitions_rotated": [], "partitions_archived": []}
+
+
+def test_every_entry_reads_back_once_in_order(db, logs, retained):
+    _, archive_dir = retained
+    since = datetime(2026, 1, 1)
+
+    records = live_records(db, since) + list(iter_archived_logs(since, archive_dir=archive_dir))
+
+    expected = sorted(logs.values(), key=lambda record: (record["timestamp"], record["id"]), reverse=True)
+    assert records == expected
+
+
+def test_since_skips_live_partitions_and_archives_before_it(db, logs, retained):
+    _, archive_dir = retained
+    since = datetime(2026, 3, 2)
+
+    records = live_records(db, since) + list(iter_archived_logs(since, archive_dir=archive_dir))
+
+    assert {record["id"] for record in records} == {
+        log_id for log_id, record in logs.items() if record["timestamp"] >= since.isoformat()
+    }
+
+
+def test_archived_reads_filter_and_resume_from_a_position(logs, retained):
+    _, archive_dir = retained
+    since = datetime(2026, 1, 1)
+
+    matching = list(iter_archived_logs(
+        since, action="pause_keyword", archive_dir=archive_dir, payload_filters={"campaign_id": "c-1"}
+    ))
+    assert matching and all(
+        record["action"] == "pause_keyword" and record["campaign_id"] == "c-1" for record in matching
+    )
+
+    every = list(iter_archived_logs(since, archive_dir=archive_dir))
+    position = (datetime.fromisoformat(every[9]["timestamp"]), every[9]["id"])
+    assert list(iter_archived_logs(since, before=position, archive_dir=archive_dir)) == every[10:]
+
+
+def test_archives_reach_back_to_their_months_only(retained):
+    _, archive_dir = retained
+    assert list(iter_archived_logs(datetime(2026, 5, 1), archive_dir=archive_dir)) == []
+    assert len(list(iter_archived_logs(datetime(2026, 4, 1) - timedelta(days=1), archive_dir=archive_dir))) == 12
+
+
+@pytest.fixture
+def default_archive(db, logs, tmp_path, monkeypatch):
+    """Retention run into the default archive directory, which summaries and /audit read."""
+    if os.path.isabs(AUDIT_ARCHIVE_DIR):
+        pytest.skip("AUDIT_ARCHIVE_DIR is set to an absolute path")
+    monkeypatch.chdir(tmp_path)
+    run_audit_retention(db, retention_days=150, today=TODAY)
+
+
+def test_scanned_summaries_count_archived_entries(db, logs, default_archive):
+    since = datetime(2026, 3, 1)
+    summary = with_archived_logs(summarize_audit_logs(db, since, entity=audit_log_entity(db, since)), since)
+
+    expected = [record for record in logs.values() if record["timestamp"] >= since.isoformat()]
+    assert summary["total_actions"] == len(expected)
+    assert summary["archived_actions"] == 24
+    assert sum(summary["breakdown"]["by_action"].values()) == len(expected)
+
+
+def test_audit_pages_continue_into_the_archives(db, logs, default_archive, session_factory):
+    app = FastAPI()
+    app.include_router(audit.router, prefix="/audit")
+    app.dependency_overrides[get_db_runner] = lambda: SessionRunner(session_factory())
+    client = TestClient(app)
+
+    seen, cursor = [], None
+    while True:
+        params = {"since": "2026-01-01", "limit": 25, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/audit/", params=params).json()
+        seen += [log["id"] for log in page["logs"]]
+        cursor = page["pagination"]["next_cursor"]
+        if not cursor:
+            break
+
+    expected = sorted(logs.values(), key=lambda record: (record["timestamp"], record["id"]), reverse=True)
+    assert seen == [record["id"] for record in expected]
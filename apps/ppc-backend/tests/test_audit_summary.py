@@ -0,0 +1,76 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+
+from models import AuditLog, AuditRollup
+from services.audit_summary import record_audit_rollups, summarize_audit_logs
+
+NOW = datetime(2026, 10, 15, 12, 0)
+
+
+def audit_entries(count, seed):
+    rng = random.Random(seed)
+    return [
+        dict(
+            id=f"log-{seed}-{i:04d}",
+            action=rng.choice(["pause_keyword", "add_negative_keyword", "update_budget"]),
+            user=rng.choice(["alice", "bob", "system"]),
+            timestamp=NOW - timedelta(days=rng.randint(0, 20), minutes=rng.randint(0, 600)),
+            result=rng.choice(["success", "error", "dry_run", None]),
+            validate_only=rng.choice([True, False, None]),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def logged(db):
+    entries = audit_entries(400, seed=1)
+    db.execute(insert(AuditLog), entries)
+    # Inserts fill in the column default; rows from the SQL migrations can hold NULL
+    db.execute(update(AuditLog).where(
+        AuditLog.id.in_([entry["id"] for entry in entries if entry["validate_only"] is None])
+    ).values(validate_only=None))
+    record_audit_rollups(db, [AuditLog(**entry) for entry in entries])
+    db.commit()
+    assert db.query(AuditLog).filter(AuditLog.validate_only.is_(None)).count() > 0
+    return entries
+
+
+def test_rollups_match_a_scan_over_whole_days(db, logged):
+    for days in (1, 7, 30):
+        since = datetime.combine((NOW - timedelta(days=days)).date(), datetime.min.time())
+        scanned = summarize_audit_logs(db, since)
+        rolled = summarize_audit_logs(db, since, use_rollups=True)
+
+        assert (scanned["source"], rolled["source"]) == ("scan", "rollups")
+        assert rolled["total_actions"] == scanned["total_actions"]
+        assert rolled["breakdown"]["by_validation"] == scanned["breakdown"]["by_validation"]
+        assert rolled["breakdown"]["by_action"] == scanned["breakdown"]["by_action"]
+        assert rolled["breakdown"]["by_user"] == scanned["breakdown"]["by_user"]
+        # Rollups store a missing result as ""
+        assert {result or None: count for result, count in rolled["breakdown"]["by_result"].items()} \
+            == scanned["breakdown"]["by_result"]
+
+
+def test_null_validate_only_counts_as_a_dry_run(db, logged):
+    summary = summarize_audit_logs(db, NOW - timedelta(days=30))
+    live = sum(1 for entry in logged if entry["validate_only"] is False)
+
+    assert summary["breakdown"]["by_validation"] == {"dry_run": len(logged) - live, "live": live}
+
+
+def test_batches_are_grouped_into_one_row_per_key(db):
+    logs = [
+        AuditLog(id=f"log-{i}", action="pause_keyword", user="alice", timestamp=NOW, result="success",
+                 validate_only=False)
+        for i in range(50)
+    ]
+    record_audit_rollups(db, logs[:20])
+    record_audit_rollups(db, logs[20:])
+    db.commit()
+
+    rollup = db.query(AuditRollup).one()
+    assert (rollup.date, rollup.count) == (NOW.date(), 50)
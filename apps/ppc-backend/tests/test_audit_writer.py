@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import pytest
+
+from models import AuditLog, AuditRollup
+from services.audit_writer import AuditWriter, payload_columns
+
+NOW = datetime(2026, 10, 15, 12, 0)
+
+
+def entry(log_id, **values):
+    return {"id": log_id, "action": "pause_keyword", "user": "tester", "timestamp": NOW,
+            "result": "success", "validate_only": False, **values}
+
+
+@pytest.fixture
+def writer(session_factory):
+    writer = AuditWriter(session_factory=session_factory, flush_interval=0.05, batch_size=10)
+    yield writer
+    writer.close()
+
+
+def test_entries_and_rollups_are_group_committed(db, writer):
+    sequences = [writer.submit(entry(f"log-{i:02d}")) for i in range(25)]
+    writer.wait_for(sequences[-1])
+
+    assert db.query(AuditLog).count() == 25
+    assert db.query(AuditRollup.count).scalar() == 25
+    stats = writer.stats()
+    assert stats["entries_written"] == 25 and stats["entries_failed"] == 0
+    assert stats["batches"] < 25
+
+
+def test_a_bad_entry_fails_alone(db, writer):
+    first = writer.submit(entry("log-01"))
+    writer.wait_for(first)
+
+    duplicate = writer.submit(entry("log-01"))
+    after = writer.submit(entry("log-02"))
+
+    with pytest.raises(RuntimeError, match="Audit log write failed"):
+        writer.wait_for(duplicate)
+    writer.wait_for(after)
+
+    assert sorted(log.id for log in db.query(AuditLog)) == ["log-01", "log-02"]
+    assert writer.stats()["entries_failed"] == 1
+
+
+def test_close_flushes_pending_entries(db, writer):
+    for i in range(5):
+        writer.submit(entry(f"log-{i}"))
+    writer.close()
+
+    assert db.query(AuditLog).count() == 5
+    assert not writer.stats()["running"]
+
+
+def test_payload_columns_keep_scalar_keys_only():
+    columns = payload_columns({"campaign_id": 123, "keyword_text": "x" * 600, "ad_group_id": {"id": 1}})
+
+    assert columns == {
+        "campaign_id": "123",
+        "recommendation_id": None,
+        "keyword_text": "x" * 500,
+        "ad_group_id": None,
+    }
+    assert payload_columns(["not", "a", "dict"]) == dict.fromkeys(columns)
+
+
+@pytest.fixture
+def apply_router(monkeypatch, writer):
+    from routers import apply
+
+    writer._customer_id, writer._customer_id_resolved = "1234567890", True
+    monkeypatch.setattr(apply, "audit_writer", writer)
+    monkeypatch.setattr(apply, "AUDIT_BUFFERED_WRITES", True)
+    return apply
+
+
+def test_live_entries_are_durable_when_logged(db, apply_router):
+    audit_id, warning = apply_router.create_audit_log(
+        "pause_keyword", {"ad_group_id": "ag-1"}, "tester", "success", validate_only=False
+    )
+
+    assert warning is None
+    log = db.get(AuditLog, audit_id)
+    assert (log.ad_group_id, log.customer_id) == ("ag-1", "1234567890")
+
+
+def test_writer_failures_after_a_live_change_become_a_warning(monkeypatch, apply_router):
+    def timed_out(sequence, timeout=None):
+        raise RuntimeError("Timed out waiting for audit log flush after 10.0s")
+
+    monkeypatch.setattr(apply_router.audit_writer, "wait_for", timed_out)
+
+    audit_id, warning = apply_router.create_audit_log(
+        "pause_keyword", {"ad_group_id": "ag-1"}, "tester", "success", validate_only=False
+    )
+
+    assert audit_id
+    assert warning.startswith("Audit log not confirmed written")
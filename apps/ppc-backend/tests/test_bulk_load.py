@@ -0,0 +1,109 @@
+import random
+from datetime import date, timedelta
+
+from models import AdMetric, AgentRun, DailyMetric, MetricRollup
+from services import bulk_load
+from services.ad_metrics_sink import ad_metric_row, upsert_ad_metrics
+from services.bulk_load import copy_upsert, use_bulk_load
+from services.metric_rollups import ROLLUP_METRICS, rebuild_metric_rollups, write_daily_metrics
+
+START = date(2026, 9, 1)
+
+
+def daily_rows(seed, days=range(40)):
+    rng = random.Random(seed)
+    return {
+        (f"c-{campaign}", START + timedelta(days=day)): {
+            "impressions": rng.randint(0, 1000),
+            "clicks": rng.randint(0, 50),
+            "cost_micros": rng.randint(0, 50) * 1_000_000,
+            "conversions": float(rng.randint(0, 3)),
+            "conversions_value": float(rng.randint(0, 300)),
+        }
+        for campaign in range(5)
+        for day in days
+    }
+
+
+def rollups(db):
+    return sorted(
+        (rollup.grain, rollup.ref_id, rollup.period_start, rollup.days,
+         *[getattr(rollup, name) for name in ROLLUP_METRICS])
+        for rollup in db.query(MetricRollup)
+    )
+
+
+def test_bulk_load_is_postgres_only(db):
+    assert not use_bulk_load(db, 1_000_000)
+    assert not use_bulk_load(db, 10, bulk=True)
+
+
+def test_threshold_decides_on_postgres(pg_db, monkeypatch):
+    monkeypatch.setattr(bulk_load, "BULK_LOAD_THRESHOLD", 100)
+    assert use_bulk_load(pg_db, 100) and not use_bulk_load(pg_db, 99)
+    assert use_bulk_load(pg_db, 1, bulk=True) and not use_bulk_load(pg_db, 1000, bulk=False)
+
+
+def test_copied_daily_metrics_match_the_orm_path(pg_db):
+    first, restated = daily_rows(1), daily_rows(2, days=range(30, 50))
+
+    assert write_daily_metrics(pg_db, "campaign", first, bulk=True) == {"inserted": 200, "updated": 0}
+    pg_db.commit()
+    counts = write_daily_metrics(pg_db, "campaign", restated, bulk=True)
+    pg_db.commit()
+    assert counts["inserted"] == 50 and counts["updated"] > 0
+
+    expected = {**first, **restated}
+    stored = {(metric.ref_id, metric.date): metric for metric in pg_db.query(DailyMetric)}
+    assert set(stored) == set(expected)
+    assert all(
+        getattr(stored[key], name) == value for key, values in expected.items() for name, value in values.items()
+    )
+
+    incremental = rollups(pg_db)
+    rebuild_metric_rollups(pg_db, "campaign")
+    pg_db.commit()
+    assert rollups(pg_db) == incremental
+
+
+def test_unrestated_copies_leave_existing_rows(pg_db):
+    write_daily_metrics(pg_db, "campaign", daily_rows(1, days=range(5)), bulk=True)
+    pg_db.commit()
+    before = rollups(pg_db)
+
+    counts = write_daily_metrics(pg_db, "campaign", daily_rows(2, days=range(5)), restate=False, bulk=True)
+    pg_db.commit()
+
+    assert counts == {"inserted": 0, "updated": 0}
+    assert rollups(pg_db) == before
+
+
+def test_copy_keeps_nulls_empty_strings_and_booleans_apart(pg_db):
+    counts = copy_upsert(pg_db, AgentRun.__table__, [
+        {"id": 1, "agent": "a", "run_id": "r-1", "ok": True, "stats": "", "watermark": None},
+        {"id": 2, "agent": "a", "run_id": "r-2", "ok": False, "stats": None, "watermark": "2026-09-01"},
+    ], ["id"])
+    pg_db.commit()
+
+    assert counts == {"inserted": 2, "updated": 0}
+    runs = {run.run_id: run for run in pg_db.query(AgentRun)}
+    assert (runs["r-1"].ok, runs["r-1"].stats, runs["r-1"].watermark) == (True, "", None)
+    assert (runs["r-2"].ok, runs["r-2"].stats, runs["r-2"].watermark) == (False, None, "2026-09-01")
+    # Client-side defaults of columns the batch doesn't carry are applied
+    assert runs["r-1"].started_at is not None
+
+
+def test_copied_ad_metrics_upserts_are_idempotent(pg_db, monkeypatch):
+    monkeypatch.setattr(bulk_load, "BULK_LOAD_THRESHOLD", 1)
+    rows = [
+        ad_metric_row("microsoft", START + timedelta(days=day), "acct-1", f"c-{campaign}", spend=1.5 * day)
+        for day in range(10)
+        for campaign in range(3)
+    ]
+
+    for _ in range(2):
+        assert upsert_ad_metrics(pg_db, rows) == 30
+        pg_db.commit()
+
+    assert pg_db.query(AdMetric).count() == 30
+    assert {metric.adgroup_id for metric in pg_db.query(AdMetric)} == {""}
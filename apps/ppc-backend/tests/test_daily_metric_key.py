@@ -0,0 +1,101 @@
+import importlib.util
+import os
+from datetime import date
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy.exc import IntegrityError
+
+from models import DailyMetric
+
+MIGRATION = os.path.join(os.path.dirname(__file__), "..", "alembic", "versions", "008_daily_metric_natural_key.py")
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("daily_metric_natural_key", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Several batches even for a handful of rows
+    module.COPY_BATCH_SIZE = 2
+    return module
+
+
+def migrate(connection, step):
+    with Operations.context(MigrationContext.configure(connection)):
+        step()
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """daily_metrics as it was before migration 008: string IDs and no unique key."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    legacy = sa.Table(
+        "daily_metrics", sa.MetaData(),
+        sa.Column("id", sa.String(100), primary_key=True),
+        *load_migration()._metric_columns()
+    )
+    with engine.begin() as connection:
+        legacy.create(connection)
+        connection.execute(legacy.insert(), [
+            {"id": "a", "date": date(2026, 10, 1), "level": "campaign", "ref_id": "c-1", "clicks": 10},
+            {"id": "b", "date": date(2026, 10, 1), "level": "campaign", "ref_id": "c-1", "clicks": 99},
+            {"id": "c", "date": date(2026, 10, 1), "level": "keyword", "ref_id": "c-1", "clicks": 20},
+            {"id": "d", "date": date(2026, 10, 2), "level": "campaign", "ref_id": "c-1", "clicks": 30},
+            {"id": "e", "date": date(2026, 10, 2), "level": "campaign", "ref_id": "c-2", "clicks": 40},
+        ])
+    yield engine
+    engine.dispose()
+
+
+def daily_rows(connection):
+    return sorted(connection.execute(sa.text("SELECT level, ref_id, date, clicks FROM daily_metrics")).all())
+
+
+def test_upgrade_keeps_the_first_row_per_natural_key(legacy_engine):
+    migration = load_migration()
+    with legacy_engine.begin() as connection:
+        migrate(connection, migration.upgrade)
+
+    with legacy_engine.connect() as connection:
+        assert daily_rows(connection) == [
+            ("campaign", "c-1", "2026-10-01", 10),
+            ("campaign", "c-1", "2026-10-02", 30),
+            ("campaign", "c-2", "2026-10-02", 40),
+            ("keyword", "c-1", "2026-10-01", 20),
+        ]
+        inspector = sa.inspect(connection)
+        assert [c["column_names"] for c in inspector.get_unique_constraints("daily_metrics")] == [
+            ["level", "ref_id", "date"]
+        ]
+        assert "idx_daily_metrics_level_date_covering" in {i["name"] for i in inspector.get_indexes("daily_metrics")}
+
+        with pytest.raises(IntegrityError):
+            connection.execute(sa.text(
+                "INSERT INTO daily_metrics (level, ref_id, date, clicks) VALUES ('campaign', 'c-2', '2026-10-02', 1)"
+            ))
+
+
+def test_downgrade_restores_composite_string_ids(legacy_engine):
+    migration = load_migration()
+    with legacy_engine.begin() as connection:
+        migrate(connection, migration.upgrade)
+        migrate(connection, migration.downgrade)
+
+    with legacy_engine.connect() as connection:
+        assert sorted(connection.execute(sa.text("SELECT id FROM daily_metrics")).scalars()) == [
+            "2026-10-01_campaign_c-1", "2026-10-01_keyword_c-1",
+            "2026-10-02_campaign_c-1", "2026-10-02_campaign_c-2",
+        ]
+
+
+def test_model_rejects_duplicate_natural_keys(db):
+    db.add(DailyMetric(date=date(2026, 10, 1), level="campaign", ref_id="c-1", clicks=1))
+    # The same ref_id at another level is a different entity
+    db.add(DailyMetric(date=date(2026, 10, 1), level="keyword", ref_id="c-1", clicks=1))
+    db.commit()
+
+    db.add(DailyMetric(date=date(2026, 10, 1), level="campaign", ref_id="c-1", clicks=2))
+    with pytest.raises(IntegrityError):
+        db.commit()
@@ -0,0 +1,125 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ads import linkedin_analytics
+from ads.linkedin_analytics import (
+    campaign_id_from_urn,
+    campaign_urn,
+    element_date,
+    fetch_campaign_analytics,
+    get_all_pages,
+)
+
+
+class AnalyticsAPI:
+    """adAnalyticsV2 stand-in answering one DAILY element per campaign-day."""
+
+    def __init__(self, rate_limited=0):
+        self.requests = []
+        self.in_flight = self.peak = 0
+        self.rate_limited = rate_limited
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        params = request.url.params
+        campaigns = [value for key, value in params.multi_items() if key.startswith("campaigns[")]
+        days = range(int(params["dateRange.start.day"]), int(params["dateRange.end.day"]) + 1)
+        if params["timeGranularity"] == "ALL":
+            days = days[:1]
+        return httpx.Response(200, json={"elements": [
+            {
+                "pivotValue": urn,
+                "dateRange": {"start": {"year": 2026, "month": 9, "day": day}},
+                "impressions": 10,
+            }
+            for urn in campaigns
+            for day in days
+        ]})
+
+
+def analytics(api, *args, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(base_url="https://linkedin.test", transport=httpx.MockTransport(api)) as client:
+            return await fetch_campaign_analytics(client, *args, **kwargs)
+    return asyncio.run(run())
+
+
+def test_campaigns_are_sent_in_chunks():
+    api = AnalyticsAPI()
+    elements = analytics(api, range(45), "2026-09-01", "2026-09-01", chunk_size=20)
+
+    chunks = [
+        [value for key, value in request.url.params.multi_items() if key.startswith("campaigns[")]
+        for request in api.requests
+    ]
+    assert sorted(len(chunk) for chunk in chunks) == [5, 20, 20]
+    assert sorted(urn for chunk in chunks for urn in chunk) == sorted(campaign_urn(i) for i in range(45))
+    assert sorted(campaign_id_from_urn(element["pivotValue"]) for element in elements) == sorted(map(str, range(45)))
+
+
+def test_daily_chunks_stay_under_the_element_cap(monkeypatch):
+    monkeypatch.setattr(linkedin_analytics, "ANALYTICS_MAX_ELEMENTS", 100)
+    api = AnalyticsAPI()
+    elements = analytics(api, range(10), "2026-09-01", "2026-09-30", granularity="DAILY", chunk_size=20)
+
+    # 30 days per campaign leaves room for 3 campaigns per response
+    assert len(api.requests) == 4
+    assert len(elements) == 300
+    assert {element_date(element).day for element in elements} == set(range(1, 31))
+
+
+def test_chunks_run_at_most_concurrency_at_a_time():
+    api = AnalyticsAPI()
+    analytics(api, range(40), "2026-09-01", "2026-09-01", chunk_size=2, concurrency=3)
+    assert len(api.requests) == 20 and api.peak == 3
+
+
+def test_rate_limited_chunks_are_retried():
+    api = AnalyticsAPI(rate_limited=2)
+    elements = analytics(api, range(3), "2026-09-01", "2026-09-01")
+    assert len(api.requests) == 3 and len(elements) == 3
+
+
+def test_unknown_granularities_are_rejected():
+    with pytest.raises(ValueError):
+        analytics(AnalyticsAPI(), range(3), "2026-09-01", "2026-09-01", granularity="WEEKLY")
+
+
+def paged(items, total=True, ignore_paging=False):
+    def handler(request):
+        start, count = int(request.url.params["start"]), int(request.url.params["count"])
+        if ignore_paging:
+            return httpx.Response(200, json={"elements": items})
+        paging = {"start": start, "count": count, **({"total": len(items)} if total else {})}
+        return httpx.Response(200, json={"elements": items[start:start + count], "paging": paging})
+    return handler
+
+
+def all_pages(handler, page_size):
+    async def run():
+        async with httpx.AsyncClient(base_url="https://linkedin.test", transport=httpx.MockTransport(handler)) as client:
+            return await get_all_pages(client, "/adCampaignsV2", {"q": "search"}, page_size=page_size)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("total", [True, False])
+def test_pages_are_collected_until_the_last_one(total):
+    items = [{"id": i} for i in range(25)]
+    assert all_pages(paged(items, total=total), page_size=10) == items
+    assert all_pages(paged(items[:20], total=total), page_size=10) == items[:20]
+
+
+def test_responses_that_ignore_paging_are_taken_whole():
+    items = [{"id": i} for i in range(25)]
+    assert all_pages(paged(items, ignore_paging=True), page_size=10) == items
@@ -0,0 +1,126 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from models import DailyMetric, MetricRollup
+from services.metric_rollups import (
+    ROLLUP_METRICS,
+    metric_totals,
+    next_period_start,
+    period_start,
+    plan_range,
+    rebuild_metric_rollups,
+    write_daily_metrics,
+)
+
+START = date(2026, 1, 1)
+
+
+def test_plan_range_uses_months_then_weeks_then_days():
+    # Wednesday 28 January to Monday 20 April 2026
+    assert plan_range("campaign", date(2026, 1, 28), date(2026, 4, 20)) == [
+        ("day", date(2026, 1, 28), date(2026, 1, 31)),
+        ("month", date(2026, 2, 1), date(2026, 3, 31)),
+        ("day", date(2026, 4, 1), date(2026, 4, 5)),
+        ("week", date(2026, 4, 6), date(2026, 4, 19)),
+        ("day", date(2026, 4, 20), date(2026, 4, 20)),
+    ]
+
+
+def test_plan_range_reads_days_for_levels_without_rollups():
+    assert plan_range("ad_group", date(2026, 1, 1), date(2026, 3, 31)) == [
+        ("day", date(2026, 1, 1), date(2026, 3, 31)),
+    ]
+
+
+@pytest.mark.parametrize("level", ["campaign", "keyword", "ad_group"])
+def test_plan_range_covers_every_day_once_with_whole_periods(level):
+    rng = random.Random(level)
+    for _ in range(500):
+        start = START + timedelta(days=rng.randint(0, 400))
+        end = start + timedelta(days=rng.randint(0, 400))
+        segments = plan_range(level, start, end)
+
+        day = start
+        for grain, first, last in segments:
+            assert first == day and first <= last
+            if grain != "day":
+                # Rollup segments span whole periods, possibly several
+                assert period_start(first, grain) == first
+                assert next_period_start(period_start(last, grain), grain) == last + timedelta(days=1)
+            day = last + timedelta(days=1)
+        assert day == end + timedelta(days=1)
+
+
+def test_plan_range_is_empty_for_inverted_ranges():
+    assert plan_range("campaign", date(2026, 2, 1), date(2026, 1, 31)) == []
+
+
+def daily_rows(ref_ids, days, seed):
+    rng = random.Random(seed)
+    return {
+        (ref_id, START + timedelta(days=day)): {
+            "impressions": rng.randint(0, 1000),
+            "clicks": rng.randint(0, 50),
+            "cost_micros": rng.randint(0, 50) * 1_000_000,
+            "conversions": float(rng.randint(0, 3)),
+            "conversions_value": float(rng.randint(0, 300)),
+        }
+        for ref_id in ref_ids
+        for day in days
+        if rng.random() < 0.9
+    }
+
+
+def daily_totals(db, level, start, end):
+    rows = db.query(
+        DailyMetric.ref_id, *[func.sum(getattr(DailyMetric, name)) for name in ROLLUP_METRICS]
+    ).filter(
+        DailyMetric.level == level, DailyMetric.date >= start, DailyMetric.date <= end
+    ).group_by(DailyMetric.ref_id)
+    return {ref_id: dict(zip(ROLLUP_METRICS, values)) for ref_id, *values in rows}
+
+
+def rollups(db):
+    return sorted(
+        (rollup.grain, rollup.level, rollup.ref_id, rollup.period_start, rollup.days,
+         *[getattr(rollup, name) for name in ROLLUP_METRICS])
+        for rollup in db.query(MetricRollup)
+    )
+
+
+@pytest.fixture
+def metrics(db):
+    campaigns = ["c-1", "c-2", "c-3"]
+    write_daily_metrics(db, "campaign", daily_rows(campaigns, range(200), seed=1))
+    db.commit()
+    # Restate a stretch spanning a month boundary, with some days new
+    counts = write_daily_metrics(db, "campaign", daily_rows(campaigns, range(25, 40), seed=2))
+    db.commit()
+    assert counts["updated"] > 0 and counts["inserted"] > 0
+    return db
+
+
+def test_metric_totals_match_daily_sums(metrics):
+    rng = random.Random(3)
+    for _ in range(50):
+        start = START + timedelta(days=rng.randint(0, 200))
+        end = start + timedelta(days=rng.randint(0, 200))
+        assert metric_totals(metrics, "campaign", start, end) == daily_totals(metrics, "campaign", start, end)
+
+
+def test_incremental_rollups_match_rebuild(metrics):
+    incremental = rollups(metrics)
+    rebuild_metric_rollups(metrics, "campaign")
+    metrics.commit()
+    assert rollups(metrics) == incremental
+
+
+def test_unrestated_writes_leave_rows_and_rollups_alone(metrics):
+    before = rollups(metrics)
+    counts = write_daily_metrics(metrics, "campaign", daily_rows(["c-1"], range(10), seed=4), restate=False)
+    metrics.commit()
+    assert counts == {"inserted": 0, "updated": 0}
+    assert rollups(metrics) == before
@@ -0,0 +1,177 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+from models import AdMetric, AgentRun
+from services import ad_metrics_sink
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "agents"))
+
+from ingestor_microsoft_ads import MicrosoftAdsIngestor, date_chunks  # noqa: E402
+
+START, END = "2026-09-01", "2026-09-28"
+
+
+class StubIngestor(MicrosoftAdsIngestor):
+    """Serves one row per campaign and day instead of downloading reports; chunks starting in fail_on raise."""
+
+    def __init__(self, fail_on=(), chunk_days=7):
+        super().__init__("token", "client", "secret", "refresh", "customer", "acct-1",
+                         mock_mode=True, chunk_days=chunk_days, concurrency=2)
+        self.fail_on = set(fail_on)
+        self.fetched = []
+
+    def fetch_metrics(self, start_date, end_date):
+        self.fetched.append((start_date, end_date))
+        if start_date in self.fail_on:
+            raise RuntimeError("report failed")
+
+        day, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        rows = []
+        while day <= last:
+            for campaign_id in ("c-1", "c-2"):
+                rows.append({"date": day.isoformat(), "account_id": "acct-1", "campaign_id": campaign_id,
+                             "impressions": 100, "clicks": 5, "spend": 2.5, "conversions": 1, "revenue": 10.0})
+            day += timedelta(days=1)
+        return iter(rows)
+
+
+@pytest.fixture(autouse=True)
+def ad_metrics_db(monkeypatch, session_factory):
+    monkeypatch.setattr(ad_metrics_sink, "ad_metrics_session_factory", lambda: session_factory)
+
+
+def stored_days(db):
+    return sorted({metric.date for metric in db.query(AdMetric)})
+
+
+def test_date_chunks_split_inclusive_ranges():
+    assert date_chunks("2026-09-01", "2026-09-16", 7) == [
+        ("2026-09-01", "2026-09-07"),
+        ("2026-09-08", "2026-09-14"),
+        ("2026-09-15", "2026-09-16"),
+    ]
+    assert date_chunks("2026-09-01", "2026-09-01", 7) == [("2026-09-01", "2026-09-01")]
+    assert date_chunks("2026-02-27", "2026-03-02", 30) == [("2026-02-27", "2026-03-02")]
+    assert date_chunks("2026-09-02", "2026-09-01", 7) == []
+
+
+@pytest.mark.parametrize("chunk_days", [1, 3, 7, 31, 400])
+def test_date_chunks_cover_every_day_once(chunk_days):
+    chunks = date_chunks("2025-11-15", "2026-03-10", chunk_days)
+
+    day = date(2025, 11, 15)
+    for first, last in chunks:
+        assert date.fromisoformat(first) == day
+        assert (date.fromisoformat(last) - day).days < chunk_days
+        day = date.fromisoformat(last) + timedelta(days=1)
+    assert day == date(2026, 3, 11)
+
+
+def test_failed_chunk_holds_the_watermark_and_rerun_resumes(db):
+    first = StubIngestor(fail_on={"2026-09-08"}).run(START, END, "job-1", "run-1")
+
+    assert not first["ok"]
+    assert first["metrics"]["chunks_ingested"] == 3
+    # Later chunks were written, but the watermark stops before the gap
+    assert first["metrics"]["watermark"] == "2026-09-07"
+    assert db.query(AgentRun).filter_by(run_id="run-1").one().watermark == "2026-09-07"
+
+    retry = StubIngestor()
+    second = retry.run(START, END, "job-2", "run-1")
+
+    assert second["ok"]
+    assert sorted(retry.fetched) == [("2026-09-08", "2026-09-14"), ("2026-09-15", "2026-09-21"),
+                                     ("2026-09-22", "2026-09-28")]
+    assert second["metrics"]["chunks_skipped"] == 1
+    assert second["metrics"]["watermark"] == END
+
+    assert stored_days(db) == [date(2026, 9, 1) + timedelta(days=i) for i in range(28)]
+    assert db.query(AdMetric).count() == 28 * 2
+
+
+def test_resume_picks_up_the_unfinished_run_with_the_same_parameters(db):
+    StubIngestor(fail_on={"2026-09-15"}).run(START, END, "job-1", "run-1")
+
+    retry = StubIngestor()
+    result = retry.run(START, END, "job-2", "run-2", resume=True)
+
+    assert result["run_id"] == "run-1"
+    assert result["metrics"]["chunks_skipped"] == 2
+    assert db.query(AgentRun).filter_by(run_id="run-2").count() == 0
+
+
+def test_watermark_is_ignored_when_the_chunking_changed(db):
+    StubIngestor(fail_on={"2026-09-15"}).run(START, END, "job-1", "run-1")
+
+    retry = StubIngestor(chunk_days=14)
+    result = retry.run(START, END, "job-2", "run-1")
+
+    assert result["ok"]
+    assert result["metrics"]["chunks_skipped"] == 0
+    assert sorted(retry.fetched) == [("2026-09-01", "2026-09-14"), ("2026-09-15", "2026-09-28")]
+    assert db.query(AdMetric).count() == 28 * 2
+
+
+REPORT_CSV = (
+    "\ufeffTimePeriod,AccountId,CampaignId,CampaignName,AdGroupId,AdGroupName,"
+    "Impressions,Clicks,Spend,Conversions,Revenue\n"
+    '2026-09-01,acct-1,c-1,"Brand, exact",ag-1,Core,100,5,2.50,1,10.00\n'
+    "2026-09-01,acct-1,c-2,Generic,ag-2,Broad,,,,,\n"
+    "2026-09-02,acct-1,c-1,\"Brand, exact\",ag-1,Core,80,4,2.00,0,0\n"
+    "2026-09-02,acct-1,c-2,Generic,,,10,1,0.25,0,0\n"
+    "2026-09-02,acct-1,c-3,Display,ag-3,Banners,1,0,0.01,0,0\n"
+    "Total,,--,,,,191,10,4.76,1,10.00\n"
+    ",,,,,,191,10,4.76,1,10.00\n"
+)
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text(REPORT_CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_report_csv_is_parsed_lazily_without_summary_rows(report_path):
+    rows = MicrosoftAdsIngestor.parse_report_csv(report_path)
+    assert iter(rows) is rows
+
+    rows = list(rows)
+    assert [(row["date"], row["campaign_id"]) for row in rows] == [
+        ("2026-09-01", "c-1"), ("2026-09-01", "c-2"), ("2026-09-02", "c-1"), ("2026-09-02", "c-2"),
+        ("2026-09-02", "c-3"),
+    ]
+    assert rows[0]["account_id"] == "acct-1" and rows[0]["campaign_name"] == "Brand, exact"
+    assert (rows[0]["impressions"], rows[0]["spend"], rows[0]["revenue"]) == (100, 2.5, 10.0)
+    # Blank metrics count as zero
+    assert (rows[1]["impressions"], rows[1]["clicks"], rows[1]["spend"]) == (0, 0, 0.0)
+
+
+def test_report_rows_stream_into_ad_metrics_in_batches(db, session_factory, report_path):
+    ingestor = StubIngestor()
+    ingestor.raw_mode = "compressed"
+
+    with ad_metrics_sink.AdMetricsSink(session_factory, batch_size=2) as sink:
+        rows = ingestor.normalize_to_ad_metrics(ingestor.parse_report_csv(report_path))
+        assert ingestor.upsert_to_database(rows, sink=sink) == 5
+    assert sink.stats["batches"] == 3
+
+    # Re-ingesting the same report updates the rows in place
+    assert ingestor.upsert_to_database(ingestor.normalize_to_ad_metrics(ingestor.parse_report_csv(report_path))) == 5
+    assert db.query(AdMetric).count() == 5
+
+    metric = db.query(AdMetric).filter_by(date=date(2026, 9, 2), campaign_id="c-2").one()
+    assert metric.adgroup_id == "" and metric.spend == 0.25
+    assert ad_metrics_sink.decode_raw(metric.raw)["campaign_name"] == "Generic"
+
+
+def test_dry_runs_count_report_rows_without_writing(db, report_path):
+    ingestor = StubIngestor()
+    ingestor.dry_run = True
+
+    rows = ingestor.normalize_to_ad_metrics(ingestor.parse_report_csv(report_path))
+    assert ingestor.upsert_to_database(rows) == 5
+    assert db.query(AdMetric).count() == 0
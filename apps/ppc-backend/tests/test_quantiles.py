@@ -0,0 +1,69 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models import DailyMetric
+from services.quantiles import KeywordConversionRateDistribution, KLLSketch
+
+
+@pytest.mark.parametrize("q", [0, 0.1, 0.25, 0.5, 0.9, 1])
+def test_sketch_is_exact_before_compacting(q):
+    values = np.random.default_rng(1).gamma(2.0, 3.0, 150)
+    sketch = KLLSketch(k=200, seed=1)
+    sketch.update_many(values)
+
+    assert sketch.quantile(q) == pytest.approx(np.percentile(values, q * 100))
+
+
+def test_sketch_rank_error_stays_small_after_compacting():
+    values = np.random.default_rng(2).lognormal(0.0, 1.0, 200_000)
+    sketch = KLLSketch(k=200, seed=2)
+    for batch in np.array_split(values, 20):
+        sketch.update_many(batch)
+
+    ordered = np.sort(values)
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.02
+    assert len(sketch) == len(values)
+    assert sketch._size() < 2000
+
+
+def test_sketch_ignores_nan_and_is_empty_until_updated():
+    sketch = KLLSketch()
+    assert sketch.quantile(0.5) is None
+
+    sketch.update_many([1.0, np.nan, 3.0])
+    sketch.update(2.0)
+    assert (len(sketch), sketch.quantile(0.5)) == (3, 2.0)
+
+
+def test_conversion_rate_percentiles_match_numpy(db):
+    rng = np.random.default_rng(3)
+    rates = []
+    # Few enough rates for the SQLite sketch to be exact
+    for i in range(200):
+        clicks, conversions = int(rng.integers(0, 200)), float(rng.integers(0, 10))
+        level = "keyword" if i % 10 else "campaign"
+        db.add(DailyMetric(date=date(2026, 10, 1), level=level, ref_id=f"ref-{i}",
+                           clicks=clicks, conversions=conversions))
+        if level == "keyword" and clicks > 0 and conversions > 0:
+            rates.append(conversions * 100.0 / clicks)
+    db.commit()
+
+    distribution = KeywordConversionRateDistribution(db)
+    assert len(rates) < 200
+    for percentile in (25, 50, 75):
+        assert distribution.percentile(percentile) == pytest.approx(np.percentile(rates, percentile))
+
+    # Cached per percentile and built once
+    sketch = distribution._sketch
+    distribution.percentile(90)
+    assert distribution._sketch is sketch
+
+
+def test_conversion_rate_percentile_is_none_without_conversions(db):
+    db.add(DailyMetric(date=date(2026, 10, 1), level="keyword", ref_id="kw-1", clicks=10, conversions=0.0))
+    db.commit()
+    assert KeywordConversionRateDistribution(db).percentile(25) is None
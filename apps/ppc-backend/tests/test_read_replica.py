@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import ReadReplica, RoutingSession
+from models import Base, Campaign
+
+
+def campaign_database(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(Campaign(id="c-1", name=name, status="ENABLED"))
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def primary(tmp_path, monkeypatch):
+    engine = campaign_database(tmp_path / "primary.db", "primary")
+    monkeypatch.setattr(database, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    engine = campaign_database(tmp_path / "replica.db", "replica")
+    replica = ReadReplica(engine, None, max_lag_seconds=30, check_seconds=60)
+    monkeypatch.setattr(database, "read_replica", replica)
+    yield replica
+    engine.dispose()
+
+
+def read_name(session):
+    return session.get(Campaign, "c-1", populate_existing=True).name
+
+
+def test_reads_go_to_the_replica_and_everything_after_a_write_to_the_primary(primary, replica):
+    session = RoutingSession()
+    assert read_name(session) == "replica"
+
+    session.execute(update(Campaign).values(status="PAUSED"))
+    assert read_name(session) == "primary"
+    session.rollback()
+
+
+def test_flushes_pin_the_session_to_the_primary(primary, replica):
+    session = RoutingSession()
+    session.add(Campaign(id="c-2", name="new", status="ENABLED"))
+    session.flush()
+
+    assert read_name(session) == "primary"
+    session.rollback()
+
+
+def test_reads_fall_back_to_the_primary_while_the_replica_lags(primary, replica, monkeypatch):
+    monkeypatch.setenv("DATABASE_READ_LAG_QUERY", "SELECT 120")
+    lagging = ReadReplica(replica.engine, None, max_lag_seconds=30, check_seconds=60)
+    monkeypatch.setattr(database, "read_replica", lagging)
+
+    assert read_name(RoutingSession()) == "primary"
+    assert lagging.status()["lag_seconds"] == 120 and not lagging.status()["healthy"]
+
+
+def test_reads_fall_back_to_the_primary_without_a_replica(primary, monkeypatch):
+    monkeypatch.setattr(database, "read_replica", None)
+    assert read_name(RoutingSession()) == "primary"
+
+
+def test_unreachable_replicas_are_reported(tmp_path):
+    missing = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replica = ReadReplica(missing, None, max_lag_seconds=30, check_seconds=60)
+
+    assert not replica.available()
+    assert replica.status()["error"] and not replica.status()["healthy"]
+
+
+def test_probes_are_cached_for_check_seconds(replica, tmp_path):
+    assert replica.available()
+    replica.engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+    # Within check_seconds the last probe stands, so the outage isn't seen yet
+    assert replica.available()
+
+    replica.check_seconds = 0
+    assert not replica.available()
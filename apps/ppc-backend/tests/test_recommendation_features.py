@@ -0,0 +1,80 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from models import AdGroup, Campaign, DailyMetric, Keyword
+from services.recommendation_features import METRIC_COLUMNS, METRIC_WINDOWS, extract_features
+
+AS_OF = date(2026, 10, 15)
+
+
+@pytest.fixture
+def account(db):
+    db.add_all([
+        Campaign(id="c-1", name="Brand", status="ENABLED", daily_budget_micros=50_000_000),
+        Campaign(id="c-2", name="Generic", status="ENABLED"),
+        AdGroup(id="ag-1", campaign_id="c-1", name="Brand", status="ENABLED"),
+        AdGroup(id="ag-2", campaign_id="c-2", name="Generic", status="ENABLED"),
+        Keyword(id="kw-1", ad_group_id="ag-1", text="brand", match_type="EXACT", status="ENABLED", icp_score=80),
+        Keyword(id="kw-2", ad_group_id="ag-1", text="brand shoes", match_type="PHRASE", status="ENABLED",
+                icp_score=40),
+        Keyword(id="kw-3", ad_group_id="ag-2", text="shoes", match_type="BROAD", status="ENABLED"),
+        # No metrics at all
+        Keyword(id="kw-4", ad_group_id="ag-2", text="cheap shoes", match_type="BROAD", status="ENABLED",
+                icp_score=10),
+    ])
+
+    rng = random.Random(1)
+    rows = []
+    for level, ref_ids in (("campaign", ["c-1", "c-2"]), ("keyword", ["kw-1", "kw-2", "kw-3"])):
+        for ref_id in ref_ids:
+            for days_ago in range(45):
+                if rng.random() < 0.8:
+                    rows.append(DailyMetric(
+                        date=AS_OF - timedelta(days=days_ago), level=level, ref_id=ref_id,
+                        impressions=rng.randint(0, 1000), clicks=rng.randint(0, 50),
+                        cost_micros=rng.randint(0, 50) * 1_000_000, conversions=float(rng.randint(0, 3))
+                    ))
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def expected_window(rows, level, ref_id, name, days):
+    cutoff = AS_OF - timedelta(days=days)
+    matching = [row for row in rows if row.level == level and row.ref_id == ref_id and row.date >= cutoff]
+    return len(matching) if name == "rows" else sum(getattr(row, name) for row in matching)
+
+
+def test_windows_match_per_entity_sums(db, account):
+    features = extract_features(db, AS_OF)
+
+    for level, entities in (("keyword", features.keywords), ("campaign", features.campaigns)):
+        for i, ref_id in enumerate(entities.ids):
+            for days in METRIC_WINDOWS:
+                for name in METRIC_COLUMNS + ("rows",):
+                    assert entities.window(name, days)[i] == expected_window(account, level, ref_id, name, days)
+
+
+def test_entities_without_metrics_get_zeros_and_missing_scores_nan(db, account):
+    keywords = extract_features(db, AS_OF).keywords
+    kw4, kw3 = keywords.ids.index("kw-4"), keywords.ids.index("kw-3")
+
+    assert all(keywords.window(name, 30)[kw4] == 0 for name in METRIC_COLUMNS)
+    assert np.isnan(keywords.icp_score[kw3])
+    assert keywords.campaign_id[kw4] == "c-2"
+
+
+def test_campaign_features_join_budgets_and_average_icp(db, account):
+    features = extract_features(db, AS_OF)
+    campaigns = dict(zip(features.campaigns.ids, range(len(features.campaigns))))
+
+    assert features.campaigns.daily_budget_micros[campaigns["c-2"]] == 0
+    assert features.campaigns.avg_icp[campaigns["c-1"]] == 60
+    # kw-3 has no score, so only kw-4 counts
+    assert features.campaigns.avg_icp[campaigns["c-2"]] == 10
+    assert features.account_conversions_30d == sum(
+        expected_window(account, "campaign", ref_id, "conversions", 30) for ref_id in ("c-1", "c-2")
+    )
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from models import Recommendation, RecommendationInput
+from routers.recommend import RULE_VERSIONS, _reconcile_rule, generate_recommendation_id
+
+REC_TYPE = "pause_keyword"
+
+
+def _inputs(features):
+    entity_ids = sorted(features)
+    return entity_ids, [(features[entity_id],) for entity_id in entity_ids]
+
+
+def _generate(features, evaluate):
+    """Recommend every evaluated entity with positive spend; the impact is the spend."""
+    entity_ids, _ = _inputs(features)
+    return {
+        entity_ids[i]: Recommendation(
+            id=generate_recommendation_id(REC_TYPE, entity_ids[i]),
+            type=REC_TYPE,
+            target_level="keyword",
+            target_id=entity_ids[i],
+            projected_impact=features[entity_ids[i]],
+            rule_version=RULE_VERSIONS[REC_TYPE]
+        )
+        for i in np.flatnonzero(evaluate)
+        if features[entity_ids[i]] > 0
+    }
+
+
+def reconcile(db, features, force_refresh=False):
+    counts = _reconcile_rule(db, features, REC_TYPE, _inputs, _generate, force_refresh)
+    db.commit()
+    return counts
+
+
+def stored(db):
+    return {rec.target_id: rec for rec in db.query(Recommendation)}
+
+
+@pytest.fixture
+def seeded(db):
+    reconcile(db, {"kw-1": 100.0, "kw-2": 50.0, "kw-3": 0.0})
+    return db
+
+
+def test_first_run_inserts_recommendations(seeded):
+    recs = stored(seeded)
+    assert set(recs) == {"kw-1", "kw-2"}
+    assert all(rec.status == "proposed" for rec in recs.values())
+    assert seeded.query(RecommendationInput).count() == 3
+
+
+def test_unchanged_inputs_are_not_re_evaluated(seeded):
+    counts = reconcile(seeded, {"kw-1": 100.0, "kw-2": 50.0, "kw-3": 0.0})
+    assert counts == {"evaluated": 0, "inserted": 0, "updated": 0, "retired": 0}
+
+
+def test_changed_inputs_update_insert_and_retire(seeded):
+    counts = reconcile(seeded, {"kw-1": 120.0, "kw-2": 0.0, "kw-3": 30.0})
+    assert counts == {"evaluated": 3, "inserted": 1, "updated": 1, "retired": 1}
+
+    recs = stored(seeded)
+    assert recs["kw-1"].projected_impact == 120.0
+    assert recs["kw-2"].status == "retired"
+    assert recs["kw-3"].status == "proposed"
+
+
+def test_retired_recommendation_is_revived_under_the_same_id(seeded):
+    original_id = stored(seeded)["kw-2"].id
+    reconcile(seeded, {"kw-1": 100.0, "kw-2": 0.0, "kw-3": 0.0})
+    counts = reconcile(seeded, {"kw-1": 100.0, "kw-2": 60.0, "kw-3": 0.0})
+
+    assert counts["updated"] == 1
+    assert stored(seeded)["kw-2"].id == original_id
+    assert stored(seeded)["kw-2"].status == "proposed"
+
+
+def test_vanished_entities_are_retired(seeded):
+    counts = reconcile(seeded, {"kw-1": 100.0})
+    assert counts["retired"] == 1
+    assert stored(seeded)["kw-2"].status == "retired"
+
+
+def test_acted_on_recommendations_are_left_alone(seeded):
+    stored(seeded)["kw-1"].status = "applied"
+    seeded.commit()
+
+    counts = reconcile(seeded, {"kw-1": 0.0, "kw-2": 50.0, "kw-3": 0.0})
+    assert counts["retired"] == 0
+    assert stored(seeded)["kw-1"].status == "applied"
+    assert stored(seeded)["kw-1"].projected_impact == 100.0
+
+
+def test_force_refresh_re_evaluates_everything(seeded):
+    counts = reconcile(seeded, {"kw-1": 100.0, "kw-2": 50.0, "kw-3": 0.0}, force_refresh=True)
+    assert counts == {"evaluated": 3, "inserted": 0, "updated": 2, "retired": 0}
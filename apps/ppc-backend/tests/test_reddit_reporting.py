@@ -0,0 +1,106 @@
+import asyncio
+from contextlib import aclosing
+from datetime import date
+
+import httpx
+import pytest
+
+from ads import reddit_reporting
+from ads.reddit_reporting import RedditReportingClient
+
+BASE_URL = "https://reddit.test/api/v2.0"
+
+
+class ReportingAPI:
+    """Reddit Ads stand-in paging every list two items at a time through next_url."""
+
+    def __init__(self, campaigns, fail_account=None):
+        self.campaigns = campaigns
+        self.fail_account = fail_account
+        self.requests = []
+
+    def page(self, request, items):
+        offset = int(request.url.params.get("cursor", 0))
+        next_url = None
+        if offset + 2 < len(items):
+            next_url = str(request.url.copy_merge_params({"cursor": offset + 2}))
+        return httpx.Response(200, json={"data": items[offset:offset + 2], "pagination": {"next_url": next_url}})
+
+    def __call__(self, request):
+        self.requests.append(request)
+        path = request.url.path.removeprefix("/api/v2.0")
+        if path == "/accounts":
+            return self.page(request, [{"id": account_id} for account_id in self.campaigns])
+
+        account_id = path.split("/")[2]
+        if account_id == self.fail_account:
+            return httpx.Response(500)
+        return self.page(request, [
+            {"campaign_id": campaign, "date": "2026-09-01", "metrics": {"impressions": 100, "spend": 2.5}}
+            for campaign in self.campaigns[account_id]
+        ])
+
+
+async def reporting(api):
+    reddit = RedditReportingClient("token")
+    await reddit.client.aclose()
+    reddit.client = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(api))
+    return reddit
+
+
+def stream(api, limit=None, **kwargs):
+    async def run():
+        rows = []
+        async with await reporting(api) as reddit:
+            async with aclosing(reddit.stream_campaign_rows("2026-09-01", "2026-09-01", **kwargs)) as rows_stream:
+                async for row in rows_stream:
+                    rows.append(row)
+                    if len(rows) == limit:
+                        break
+        return rows
+    return asyncio.run(run())
+
+
+CAMPAIGNS = {f"a-{account}": [f"c-{account}-{i}" for i in range(5)] for account in range(5)}
+
+
+def test_every_page_of_every_account_is_streamed():
+    api = ReportingAPI(CAMPAIGNS)
+    rows = stream(api)
+
+    assert sorted((row["account_id"], row["campaign_id"]) for row in rows) == sorted(
+        (account_id, campaign) for account_id, campaigns in CAMPAIGNS.items() for campaign in campaigns
+    )
+    assert {(row["date"], row["impressions"], row["spend"]) for row in rows} == {(date(2026, 9, 1), 100, 2.5)}
+    # 3 pages of accounts, then 3 pages of campaigns for each
+    assert len(api.requests) == 3 + 5 * 3
+
+
+def test_only_the_given_accounts_are_streamed():
+    api = ReportingAPI(CAMPAIGNS)
+    rows = stream(api, account_ids=["a-1"])
+    assert {row["account_id"] for row in rows} == {"a-1"} and len(rows) == 5
+
+
+def test_failures_of_any_account_are_raised():
+    with pytest.raises(httpx.HTTPStatusError):
+        stream(ReportingAPI(CAMPAIGNS, fail_account="a-3"))
+
+
+def test_consumers_can_stop_early(monkeypatch):
+    monkeypatch.setattr(reddit_reporting, "QUEUE_PAGES", 1)
+    api = ReportingAPI({"a-0": [f"c-{i}" for i in range(100)]})
+
+    assert len(stream(api, limit=3)) == 3
+    # The fetcher stopped with the queue full instead of paging to the end
+    assert len(api.requests) < 10
+
+
+def test_inline_metrics_are_normalized_like_nested_ones():
+    nested = reddit_reporting.campaign_metrics_row("a-1", {"campaign_id": "c-1", "metrics": {"clicks": 3}}, "2026-09-01")
+    inline = reddit_reporting.campaign_metrics_row("a-1", {"id": "c-1", "clicks": 3}, "2026-09-01")
+
+    assert {key: value for key, value in nested.items() if key != "raw"} == {
+        key: value for key, value in inline.items() if key != "raw"
+    }
+    assert nested["clicks"] == 3 and nested["date"] == date(2026, 9, 1)
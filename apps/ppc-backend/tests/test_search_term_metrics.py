@@ -0,0 +1,87 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from models import SearchTermWindowMetric
+from services.recommendation_features import METRIC_COLUMNS, METRIC_WINDOWS
+from services.search_term_metrics import rebuild_search_term_windows, record_search_term_metrics, roll_search_term_windows
+
+START = date(2026, 8, 1)
+TERMS = [f"term-{i}" for i in range(5)]
+
+
+def daily_rows(days, seed):
+    rng = random.Random(seed)
+    return {
+        (term_id, day): {
+            "impressions": rng.randint(0, 1000),
+            "clicks": rng.randint(0, 50),
+            "cost_micros": rng.randint(0, 50) * 1_000_000,
+            "conversions": float(rng.randint(0, 3)),
+        }
+        for term_id in TERMS
+        for day in days
+        if rng.random() < 0.8
+    }
+
+
+def record(db, rows, as_of):
+    # Callers commit after recording, like the sync does
+    record_search_term_metrics(db, rows, as_of)
+    db.commit()
+
+
+def windows(db):
+    db.flush()
+    return {
+        window.search_term_id: (window.as_of, *[
+            getattr(window, f"{name}_{days}d") for days in METRIC_WINDOWS for name in METRIC_COLUMNS
+        ])
+        for window in db.query(SearchTermWindowMetric)
+    }
+
+
+def rebuilt(db, as_of):
+    rolled = windows(db)
+    assert rolled
+    rebuild_search_term_windows(db, as_of, term_ids=sorted(rolled))
+    return rolled, windows(db)
+
+
+@pytest.mark.parametrize("steps", [[1, 1, 1], [3, 8], [45], [2, 31]])
+def test_rolling_matches_rebuild(db, steps):
+    as_of = START + timedelta(days=40)
+    record(db, daily_rows([START + timedelta(days=d) for d in range(41)], seed=1), as_of)
+
+    for step in steps:
+        as_of += timedelta(days=step)
+        roll_search_term_windows(db, as_of)
+
+    rolled, expected = rebuilt(db, as_of)
+    assert rolled == expected
+
+
+def test_new_days_and_restatements_match_rebuild(db):
+    as_of = START + timedelta(days=30)
+    record(db, daily_rows([START + timedelta(days=d) for d in range(31)], seed=2), as_of)
+
+    # A day later: today's facts arrive and the last week is restated
+    as_of += timedelta(days=1)
+    restated = [as_of - timedelta(days=d) for d in range(8)]
+    record(db, daily_rows(restated, seed=3), as_of)
+
+    rolled, expected = rebuilt(db, as_of)
+    assert rolled == expected
+
+
+def test_new_terms_are_seeded_from_stored_facts(db):
+    as_of = START + timedelta(days=10)
+    record(db, daily_rows([START + timedelta(days=d) for d in range(11)], seed=4), as_of)
+    db.query(SearchTermWindowMetric).delete()
+    db.commit()
+
+    record(db, daily_rows([as_of], seed=5), as_of)
+
+    rolled, expected = rebuilt(db, as_of)
+    assert rolled == expected
@@ -0,0 +1,47 @@
+from datetime import date
+
+import numpy as np
+
+from services import simulation
+from services.simulation import SimulationCache, budget_spend_ratio
+
+
+def test_budget_increase_scales_constrained_campaigns():
+    ratio = budget_spend_ratio(np.array([20e6]), np.array([19e6]), np.array([20.0]))
+    assert np.allclose(ratio, [1.2])
+
+
+def test_budget_increase_leaves_unconstrained_campaigns():
+    ratio = budget_spend_ratio(np.array([20e6]), np.array([5e6]), np.array([50.0]))
+    assert np.allclose(ratio, [1.0])
+
+
+def test_budget_increase_never_lowers_over_delivering_spend():
+    # 25M/day on a 20M budget; +20% is a 24M budget, below current spend
+    ratio = budget_spend_ratio(np.array([20e6]), np.array([25e6]), np.array([20.0]))
+    assert ratio[0] >= 1.0
+
+
+def test_budget_cut_caps_spend_at_new_budget():
+    ratio = budget_spend_ratio(np.array([20e6, 20e6]), np.array([25e6, 10e6]), np.array([-20.0, -20.0]))
+    assert np.allclose(ratio, [16e6 / 25e6, 1.0])
+
+
+def test_zero_spend_is_unchanged():
+    ratio = budget_spend_ratio(np.array([20e6]), np.array([0.0]), np.array([20.0]))
+    assert np.allclose(ratio, [1.0])
+
+
+def test_data_version_is_reused_within_ttl(monkeypatch):
+    calls = []
+    monkeypatch.setattr(simulation, "get_data_version", lambda db, as_of: calls.append(as_of) or f"v{len(calls)}")
+    cache = SimulationCache()
+
+    assert cache.data_version(None, date(2026, 10, 1)) == "v1"
+    assert cache.data_version(None, date(2026, 10, 1)) == "v1"
+    assert cache.data_version(None, date(2026, 10, 2)) == "v2"
+
+    monkeypatch.setattr(simulation, "DATA_VERSION_TTL_SECONDS", 0)
+    expiring = SimulationCache()
+    assert expiring.data_version(None, date(2026, 10, 2)) == "v3"
+    assert expiring.data_version(None, date(2026, 10, 2)) == "v4"
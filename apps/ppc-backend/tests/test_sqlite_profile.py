@@ -0,0 +1,104 @@
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import WriteQueue, apply_sqlite_profile
+from models import AuditLog, Base
+
+
+def pragmas(engine, *names):
+    with engine.connect() as connection:
+        return [connection.execute(text(f"PRAGMA {name}")).scalar() for name in names]
+
+
+def test_profile_applies_to_every_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_profile(engine, serialize_writes=False)
+
+    assert pragmas(engine, "journal_mode", "synchronous", "busy_timeout", "temp_store") == [
+        "wal", 1, database.SQLITE_BUSY_TIMEOUT_MS, 2
+    ]
+    engine.dispose()
+
+
+def test_in_memory_databases_skip_the_journal_pragmas():
+    engine = create_engine("sqlite://")
+    apply_sqlite_profile(engine, serialize_writes=False)
+    assert pragmas(engine, "journal_mode", "synchronous") == ["memory", 1]
+
+
+def test_write_queue_hands_the_lock_over_in_arrival_order():
+    queue = WriteQueue(timeout=5)
+    holder, order = object(), []
+    assert queue.acquire(holder)
+    # Re-entrant for the owner that holds it
+    assert queue.acquire(holder)
+
+    def writer(name):
+        owner = object()
+        queue.acquire(owner)
+        order.append(name)
+        queue.release(owner)
+
+    threads = []
+    for name in ("first", "second", "third"):
+        threads.append(threading.Thread(target=writer, args=(name,)))
+        threads[-1].start()
+        while queue.snapshot()["waiting"] < len(threads):
+            time.sleep(0.001)
+
+    queue.release(holder)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["first", "second", "third"]
+    snapshot = queue.snapshot()
+    assert (snapshot["acquired"], snapshot["timeouts"], snapshot["waiting"], snapshot["held"]) == (4, 0, 0, False)
+
+
+def test_write_queue_times_out_and_ignores_foreign_releases():
+    queue = WriteQueue(timeout=0.05)
+    holder = object()
+    queue.acquire(holder)
+
+    queue.release(object())
+    assert not queue.acquire(object())
+    assert queue.snapshot()["timeouts"] == 1 and queue.snapshot()["held"]
+
+
+def test_queued_writers_do_not_hit_database_is_locked(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "write_queue", WriteQueue(timeout=10))
+    monkeypatch.setitem(database.SQLITE_PRAGMAS, "busy_timeout", 0)
+    engine = create_engine(f"sqlite:///{tmp_path / 'queued.db'}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine, serialize_writes=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    errors = []
+
+    def writer(worker):
+        try:
+            for i in range(20):
+                with Session() as session:
+                    session.add(AuditLog(id=f"log-{worker}-{i}", action="sync", user="tester"))
+                    session.flush()
+                    # Hold the write transaction open for a moment
+                    time.sleep(0.001)
+                    session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with Session() as session:
+        assert session.query(AuditLog).count() == 80
+    assert database.write_queue.snapshot()["held"] is False
+    engine.dispose()
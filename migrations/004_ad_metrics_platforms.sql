@@ -0,0 +1,7 @@
+-- Allow Microsoft and LinkedIn rows in ad_metrics (written by the ppc-backend ingestion sink),
+-- and add the row timestamps the sink sets on insert and upsert
+
+ALTER TABLE ad_metrics
+  MODIFY platform ENUM('google','reddit','x','microsoft','linkedin') NOT NULL,
+  ADD COLUMN created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  ADD COLUMN updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;